@@ -1,3 +1,29 @@
 from django.contrib import admin
+from .models import AIResultCache, ATReportBatch, ATReportBatchItem
 
-# Register your models here.
+
+@admin.register(AIResultCache)
+class AIResultCacheAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'key', 'model', 'prompt_version', 'hit_count', 'created_at', 'last_hit_at']
+    list_filter = ['kind', 'model', 'prompt_version']
+    search_fields = ['key']
+    readonly_fields = [
+        'key', 'kind', 'model', 'prompt_version', 'result',
+        'prompt_tokens', 'completion_tokens', 'hit_count', 'created_at', 'last_hit_at',
+    ]
+
+
+class ATReportBatchItemInline(admin.TabularInline):
+    model = ATReportBatchItem
+    extra = 0
+    fields = ['position', 'filename', 'status', 'participant_name', 'error', 'attempts', 'finished_at']
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(ATReportBatch)
+class ATReportBatchAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'report_type', 'send_email', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['report_type', 'send_email']
+    readonly_fields = ['id', 'created_at', 'finished_at']
+    inlines = [ATReportBatchItemInline]
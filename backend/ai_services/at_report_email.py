@@ -5,7 +5,6 @@ This module provides email functionality for AT Reports using the Gmail API inte
 """
 from gmail_integration.services import gmail_service
 from gmail_integration.models import EmailTemplate
-from .pdf_generator import generate_at_report_pdf
 
 
 def send_at_report_email_via_gmail(
@@ -14,7 +13,8 @@ def send_at_report_email_via_gmail(
     cc_emails: list = None,
     custom_message: str = None,
     from_address: str = None,
-    connection_email: str = None
+    connection_email: str = None,
+    pdf_bytes: bytes = None
 ) -> dict:
     """
     Send AT Report email via Gmail API integration
@@ -24,18 +24,21 @@ def send_at_report_email_via_gmail(
         to_emails: List of recipient email addresses
         cc_emails: List of CC email addresses (optional)
         custom_message: Custom message to include in email (optional)
+        pdf_bytes: Already generated report PDF (optional, generated if omitted)
         
     Returns:
         dict with success status and details
     """
     # Generate PDF
-    pdf_buffer = generate_at_report_pdf(form_data)
-    
-    # Convert BytesIO to bytes
-    if hasattr(pdf_buffer, 'getvalue'):
-        pdf_bytes = pdf_buffer.getvalue()
-    else:
-        pdf_bytes = pdf_buffer
+    if pdf_bytes is None:
+        from .pdf_generator import generate_at_report_pdf
+        pdf_buffer = generate_at_report_pdf(form_data)
+        
+        # Convert BytesIO to bytes
+        if hasattr(pdf_buffer, 'getvalue'):
+            pdf_bytes = pdf_buffer.getvalue()
+        else:
+            pdf_bytes = pdf_buffer
     
     # Get participant info for filename
     participant_name = form_data.get('participant', {}).get('name', 'Report')
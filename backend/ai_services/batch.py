@@ -0,0 +1,342 @@
+"""
+Batch AT report processing
+
+Each ATReportBatchItem goes pending → extracting → generating → (emailing) →
+completed, or failed with the error recorded. Items run on a small
+process-wide thread pool (the work is mostly waiting on OpenAI, pool
+workers for PDF text and Gmail), so a coordinator's backlog is processed
+unattended after the upload request returns.
+
+Items are claimed with a conditional UPDATE on status, so the request-time
+pool and `manage.py process_at_report_batches` (which also resumes items
+left in progress by a restarted worker) never process the same item twice.
+
+Uploaded and generated PDFs hold patient health information and are kept
+in S3, so any instance can process or serve them. An item's source PDF is
+deleted once its report exists; `manage.py prune_at_report_batches`
+deletes old batches with their reports.
+"""
+import functools
+import logging
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ATReportBatch, ATReportBatchItem
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 3
+MAX_FILES_PER_BATCH = 200
+MAX_PDF_BYTES = 50 * 1024 * 1024
+MAX_BATCH_BYTES = 500 * 1024 * 1024
+S3_FOLDER = 'at-report-batches'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class BatchUploadError(ValueError):
+    """Raised for an upload that cannot become a batch (bad file, too many files)"""
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='at-report-batch')
+        return _executor
+
+
+# ---------------------------------------------------------------------------
+# Upload handling
+# ---------------------------------------------------------------------------
+
+def collect_pdfs(uploaded_files):
+    """
+    Return [(filename, size, read)] for uploaded PDFs and/or ZIP archives of
+    PDFs, in upload order (ZIP members in archive order). Only sizes are
+    checked here; read() returns one file's bytes when create_batch stores
+    it, so a large upload is never held in memory at once.
+    """
+    pdfs = []
+    total = 0
+    for upload in uploaded_files:
+        name = os.path.basename(upload.name)
+        lower = name.lower()
+        if lower.endswith('.pdf'):
+            if upload.size > MAX_PDF_BYTES:
+                raise BatchUploadError(f'{name} is larger than {MAX_PDF_BYTES // (1024 * 1024)} MB')
+            pdfs.append((name, upload.size, upload.read))
+            total += upload.size
+        elif lower.endswith('.zip'):
+            try:
+                archive = zipfile.ZipFile(upload)
+            except zipfile.BadZipFile:
+                raise BatchUploadError(f'{name} is not a valid ZIP file')
+            # Left open: members are read later by create_batch
+            for info in archive.infolist():
+                member = os.path.basename(info.filename)
+                if info.is_dir() or info.filename.startswith('__MACOSX/') or member.startswith('.'):
+                    continue
+                if not member.lower().endswith('.pdf'):
+                    continue
+                if info.file_size > MAX_PDF_BYTES:
+                    raise BatchUploadError(f'{member} in {name} is larger than {MAX_PDF_BYTES // (1024 * 1024)} MB')
+                pdfs.append((member, info.file_size, functools.partial(archive.read, info)))
+                total += info.file_size
+        else:
+            raise BatchUploadError(f'{name} must be a PDF or ZIP file')
+
+        if len(pdfs) > MAX_FILES_PER_BATCH:
+            raise BatchUploadError(f'A batch can contain at most {MAX_FILES_PER_BATCH} PDFs')
+        if total > MAX_BATCH_BYTES:
+            raise BatchUploadError(f'A batch can contain at most {MAX_BATCH_BYTES // (1024 * 1024)} MB of PDFs')
+
+    if not pdfs:
+        raise BatchUploadError('No PDF files found in upload')
+    return pdfs
+
+
+def _upload_pdf(s3, pdf_bytes, filename, folder):
+    return s3.upload_file(ContentFile(pdf_bytes), filename, folder=f'{S3_FOLDER}/{folder}')['s3_key']
+
+
+def create_batch(pdfs, created_by=None, **options):
+    """
+    Create a batch with one pending item per (filename, size, read) from
+    collect_pdfs, uploading each source PDF to S3 in turn
+    """
+    from documents.services import S3Service
+
+    s3 = S3Service()
+    uploaded = []
+    try:
+        for filename, _size, read in pdfs:
+            uploaded.append(_upload_pdf(s3, read(), filename, 'source'))
+    except Exception:
+        for s3_key in uploaded:
+            _delete_pdf(s3, s3_key)
+        raise
+
+    batch = ATReportBatch.objects.create(created_by=created_by, **options)
+    ATReportBatchItem.objects.bulk_create([
+        ATReportBatchItem(batch=batch, position=position, filename=filename, source_s3_key=s3_key)
+        for position, ((filename, _size, _read), s3_key) in enumerate(zip(pdfs, uploaded))
+    ])
+    return batch
+
+
+def _delete_pdf(s3, s3_key):
+    """Delete a stored PDF; failures are logged, not raised"""
+    try:
+        s3.delete_file(s3_key)
+    except Exception as e:
+        logger.warning(f"Could not delete {s3_key} from S3: {e}")
+
+
+def open_report(item):
+    """Streaming body of an item's generated report PDF"""
+    from documents.services import S3Service
+    return S3Service().get_file(item.report_s3_key)
+
+
+def delete_item_files(items):
+    """Delete the stored PDFs of `items` (before deleting the rows)"""
+    from documents.services import S3Service
+
+    s3 = None
+    for item in items:
+        for s3_key in (item.source_s3_key, item.report_s3_key):
+            if s3_key:
+                s3 = s3 or S3Service()
+                _delete_pdf(s3, s3_key)
+
+
+# ---------------------------------------------------------------------------
+# Processing
+# ---------------------------------------------------------------------------
+
+def extraction_to_form_data(data):
+    """
+    Map flat extracted fields to the nested form data used by
+    generate_at_report_pdf (same mapping as the AT report form's import).
+    """
+    return {
+        'participant': {
+            'name': data.get('participant_name', ''),
+            'address': data.get('address', ''),
+            'contactTelephone': data.get('contact_telephone', ''),
+            'email': data.get('email', ''),
+            'ndisNumber': data.get('ndis_number', ''),
+            'dateOfBirth': data.get('date_of_birth', ''),
+            'preferredContact': data.get('preferred_contact', ''),
+            'nomineeName': data.get('nominee_name', ''),
+            'nomineePhone': data.get('nominee_phone', ''),
+            'coordinatorName': data.get('coordinator_name', ''),
+            'coordinatorPhone': data.get('coordinator_phone', ''),
+            'coordinatorEmail': data.get('coordinator_email', ''),
+        },
+        'assessor': {
+            'name': data.get('assessor_name', ''),
+            'qualifications': data.get('assessor_qualifications', ''),
+            'telephone': data.get('assessor_telephone', ''),
+            'email': data.get('assessor_email', ''),
+            'registrationNumber': data.get('assessor_registration_number', ''),
+            'assessmentDate': data.get('assessment_date', ''),
+            'reportDate': data.get('report_date', ''),
+        },
+        'planManagement': {
+            'agencyManaged': bool(data.get('plan_managed_agency')),
+            'selfManaged': bool(data.get('plan_managed_self')),
+            'planManager': bool(data.get('plan_managed_plan_manager')),
+        },
+        'background': data.get('background', ''),
+        'participantGoals': data.get('participant_goals', ''),
+        'height': data.get('height', ''),
+        'weight': data.get('weight', ''),
+        'functionalLimitations': {
+            'physical': data.get('physical_limitations', ''),
+            'sensory': data.get('sensory_limitations', ''),
+            'communication': data.get('communication_limitations', ''),
+            'cognitive': data.get('cognitive_limitations', ''),
+            'behavioural': data.get('behavioural_limitations', ''),
+            'other': data.get('other_limitations', ''),
+        },
+        'provisionTimeframe': data.get('provision_timeframe', ''),
+        'reviewFrequency': data.get('review_frequency', ''),
+        'maintenanceInfo': data.get('maintenance_info', ''),
+    }
+
+
+def _set_status(item, status, **fields):
+    fields['status'] = status
+    fields['updated_at'] = timezone.now()
+    ATReportBatchItem.objects.filter(pk=item.pk).update(**fields)
+    for name, value in fields.items():
+        setattr(item, name, value)
+
+
+def claim_item(item_id):
+    """Atomically move a pending item to 'extracting'. Returns the item or None."""
+    now = timezone.now()
+    claimed = ATReportBatchItem.objects.filter(pk=item_id, status='pending').update(
+        status='extracting', started_at=now, updated_at=now, error='', attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        return None
+    return ATReportBatchItem.objects.select_related('batch').get(pk=item_id)
+
+
+def process_item(item_id):
+    """Run one item end to end. Never raises - failures are recorded on the item."""
+    from .at_report_email import send_at_report_email_via_gmail
+    from .pdf_generator import find_ndis_logo, generate_at_report_pdf, report_filename
+    from .services import OpenAIService
+    from documents.services import S3Service
+
+    close_old_connections()
+    try:
+        item = claim_item(item_id)
+        if item is None:
+            return
+        batch = item.batch
+        try:
+            s3 = S3Service()
+            if not item.source_s3_key:
+                raise ValueError('The uploaded PDF is no longer stored; upload it again')
+
+            # Step 1: extract (cached by PDF hash, chunked for long reports)
+            pdf_bytes = s3.get_file(item.source_s3_key).read()
+            cached = OpenAIService().extract_at_report_cached(pdf_bytes, batch.report_type)
+            data = cached.value['data']
+            form_data = extraction_to_form_data(data)
+            _set_status(
+                item, 'generating',
+                extracted_data=data,
+                pages_extracted=cached.value['pages_extracted'],
+                extraction_cached=cached.hit,
+                participant_name=(data.get('participant_name') or '')[:255],
+                ndis_number=(data.get('ndis_number') or '')[:50],
+            )
+
+            # Step 2: generate the NDIS report PDF
+            report_bytes = generate_at_report_pdf(form_data, logo_path=find_ndis_logo()).getvalue()
+            if item.report_s3_key:
+                _delete_pdf(s3, item.report_s3_key)  # from an earlier attempt
+            item.report_s3_key = _upload_pdf(s3, report_bytes, report_filename(form_data), 'reports')
+            ATReportBatchItem.objects.filter(pk=item.pk).update(report_s3_key=item.report_s3_key)
+
+            # Step 3: email (optional)
+            if batch.send_email and batch.to_emails:
+                _set_status(item, 'emailing')
+                send_at_report_email_via_gmail(
+                    form_data=form_data,
+                    to_emails=batch.to_emails,
+                    cc_emails=batch.cc_emails or None,
+                    custom_message=batch.custom_message or None,
+                    from_address=batch.from_address or None,
+                    connection_email=batch.connection_email or None,
+                    pdf_bytes=report_bytes,
+                )
+                item.email_sent = True
+
+            _set_status(item, 'completed', email_sent=item.email_sent, finished_at=timezone.now())
+
+            # The report is stored; the uploaded PDF is no longer needed
+            _delete_pdf(s3, item.source_s3_key)
+            ATReportBatchItem.objects.filter(pk=item.pk).update(source_s3_key='')
+        except Exception as e:
+            logger.error(f"AT report batch item {item.pk} ({item.filename}) failed: {e}", exc_info=True)
+            _set_status(item, 'failed', error=str(e)[:2000], finished_at=timezone.now())
+        finally:
+            _finish_batch_if_done(batch)
+    except Exception as e:
+        logger.error(f"AT report batch item {item_id} could not be processed: {e}", exc_info=True)
+    finally:
+        close_old_connections()
+
+
+def _finish_batch_if_done(batch):
+    active = batch.items.filter(status__in=ATReportBatchItem.ACTIVE_STATUSES).exists()
+    if not active:
+        ATReportBatch.objects.filter(pk=batch.pk, finished_at__isnull=True).update(finished_at=timezone.now())
+
+
+def start_batch(batch):
+    """Queue every pending item of `batch` on the worker pool"""
+    executor = _get_executor()
+    item_ids = list(batch.items.filter(status='pending').values_list('id', flat=True))
+    for item_id in item_ids:
+        executor.submit(process_item, item_id)
+    return len(item_ids)
+
+
+def retry_failed(batch):
+    """Reset failed items to pending and queue them again"""
+    reset = batch.items.filter(status='failed').update(
+        status='pending', error='', finished_at=None, updated_at=timezone.now(),
+    )
+    if reset:
+        ATReportBatch.objects.filter(pk=batch.pk).update(finished_at=None)
+        start_batch(batch)
+    return reset
+
+
+def requeue_stale(older_than=timedelta(minutes=30)):
+    """
+    Reset items stuck in an in-progress state (their worker was restarted)
+    back to pending. Returns the number of items reset.
+    """
+    cutoff = timezone.now() - older_than
+    return ATReportBatchItem.objects.filter(
+        status__in=['extracting', 'generating', 'emailing'],
+        updated_at__lt=cutoff,
+    ).update(status='pending', updated_at=timezone.now())
@@ -0,0 +1,59 @@
+"""
+Django management command to process pending AT report batch items
+
+Items are normally processed by the web worker that received the upload.
+Run this (e.g. from a scheduled job) to resume items whose worker was
+restarted mid-batch, or to work through a batch outside the web process.
+
+Usage:
+    python manage.py process_at_report_batches
+    python manage.py process_at_report_batches --batch <uuid> --workers 4
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from ai_services import batch as batch_processing
+from ai_services.models import ATReportBatchItem
+
+
+class Command(BaseCommand):
+    help = 'Process pending AT report batch items (and resume stale in-progress items)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', help='Only process items of this batch id')
+        parser.add_argument('--workers', type=int, default=batch_processing.MAX_WORKERS)
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=30,
+            help='Re-queue items stuck in progress for longer than this',
+        )
+
+    def handle(self, *args, **options):
+        requeued = batch_processing.requeue_stale(timedelta(minutes=options['stale_minutes']))
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Re-queued {requeued} stale item(s)"))
+
+        items = ATReportBatchItem.objects.filter(status='pending').order_by('batch__created_at', 'position')
+        if options['batch']:
+            items = items.filter(batch_id=options['batch'])
+        item_ids = list(items.values_list('id', flat=True))
+
+        if not item_ids:
+            self.stdout.write('No pending items')
+            return
+
+        self.stdout.write(f"Processing {len(item_ids)} item(s) with {options['workers']} worker(s)...")
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            list(executor.map(batch_processing.process_item, item_ids))
+
+        results = ATReportBatchItem.objects.filter(id__in=item_ids)
+        completed = results.filter(status='completed').count()
+        failed = results.filter(status='failed').count()
+        self.stdout.write(self.style.SUCCESS(f"✅ Completed: {completed}"))
+        if failed:
+            self.stdout.write(self.style.ERROR(f"❌ Failed: {failed}"))
+            for item in results.filter(status='failed'):
+                self.stdout.write(f"   {item.filename}: {item.error}")
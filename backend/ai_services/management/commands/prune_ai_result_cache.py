@@ -0,0 +1,40 @@
+"""
+Delete expired AI result cache entries.
+
+Entries older than result_cache.ENTRY_TTL are no longer served, but they
+still hold clinical-note text and extracted report data until deleted.
+Schedule this daily.
+
+Usage:
+    python manage.py prune_ai_result_cache
+    python manage.py prune_ai_result_cache --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from ai_services import result_cache
+from ai_services.models import AIResultCache
+
+
+class Command(BaseCommand):
+    help = f'Delete AI result cache entries older than {result_cache.ENTRY_TTL.days} days'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted')
+
+    def handle(self, *args, **options):
+        self.stdout.write("=" * 70)
+        self.stdout.write("🧹 Prune AI Result Cache")
+        self.stdout.write("=" * 70)
+
+        expired = result_cache.expired_entries()
+        if options['dry_run']:
+            deleted = expired.count()
+        else:
+            deleted, _ = expired.delete()
+
+        self.stdout.write("\n" + "=" * 70)
+        self.stdout.write("📊 SUMMARY")
+        self.stdout.write("=" * 70)
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(f"{verb}: {deleted} entries older than {result_cache.ENTRY_TTL.days} days")
+        self.stdout.write(f"Remaining: {AIResultCache.objects.count()}")
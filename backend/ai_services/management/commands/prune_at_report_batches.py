@@ -0,0 +1,52 @@
+"""
+Delete old AT report batches and their PDFs from S3.
+
+Reports contain patient health information; once coordinators have
+downloaded or been emailed them there is no reason to keep them. Batches
+with items still in progress are never deleted.
+
+Usage:
+    python manage.py prune_at_report_batches
+    python manage.py prune_at_report_batches --days 7 --dry-run
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ai_services import batch as batch_processing
+from ai_services.models import ATReportBatch, ATReportBatchItem
+
+
+class Command(BaseCommand):
+    help = 'Delete AT report batches (and their S3 PDFs) older than --days (default: 30)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Keep batches from the last N days (default: 30)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        self.stdout.write("=" * 70)
+        self.stdout.write("🧹 Prune AT Report Batches")
+        self.stdout.write("=" * 70)
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        batches = ATReportBatch.objects.filter(created_at__lt=cutoff).exclude(
+            items__status__in=ATReportBatchItem.ACTIVE_STATUSES,
+        )
+        batch_ids = list(batches.values_list('pk', flat=True).distinct())
+        items = list(ATReportBatchItem.objects.filter(batch_id__in=batch_ids).only('source_s3_key', 'report_s3_key'))
+        files = sum(1 for item in items for key in (item.source_s3_key, item.report_s3_key) if key)
+
+        if not options['dry_run']:
+            batch_processing.delete_item_files(items)
+            ATReportBatch.objects.filter(pk__in=batch_ids).delete()
+
+        self.stdout.write("\n" + "=" * 70)
+        self.stdout.write("📊 SUMMARY")
+        self.stdout.write("=" * 70)
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(f"{verb}: {len(batch_ids)} batches ({len(items)} items, {files} S3 files) created before {cutoff:%Y-%m-%d}")
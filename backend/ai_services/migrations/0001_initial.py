@@ -0,0 +1,37 @@
+# Generated by Django 4.2.25 on 2026-10-19 07:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIResultCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='SHA-256 of the request inputs', max_length=64, unique=True)),
+                ('kind', models.CharField(choices=[('rewrite', 'Clinical Notes Rewrite'), ('at_report', 'AT Report Extraction')], max_length=20)),
+                ('model', models.CharField(max_length=50)),
+                ('prompt_version', models.CharField(max_length=50)),
+                ('result', models.JSONField(help_text='Completion result as returned to the client')),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'AI Result Cache Entry',
+                'verbose_name_plural': 'AI Result Cache',
+                'db_table': 'ai_result_cache',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['kind', '-created_at'], name='ai_result_c_kind_ad8637_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.25 on 2026-10-19 07:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ai_services', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ATReportBatch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, help_text='Optional label, e.g. coordinator name', max_length=255)),
+                ('report_type', models.CharField(choices=[('general', 'General'), ('prosthetics_orthotics', 'Prosthetics & Orthotics')], default='general', max_length=30)),
+                ('send_email', models.BooleanField(default=False)),
+                ('to_emails', models.JSONField(blank=True, default=list)),
+                ('cc_emails', models.JSONField(blank=True, default=list)),
+                ('custom_message', models.TextField(blank=True)),
+                ('from_address', models.EmailField(blank=True, max_length=254)),
+                ('connection_email', models.EmailField(blank=True, max_length=254)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='at_report_batches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'AT Report Batch',
+                'verbose_name_plural': 'AT Report Batches',
+                'db_table': 'ai_at_report_batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ATReportBatchItem',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('position', models.PositiveIntegerField(default=0, help_text='Order within the upload')),
+                ('filename', models.CharField(max_length=255)),
+                ('source_file', models.FileField(upload_to='at_report_batches/source/')),
+                ('report_file', models.FileField(blank=True, null=True, upload_to='at_report_batches/reports/')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('extracting', 'Extracting'), ('generating', 'Generating PDF'), ('emailing', 'Emailing'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('error', models.TextField(blank=True)),
+                ('participant_name', models.CharField(blank=True, max_length=255)),
+                ('ndis_number', models.CharField(blank=True, max_length=50)),
+                ('extracted_data', models.JSONField(blank=True, null=True)),
+                ('pages_extracted', models.PositiveIntegerField(default=0)),
+                ('extraction_cached', models.BooleanField(default=False)),
+                ('email_sent', models.BooleanField(default=False)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='ai_services.atreportbatch')),
+            ],
+            options={
+                'verbose_name': 'AT Report Batch Item',
+                'verbose_name_plural': 'AT Report Batch Items',
+                'db_table': 'ai_at_report_batch_items',
+                'ordering': ['batch', 'position'],
+                'indexes': [models.Index(fields=['batch', 'status'], name='ai_at_repor_batch_i_522661_idx'), models.Index(fields=['status', 'updated_at'], name='ai_at_repor_status_d20d07_idx')],
+            },
+        ),
+    ]
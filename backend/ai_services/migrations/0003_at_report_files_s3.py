@@ -0,0 +1,31 @@
+# Generated by Django 4.2.25 on 2026-10-19 08:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_services', '0002_atreportbatch_atreportbatchitem'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='atreportbatchitem',
+            name='report_file',
+        ),
+        migrations.RemoveField(
+            model_name='atreportbatchitem',
+            name='source_file',
+        ),
+        migrations.AddField(
+            model_name='atreportbatchitem',
+            name='report_s3_key',
+            field=models.CharField(blank=True, max_length=512),
+        ),
+        migrations.AddField(
+            model_name='atreportbatchitem',
+            name='source_s3_key',
+            field=models.CharField(blank=True, max_length=512),
+        ),
+    ]
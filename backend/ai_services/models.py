@@ -1,3 +1,160 @@
+"""
+AI services models for WalkEasy Nexus
+"""
+import uuid
+
 from django.db import models
 
-# Create your models here.
+
+class AIResultCache(models.Model):
+    """
+    Stored OpenAI result, keyed by a content hash of everything that
+    determines the output (model, prompt version, input text/PDF bytes and
+    custom prompt). Identical requests are answered from here instead of
+    paying for another completion.
+    """
+
+    KIND_CHOICES = [
+        ('rewrite', 'Clinical Notes Rewrite'),
+        ('at_report', 'AT Report Extraction'),
+    ]
+
+    key = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the request inputs")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    model = models.CharField(max_length=50)
+    prompt_version = models.CharField(max_length=50)
+
+    result = models.JSONField(help_text="Completion result as returned to the client")
+
+    # Usage of the original completion (what each hit saves)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'ai_result_cache'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['kind', '-created_at']),
+        ]
+        verbose_name = 'AI Result Cache Entry'
+        verbose_name_plural = 'AI Result Cache'
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.key[:12]} ({self.model}, {self.prompt_version})"
+
+
+class ATReportBatch(models.Model):
+    """
+    A batch of AT report PDFs processed unattended: each item is extracted,
+    rendered with generate_at_report_pdf and optionally emailed.
+    Processing happens in ai_services/batch.py.
+    """
+
+    REPORT_TYPE_CHOICES = [
+        ('general', 'General'),
+        ('prosthetics_orthotics', 'Prosthetics & Orthotics'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255, blank=True, help_text="Optional label, e.g. coordinator name")
+    report_type = models.CharField(max_length=30, choices=REPORT_TYPE_CHOICES, default='general')
+
+    # Optional emailing of each generated report
+    send_email = models.BooleanField(default=False)
+    to_emails = models.JSONField(default=list, blank=True)
+    cc_emails = models.JSONField(default=list, blank=True)
+    custom_message = models.TextField(blank=True)
+    from_address = models.EmailField(blank=True)
+    connection_email = models.EmailField(blank=True)
+
+    created_by = models.ForeignKey(
+        'auth.User',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='at_report_batches'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'ai_at_report_batches'
+        ordering = ['-created_at']
+        verbose_name = 'AT Report Batch'
+        verbose_name_plural = 'AT Report Batches'
+
+    def __str__(self):
+        return self.name or f"AT Report Batch {self.created_at:%Y-%m-%d %H:%M}"
+
+    def status_counts(self):
+        """Return {status: count} for the batch's items"""
+        counts = dict.fromkeys([choice for choice, _label in ATReportBatchItem.STATUS_CHOICES], 0)
+        for row in self.items.values('status').annotate(count=models.Count('id')):
+            counts[row['status']] = row['count']
+        return counts
+
+    @staticmethod
+    def status_from_counts(counts):
+        """pending / running / completed / completed_with_errors"""
+        total = sum(counts.values())
+        if total and counts['pending'] == total:
+            return 'pending'
+        if any(counts[status] for status in ATReportBatchItem.ACTIVE_STATUSES):
+            return 'running'
+        return 'completed_with_errors' if counts['failed'] else 'completed'
+
+
+class ATReportBatchItem(models.Model):
+    """One uploaded PDF in an ATReportBatch and the outcome of processing it"""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('extracting', 'Extracting'),
+        ('generating', 'Generating PDF'),
+        ('emailing', 'Emailing'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ['pending', 'extracting', 'generating', 'emailing']
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    batch = models.ForeignKey(ATReportBatch, on_delete=models.CASCADE, related_name='items')
+    position = models.PositiveIntegerField(default=0, help_text="Order within the upload")
+
+    filename = models.CharField(max_length=255)
+    # PDFs are kept in S3 (see documents.services.S3Service); the source is
+    # deleted once the report is generated
+    source_s3_key = models.CharField(max_length=512, blank=True)
+    report_s3_key = models.CharField(max_length=512, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    error = models.TextField(blank=True)
+
+    participant_name = models.CharField(max_length=255, blank=True)
+    ndis_number = models.CharField(max_length=50, blank=True)
+    extracted_data = models.JSONField(null=True, blank=True)
+    pages_extracted = models.PositiveIntegerField(default=0)
+    extraction_cached = models.BooleanField(default=False)
+    email_sent = models.BooleanField(default=False)
+    attempts = models.PositiveIntegerField(default=0)
+
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'ai_at_report_batch_items'
+        ordering = ['batch', 'position']
+        indexes = [
+            models.Index(fields=['batch', 'status']),
+            models.Index(fields=['status', 'updated_at']),
+        ]
+        verbose_name = 'AT Report Batch Item'
+        verbose_name_plural = 'AT Report Batch Items'
+
+    def __str__(self):
+        return f"{self.filename} ({self.get_status_display()})"
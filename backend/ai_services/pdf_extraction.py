@@ -0,0 +1,146 @@
+"""
+PDF text extraction for AT reports
+
+- Page text is extracted in a process pool (pypdf is pure Python and
+  CPU-bound, so threads would serialize on the GIL). Small PDFs are
+  extracted inline - the pool only pays off for long reports.
+- Extracted pages are cached in the shared cache by SHA-256 of the PDF, so
+  re-uploads and batch retries skip extraction entirely.
+- chunk_pages() groups pages into prompt-sized chunks so long reports can be
+  sent to OpenAI as several concurrent requests (see OpenAIService).
+
+Django is imported lazily: this module is imported by spawned pool workers.
+pypdf is imported on first extraction, so importing the views stays cheap.
+"""
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_PREFIX = 'pdf_pages:'
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+# Below this many pages, extraction runs in the calling thread
+PARALLEL_MIN_PAGES = 8
+MAX_PROCESSES = 4
+
+# ~6k tokens of PDF text per OpenAI request, leaving room for the prompt
+# and the JSON field template
+CHUNK_MAX_CHARS = 24000
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pdf_hash(pdf_bytes: bytes) -> str:
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def _pool_size():
+    return min(MAX_PROCESSES, os.cpu_count() or 1)
+
+
+def _get_pool():
+    """Shared process pool, created on first use (spawned, not forked, so
+    worker processes never inherit the gunicorn worker's threads/sockets)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            import multiprocessing
+            _pool = ProcessPoolExecutor(
+                max_workers=_pool_size(),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _extract_page_range(pdf_bytes: bytes, start: int, end: int) -> list:
+    """Extract text for pages [start, end) - runs inside pool workers"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(BytesIO(pdf_bytes))
+    return [(reader.pages[index].extract_text() or '') for index in range(start, end)]
+
+
+def _page_ranges(page_count: int, parts: int) -> list:
+    size = -(-page_count // parts)  # ceil
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def extract_pages(pdf_bytes: bytes) -> list:
+    """
+    Return the text of every page (empty string for pages without text),
+    in page order.
+    """
+    from django.core.cache import cache
+
+    cache_key = PAGE_CACHE_PREFIX + pdf_hash(pdf_bytes)
+    pages = cache.get(cache_key)
+    if pages is not None:
+        return pages
+
+    from pypdf import PdfReader
+
+    page_count = len(PdfReader(BytesIO(pdf_bytes)).pages)
+    processes = _pool_size()
+
+    if page_count < PARALLEL_MIN_PAGES or processes < 2:
+        pages = _extract_page_range(pdf_bytes, 0, page_count)
+    else:
+        ranges = _page_ranges(page_count, processes)
+        try:
+            pool = _get_pool()
+            futures = [pool.submit(_extract_page_range, pdf_bytes, start, end) for start, end in ranges]
+            pages = [text for future in futures for text in future.result()]
+        except Exception as e:
+            # Broken pool (worker killed, spawn unavailable) - fall back to inline
+            logger.warning(f"Parallel PDF extraction failed, extracting inline: {e}")
+            _reset_pool()
+            pages = _extract_page_range(pdf_bytes, 0, page_count)
+
+    cache.set(cache_key, pages, timeout=PAGE_CACHE_TIMEOUT)
+    return pages
+
+
+def format_pages(pages: list) -> str:
+    """Join page texts with the '--- Page n ---' markers used in prompts"""
+    return "\n\n".join(
+        f"--- Page {number} ---\n{text}"
+        for number, text in enumerate(pages, 1)
+        if text.strip()
+    )
+
+
+def chunk_pages(pages: list, max_chars: int = CHUNK_MAX_CHARS) -> list:
+    """
+    Group pages into formatted text chunks of at most ~max_chars, never
+    splitting a page (an oversized page becomes its own chunk). Chunks are
+    returned in page order.
+    """
+    chunks = []
+    current = []
+    size = 0
+    for number, text in enumerate(pages, 1):
+        if not text.strip():
+            continue
+        block = f"--- Page {number} ---\n{text}"
+        if current and size + len(block) > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(block)
+        size += len(block) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
@@ -828,3 +828,34 @@ def generate_at_report_pdf(form_data, output_path=None, logo_path=None):
     generator = NDISATPDFGenerator(logo_path=logo_path)
     return generator.generate_pdf(form_data, output_path)
 
+
+def find_ndis_logo():
+    """Path to the NDIS logo in docs/, or None to generate without it"""
+    logo_path = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        '../docs/AT Report/NDIS_Menu_Large.jpg'
+    )
+    
+    if not os.path.exists(logo_path):
+        # Try alternative path
+        logo_path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+            'docs/AT Report/NDIS_Menu_Large.jpg'
+        )
+    
+    return logo_path if os.path.exists(logo_path) else None
+
+
+def report_filename(form_data):
+    """Download/attachment filename: ParticipantName_NDISNumber.pdf"""
+    participant_name = form_data.get('participant', {}).get('name', 'Report')
+    ndis_number = form_data.get('participant', {}).get('ndisNumber', '')
+    
+    # Clean filename (remove special characters)
+    safe_name = ''.join(c for c in participant_name if c.isalnum() or c in (' ', '-', '_'))
+    safe_name = safe_name.replace(' ', '_')
+    safe_ndis = ''.join(c for c in ndis_number if c.isalnum())
+    
+    if safe_ndis:
+        return f'{safe_name}_{safe_ndis}.pdf'
+    return f'{safe_name}.pdf'
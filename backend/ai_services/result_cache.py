@@ -0,0 +1,172 @@
+"""
+Content-hash result cache for OpenAI calls
+
+Results are stored in the AIResultCache table keyed by
+sha256(model, prompt version, *inputs), so a clinician re-submitting the same
+letter or re-uploading the same AT report PDF gets the stored result back
+without another completion. Bumping a prompt version in services.py makes
+every older entry for that prompt unreachable.
+
+Entries hold clinical-note text and extracted report data, so they expire
+after ENTRY_TTL: expired entries are never returned, and
+`manage.py prune_ai_result_cache` deletes them.
+
+Hit/miss and token counters live in the shared Django cache so they are
+aggregated across gunicorn workers; see get_stats().
+"""
+import hashlib
+import logging
+from collections import namedtuple
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from ncc_api import metrics
+from .models import AIResultCache
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY_PREFIX = 'ai_stats:'
+STAT_NAMES = ['hits', 'misses', 'prompt_tokens', 'completion_tokens', 'saved_prompt_tokens', 'saved_completion_tokens']
+
+ENTRY_TTL = timedelta(days=30)
+
+CachedResult = namedtuple('CachedResult', ['value', 'hit', 'usage'])
+
+
+def make_key(model, prompt_version, *parts):
+    """
+    Hash the request inputs. Parts may be str, bytes or None; each is
+    length-prefixed so ('ab', 'c') and ('a', 'bc') hash differently.
+    """
+    digest = hashlib.sha256()
+    for part in (model, prompt_version) + parts:
+        if part is None:
+            data = b'\x00none'
+        elif isinstance(part, bytes):
+            data = part
+        else:
+            data = str(part).encode('utf-8')
+        digest.update(len(data).to_bytes(8, 'big'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def record(kind, **amounts):
+    """Add to the shared counters, e.g. record('rewrite', hits=1)"""
+    for name, amount in amounts.items():
+        if not amount:
+            continue
+        key = f"{STATS_KEY_PREFIX}{kind}:{name}"
+        if not cache.add(key, amount, timeout=None):
+            try:
+                cache.incr(key, amount)
+            except ValueError:
+                cache.set(key, amount, timeout=None)
+
+
+def record_usage(kind, usage):
+    record(kind, prompt_tokens=usage.get('prompt_tokens', 0), completion_tokens=usage.get('completion_tokens', 0))
+    metrics.inc('ncc_openai_tokens_total', usage.get('prompt_tokens', 0), kind=kind, type='prompt')
+    metrics.inc('ncc_openai_tokens_total', usage.get('completion_tokens', 0), kind=kind, type='completion')
+
+
+def get_stats():
+    """Return {kind: {stat: value}} for every cached kind"""
+    kinds = [kind for kind, _label in AIResultCache.KIND_CHOICES]
+    keys = [f"{STATS_KEY_PREFIX}{kind}:{name}" for kind in kinds for name in STAT_NAMES]
+    found = cache.get_many(keys)
+    stats = {}
+    for kind in kinds:
+        counters = {name: found.get(f"{STATS_KEY_PREFIX}{kind}:{name}", 0) for name in STAT_NAMES}
+        lookups = counters['hits'] + counters['misses']
+        counters['hit_rate'] = round(counters['hits'] / lookups, 3) if lookups else None
+        counters['entries'] = AIResultCache.objects.filter(kind=kind).count()
+        stats[kind] = counters
+    return stats
+
+
+def usage_from_response(response):
+    usage = getattr(response, 'usage', None)
+    return {
+        'prompt_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+        'completion_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+    }
+
+
+def expired_entries():
+    return AIResultCache.objects.filter(created_at__lt=timezone.now() - ENTRY_TTL)
+
+
+def lookup(key):
+    entry = AIResultCache.objects.filter(key=key, created_at__gte=timezone.now() - ENTRY_TTL).first()
+    if entry is not None:
+        AIResultCache.objects.filter(pk=entry.pk).update(
+            hit_count=F('hit_count') + 1,
+            last_hit_at=timezone.now(),
+        )
+    return entry
+
+
+def store(key, kind, model, prompt_version, result, usage):
+    AIResultCache.objects.update_or_create(
+        key=key,
+        defaults={
+            'kind': kind,
+            'model': model,
+            'prompt_version': prompt_version,
+            'result': result,
+            'prompt_tokens': usage.get('prompt_tokens', 0),
+            'completion_tokens': usage.get('completion_tokens', 0),
+            # A refreshed or re-computed expired entry starts a new TTL
+            'created_at': timezone.now(),
+        },
+    )
+
+
+def get_cached(kind, key):
+    """Return CachedResult for a stored result (counting a hit), or None"""
+    try:
+        entry = lookup(key)
+    except Exception as e:
+        logger.error(f"AI result cache lookup failed: {e}")
+        return None
+    if entry is None:
+        return None
+    record(
+        kind,
+        hits=1,
+        saved_prompt_tokens=entry.prompt_tokens,
+        saved_completion_tokens=entry.completion_tokens,
+    )
+    return CachedResult(entry.result, True, {
+        'prompt_tokens': entry.prompt_tokens,
+        'completion_tokens': entry.completion_tokens,
+    })
+
+
+def save_result(kind, key, model, prompt_version, result, usage):
+    """Store a fresh result. Failures are logged, never raised."""
+    try:
+        store(key, kind, model, prompt_version, result, usage)
+    except Exception as e:
+        logger.error(f"AI result cache store failed: {e}")
+
+
+def get_or_compute(kind, key, model, prompt_version, compute, refresh=False):
+    """
+    Return CachedResult for `key`, calling compute() -> (result, usage) on a
+    miss (or when refresh=True). Cache storage failures are logged, never
+    raised - the caller still gets the fresh result.
+    """
+    if not refresh:
+        cached = get_cached(kind, key)
+        if cached is not None:
+            return cached
+
+    record(kind, misses=1)
+    result, usage = compute()
+    save_result(kind, key, model, prompt_version, result, usage)
+    return CachedResult(result, False, usage)
@@ -0,0 +1,59 @@
+from rest_framework import serializers
+from .models import ATReportBatch, ATReportBatchItem
+
+
+class ATReportBatchItemSerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    has_report = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ATReportBatchItem
+        fields = [
+            'id', 'position', 'filename', 'status', 'status_display', 'error',
+            'participant_name', 'ndis_number', 'pages_extracted', 'extraction_cached',
+            'email_sent', 'attempts', 'has_report', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def get_has_report(self, obj):
+        return bool(obj.report_s3_key)
+
+
+class ATReportBatchSerializer(serializers.ModelSerializer):
+    status = serializers.SerializerMethodField()
+    counts = serializers.SerializerMethodField()
+    created_by_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ATReportBatch
+        fields = [
+            'id', 'name', 'report_type', 'send_email', 'to_emails', 'cc_emails',
+            'status', 'counts', 'created_by_name', 'created_at', 'finished_at',
+        ]
+        read_only_fields = fields
+
+    def _counts(self, obj):
+        # Computed once per object; used by both status and counts
+        if not hasattr(obj, '_status_counts'):
+            obj._status_counts = obj.status_counts()
+        return obj._status_counts
+
+    def get_counts(self, obj):
+        counts = self._counts(obj)
+        return {**counts, 'total': sum(counts.values())}
+
+    def get_status(self, obj):
+        return ATReportBatch.status_from_counts(self._counts(obj))
+
+    def get_created_by_name(self, obj):
+        if not obj.created_by:
+            return None
+        return obj.created_by.get_full_name() or obj.created_by.username
+
+
+class ATReportBatchDetailSerializer(ATReportBatchSerializer):
+    items = ATReportBatchItemSerializer(many=True, read_only=True)
+
+    class Meta(ATReportBatchSerializer.Meta):
+        fields = ATReportBatchSerializer.Meta.fields + ['items']
+        read_only_fields = fields
@@ -1,8 +1,79 @@
 import os
 import json
-from openai import OpenAI
-from pypdf import PdfReader
-from io import BytesIO
+import threading
+
+from . import pdf_extraction, result_cache
+
+MODEL = "gpt-4o-mini"  # Using the latest, most cost-effective model
+
+# Bump when a prompt (or its generation parameters) changes so cached
+# results produced by the old prompt are no longer returned
+REWRITE_PROMPT_VERSION = 'rewrite-v1'
+AT_EXTRACTION_PROMPT_VERSION = 'at-extract-v2'
+
+# Concurrent OpenAI requests when a long AT report is extracted in chunks
+MAX_CONCURRENT_EXTRACTIONS = 4
+
+# Free-text AT report fields: values from every chunk are kept (in page
+# order); all other fields take the first non-empty value
+NARRATIVE_FIELDS = {
+    'background', 'participant_goals', 'gait_assessment',
+    'physical_limitations', 'sensory_limitations', 'communication_limitations',
+    'cognitive_limitations', 'behavioural_limitations', 'other_limitations',
+    'current_at_description', 'current_at_usage', 'current_at_suitability',
+    'alternative_options_description', 'alternative_options_trialled',
+    'alternative_options_reasons_not_suitable', 'clinical_justification',
+    'additional_factors', 'expected_outcomes', 'maintenance_info',
+}
+
+_client = None
+_client_key = None
+_client_lock = threading.Lock()
+
+
+def get_openai_client(api_key: str):
+    """
+    Process-wide OpenAI client. The client owns an HTTP connection pool and
+    is thread-safe, so one instance is shared by every request in the worker.
+
+    The openai SDK (with httpx and pydantic) is imported on first use: it is
+    the slowest import of the whole app and most workers never call OpenAI.
+    """
+    global _client, _client_key
+    with _client_lock:
+        if _client is None or _client_key != api_key:
+            from openai import OpenAI
+            _client = OpenAI(api_key=api_key)
+            _client_key = api_key
+        return _client
+
+
+def merge_extractions(template: dict, results: list) -> dict:
+    """
+    Merge per-chunk extraction results (in page order) into the field
+    template. Deterministic for a given list of results: booleans are true
+    if any chunk says so, narrative fields join distinct values, other
+    fields take the first non-empty value. Keys not in the template are dropped.
+    """
+    merged = {}
+    for field, default in template.items():
+        values = [result.get(field) for result in results if isinstance(result, dict)]
+        if isinstance(default, bool):
+            merged[field] = any(value is True or str(value).lower() == 'true' for value in values)
+        elif field in NARRATIVE_FIELDS:
+            parts = []
+            for value in values:
+                text = str(value).strip() if value is not None else ''
+                if text and text not in parts:
+                    parts.append(text)
+            merged[field] = "\n\n".join(parts)
+        else:
+            merged[field] = next((value for value in values if value not in (None, '')), default)
+    return merged
+
+
+class NoPDFTextError(Exception):
+    """Raised when a PDF contains no extractable text"""
 
 
 class OpenAIService:
@@ -13,8 +84,8 @@ class OpenAIService:
         if not self.api_key or self.api_key == 'your-openai-api-key-here':
             raise ValueError("OPENAI_API_KEY must be set in environment variables")
         
-        self.client = OpenAI(api_key=self.api_key)
-        self.model = "gpt-4o-mini"  # Using the latest, most cost-effective model
+        self.client = get_openai_client(self.api_key)
+        self.model = MODEL
     
     def rewrite_clinical_notes(self, content: str, custom_prompt: str = None) -> str:
         """
@@ -27,6 +98,66 @@ class OpenAIService:
         Returns:
             Rewritten clinical notes
         """
+        return self._rewrite(content, custom_prompt)[0]
+    
+    def rewrite_clinical_notes_cached(self, content: str, custom_prompt: str = None, refresh: bool = False):
+        """
+        Rewrite clinical notes, returning a stored result for identical input
+        
+        Returns:
+            result_cache.CachedResult(value=rewritten text, hit, usage)
+        """
+        return result_cache.get_or_compute(
+            'rewrite', self.rewrite_cache_key(content, custom_prompt), self.model, REWRITE_PROMPT_VERSION,
+            lambda: self._rewrite(content, custom_prompt),
+            refresh=refresh,
+        )
+    
+    def rewrite_cache_key(self, content: str, custom_prompt: str = None) -> str:
+        return result_cache.make_key(self.model, REWRITE_PROMPT_VERSION, content, custom_prompt or None)
+    
+    def stream_rewrite_clinical_notes(self, content: str, custom_prompt: str = None):
+        """
+        Rewrite clinical notes, yielding output as OpenAI generates it
+        
+        Yields:
+            ('delta', text) for each chunk of generated text, then
+            ('usage', {'prompt_tokens': n, 'completion_tokens': n}) once complete
+        
+        Closing the generator early (e.g. the client disconnected) closes the
+        OpenAI stream, which cancels the completion.
+        """
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        messages = self._rewrite_messages(content, custom_prompt)
+        logger.info(f'🌐 Streaming OpenAI API - Model: {self.model}, Message length: {len(messages[-1]["content"])} chars')
+        
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=4000,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        usage = {'prompt_tokens': 0, 'completion_tokens': 0}
+        try:
+            for chunk in stream:
+                if getattr(chunk, 'usage', None):
+                    usage = result_cache.usage_from_response(chunk)
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield 'delta', delta
+        finally:
+            stream.close()
+        
+        result_cache.record_usage('rewrite', usage)
+        yield 'usage', usage
+    
+    def _rewrite_messages(self, content: str, custom_prompt: str = None) -> list:
+        """Chat messages for a clinical notes rewrite"""
         system_message = """You are a professional medical scribe specializing in podiatry and orthotic clinical documentation.
 Your task is to improve the clinical tone and language of medical letters while preserving the EXACT original structure and format.
 
@@ -55,6 +186,16 @@ Please improve the clinical tone and language while preserving the EXACT origina
 
 Please improve the clinical tone and language while preserving the EXACT original structure, format, paragraphs, and layout. Make it more professional and clinically appropriate without changing the organization."""
 
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message}
+        ]
+    
+    def _rewrite(self, content: str, custom_prompt: str = None):
+        """Call OpenAI for a rewrite. Returns (result, usage)"""
+        messages = self._rewrite_messages(content, custom_prompt)
+        user_message = messages[-1]['content']
+        
         try:
             import logging
             import time
@@ -65,10 +206,7 @@ Please improve the clinical tone and language while preserving the EXACT origina
             
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
+                messages=messages,
                 temperature=0.7,
                 max_tokens=4000  # Increased from 1000 to handle longer content
             )
@@ -80,7 +218,10 @@ Please improve the clinical tone and language while preserving the EXACT origina
             logger.info(f'✅ OpenAI result length: {len(result)} chars')
             logger.debug(f'📝 Result preview: {result[:200]}...')
             
-            return result
+            usage = result_cache.usage_from_response(response)
+            result_cache.record_usage('rewrite', usage)
+            
+            return result, usage
             
         except Exception as e:
             import logging
@@ -101,20 +242,12 @@ Please improve the clinical tone and language while preserving the EXACT origina
         try:
             # Handle both file objects and bytes
             if hasattr(pdf_file, 'read'):
-                pdf_bytes = BytesIO(pdf_file.read())
+                pdf_bytes = pdf_file.read()
             else:
-                pdf_bytes = BytesIO(pdf_file)
-            
-            # Extract text from PDF
-            reader = PdfReader(pdf_bytes)
-            text_content = []
-            
-            for page_num, page in enumerate(reader.pages, 1):
-                page_text = page.extract_text()
-                if page_text.strip():
-                    text_content.append(f"--- Page {page_num} ---\n{page_text}")
+                pdf_bytes = pdf_file
             
-            return "\n\n".join(text_content)
+            # Pages are extracted in parallel and cached by PDF hash
+            return pdf_extraction.format_pages(pdf_extraction.extract_pages(pdf_bytes))
             
         except Exception as e:
             raise Exception(f"PDF extraction error: {str(e)}")
@@ -130,6 +263,67 @@ Please improve the clinical tone and language while preserving the EXACT origina
         Returns:
             Dictionary of extracted form fields
         """
+        return self._extract_at_report(pdf_text, report_type)[0]
+    
+    def extract_at_report_cached(self, pdf_bytes: bytes, report_type: str = "general", refresh: bool = False):
+        """
+        Extract AT Report data from PDF bytes, returning a stored result for
+        a PDF that has been extracted before (text extraction is skipped too)
+        
+        Returns:
+            result_cache.CachedResult(value={'data': ..., 'pages_extracted': n}, hit, usage)
+        
+        Raises:
+            NoPDFTextError: If no text could be extracted from the PDF
+        """
+        def compute():
+            try:
+                pages = pdf_extraction.extract_pages(pdf_bytes)
+            except Exception as e:
+                raise Exception(f"PDF extraction error: {str(e)}")
+            if not any(text.strip() for text in pages):
+                raise NoPDFTextError('No text could be extracted from the PDF')
+            data, usage = self.extract_at_report_from_pages(pages, report_type)
+            return {'data': data, 'pages_extracted': sum(1 for text in pages if text.strip())}, usage
+        
+        key = result_cache.make_key(self.model, AT_EXTRACTION_PROMPT_VERSION, report_type, pdf_bytes)
+        return result_cache.get_or_compute(
+            'at_report', key, self.model, AT_EXTRACTION_PROMPT_VERSION, compute, refresh=refresh,
+        )
+    
+    def extract_at_report_from_pages(self, pages: list, report_type: str = "general"):
+        """
+        Extract AT Report data from page texts. Long reports are split into
+        chunks that are extracted concurrently and merged in page order.
+        
+        Returns:
+            (data, usage) - data has exactly the fields of the report template
+        """
+        chunks = pdf_extraction.chunk_pages(pages)
+        if len(chunks) == 1:
+            return self._extract_at_report(chunks[0], report_type)
+        
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=min(len(chunks), MAX_CONCURRENT_EXTRACTIONS)) as executor:
+            results = list(executor.map(
+                lambda item: self._extract_at_report(item[1], report_type, part=(item[0], len(chunks))),
+                enumerate(chunks, 1)
+            ))
+        
+        template = self._get_po_fields_template() if report_type == "prosthetics_orthotics" else self._get_general_fields_template()
+        usage = {
+            'prompt_tokens': sum(chunk_usage['prompt_tokens'] for _data, chunk_usage in results),
+            'completion_tokens': sum(chunk_usage['completion_tokens'] for _data, chunk_usage in results),
+        }
+        return merge_extractions(template, [data for data, _usage in results]), usage
+    
+    def _extract_at_report(self, pdf_text: str, report_type: str = "general", part: tuple = None):
+        """
+        Call OpenAI for AT report extraction. Returns (data, usage)
+        
+        part: (n, total) when pdf_text is one chunk of a longer report
+        """
         # Determine fields based on report type
         if report_type == "prosthetics_orthotics":
             fields_template = self._get_po_fields_template()
@@ -138,9 +332,13 @@ Please improve the clinical tone and language while preserving the EXACT origina
             fields_template = self._get_general_fields_template()
             system_message = self._get_general_extraction_prompt()
         
+        part_note = ""
+        if part:
+            part_note = f"\nThis is part {part[0]} of {part[1]} of the report. Extract only what appears in this part.\n"
+        
         user_message = f"""PDF Text Content:
 {pdf_text}
-
+{part_note}
 Please extract the information from this AT report and return it in the following JSON format:
 {json.dumps(fields_template, indent=2)}
 
@@ -165,7 +363,9 @@ Important:
             )
             
             result = response.choices[0].message.content.strip()
-            return json.loads(result)
+            usage = result_cache.usage_from_response(response)
+            result_cache.record_usage('at_report', usage)
+            return json.loads(result), usage
             
         except Exception as e:
             raise Exception(f"OpenAI extraction error: {str(e)}")
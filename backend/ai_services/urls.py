@@ -1,17 +1,29 @@
 from django.urls import path
 from .views import (
     RewriteClinicalNotesView,
+    RewriteClinicalNotesStreamView,
     ExtractATReportView,
+    AICacheStatsView,
     GenerateATPDFView,
     EmailATReportView,
-    TestEmailView
+    TestEmailView,
+    ATReportBatchListView,
+    ATReportBatchDetailView,
+    ATReportBatchRetryView,
+    ATReportBatchItemPDFView
 )
 
 urlpatterns = [
     path('rewrite-clinical-notes/', RewriteClinicalNotesView.as_view(), name='rewrite-clinical-notes'),
+    path('rewrite-clinical-notes/stream/', RewriteClinicalNotesStreamView.as_view(), name='rewrite-clinical-notes-stream'),
     path('extract-at-report/', ExtractATReportView.as_view(), name='extract-at-report'),
+    path('cache-stats/', AICacheStatsView.as_view(), name='ai-cache-stats'),
     path('generate-at-pdf/', GenerateATPDFView.as_view(), name='generate-at-pdf'),
     path('email-at-report/', EmailATReportView.as_view(), name='email-at-report'),
     path('test-email/', TestEmailView.as_view(), name='test-email'),
+    path('at-report-batches/', ATReportBatchListView.as_view(), name='at-report-batches'),
+    path('at-report-batches/<uuid:batch_id>/', ATReportBatchDetailView.as_view(), name='at-report-batch-detail'),
+    path('at-report-batches/<uuid:batch_id>/retry/', ATReportBatchRetryView.as_view(), name='at-report-batch-retry'),
+    path('at-report-batches/<uuid:batch_id>/items/<uuid:item_id>/pdf/', ATReportBatchItemPDFView.as_view(), name='at-report-batch-item-pdf'),
 ]
 
@@ -2,14 +2,23 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.http import HttpResponse
-import os
-from .services import OpenAIService
-from .pdf_generator import generate_at_report_pdf
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+import json
+from .services import OpenAIService, NoPDFTextError, REWRITE_PROMPT_VERSION
+from . import batch as batch_processing
+from . import result_cache
+from .models import ATReportBatch, ATReportBatchItem
+from .serializers import ATReportBatchSerializer, ATReportBatchDetailSerializer
 from .email_service import get_email_service
 from .at_report_email import send_at_report_email_via_gmail
 
 
+def _flag(data, field):
+    """Boolean from JSON, form data or a query string ("false" and "0" are false)"""
+    return str(data.get(field, '')).lower() in ('1', 'true', 'yes')
+
+
 class RewriteClinicalNotesView(APIView):
     """
     API endpoint to rewrite text as clinical notes using OpenAI
@@ -17,8 +26,11 @@ class RewriteClinicalNotesView(APIView):
     POST /api/ai/rewrite-clinical-notes/
     {
         "content": "original note text",
-        "custom_prompt": "optional refinement instructions"
+        "custom_prompt": "optional refinement instructions",
+        "refresh": false  // optional, true to bypass the result cache
     }
+    
+    Identical content + custom prompt returns the stored result ("cached": true).
     """
     
     def post(self, request):
@@ -29,6 +41,7 @@ class RewriteClinicalNotesView(APIView):
         start_time = time.time()
         content = request.data.get('content')
         custom_prompt = request.data.get('custom_prompt')
+        refresh = _flag(request.data, 'refresh')
         
         logger.info(f'🤖 OpenAI Request Received - Content length: {len(content) if content else 0}, Custom prompt: {bool(custom_prompt)}')
         
@@ -45,10 +58,11 @@ class RewriteClinicalNotesView(APIView):
             logger.info(f'📝 Calling OpenAI API with model: {ai_service.model}')
             
             api_start_time = time.time()
-            result = ai_service.rewrite_clinical_notes(content, custom_prompt)
+            cached = ai_service.rewrite_clinical_notes_cached(content, custom_prompt, refresh=refresh)
+            result = cached.value
             api_duration = time.time() - api_start_time
             
-            logger.info(f'✅ OpenAI API Success - Duration: {api_duration:.2f}s, Result length: {len(result) if result else 0}')
+            logger.info(f'✅ OpenAI API Success - Duration: {api_duration:.2f}s, Cached: {cached.hit}, Result length: {len(result) if result else 0}')
             
             total_duration = time.time() - start_time
             logger.info(f'✨ Total request duration: {total_duration:.2f}s')
@@ -56,7 +70,9 @@ class RewriteClinicalNotesView(APIView):
             return Response({
                 'success': True,
                 'result': result,
-                'model': ai_service.model
+                'model': ai_service.model,
+                'cached': cached.hit,
+                'usage': cached.usage
             })
             
         except ValueError as e:
@@ -73,6 +89,107 @@ class RewriteClinicalNotesView(APIView):
             )
 
 
+class RewriteClinicalNotesStreamView(APIView):
+    """
+    Streaming version of RewriteClinicalNotesView (server-sent events)
+    
+    POST /api/ai/rewrite-clinical-notes/stream/
+    {
+        "content": "original note text",
+        "custom_prompt": "optional refinement instructions",
+        "refresh": false
+    }
+    
+    Response is text/event-stream:
+        event: delta   data: {"text": "..."}            (repeated, as tokens arrive)
+        event: done    data: {"result": "...", "model": "...", "cached": false, "usage": {...}}
+        event: error   data: {"error": "..."}
+    
+    A cached result is sent as a single delta followed by done. If the
+    client disconnects, the OpenAI stream is closed (cancelling the
+    completion) and nothing is cached.
+    """
+    
+    def post(self, request):
+        content = request.data.get('content')
+        custom_prompt = request.data.get('custom_prompt')
+        refresh = _flag(request.data, 'refresh')
+        
+        if not content:
+            return Response(
+                {'error': 'Content is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            ai_service = OpenAIService()
+        except ValueError as e:
+            return Response(
+                {'error': str(e), 'message': 'OpenAI API key not configured'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        response = StreamingHttpResponse(
+            self._events(ai_service, content, custom_prompt, refresh),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Stop proxies buffering the stream
+        return response
+    
+    @staticmethod
+    def _event(name, data):
+        return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+    
+    def _events(self, ai_service, content, custom_prompt, refresh):
+        import logging
+        logger = logging.getLogger(__name__)
+        
+        key = ai_service.rewrite_cache_key(content, custom_prompt)
+        if not refresh:
+            cached = result_cache.get_cached('rewrite', key)
+            if cached is not None:
+                yield self._event('delta', {'text': cached.value})
+                yield self._event('done', {
+                    'result': cached.value,
+                    'model': ai_service.model,
+                    'cached': True,
+                    'usage': cached.usage
+                })
+                return
+        
+        result_cache.record('rewrite', misses=1)
+        parts = []
+        usage = {}
+        stream = ai_service.stream_rewrite_clinical_notes(content, custom_prompt)
+        try:
+            for kind, value in stream:
+                if kind == 'delta':
+                    parts.append(value)
+                    yield self._event('delta', {'text': value})
+                else:
+                    usage = value
+        except GeneratorExit:
+            # Client went away - closing our stream closes the OpenAI one
+            logger.info('🛑 Client disconnected - cancelling OpenAI stream')
+            raise
+        except Exception as e:
+            logger.error(f'❌ OpenAI streaming failed: {str(e)}', exc_info=True)
+            yield self._event('error', {'error': str(e)})
+            return
+        finally:
+            stream.close()
+        
+        result = ''.join(parts).strip()
+        result_cache.save_result('rewrite', key, ai_service.model, REWRITE_PROMPT_VERSION, result, usage)
+        yield self._event('done', {
+            'result': result,
+            'model': ai_service.model,
+            'cached': False,
+            'usage': usage
+        })
+
+
 class ExtractATReportView(APIView):
     """
     API endpoint to extract structured data from AT report PDFs
@@ -80,14 +197,18 @@ class ExtractATReportView(APIView):
     POST /api/ai/extract-at-report/
     {
         "pdf_file": <file>,
-        "report_type": "general" | "prosthetics_orthotics"  (optional, default: "general")
+        "report_type": "general" | "prosthetics_orthotics"  (optional, default: "general"),
+        "refresh": "true"  (optional, bypass the result cache)
     }
+    
+    Re-uploading the same PDF returns the stored extraction ("cached": true).
     """
     parser_classes = (MultiPartParser, FormParser)
     
     def post(self, request):
         pdf_file = request.FILES.get('pdf_file')
         report_type = request.data.get('report_type', 'general')
+        refresh = _flag(request.data, 'refresh')
         
         if not pdf_file:
             return Response(
@@ -112,26 +233,25 @@ class ExtractATReportView(APIView):
         try:
             ai_service = OpenAIService()
             
-            # Step 1: Extract text from PDF
-            pdf_text = ai_service.extract_text_from_pdf(pdf_file)
-            
-            if not pdf_text.strip():
-                return Response(
-                    {'error': 'No text could be extracted from the PDF'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Step 2: Extract structured data using AI
-            extracted_data = ai_service.extract_at_report_data(pdf_text, report_type)
+            # Extract text from PDF, then structured data using AI
+            # (both skipped when this PDF has been extracted before)
+            cached = ai_service.extract_at_report_cached(pdf_file.read(), report_type, refresh=refresh)
             
             return Response({
                 'success': True,
-                'data': extracted_data,
+                'data': cached.value['data'],
                 'report_type': report_type,
                 'model': ai_service.model,
-                'pages_extracted': pdf_text.count('--- Page')
+                'pages_extracted': cached.value['pages_extracted'],
+                'cached': cached.hit,
+                'usage': cached.usage
             })
             
+        except NoPDFTextError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except ValueError as e:
             return Response(
                 {'error': str(e), 'message': 'OpenAI API key not configured'},
@@ -144,6 +264,20 @@ class ExtractATReportView(APIView):
             )
 
 
+class AICacheStatsView(APIView):
+    """
+    API endpoint for OpenAI result cache statistics
+    
+    GET /api/ai/cache-stats/
+    
+    Returns hits, misses, hit rate, tokens used and tokens saved per kind
+    (rewrite, at_report), aggregated across all workers.
+    """
+    
+    def get(self, request):
+        return Response(result_cache.get_stats())
+
+
 class GenerateATPDFView(APIView):
     """
     API endpoint to generate PDF from completed AT Report data
@@ -169,42 +303,17 @@ class GenerateATPDFView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        from .pdf_generator import find_ndis_logo, generate_at_report_pdf, report_filename
+
         try:
-            # Find NDIS logo
-            logo_path = os.path.join(
-                os.path.dirname(os.path.dirname(__file__)),
-                '../docs/AT Report/NDIS_Menu_Large.jpg'
-            )
-            
-            if not os.path.exists(logo_path):
-                # Try alternative path
-                logo_path = os.path.join(
-                    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-                    'docs/AT Report/NDIS_Menu_Large.jpg'
-                )
-            
-            if not os.path.exists(logo_path):
-                logo_path = None  # Generate without logo
-            
-            # Generate PDF
-            pdf_buffer = generate_at_report_pdf(form_data, logo_path=logo_path)
+            # Generate PDF (without logo if docs/ is not deployed)
+            pdf_buffer = generate_at_report_pdf(form_data, logo_path=find_ndis_logo())
             
             # Prepare response
             response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
             
             # Generate filename: ParticipantName_NDISNumber.pdf
-            participant_name = form_data.get('participant', {}).get('name', 'Report')
-            ndis_number = form_data.get('participant', {}).get('ndisNumber', '')
-            
-            # Clean filename (remove special characters)
-            safe_name = ''.join(c for c in participant_name if c.isalnum() or c in (' ', '-', '_'))
-            safe_name = safe_name.replace(' ', '_')
-            safe_ndis = ''.join(c for c in ndis_number if c.isalnum())
-            
-            if safe_ndis:
-                filename = f'{safe_name}_{safe_ndis}.pdf'
-            else:
-                filename = f'{safe_name}.pdf'
+            filename = report_filename(form_data)
             
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
             
@@ -277,35 +386,14 @@ class EmailATReportView(APIView):
                 print(f"Gmail API failed: {gmail_error}, falling back to SMTP")
                 
                 # Generate PDF for SMTP fallback
-                logo_path = os.path.join(
-                    os.path.dirname(os.path.dirname(__file__)),
-                    '../docs/AT Report/NDIS_Menu_Large.jpg'
-                )
-                
-                if not os.path.exists(logo_path):
-                    logo_path = os.path.join(
-                        os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-                        'docs/AT Report/NDIS_Menu_Large.jpg'
-                    )
-                
-                if not os.path.exists(logo_path):
-                    logo_path = None
-                
-                pdf_buffer = generate_at_report_pdf(form_data, logo_path=logo_path)
+                from .pdf_generator import find_ndis_logo, generate_at_report_pdf, report_filename
+                pdf_buffer = generate_at_report_pdf(form_data, logo_path=find_ndis_logo())
                 pdf_content = pdf_buffer.getvalue()
                 
                 # Generate filename
                 participant_name = form_data.get('participant', {}).get('name', 'Report')
                 ndis_number = form_data.get('participant', {}).get('ndisNumber', '')
-                
-                safe_name = ''.join(c for c in participant_name if c.isalnum() or c in (' ', '-', '_'))
-                safe_name = safe_name.replace(' ', '_')
-                safe_ndis = ''.join(c for c in ndis_number if c.isalnum())
-                
-                if safe_ndis:
-                    pdf_filename = f'{safe_name}_{safe_ndis}.pdf'
-                else:
-                    pdf_filename = f'{safe_name}.pdf'
+                pdf_filename = report_filename(form_data)
                 
                 # Send via SMTP
                 email_service = get_email_service()
@@ -377,3 +465,151 @@ class TestEmailView(APIView):
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+def _email_list(data, field):
+    """Recipients from multipart form data: repeated fields, a JSON list or comma-separated"""
+    values = data.getlist(field) if hasattr(data, 'getlist') else data.get(field, [])
+    if isinstance(values, str):
+        values = [values]
+    emails = []
+    for value in values or []:
+        if isinstance(value, str) and value.strip().startswith('['):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        parts = value if isinstance(value, list) else str(value).split(',')
+        emails.extend(part.strip() for part in parts if part and part.strip())
+    return emails
+
+
+class ATReportBatchListView(APIView):
+    """
+    API endpoint to create and list AT report batches
+    
+    POST /api/ai/at-report-batches/  (multipart)
+        files: one or more PDFs and/or ZIP archives of PDFs
+        report_type: "general" | "prosthetics_orthotics"  (optional, default: "general")
+        name: optional label
+        send_email: "true" to email each generated report (optional)
+        to_emails, cc_emails: recipients (repeated fields, JSON list or comma-separated)
+        custom_message, from_address, connection_email: as for email-at-report (optional)
+    
+    Returns 202 with the batch; items are processed in the background.
+    Poll GET /api/ai/at-report-batches/<id>/ for per-item status.
+    
+    GET /api/ai/at-report-batches/ lists the 50 most recent batches.
+    """
+    parser_classes = (MultiPartParser, FormParser)
+    
+    def get(self, request):
+        batches = ATReportBatch.objects.select_related('created_by')[:50]
+        return Response(ATReportBatchSerializer(batches, many=True).data)
+    
+    def post(self, request):
+        files = request.FILES.getlist('files')
+        if not files:
+            return Response(
+                {'error': 'At least one PDF or ZIP file is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        report_type = request.data.get('report_type', 'general')
+        if report_type not in dict(ATReportBatch.REPORT_TYPE_CHOICES):
+            return Response(
+                {'error': 'Invalid report_type. Must be "general" or "prosthetics_orthotics"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        send_email = _flag(request.data, 'send_email')
+        to_emails = _email_list(request.data, 'to_emails')
+        if send_email and not to_emails:
+            return Response(
+                {'error': 'At least one recipient email address is required when send_email is set'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            pdfs = batch_processing.collect_pdfs(files)
+        except batch_processing.BatchUploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            batch = batch_processing.create_batch(
+                pdfs,
+                created_by=request.user if request.user.is_authenticated else None,
+                name=request.data.get('name', '')[:255],
+                report_type=report_type,
+                send_email=send_email,
+                to_emails=to_emails,
+                cc_emails=_email_list(request.data, 'cc_emails'),
+                custom_message=request.data.get('custom_message', ''),
+                from_address=request.data.get('from_address', ''),
+                connection_email=request.data.get('connection_email', ''),
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'Could not store the uploaded PDFs: {str(e)}'},
+                status=status.HTTP_502_BAD_GATEWAY
+            )
+        
+        batch_processing.start_batch(batch)
+        
+        return Response(ATReportBatchDetailSerializer(batch).data, status=status.HTTP_202_ACCEPTED)
+
+
+class ATReportBatchDetailView(APIView):
+    """
+    API endpoint for one AT report batch with per-item status
+    
+    GET /api/ai/at-report-batches/<id>/
+    """
+    
+    def get(self, request, batch_id):
+        batch = get_object_or_404(ATReportBatch.objects.select_related('created_by'), pk=batch_id)
+        return Response(ATReportBatchDetailSerializer(batch).data)
+
+
+class ATReportBatchRetryView(APIView):
+    """
+    API endpoint to re-queue the failed items of a batch
+    
+    POST /api/ai/at-report-batches/<id>/retry/
+    """
+    
+    def post(self, request, batch_id):
+        batch = get_object_or_404(ATReportBatch, pk=batch_id)
+        requeued = batch_processing.retry_failed(batch)
+        return Response({'success': True, 'requeued': requeued})
+
+
+class ATReportBatchItemPDFView(APIView):
+    """
+    API endpoint to download the generated report PDF of a batch item
+    
+    GET /api/ai/at-report-batches/<id>/items/<item_id>/pdf/
+    """
+    
+    def get(self, request, batch_id, item_id):
+        import logging
+        from .pdf_generator import report_filename
+        logger = logging.getLogger(__name__)
+
+        item = get_object_or_404(ATReportBatchItem, pk=item_id, batch_id=batch_id)
+        if not item.report_s3_key:
+            return Response(
+                {'error': 'Report has not been generated for this item'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            report = batch_processing.open_report(item)
+        except Exception as e:
+            logger.error(f"AT report batch item {item.pk}: could not read report: {e}")
+            return Response({'error': 'Could not read the report file'}, status=status.HTTP_502_BAD_GATEWAY)
+        return FileResponse(
+            report,
+            as_attachment=True,
+            filename=report_filename(batch_processing.extraction_to_form_data(item.extracted_data or {})),
+            content_type='application/pdf'
+        )
@@ -5,13 +5,16 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Prefetch
 from django.utils.dateparse import parse_datetime
 from datetime import timedelta
+from ncc_api.caching import cached_response
 import uuid
 import sys
 from .models import Appointment, Encounter, AppointmentType
 from clinicians.models import Clinic, Clinician
-from patients.models import Patient
+from patients.models import Patient, PatientContactPoint
+from patients.versions import conditional_patient_response
 from .serializers import (
     AppointmentSerializer, 
     AppointmentCalendarSerializer,
@@ -39,6 +42,14 @@ class AppointmentTypeViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(is_active=True)
         
         return queryset
+    
+    @cached_response('appointment_types', invalidated_by=['appointments.AppointmentType'])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @cached_response('appointment_types', invalidated_by=['appointments.AppointmentType'])
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
 
 
 class AppointmentViewSet(viewsets.ModelViewSet):
@@ -60,6 +71,10 @@ class AppointmentViewSet(viewsets.ModelViewSet):
             return AppointmentCalendarSerializer
         return AppointmentSerializer
     
+    @conditional_patient_response(lookup=('patient',))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def get_queryset(self):
         """Filter by date range if provided"""
         queryset = super().get_queryset()
@@ -415,7 +430,6 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         Returns: List of appointments with phone availability flag
         """
         from datetime import datetime, timedelta
-        import json
         
         if not date:
             return Response(
@@ -439,53 +453,16 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         appointments = Appointment.objects.filter(
             start_time__gte=start_datetime,
             start_time__lte=end_datetime
-        ).select_related('patient', 'clinic', 'clinician', 'appointment_type').order_by('start_time')
+        ).select_related('patient', 'clinic', 'clinician', 'appointment_type').prefetch_related(
+            Prefetch('patient__contact_points', queryset=PatientContactPoint.objects.filter(kind='phone'))
+        ).order_by('start_time')
         
         # Build response with phone availability
         result = []
         for appointment in appointments:
-            # Get patient phone numbers from contact_json
-            has_phone = False
-            phone_number = None
-            
-            if appointment.patient and appointment.patient.contact_json:
-                try:
-                    contact_json = appointment.patient.contact_json
-                    if isinstance(contact_json, str):
-                        contact_json = json.loads(contact_json)
-                    
-                    # Check for phones array (new format)
-                    phones = contact_json.get('phones', [])
-                    if phones and isinstance(phones, list) and len(phones) > 0:
-                        # Find default phone or first mobile
-                        default_phone = None
-                        first_mobile = None
-                        
-                        for phone in phones:
-                            if isinstance(phone, dict):
-                                phone_value = phone.get('phone', '').strip()
-                                phone_type = phone.get('type', '')
-                                is_default = phone.get('is_default', phone.get('default', False))
-                                
-                                if phone_value:
-                                    if is_default:
-                                        default_phone = phone_value
-                                        break
-                                    if phone_type == 'mobile' and not first_mobile:
-                                        first_mobile = phone_value
-                        
-                        phone_number = default_phone or first_mobile or phones[0].get('phone', '')
-                        has_phone = bool(phone_number)
-                    
-                    # Fallback to old format
-                    if not has_phone:
-                        mobile = contact_json.get('mobile', {})
-                        if isinstance(mobile, dict):
-                            phone_number = mobile.get('phone', '').strip()
-                            has_phone = bool(phone_number)
-                
-                except (json.JSONDecodeError, AttributeError, TypeError) as e:
-                    has_phone = False
+            # Default mobile/phone from the patient's normalized contact points
+            phone_number = appointment.patient.default_phone() if appointment.patient else None
+            has_phone = bool(phone_number)
             
             result.append({
                 'id': str(appointment.id),
@@ -89,3 +89,13 @@ class ClinicianListSerializer(serializers.ModelSerializer):
         """Return display name for FullCalendar"""
         return obj.get_display_name()
 
+
+
+class ClinicianReferenceSerializer(ClinicianSerializer):
+    """
+    Clinician serializer for the cached reference-data bundle (/api/bootstrap/).
+    Omits signature_url - presigned S3 URLs expire, so they must not be cached.
+    """
+    
+    class Meta(ClinicianSerializer.Meta):
+        fields = [f for f in ClinicianSerializer.Meta.fields if f != 'signature_url']
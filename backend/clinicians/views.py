@@ -6,6 +6,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from ncc_api.caching import cached_response
 from .models import Clinic, Clinician
 from .serializers import ClinicSerializer, ClinicianSerializer, ClinicianListSerializer
 
@@ -30,6 +31,14 @@ class ClinicViewSet(viewsets.ModelViewSet):
         """
         return Clinic.objects.all().order_by('name')
     
+    @cached_response('clinics', invalidated_by=['clinicians.Clinic'])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @cached_response('clinics', invalidated_by=['clinicians.Clinic'])
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
     def perform_create(self, serializer):
         """Only staff can create clinics"""
         if not self.request.user.is_staff:
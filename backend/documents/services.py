@@ -1,10 +1,39 @@
 import os
 import uuid
 import mimetypes
+import threading
 from datetime import timedelta
 from django.conf import settings
-import boto3
-from botocore.exceptions import ClientError
+from ncc_api import metrics
+
+_client = None
+_client_key = None
+_client_lock = threading.Lock()
+
+
+def get_s3_client(region):
+    """
+    Process-wide S3 client. boto3 clients are thread-safe and expensive to
+    build, and S3Service is created per request (even per serialized image),
+    so every S3Service shares one. boto3 is imported on first use.
+    """
+    global _client, _client_key
+    key = (region, os.getenv('AWS_ACCESS_KEY_ID'), os.getenv('AWS_SECRET_ACCESS_KEY'))
+    with _client_lock:
+        if _client is None or _client_key != key:
+            import boto3
+            _client = boto3.client(
+                's3',
+                aws_access_key_id=key[1],
+                aws_secret_access_key=key[2],
+                region_name=region,
+                config=boto3.session.Config(
+                    signature_version='s3v4',
+                    s3={'addressing_style': 'virtual'}
+                )
+            )
+            _client_key = key
+        return _client
 
 
 class S3Service:
@@ -12,16 +41,7 @@ class S3Service:
     
     def __init__(self):
         self.region = os.getenv('AWS_REGION', 'ap-southeast-2')
-        self.s3_client = boto3.client(
-            's3',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=self.region,
-            config=boto3.session.Config(
-                signature_version='s3v4',
-                s3={'addressing_style': 'virtual'}
-            )
-        )
+        self.s3_client = get_s3_client(self.region)
         self.bucket_name = os.getenv('AWS_S3_BUCKET_NAME')
         
         if not self.bucket_name:
@@ -104,7 +124,7 @@ class S3Service:
                 'mime_type': mime_type,
             }
             
-        except ClientError as e:
+        except self.s3_client.exceptions.ClientError as e:
             raise Exception(f"Failed to upload to S3: {str(e)}")
     
     def generate_presigned_url(self, s3_key, expiration=3600, filename=None):
@@ -131,10 +151,30 @@ class S3Service:
                 ExpiresIn=expiration,
                 HttpMethod='GET'
             )
+            metrics.inc('ncc_s3_presigned_urls_total')
             return url
-        except ClientError as e:
+        except self.s3_client.exceptions.ClientError as e:
             raise Exception(f"Failed to generate pre-signed URL: {str(e)}")
     
+    def get_file(self, s3_key):
+        """
+        Open a file for reading
+        
+        Args:
+            s3_key: S3 object key
+            
+        Returns:
+            Streaming file-like body (call .read() for the bytes)
+        """
+        try:
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=s3_key
+            )
+            return response['Body']
+        except self.s3_client.exceptions.ClientError as e:
+            raise Exception(f"Failed to read from S3: {str(e)}")
+    
     def delete_file(self, s3_key):
         """
         Delete a file from S3
@@ -151,7 +191,7 @@ class S3Service:
                 Key=s3_key
             )
             return True
-        except ClientError as e:
+        except self.s3_client.exceptions.ClientError as e:
             raise Exception(f"Failed to delete from S3: {str(e)}")
     
     def list_files(self, prefix='documents/', max_keys=1000):
@@ -183,7 +223,7 @@ class S3Service:
             
             return files
             
-        except ClientError as e:
+        except self.s3_client.exceptions.ClientError as e:
             raise Exception(f"Failed to list S3 files: {str(e)}")
     
     def check_file_exists(self, s3_key):
@@ -202,7 +242,7 @@ class S3Service:
                 Key=s3_key
             )
             return True
-        except ClientError as e:
+        except self.s3_client.exceptions.ClientError as e:
             if e.response['Error']['Code'] == '404':
                 return False
             raise Exception(f"Failed to check file existence: {str(e)}")
@@ -227,7 +267,7 @@ class S3Service:
                 'region': region,
                 'accessible': True,
             }
-        except ClientError as e:
+        except self.s3_client.exceptions.ClientError as e:
             return {
                 'bucket_name': self.bucket_name,
                 'accessible': False,
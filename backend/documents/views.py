@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import AllowAny
 from django.contrib.contenttypes.models import ContentType
+from patients.versions import PRESIGNED_URL_REFRESH, conditional_patient_response
 from .models import Document
 from .serializers import DocumentSerializer, DocumentUploadSerializer
 from .services import S3Service
@@ -19,6 +20,10 @@ class DocumentViewSet(viewsets.ModelViewSet):
     parser_classes = (MultiPartParser, FormParser)
     permission_classes = [AllowAny]  # TODO: Add proper authentication
     
+    @conditional_patient_response(lookup=('patient_id',), refresh_every=PRESIGNED_URL_REFRESH)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def get_queryset(self):
         """Filter documents by query parameters"""
         queryset = Document.objects.filter(is_active=True)
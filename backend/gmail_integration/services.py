@@ -10,20 +10,41 @@ Handles:
 import os
 import base64
 import time
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
 from datetime import timedelta
 from typing import List, Optional, Dict, Any
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django.conf import settings
+from ncc_api import metrics
 from .models import GmailConnection, EmailTemplate, SentEmail
 
+TOKEN_URL = "https://oauth2.googleapis.com/token"
+SEND_URL = "https://gmail.googleapis.com/gmail/v1/users/me/messages/send"
+SEND_AS_URL = "https://gmail.googleapis.com/gmail/v1/users/me/settings/sendAs"
+
+# Refresh this long before Google's expiry so a token never expires mid-request
+TOKEN_EXPIRY_MARGIN = timedelta(seconds=60)
+SEND_AS_CACHE_TTL = 600  # seconds
+SESSION_POOL_SIZE = 10  # connections kept alive per Gmail account
+
 
 class GmailService:
     """
     Main service class for Gmail API interactions
+    
+    HTTP calls go through one pooled requests.Session per Gmail connection
+    (plus one for the OAuth token endpoint), so a batch of sends reuses
+    keep-alive TCP/TLS connections. Access tokens are cached per connection
+    and refreshed single-flight: one thread per process refreshes (under a
+    per-connection lock, and a row lock across workers on Postgres) while
+    the others wait and reuse the new token.
     """
     
     def __init__(self):
@@ -39,6 +60,134 @@ class GmailService:
             'https://www.googleapis.com/auth/userinfo.email',  # Get user email
             'https://www.googleapis.com/auth/userinfo.profile',  # Get user profile
         ]
+        
+        self._lock = threading.Lock()
+        self._sessions = {}  # connection id (or 'oauth') -> requests.Session
+        self._token_locks = {}  # connection id -> Lock
+        self._tokens = {}  # connection id -> (access_token, expires_at)
+        self._send_as_cache = {}  # connection id -> (expires monotonic, list)
+    
+    # ------------------------------------------------------------------
+    # Pooled sessions and token cache
+    # ------------------------------------------------------------------
+    
+    def _session(self, key) -> 'requests.Session':
+        """Keep-alive session for a connection id (or 'oauth')"""
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=SESSION_POOL_SIZE)
+                session.mount('https://', adapter)
+                self._sessions[key] = session
+            return session
+    
+    def _token_lock(self, connection_id) -> threading.Lock:
+        with self._lock:
+            lock = self._token_locks.get(connection_id)
+            if lock is None:
+                lock = self._token_locks[connection_id] = threading.Lock()
+            return lock
+    
+    def _cache_token(self, connection: GmailConnection):
+        self._tokens[connection.pk] = (connection.access_token, connection.expires_at)
+    
+    @staticmethod
+    def _token_valid(expires_at) -> bool:
+        return expires_at is not None and timezone.now() + TOKEN_EXPIRY_MARGIN < expires_at
+    
+    def _ensure_token(self, connection: GmailConnection, force_refresh: bool = False) -> GmailConnection:
+        """
+        Make sure `connection` carries a valid access token, refreshing at
+        most once per process (single-flight) when it has expired.
+        """
+        if not force_refresh:
+            cached = self._tokens.get(connection.pk)
+            if cached and self._token_valid(cached[1]):
+                connection.access_token, connection.expires_at = cached
+                return connection
+            if self._token_valid(connection.expires_at):
+                self._cache_token(connection)
+                return connection
+        
+        stale_token = self._tokens.get(connection.pk, (connection.access_token, None))[0]
+        with self._token_lock(connection.pk):
+            # Another thread may have refreshed while we waited for the lock
+            cached = self._tokens.get(connection.pk)
+            if cached and self._token_valid(cached[1]) and cached[0] != stale_token:
+                connection.access_token, connection.expires_at = cached
+                return connection
+            return self._refresh_token_locked(connection, force_refresh)
+    
+    def _refresh_token_locked(self, connection: GmailConnection, force_refresh: bool) -> GmailConnection:
+        """Refresh under the per-connection lock and a DB row lock"""
+        with transaction.atomic():
+            row = GmailConnection.objects.select_for_update().get(pk=connection.pk)
+            if not force_refresh and self._token_valid(row.expires_at):
+                # Another worker process refreshed it already
+                connection.access_token = row.access_token
+                connection.expires_at = row.expires_at
+                connection.last_refresh_at = row.last_refresh_at
+            else:
+                token_data = self._request_refreshed_token(row.refresh_token)
+                connection.access_token = token_data['access_token']
+                connection.expires_at = timezone.now() + timedelta(seconds=token_data.get('expires_in', 3600))
+                connection.last_refresh_at = timezone.now()
+                GmailConnection.objects.filter(pk=connection.pk).update(
+                    access_token=connection.access_token,
+                    expires_at=connection.expires_at,
+                    last_refresh_at=connection.last_refresh_at,
+                    updated_at=timezone.now(),
+                )
+                print(f"✓ Gmail token refreshed for {connection.email_address}")
+        self._cache_token(connection)
+        return connection
+    
+    def _request_refreshed_token(self, refresh_token: str) -> Dict[str, Any]:
+        self._check_credentials()
+        
+        if not refresh_token:
+            raise ValueError("No refresh token available. Please reconnect your Gmail account.")
+        
+        data = {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "refresh_token": refresh_token,
+            "grant_type": "refresh_token"
+        }
+        response = self._session('oauth').post(TOKEN_URL, data=data, timeout=30)
+        response.raise_for_status()
+        return response.json()
+    
+    def _api_request(self, connection: GmailConnection, method: str, url: str, **kwargs):
+        """
+        Authorized Gmail API call on the connection's pooled session.
+        A 401 (token revoked/rotated early) triggers one forced refresh and retry.
+        """
+        session = self._session(connection.pk)
+        for attempt in range(2):
+            self._ensure_token(connection, force_refresh=attempt > 0)
+            headers = {
+                "Authorization": f"Bearer {connection.access_token}",
+                "Content-Type": "application/json"
+            }
+            response = session.request(method, url, headers=headers, timeout=30, **kwargs)
+            if response.status_code != 401:
+                break
+        response.raise_for_status()
+        return response
+    
+    def forget_connection(self, connection_id):
+        """Drop cached token, send-as list and session for a (disconnected) account"""
+        with self._lock:
+            session = self._sessions.pop(connection_id, None)
+            self._tokens.pop(connection_id, None)
+            self._send_as_cache.pop(connection_id, None)
+        if session is not None:
+            session.close()
     
     def _check_credentials(self):
         """Verify OAuth2 credentials are configured"""
@@ -91,10 +240,8 @@ class GmailService:
         start_time = time.time()
         
         try:
-            import requests
-            
             # Exchange code for token
-            token_url = "https://oauth2.googleapis.com/token"
+            token_url = TOKEN_URL
             data = {
                 "code": code,
                 "client_id": self.client_id,
@@ -103,7 +250,7 @@ class GmailService:
                 "grant_type": "authorization_code"
             }
             
-            response = requests.post(token_url, data=data, timeout=30)
+            response = self._session('oauth').post(token_url, data=data, timeout=30)
             response.raise_for_status()
             token_data = response.json()
             
@@ -113,7 +260,7 @@ class GmailService:
                 "Authorization": f"Bearer {token_data['access_token']}"
             }
             
-            user_response = requests.get(userinfo_url, headers=headers, timeout=30)
+            user_response = self._session('oauth').get(userinfo_url, headers=headers, timeout=30)
             user_response.raise_for_status()
             user_data = user_response.json()
             
@@ -134,6 +281,10 @@ class GmailService:
                 }
             )
             
+            # Reconnected accounts get a fresh token and send-as list
+            self.forget_connection(connection.pk)
+            self._cache_token(connection)
+            
             # Set connected_at only for new connections
             if created:
                 connection.connected_at = timezone.now()
@@ -156,7 +307,7 @@ class GmailService:
     
     def refresh_access_token(self, connection: GmailConnection) -> GmailConnection:
         """
-        Refresh an expired access token
+        Refresh the access token now (single-flight with concurrent refreshes)
         
         Args:
             connection: GmailConnection with refresh token
@@ -164,38 +315,8 @@ class GmailService:
         Returns:
             Updated GmailConnection
         """
-        self._check_credentials()
-        
-        if not connection.refresh_token:
-            raise ValueError("No refresh token available. Please reconnect your Gmail account.")
-        
         try:
-            import requests
-            
-            # Refresh token
-            token_url = "https://oauth2.googleapis.com/token"
-            data = {
-                "client_id": self.client_id,
-                "client_secret": self.client_secret,
-                "refresh_token": connection.refresh_token,
-                "grant_type": "refresh_token"
-            }
-            
-            response = requests.post(token_url, data=data, timeout=30)
-            response.raise_for_status()
-            token_data = response.json()
-            
-            # Update connection with new token
-            expires_at = timezone.now() + timedelta(seconds=token_data.get('expires_in', 3600))
-            connection.access_token = token_data['access_token']
-            connection.expires_at = expires_at
-            connection.last_refresh_at = timezone.now()
-            connection.save()
-            
-            print(f"✓ Gmail token refreshed for {connection.email_address}")
-            
-            return connection
-            
+            return self._ensure_token(connection, force_refresh=True)
         except Exception as e:
             print(f"✗ Failed to refresh Gmail token: {str(e)}")
             raise
@@ -210,9 +331,9 @@ class GmailService:
             connection = GmailConnection.objects.filter(is_active=True).first()
         
         # Refresh token if expired
-        if connection and connection.is_token_expired():
+        if connection:
             try:
-                connection = self.refresh_access_token(connection)
+                connection = self._ensure_token(connection)
             except Exception as e:
                 print(f"Failed to refresh token: {e}")
                 return None
@@ -233,10 +354,7 @@ class GmailService:
             connection = GmailConnection.objects.get(email_address=email, is_active=True)
             
             # Refresh token if expired
-            if connection.is_token_expired():
-                connection = self.refresh_access_token(connection)
-            
-            return connection
+            return self._ensure_token(connection)
         except GmailConnection.DoesNotExist:
             return None
     
@@ -249,12 +367,15 @@ class GmailService:
         """
         return list(GmailConnection.objects.filter(is_active=True).order_by('-is_primary', '-connected_at'))
     
-    def get_send_as_addresses(self, connection: GmailConnection = None) -> List[Dict[str, Any]]:
+    def get_send_as_addresses(self, connection: GmailConnection = None, refresh: bool = False) -> List[Dict[str, Any]]:
         """
         Fetch all 'Send As' addresses configured for the Gmail account
         
+        Results are cached per connection for SEND_AS_CACHE_TTL seconds.
+        
         Args:
             connection: GmailConnection to use (optional, uses active if not provided)
+            refresh: Bypass the cache
             
         Returns:
             List of dicts with send as address information
@@ -264,18 +385,14 @@ class GmailService:
             if not connection:
                 raise ValueError("No active Gmail connection available")
         
+        if not refresh:
+            cached = self._send_as_cache.get(connection.pk)
+            if cached and cached[0] > time.monotonic():
+                return [dict(address) for address in cached[1]]
+        
         try:
-            import requests
-            
             # Fetch send as addresses from Gmail API
-            url = "https://gmail.googleapis.com/gmail/v1/users/me/settings/sendAs"
-            headers = {
-                "Authorization": f"Bearer {connection.access_token}",
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
+            response = self._api_request(connection, 'GET', SEND_AS_URL)
             result = response.json()
             
             # Parse and format the send as addresses
@@ -292,7 +409,8 @@ class GmailService:
                 })
             
             print(f"✓ Fetched {len(send_as_list)} Send As addresses")
-            return send_as_list
+            self._send_as_cache[connection.pk] = (time.monotonic() + SEND_AS_CACHE_TTL, send_as_list)
+            return [dict(address) for address in send_as_list]
             
         except Exception as e:
             print(f"✗ Failed to fetch Send As addresses: {str(e)}")
@@ -402,149 +520,217 @@ class GmailService:
             SentEmail log entry
         """
         # Get connection - prioritize connection_email, then connection, then default
-        if connection_email:
-            connection = self.get_connection_by_email(connection_email)
-            if not connection:
-                # Use the same error message format as token expiry so frontend shows reconnect modal
-                raise ValueError(f"No refresh token available. Please reconnect your Gmail account ({connection_email}).")
-        elif not connection:
-            connection = self.get_active_connection()
-            if not connection:
-                raise ValueError("No active Gmail connection available. Please connect your Gmail account.")
+        connection = self.resolve_connection(connection, connection_email)
         
         try:
-            import requests
-            
-            # Note: Email signature is now handled by EmailGenerator
-            # No need to append signature here as it's already in body_html
-            body_html_with_signature = body_html
-            
-            # Create MIME message structure
-            # For emails with attachments, use 'mixed' and nest 'alternative' inside
-            if attachments:
-                message = MIMEMultipart('mixed')
-                message['To'] = ', '.join(to_emails)
-                message['Subject'] = subject
-                # Use from_address if provided, otherwise use connection's email
-                message['From'] = from_address if from_address else connection.email_address
-                
-                if cc_emails:
-                    message['Cc'] = ', '.join(cc_emails)
-                
-                # Create alternative part for text/html
-                msg_alternative = MIMEMultipart('alternative')
-                
-                # Add text parts to alternative
-                if body_text:
-                    text_part = MIMEText(body_text, 'plain', 'utf-8')
-                    msg_alternative.attach(text_part)
-                
-                html_part = MIMEText(body_html_with_signature, 'html', 'utf-8')
-                msg_alternative.attach(html_part)
-                
-                # Attach the alternative part to the main message
-                message.attach(msg_alternative)
-                
-            else:
-                # No attachments, use simple alternative structure
-                message = MIMEMultipart('alternative')
-                message['To'] = ', '.join(to_emails)
-                message['Subject'] = subject
-                # Use from_address if provided, otherwise use connection's email
-                message['From'] = from_address if from_address else connection.email_address
-                
-                if cc_emails:
-                    message['Cc'] = ', '.join(cc_emails)
-                
-                # Add text parts
-                if body_text:
-                    text_part = MIMEText(body_text, 'plain', 'utf-8')
-                    message.attach(text_part)
-                
-                html_part = MIMEText(body_html_with_signature, 'html', 'utf-8')
-                message.attach(html_part)
-            
-            # Add attachments
-            attachment_names = []
-            if attachments:
-                for attachment in attachments:
-                    # Create the attachment part
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(attachment['content'])
-                    encoders.encode_base64(part)
-                    
-                    # Add header with proper filename (no space before filename)
-                    part.add_header(
-                        'Content-Disposition',
-                        f'attachment; filename="{attachment["filename"]}"'
-                    )
-                    
-                    message.attach(part)
-                    attachment_names.append(attachment['filename'])
-            
-            # Encode message
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
-            
-            # Send via Gmail API
-            send_url = "https://gmail.googleapis.com/gmail/v1/users/me/messages/send"
-            headers = {
-                "Authorization": f"Bearer {connection.access_token}",
-                "Content-Type": "application/json"
-            }
-            data = {
-                "raw": raw_message
-            }
-            
-            response = requests.post(send_url, headers=headers, json=data, timeout=30)
-            response.raise_for_status()
-            result = response.json()
-            
-            # Update connection stats
-            connection.emails_sent += 1
-            connection.last_used_at = timezone.now()
-            connection.save()
-            
-            # Log sent email
-            sent_email = SentEmail.objects.create(
-                connection=connection,
-                to_addresses=', '.join(to_emails),
-                cc_addresses=', '.join(cc_emails) if cc_emails else '',
-                bcc_addresses=', '.join(bcc_emails) if bcc_emails else '',
+            sent_email = self.deliver(
+                connection,
+                to_emails=to_emails,
                 subject=subject,
-                body_preview=body_text[:500] if body_text else body_html[:500],
-                has_attachments=bool(attachments),
-                attachment_names=', '.join(attachment_names),
+                body_html=body_html,
+                body_text=body_text,
+                cc_emails=cc_emails,
+                bcc_emails=bcc_emails,
+                attachments=attachments,
                 template=template,
-                status='sent',
-                gmail_message_id=result.get('id', ''),
-                gmail_thread_id=result.get('threadId', ''),
-                related_patient_id=metadata.get('patient_id', '') if metadata else '',
-                related_appointment_id=metadata.get('appointment_id', '') if metadata else '',
-                related_report_type=metadata.get('report_type', '') if metadata else '',
-                sent_by=metadata.get('sent_by', '') if metadata else '',
+                metadata=metadata,
+                from_address=from_address,
             )
             
+            # Update connection stats (atomic - concurrent sends must not
+            # overwrite each other's counts or a freshly refreshed token)
+            self.record_sent(connection, 1)
+            
+            # Log sent email
+            sent_email.save()
+            
             print(f"✓ Email sent via Gmail: {subject} to {', '.join(to_emails)}")
             
             return sent_email
             
         except Exception as e:
             # Log failed attempt
-            sent_email = SentEmail.objects.create(
-                connection=connection,
-                to_addresses=', '.join(to_emails),
-                cc_addresses=', '.join(cc_emails) if cc_emails else '',
-                subject=subject,
-                body_preview=body_text[:500] if body_text else body_html[:500],
-                has_attachments=bool(attachments),
-                status='failed',
-                error_message=str(e),
+            sent_email = self.failed_email_record(
+                connection, to_emails, subject, body_html, body_text, cc_emails, attachments, e
             )
+            sent_email.save()
+            metrics.inc('ncc_emails_total', status='failed')
             
             print(f"✗ Failed to send email via Gmail: {str(e)}")
             raise
+    
+    def resolve_connection(self, connection: GmailConnection = None, connection_email: str = None) -> GmailConnection:
+        """Connection for sending: connection_email, then connection, then the primary account"""
+        if connection_email:
+            connection = self.get_connection_by_email(connection_email)
+            if not connection:
+                # Use the same error message format as token expiry so frontend shows reconnect modal
+                raise ValueError(f"No refresh token available. Please reconnect your Gmail account ({connection_email}).")
+        elif not connection:
+            connection = self.get_active_connection()
+            if not connection:
+                raise ValueError("No active Gmail connection available. Please connect your Gmail account.")
+        return connection
+    
+    def build_message(
+        self,
+        connection: GmailConnection,
+        to_emails: List[str],
+        subject: str,
+        body_html: str,
+        body_text: str = None,
+        cc_emails: List[str] = None,
+        attachments: List[Dict[str, Any]] = None,
+        from_address: str = None
+    ) -> MIMEMultipart:
+        """Build the MIME message sent by deliver()"""
+        # Note: Email signature is now handled by EmailGenerator
+        # No need to append signature here as it's already in body_html
+        body_html_with_signature = body_html
+        
+        # Create MIME message structure
+        # For emails with attachments, use 'mixed' and nest 'alternative' inside
+        if attachments:
+            message = MIMEMultipart('mixed')
+            message['To'] = ', '.join(to_emails)
+            message['Subject'] = subject
+            # Use from_address if provided, otherwise use connection's email
+            message['From'] = from_address if from_address else connection.email_address
+            
+            if cc_emails:
+                message['Cc'] = ', '.join(cc_emails)
+            
+            # Create alternative part for text/html
+            msg_alternative = MIMEMultipart('alternative')
+            
+            # Add text parts to alternative
+            if body_text:
+                text_part = MIMEText(body_text, 'plain', 'utf-8')
+                msg_alternative.attach(text_part)
+            
+            html_part = MIMEText(body_html_with_signature, 'html', 'utf-8')
+            msg_alternative.attach(html_part)
+            
+            # Attach the alternative part to the main message
+            message.attach(msg_alternative)
+            
+        else:
+            # No attachments, use simple alternative structure
+            message = MIMEMultipart('alternative')
+            message['To'] = ', '.join(to_emails)
+            message['Subject'] = subject
+            # Use from_address if provided, otherwise use connection's email
+            message['From'] = from_address if from_address else connection.email_address
+            
+            if cc_emails:
+                message['Cc'] = ', '.join(cc_emails)
+            
+            # Add text parts
+            if body_text:
+                text_part = MIMEText(body_text, 'plain', 'utf-8')
+                message.attach(text_part)
+            
+            html_part = MIMEText(body_html_with_signature, 'html', 'utf-8')
+            message.attach(html_part)
+        
+        # Add attachments
+        if attachments:
+            for attachment in attachments:
+                # Create the attachment part
+                part = MIMEBase('application', 'octet-stream')
+                part.set_payload(attachment['content'])
+                encoders.encode_base64(part)
+                
+                # Add header with proper filename (no space before filename)
+                part.add_header(
+                    'Content-Disposition',
+                    f'attachment; filename="{attachment["filename"]}"'
+                )
+                
+                message.attach(part)
+        
+        return message
+    
+    def deliver(
+        self,
+        connection: GmailConnection,
+        to_emails: List[str],
+        subject: str,
+        body_html: str,
+        body_text: str = None,
+        cc_emails: List[str] = None,
+        bcc_emails: List[str] = None,
+        attachments: List[Dict[str, Any]] = None,
+        template: EmailTemplate = None,
+        metadata: Dict[str, Any] = None,
+        from_address: str = None
+    ) -> SentEmail:
+        """
+        Send one message on an already resolved connection and return its
+        SentEmail log entry UNSAVED, so bulk senders can insert the log with
+        bulk_create and update the connection stats once (see record_sent).
+        Raises on failure.
+        """
+        message = self.build_message(
+            connection, to_emails, subject, body_html, body_text, cc_emails, attachments, from_address
+        )
+        
+        # Encode message
+        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        
+        # Send via Gmail API (pooled session, cached token)
+        data = {
+            "raw": raw_message
+        }
+        
+        response = self._api_request(connection, 'POST', SEND_URL, json=data)
+        result = response.json()
+        
+        attachment_names = [attachment['filename'] for attachment in attachments or []]
+        return SentEmail(
+            connection=connection,
+            to_addresses=', '.join(to_emails),
+            cc_addresses=', '.join(cc_emails) if cc_emails else '',
+            bcc_addresses=', '.join(bcc_emails) if bcc_emails else '',
+            subject=subject,
+            body_preview=body_text[:500] if body_text else body_html[:500],
+            has_attachments=bool(attachments),
+            attachment_names=', '.join(attachment_names),
+            template=template,
+            status='sent',
+            gmail_message_id=result.get('id', ''),
+            gmail_thread_id=result.get('threadId', ''),
+            related_patient_id=metadata.get('patient_id', '') if metadata else '',
+            related_appointment_id=metadata.get('appointment_id', '') if metadata else '',
+            related_report_type=metadata.get('report_type', '') if metadata else '',
+            sent_by=metadata.get('sent_by', '') if metadata else '',
+        )
+    
+    @staticmethod
+    def failed_email_record(connection, to_emails, subject, body_html, body_text, cc_emails, attachments, error) -> SentEmail:
+        """Unsaved SentEmail logging a failed send"""
+        return SentEmail(
+            connection=connection,
+            to_addresses=', '.join(to_emails),
+            cc_addresses=', '.join(cc_emails) if cc_emails else '',
+            subject=subject,
+            body_preview=body_text[:500] if body_text else body_html[:500],
+            has_attachments=bool(attachments),
+            status='failed',
+            error_message=str(error),
+        )
+    
+    @staticmethod
+    def record_sent(connection: GmailConnection, count: int):
+        """Add `count` sends to the connection's stats in one UPDATE"""
+        if count:
+            GmailConnection.objects.filter(pk=connection.pk).update(
+                emails_sent=F('emails_sent') + count,
+                last_used_at=timezone.now(),
+            )
+            metrics.inc('ncc_emails_total', count, status='sent')
 
 
-# Singleton instance
-gmail_service = GmailService()
+# Singleton instance (created on first use)
+gmail_service = SimpleLazyObject(GmailService)
 
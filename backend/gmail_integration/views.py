@@ -120,6 +120,7 @@ def gmail_disconnect(request):
         
         connection.is_active = False
         connection.save()
+        gmail_service.forget_connection(connection.pk)
         
         return Response({
             'success': True,
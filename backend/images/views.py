@@ -7,6 +7,7 @@ from django.utils import timezone
 from django.db.models import Q
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from django.http import HttpResponse
+from patients.versions import PRESIGNED_URL_REFRESH, conditional_patient_response
 
 from .models import ImageBatch, Image
 from .serializers import ImageBatchSerializer, ImageBatchListSerializer, ImageSerializer
@@ -14,7 +15,6 @@ from documents.services import S3Service
 
 import uuid
 from datetime import datetime
-from PIL import Image as PILImage
 from io import BytesIO
 import sys
 import requests
@@ -38,6 +38,10 @@ class ImageBatchViewSet(viewsets.ModelViewSet):
     queryset = ImageBatch.objects.all()
     serializer_class = ImageBatchSerializer
     
+    @conditional_patient_response(lookup=('patient_id',), refresh_every=PRESIGNED_URL_REFRESH)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def get_queryset(self):
         """Filter batches by patient_id or other content object"""
         queryset = super().get_queryset()
@@ -94,6 +98,8 @@ class ImageBatchViewSet(viewsets.ModelViewSet):
         - categories: string[] (category for each image)
         - captions: string[] (optional caption for each image)
         """
+        from PIL import Image as PILImage
+
         batch = self.get_object()
         s3_service = S3Service()
         
@@ -423,6 +429,10 @@ class ImageViewSet(viewsets.ModelViewSet):
     queryset = Image.objects.all()
     serializer_class = ImageSerializer
     
+    @conditional_patient_response(lookup=('patient_id',), refresh_every=PRESIGNED_URL_REFRESH)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def get_queryset(self):
         """Filter images by batch_id or patient_id"""
         queryset = super().get_queryset()
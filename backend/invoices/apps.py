@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class InvoicesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'invoices'
+
+    def ready(self):
+        # Connect cache invalidation for email settings
+        from . import signals  # noqa: F401
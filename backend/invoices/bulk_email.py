@@ -0,0 +1,355 @@
+"""
+Bulk invoice/receipt/quote emailing
+
+An InvoiceEmailBatch is run by one coordinator thread:
+
+- The Gmail connection, sender clinician (signature) and header color are
+  resolved once for the whole batch, and every send goes through the
+  connection's pooled Gmail session (see GmailService._session).
+- Items are rendered (email HTML + PDF) and sent by a small worker pool.
+  Each item is claimed with a conditional UPDATE on status, so a batch
+  resumed by `manage.py send_invoice_email_batches` never sends twice.
+- Each item's SentEmail row and status are written as soon as Gmail
+  returns, so a restart never forgets a message that was already sent.
+  Only the connection's sent counter and the metrics are batched, in
+  groups of FLUSH_SIZE.
+
+Poll the batch (GET /api/invoices/email-batches/<id>/) for per-item progress.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+
+from gmail_integration.services import gmail_service
+from ncc_api import metrics
+from xero_integration.models import XeroInvoiceLink, XeroQuoteLink
+from .models import InvoiceEmailBatch, InvoiceEmailBatchItem
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCHES = 2  # batches running at once per process
+MAX_WORKERS = 4  # render+send threads per batch
+FLUSH_SIZE = 20  # results per sent-counter update
+MAX_ITEMS_PER_BATCH = 1000
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class BulkEmailError(ValueError):
+    """Raised for a request that cannot become a batch (unknown ids, too many items)"""
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_BATCHES, thread_name_prefix='invoice-email-batch')
+        return _executor
+
+
+# ---------------------------------------------------------------------------
+# Recipients
+# ---------------------------------------------------------------------------
+
+def contact_email(contact_json):
+    """
+    First email address in a company contact_json (patients use their
+    PatientContactPoint rows instead). Handles the shapes in use:
+    {"email": "a@b"}, {"email": {"home": {"value": ..., "default": true}}}
+    and {"emails": [{"address": ...}]}.
+    """
+    if not contact_json:
+        return None
+
+    email = contact_json.get('email')
+    if isinstance(email, str) and email.strip():
+        return email.strip()
+    if isinstance(email, dict):
+        entries = [entry for entry in email.values() if isinstance(entry, dict) and entry.get('value')]
+        entries.sort(key=lambda entry: not entry.get('default'))
+        if entries:
+            return entries[0]['value'].strip()
+
+    for entry in contact_json.get('emails') or []:
+        address = (entry.get('address') or entry.get('value') or '') if isinstance(entry, dict) else entry
+        address = str(address).split(',')[0].strip()
+        if address:
+            return address
+    return None
+
+
+def default_recipient(document):
+    """Who the document is billed to: the company if set, otherwise the patient"""
+    if document.company_id and document.company:
+        email = contact_email(document.company.contact_json)
+        if email:
+            return email
+    if document.patient_id and document.patient:
+        return document.patient.default_email()
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Batch creation
+# ---------------------------------------------------------------------------
+
+def create_batch(documents, from_email, created_by=None, **options):
+    """
+    Create a batch with one pending item per document.
+
+    documents: list of dicts with 'id', optional 'document_type'
+        ('invoice', 'receipt' or 'quote'; default 'invoice') and optional 'to'.
+    """
+    if not documents:
+        raise BulkEmailError('At least one document is required')
+    if len(documents) > MAX_ITEMS_PER_BATCH:
+        raise BulkEmailError(f'A batch can contain at most {MAX_ITEMS_PER_BATCH} documents')
+
+    valid_types = dict(InvoiceEmailBatchItem.DOCUMENT_TYPE_CHOICES)
+    for document in documents:
+        if document.get('document_type', 'invoice') not in valid_types:
+            raise BulkEmailError(f"Invalid document_type: {document.get('document_type')}")
+
+    invoice_ids = {str(d['id']) for d in documents if d.get('document_type', 'invoice') != 'quote'}
+    quote_ids = {str(d['id']) for d in documents if d.get('document_type') == 'quote'}
+    try:
+        invoices = {str(pk) for pk in XeroInvoiceLink.objects.filter(pk__in=invoice_ids).values_list('pk', flat=True)}
+        quotes = {str(pk) for pk in XeroQuoteLink.objects.filter(pk__in=quote_ids).values_list('pk', flat=True)}
+    except Exception:
+        raise BulkEmailError('Document ids must be UUIDs')
+    missing = (invoice_ids - invoices) | (quote_ids - quotes)
+    if missing:
+        raise BulkEmailError(f"Documents not found: {', '.join(sorted(missing))}")
+
+    batch = InvoiceEmailBatch.objects.create(from_email=from_email, created_by=created_by, **options)
+    items = []
+    for position, document in enumerate(documents):
+        document_type = document.get('document_type', 'invoice')
+        items.append(InvoiceEmailBatchItem(
+            batch=batch,
+            position=position,
+            document_type=document_type,
+            invoice_link_id=None if document_type == 'quote' else document['id'],
+            quote_link_id=document['id'] if document_type == 'quote' else None,
+            to_email=(document.get('to') or '')[:500],
+        ))
+    InvoiceEmailBatchItem.objects.bulk_create(items)
+    return batch
+
+
+# ---------------------------------------------------------------------------
+# Processing
+# ---------------------------------------------------------------------------
+
+def claim_item(item_id):
+    """Atomically move a pending item to 'sending'. Returns the item or None."""
+    now = timezone.now()
+    claimed = InvoiceEmailBatchItem.objects.filter(pk=item_id, status='pending').update(
+        status='sending', started_at=now, updated_at=now, error='', attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        return None
+    return InvoiceEmailBatchItem.objects.select_related(
+        'invoice_link__patient', 'invoice_link__company',
+        'quote_link__patient', 'quote_link__company',
+    ).prefetch_related(
+        'invoice_link__patient__contact_points', 'quote_link__patient__contact_points',
+    ).get(pk=item_id)
+
+
+def _deliver(item, context):
+    """Render and send one claimed item. Returns (sent_email, error) with the SentEmail unsaved."""
+    from .email_views import document_pdf_attachment, generate_document_email
+
+    document = item.document
+    to_email = item.to_email or default_recipient(document)
+    if not to_email:
+        return None, 'No recipient email address for this document'
+
+    html, subject = generate_document_email(
+        document, item.document_type, context['header_color'], context['clinician'],
+    )
+    attachments = []
+    if context['attach_pdf']:
+        attachments.append(document_pdf_attachment(document, item.document_type))
+
+    to_emails = [email.strip() for email in to_email.split(',') if email.strip()]
+    metadata = {
+        'patient_id': str(document.patient_id or ''),
+        'sent_by': context['sent_by'],
+    }
+    try:
+        sent_email = gmail_service.deliver(
+            context['connection'],
+            to_emails=to_emails,
+            subject=subject,
+            body_html=html,
+            cc_emails=context['cc_emails'] or None,
+            attachments=attachments or None,
+            metadata=metadata,
+            from_address=context['from_email'],
+        )
+        return sent_email, ''
+    except Exception as e:
+        logger.error(f"Invoice email batch item {item.pk} send failed: {e}")
+        failed = gmail_service.failed_email_record(
+            context['connection'], to_emails, subject, html, None, context['cc_emails'], attachments, e,
+        )
+        return failed, str(e)
+
+
+def _save_result(item, sent_email, error):
+    """Write one item's SentEmail log and final status"""
+    now = timezone.now()
+    if sent_email is not None:
+        sent_email.save()
+    InvoiceEmailBatchItem.objects.filter(pk=item.pk).update(
+        status='failed' if error else 'sent',
+        error=error[:2000],
+        sent_email=sent_email,
+        finished_at=now,
+        updated_at=now,
+    )
+
+
+def _send_item(item_id, context):
+    """
+    Render, send and record one item. Returns (item, sent_email, error), or
+    None if the item was claimed elsewhere. Never raises.
+    """
+    close_old_connections()
+    item = None
+    try:
+        item = claim_item(item_id)
+        if item is None:
+            return None
+        sent_email, error = _deliver(item, context)
+        # Written straight away: an item left in 'sending' after Gmail
+        # accepted it would be sent again by requeue_stale
+        _save_result(item, sent_email, error)
+        return item, sent_email, error
+    except Exception as e:
+        logger.error(f"Invoice email batch item {item_id} failed: {e}", exc_info=True)
+        if item is None:
+            return None
+        try:
+            _save_result(item, None, str(e))
+        except Exception:
+            logger.error(f"Invoice email batch item {item_id}: could not record failure", exc_info=True)
+        return item, None, str(e)
+    finally:
+        close_old_connections()
+
+
+def _flush(results, connection):
+    """Add a group of already saved results to the connection's sent counter and the metrics"""
+    if not results:
+        return
+    gmail_service.record_sent(connection, sum(1 for _item, _sent, error in results if not error))
+    metrics.inc('ncc_emails_total', sum(1 for _item, sent, error in results if sent is not None and error), status='failed')
+    results.clear()
+
+
+def _fail_pending(batch, error):
+    now = timezone.now()
+    batch.items.filter(status='pending').update(status='failed', error=error[:2000], finished_at=now, updated_at=now)
+
+
+def run_batch(batch_id, workers=MAX_WORKERS):
+    """Process every pending item of a batch. Never raises."""
+    from .email_views import resolve_sender_clinician
+
+    close_old_connections()
+    try:
+        batch = InvoiceEmailBatch.objects.select_related('template', 'created_by').get(pk=batch_id)
+        item_ids = list(batch.items.filter(status='pending').values_list('id', flat=True))
+        if not item_ids:
+            _finish_batch_if_done(batch)
+            return
+
+        # Resolved once for the whole batch
+        try:
+            connection = gmail_service.resolve_connection(connection_email=batch.from_email)
+        except Exception as e:
+            logger.error(f"Invoice email batch {batch.pk}: no Gmail connection: {e}")
+            _fail_pending(batch, str(e))
+            _finish_batch_if_done(batch)
+            return
+
+        user = batch.created_by
+        context = {
+            'connection': connection,
+            'from_email': batch.from_email,
+            'clinician': resolve_sender_clinician(batch.from_email),
+            'header_color': batch.template.header_color if batch.template else None,
+            'cc_emails': batch.cc_emails or [],
+            'attach_pdf': batch.attach_pdf,
+            'sent_by': (user.get_full_name() or user.username) if user else '',
+        }
+
+        results = []
+        sent = failed = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='invoice-email') as pool:
+            futures = [pool.submit(_send_item, item_id, context) for item_id in item_ids]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                results.append(result)
+                if result[2]:
+                    failed += 1
+                else:
+                    sent += 1
+                if len(results) >= FLUSH_SIZE:
+                    _flush(results, connection)
+        _flush(results, connection)
+
+        logger.info(f"📧 Invoice email batch {batch.pk}: {sent} sent, {failed} failed")
+        _finish_batch_if_done(batch)
+    except Exception as e:
+        logger.error(f"Invoice email batch {batch_id} could not be processed: {e}", exc_info=True)
+    finally:
+        close_old_connections()
+
+
+def _finish_batch_if_done(batch):
+    active = batch.items.filter(status__in=InvoiceEmailBatchItem.ACTIVE_STATUSES).exists()
+    if not active:
+        InvoiceEmailBatch.objects.filter(pk=batch.pk, finished_at__isnull=True).update(finished_at=timezone.now())
+
+
+def start_batch(batch):
+    """Queue the batch on the coordinator pool"""
+    _get_executor().submit(run_batch, batch.pk)
+
+
+def retry_failed(batch):
+    """Reset failed items to pending and queue the batch again"""
+    reset = batch.items.filter(status='failed').update(
+        status='pending', error='', sent_email=None, finished_at=None, updated_at=timezone.now(),
+    )
+    if reset:
+        InvoiceEmailBatch.objects.filter(pk=batch.pk).update(finished_at=None)
+        start_batch(batch)
+    return reset
+
+
+def requeue_stale(older_than=timedelta(minutes=30)):
+    """
+    Reset items stuck in 'sending' (their worker was restarted) back to
+    pending. Returns the number of items reset.
+
+    Results are saved right after each send, so only a worker killed
+    during the Gmail call itself can leave a sent message in 'sending'.
+    """
+    cutoff = timezone.now() - older_than
+    return InvoiceEmailBatchItem.objects.filter(
+        status='sending',
+        updated_at__lt=cutoff,
+    ).update(status='pending', updated_at=timezone.now())
@@ -0,0 +1,285 @@
+"""
+Invoice / Receipt / Quote Document Service
+
+Builds the data for an invoice, receipt or quote PDF once, from the local
+database, and renders it. This one service is used by the download views,
+the receipt view, the single email send and bulk email batches, so one
+document costs one data assembly and one render. The email path does not
+go back through the DRF view machinery.
+
+Line items and the Xero reference are read from the snapshot stored on
+XeroInvoiceLink/XeroQuoteLink (kept up to date by XeroService on create,
+update and sync). Older links without a snapshot are fetched from Xero
+once and the snapshot is saved.
+
+The PDF generator (reportlab) is imported on first render.
+"""
+import logging
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRACTITIONER = {
+    'name': 'Craig Laird',
+    'qualification': 'CPed CM au',
+    'registration': '3454'
+}
+
+
+def _gst_rate(tax_type):
+    # EXEMPTOUTPUT = GST Free (0%)
+    # OUTPUT2 = GST on Income (10%)
+    # INPUT2 = GST on Expenses (10%)
+    if tax_type and ('OUTPUT2' in tax_type or 'INPUT2' in tax_type):
+        return 0.10
+    return 0.0
+
+
+class InvoiceDocumentService:
+    """
+    Assemble and render invoice/receipt/quote PDFs for Xero links
+
+    Usage:
+        service = InvoiceDocumentService()
+        pdf_bytes = service.render(invoice_link, 'invoice')
+        filename = service.filename(invoice_link, 'invoice')
+
+    Pass links fetched with select_related('patient', 'company') to avoid
+    extra queries.
+    """
+
+    def __init__(self, fetch_missing_line_items=True):
+        self.fetch_missing_line_items = fetch_missing_line_items
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def render(self, document, document_type, debug=False, test_items=None) -> bytes:
+        """
+        Render the PDF for `document` (XeroInvoiceLink for 'invoice'/'receipt',
+        XeroQuoteLink for 'quote') and return the bytes.
+        """
+        from .document_pdf_generator import generate_invoice_pdf, generate_quote_pdf
+
+        if document_type == 'quote':
+            pdf_buffer = generate_quote_pdf(self.quote_data(document), debug=debug)
+        else:
+            data = self.invoice_data(document, test_items=test_items)
+            pdf_buffer = generate_invoice_pdf(data, debug=debug, is_receipt=document_type == 'receipt')
+        return pdf_buffer.getvalue()
+
+    @staticmethod
+    def filename(document, document_type) -> str:
+        if document_type == 'quote':
+            return f"Quote_{document.xero_quote_number}.pdf"
+        if document_type == 'receipt':
+            return f"Receipt_{document.xero_invoice_number}.pdf"
+        return f"Invoice_{document.xero_invoice_number}.pdf"
+
+    def invoice_data(self, invoice_link, test_items=None) -> dict:
+        """Data for generate_invoice_pdf (see DocumentPDFGenerator.__init__)"""
+        patient_info, patient_reference = self._bill_to(invoice_link, with_title=True)
+
+        line_items = []
+        for item in self.line_items(invoice_link, 'invoice'):
+            line_items.append({
+                'description': item.get('description', ''),
+                'quantity': int(item.get('quantity') or 1),
+                'unit_price': float(item.get('unit_amount') or 0),
+                'discount': float(item.get('discount') or 0),
+                'gst_rate': _gst_rate(item.get('tax_type')),
+            })
+
+        # If no line items, add a placeholder
+        if not line_items:
+            line_items.append({
+                'description': 'Invoice item',
+                'quantity': 1,
+                'unit_price': float(invoice_link.total or 0),
+                'discount': 0,
+                'gst_rate': 0.0,
+            })
+
+        # If test_items mode, generate multiple test line items
+        if test_items:
+            line_items = []
+            for i in range(1, test_items + 1):
+                line_items.append({
+                    'description': f'Test Line Item {i} - Custom orthotic device with adjustments and fitting',
+                    'quantity': 1,
+                    'unit_price': 150.00 + (i * 10),  # Varying prices
+                    'discount': 10 if i % 5 == 0 else 0,  # Every 5th item has 10% discount
+                    'gst_rate': 0.10 if i % 3 == 0 else 0.0,  # Every 3rd item has GST
+                })
+
+        return {
+            'invoice_number': invoice_link.xero_invoice_number,
+            'invoice_date': invoice_link.invoice_date or datetime.now(),
+            'due_date': invoice_link.due_date or (datetime.now() + timedelta(days=7)),
+            'patient': patient_info,
+            'patient_reference': patient_reference,  # Separate patient reference for company billing
+            'xero_reference': self._reference(invoice_link),  # Reference/PO# (funding-based)
+            'practitioner': DEFAULT_PRACTITIONER,
+            'line_items': line_items,
+            'payments': self._payments(invoice_link),
+            'payment_terms_days': 7,
+        }
+
+    def quote_data(self, quote_link) -> dict:
+        """Data for generate_quote_pdf (see DocumentPDFGenerator.__init__)"""
+        patient_info, patient_reference = self._bill_to(quote_link, with_title=False)
+
+        line_items = []
+        for item in self.line_items(quote_link, 'quote'):
+            line_items.append({
+                'description': item.get('description') or 'Quote item',
+                'quantity': float(item.get('quantity') or 1),
+                'unit_price': float(item.get('unit_amount') or 0),
+                'discount': float(item.get('discount') or 0),
+                'gst_rate': _gst_rate(item.get('tax_type')),
+            })
+
+        return {
+            'quote_number': quote_link.xero_quote_number,
+            'quote_date': quote_link.quote_date or datetime.now(),
+            'expiry_date': quote_link.expiry_date or (datetime.now() + timedelta(days=30)),
+            'patient': patient_info,
+            'patient_reference': patient_reference,  # Separate patient reference for company billing
+            'xero_reference': self._reference(quote_link),  # Reference/PO# (funding-based)
+            'practitioner': DEFAULT_PRACTITIONER,
+            'line_items': line_items,
+            'payments': [],  # Quotes don't have payments
+            'payment_terms_days': 30,  # Default for quotes
+        }
+
+    def line_items(self, document, document_type) -> list:
+        """
+        Line item snapshot for the document. Links created before snapshots
+        existed are fetched from Xero once and the snapshot is saved.
+        """
+        if document.line_items or not self.fetch_missing_line_items:
+            return document.line_items or []
+
+        try:
+            from xero_integration.models import XeroConnection
+            from xero_integration.services import XeroService, line_items_snapshot
+
+            if not XeroConnection.objects.filter(is_active=True).exists():
+                return []
+
+            if document_type == 'quote':
+                xero_document = XeroService().get_quote(document.xero_quote_id)
+            else:
+                xero_document = XeroService().get_invoice(document.xero_invoice_id)
+            if not xero_document or not xero_document.line_items:
+                return []
+
+            document.line_items = line_items_snapshot(xero_document.line_items)
+            document.reference = getattr(xero_document, 'reference', None) or ''
+            type(document).objects.filter(pk=document.pk).update(
+                line_items=document.line_items,
+                reference=document.reference,
+            )
+            logger.info(f"Saved line item snapshot for {document_type} {document.pk} ({len(document.line_items)} items)")
+            return document.line_items
+        except Exception as e:
+            logger.warning(f"Could not fetch line items from Xero: {e}")
+            return []
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _bill_to(document, with_title):
+        """
+        (patient_info, patient_reference) for the address block.
+        Company takes precedence for address (determines who is billed).
+        """
+        patient_info = {
+            'name': '',
+            'address': '',
+            'suburb': '',
+            'state': '',
+            'postcode': '',
+            'ndis_number': '',
+        }
+        patient_reference = None
+
+        if document.company:
+            # Company pays - use company's address BUT keep patient name for reference
+            company = document.company
+            patient_info['name'] = company.name
+            address = company.address_json
+
+            # Store patient reference separately for the Reference/PO# field
+            if document.patient:
+                patient = document.patient
+                patient_reference = {
+                    'name': f"{patient.first_name} {patient.last_name}",
+                    'ndis_number': patient.health_number if patient.health_number else ''
+                }
+        elif document.patient:
+            # Patient pays directly - use patient's address
+            patient = document.patient
+            if with_title:
+                patient_info['name'] = f"{patient.title or ''} {patient.first_name} {patient.last_name}".strip()
+            else:
+                patient_info['name'] = f"{patient.first_name} {patient.last_name}"
+            default_address = patient.default_address()
+            address = {
+                'street': default_address.street,
+                'suburb': default_address.suburb,
+                'state': default_address.state,
+                'postcode': default_address.postcode,
+            } if default_address else None
+
+            # Get NDIS/health number
+            if patient.health_number:
+                patient_info['ndis_number'] = patient.health_number
+        else:
+            patient_info['name'] = 'Unknown'
+            address = None
+
+        if address:
+            patient_info['address'] = address.get('street', '')
+            patient_info['suburb'] = address.get('suburb', '')
+            patient_info['state'] = address.get('state', '')
+            patient_info['postcode'] = address.get('postcode', '')
+
+        return patient_info, patient_reference
+
+    @staticmethod
+    def _reference(document):
+        """
+        Always regenerate the reference from the patient's CURRENT funding
+        source, so PDFs reflect the latest patient data even if the document
+        was created months ago. Without a patient, use the Xero reference.
+        """
+        if document.patient:
+            from xero_integration.services import generate_smart_reference
+            return generate_smart_reference(document.patient)
+        return document.reference or None
+
+    @staticmethod
+    def _payments(invoice_link):
+        """Authorised payments for the invoice, oldest first"""
+        from xero_integration.models import XeroPayment
+
+        payments = []
+        try:
+            payment_records = XeroPayment.objects.filter(
+                invoice_link=invoice_link,
+                status='AUTHORISED'  # Only show authorised payments
+            ).order_by('payment_date')
+
+            for payment in payment_records:
+                payments.append({
+                    'date': payment.payment_date,  # Already a date object
+                    'reference': payment.reference or f'Payment {payment.xero_payment_id[:8]}',
+                    'amount': float(payment.amount),
+                })
+        except Exception as e:
+            logger.warning(f"Could not fetch payments: {e}")
+        return payments
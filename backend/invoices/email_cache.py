@@ -0,0 +1,44 @@
+"""
+Email rendering caches
+
+- Global email settings (singleton row) memoized per settings version
+- Compiled wrapper skeletons per (email type, header colour, settings version)
+
+The settings version is a namespace version in the shared cache
+(ncc_api.caching), bumped by invoices/signals.py whenever EmailGlobalSettings
+is saved, so every worker picks up changes on its next render.
+"""
+from ncc_api.caching import LRUCache, bump_namespace, get_namespace_version
+
+SETTINGS_NAMESPACE = 'email_global_settings'
+
+_settings_cache = LRUCache(maxsize=4)
+skeleton_cache = LRUCache(maxsize=128)
+
+
+def settings_version():
+    """Current version of EmailGlobalSettings"""
+    return get_namespace_version(SETTINGS_NAMESPACE)
+
+
+def get_email_settings(version=None):
+    """Return EmailGlobalSettings, loading it from the DB once per version"""
+    if version is None:
+        version = settings_version()
+    settings = _settings_cache.get(version)
+    if settings is None:
+        from .models import EmailGlobalSettings
+        settings = EmailGlobalSettings.get_settings()
+        _settings_cache.set(version, settings)
+    return settings
+
+
+def invalidate_email_settings():
+    """Force every worker to reload settings and recompile skeletons"""
+    bump_namespace(SETTINGS_NAMESPACE)
+
+
+def clear_local_caches():
+    """Drop this process's memoized settings and skeletons (used by benchmarks)"""
+    _settings_cache.clear()
+    skeleton_cache.clear()
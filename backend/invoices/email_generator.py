@@ -93,8 +93,8 @@ class EmailGenerator:
         # Load clinic settings if not provided
         if not self.clinic_settings:
             try:
-                from .models import EmailGlobalSettings
-                self.clinic_settings = EmailGlobalSettings.get_settings()
+                from .email_cache import get_email_settings
+                self.clinic_settings = get_email_settings()
             except Exception as e:
                 logger.warning(f"Could not load clinic settings: {e}")
                 self.clinic_settings = None
@@ -4,6 +4,7 @@ Email Layouts - Layout definitions for each email type
 Each layout class defines how to compose components into a complete email.
 Layouts are responsible for the structure and flow of content.
 """
+from functools import lru_cache
 from typing import Optional
 from datetime import datetime
 from .email_data_models import (
@@ -412,17 +413,23 @@ def get_layout(email_type: str, header_color: str = '#3b82f6') -> EmailLayoutBas
     Raises:
         ValueError: If email_type is unknown
     """
-    layouts = {
-        'invoice': InvoiceLayout,
-        'receipt': ReceiptLayout,
-        'quote': QuoteLayout,
-        'at_report': ATReportLayout,
-        'letter': LetterLayout,
-    }
-    
-    layout_class = layouts.get(email_type)
-    if not layout_class:
+    if email_type not in LAYOUTS:
         raise ValueError(f"Unknown email type: {email_type}")
     
-    return layout_class(header_color)
+    return _cached_layout(email_type, header_color)
+
+
+LAYOUTS = {
+    'invoice': InvoiceLayout,
+    'receipt': ReceiptLayout,
+    'quote': QuoteLayout,
+    'at_report': ATReportLayout,
+    'letter': LetterLayout,
+}
+
+
+@lru_cache(maxsize=64)
+def _cached_layout(email_type: str, header_color: str) -> EmailLayoutBase:
+    # Layouts hold no per-email state, so one instance per (type, colour) is reused
+    return LAYOUTS[email_type](header_color)
 
@@ -2,7 +2,7 @@
 Email Template Serializers
 """
 from rest_framework import serializers
-from .models import EmailTemplate, EmailGlobalSettings
+from .models import EmailTemplate, EmailGlobalSettings, InvoiceEmailBatch, InvoiceEmailBatchItem
 from .custom_funding_model import CustomFundingSource
 
 
@@ -137,3 +137,70 @@ class EmailGlobalSettingsSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'updated_at']
 
+
+class InvoiceEmailBatchItemSerializer(serializers.ModelSerializer):
+    """Per-item progress of an InvoiceEmailBatch"""
+    
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    document_id = serializers.SerializerMethodField()
+    document_number = serializers.CharField(read_only=True)
+    
+    class Meta:
+        model = InvoiceEmailBatchItem
+        fields = [
+            'id', 'position', 'document_type', 'document_id', 'document_number',
+            'to_email', 'status', 'status_display', 'error', 'sent_email',
+            'attempts', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
+    
+    def get_document_id(self, obj):
+        return str(obj.quote_link_id if obj.document_type == 'quote' else obj.invoice_link_id)
+
+
+class InvoiceEmailBatchSerializer(serializers.ModelSerializer):
+    """Serializer for InvoiceEmailBatch with status counts"""
+    
+    status = serializers.SerializerMethodField()
+    counts = serializers.SerializerMethodField()
+    created_by_name = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = InvoiceEmailBatch
+        fields = [
+            'id', 'name', 'from_email', 'template', 'cc_emails', 'attach_pdf',
+            'status', 'counts', 'created_by_name', 'created_at', 'finished_at',
+        ]
+        read_only_fields = fields
+    
+    def _counts(self, obj):
+        # Computed once per object; used by both status and counts
+        if not hasattr(obj, '_status_counts'):
+            obj._status_counts = obj.status_counts()
+        return obj._status_counts
+    
+    def get_counts(self, obj):
+        counts = self._counts(obj)
+        return {**counts, 'total': sum(counts.values())}
+    
+    def get_status(self, obj):
+        return InvoiceEmailBatch.status_from_counts(self._counts(obj))
+    
+    def get_created_by_name(self, obj):
+        if not obj.created_by:
+            return None
+        return obj.created_by.get_full_name() or obj.created_by.username
+
+
+class InvoiceEmailBatchDetailSerializer(InvoiceEmailBatchSerializer):
+    """InvoiceEmailBatch with its items"""
+    
+    items = serializers.SerializerMethodField()
+    
+    class Meta(InvoiceEmailBatchSerializer.Meta):
+        fields = InvoiceEmailBatchSerializer.Meta.fields + ['items']
+        read_only_fields = fields
+    
+    def get_items(self, obj):
+        items = obj.items.select_related('invoice_link', 'quote_link')
+        return InvoiceEmailBatchItemSerializer(items, many=True).data
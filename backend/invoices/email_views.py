@@ -8,11 +8,15 @@ from decimal import Decimal
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.shortcuts import get_object_or_404
 from xero_integration.models import XeroInvoiceLink, XeroQuoteLink
-from gmail_integration.services import GmailService
+from gmail_integration.services import gmail_service
 from .email_wrapper import wrap_email_html, get_email_type_from_category
-from .models import EmailTemplate
+from .models import EmailTemplate, InvoiceEmailBatch
+from . import bulk_email
+from .email_serializers import InvoiceEmailBatchSerializer, InvoiceEmailBatchDetailSerializer
 from .email_generator import EmailGenerator
+from .document_service import InvoiceDocumentService
 from .email_data_models import Contact, LineItem, PaymentMethod
 
 logger = logging.getLogger(__name__)
@@ -75,14 +79,14 @@ class SendInvoiceEmailView(APIView):
             invoice = None
             if document_type in ['invoice', 'receipt']:
                 try:
-                    invoice = XeroInvoiceLink.objects.get(id=invoice_id)
+                    invoice = XeroInvoiceLink.objects.select_related('patient', 'company').get(id=invoice_id)
                 except XeroInvoiceLink.DoesNotExist:
                     return Response({
                         'error': 'Invoice not found'
                     }, status=status.HTTP_404_NOT_FOUND)
             else:  # quote
                 try:
-                    invoice = XeroQuoteLink.objects.get(id=invoice_id)
+                    invoice = XeroQuoteLink.objects.select_related('patient', 'company').get(id=invoice_id)
                 except XeroQuoteLink.DoesNotExist:
                     return Response({
                         'error': 'Quote not found'
@@ -135,42 +139,7 @@ class SendInvoiceEmailView(APIView):
             attachments = []
             if attach_pdf:
                 try:
-                    # Generate PDF using the existing view functions
-                    # Pass the authenticated user from the current request
-                    if document_type == 'quote':
-                        from .quote_views import generate_xero_quote_pdf
-                        from django.http import HttpRequest, QueryDict
-                        
-                        # Create a request with authentication
-                        pdf_request = HttpRequest()
-                        pdf_request.method = 'GET'
-                        pdf_request.GET = QueryDict('', mutable=True)
-                        pdf_request.user = request.user  # ✅ Pass authenticated user
-                        pdf_response = generate_xero_quote_pdf(pdf_request, str(invoice_id))
-                    else:
-                        from django.http import HttpRequest, QueryDict
-                        pdf_request = HttpRequest()
-                        pdf_request.method = 'GET'
-                        pdf_request.GET = QueryDict('', mutable=True)
-                        pdf_request.user = request.user  # ✅ Pass authenticated user
-                        if document_type == 'receipt':
-                            pdf_request.GET['receipt'] = 'true'
-                        
-                        from .views import generate_xero_invoice_pdf
-                        pdf_response = generate_xero_invoice_pdf(pdf_request, str(invoice_id))
-                    
-                    if pdf_response.status_code == 200:
-                        pdf_content = pdf_response.content
-                        pdf_filename = f"{invoice.xero_invoice_number if hasattr(invoice, 'xero_invoice_number') else invoice.xero_quote_number}_{document_type}.pdf"
-                        
-                        attachments.append({
-                            'content': pdf_content,
-                            'filename': pdf_filename,
-                            'mimetype': 'application/pdf'
-                        })
-                        logger.info(f"PDF attached: {pdf_filename} ({len(pdf_content)} bytes)")
-                    else:
-                        logger.warning(f"Failed to generate PDF attachment: {pdf_response.status_code}")
+                    attachments.append(document_pdf_attachment(invoice, document_type))
                 except Exception as e:
                     logger.error(f"Error generating PDF attachment: {e}")
                     import traceback
@@ -178,7 +147,6 @@ class SendInvoiceEmailView(APIView):
                     # Continue without attachment
             
             # Send email via Gmail
-            gmail_service = GmailService()
             
             # Split CC and BCC if multiple
             cc_list = [email.strip() for email in cc_email.split(',') if email.strip()] if cc_email else []
@@ -224,231 +192,337 @@ class SendInvoiceEmailView(APIView):
         Returns:
             Tuple of (email_html, subject)
         """
-        # DEBUG: Write to file since logging isn't working
-        with open('/Users/craig/Documents/nexus-core-clinic/backend/email_debug.txt', 'a') as f:
-            f.write("="*80 + "\n")
-            f.write(f"_generate_email_with_generator called\n")
-            f.write(f"  from_email: {from_email}\n")
-            f.write(f"  document_type: {document_type}\n")
-            f.write("="*80 + "\n")
-        
-        # FIRST: Determine clinician based on from_email
-        # If from_email is info@walkeasy.com.au → company (no clinician)
-        # Otherwise → find clinician for that email
-        clinician = None
-        
-        # DEBUG
-        with open('/Users/craig/Documents/nexus-core-clinic/backend/email_debug.txt', 'a') as f:
-            f.write(f"Checking from_email: {from_email}\n")
-            f.write(f"Is info?: {from_email and from_email.lower() == 'info@walkeasy.com.au'}\n")
-        
-        if from_email and from_email.lower() != 'info@walkeasy.com.au':
-            # Not company email - find clinician
-            from clinicians.models import Clinician
-            clinician = Clinician.objects.filter(user__email__iexact=from_email, active=True).first()
-            if not clinician:
-                clinician = Clinician.objects.filter(email__iexact=from_email, active=True).first()
-            
-            with open('/Users/craig/Documents/nexus-core-clinic/backend/email_debug.txt', 'a') as f:
-                f.write(f"Found clinician: {clinician}\n")
-        else:
-            with open('/Users/craig/Documents/nexus-core-clinic/backend/email_debug.txt', 'a') as f:
-                f.write(f"Using company signature (clinician=None)\n")
+        clinician = resolve_sender_clinician(from_email)
+        return generate_document_email(invoice, document_type, header_color, clinician)
+
+
+class InvoiceEmailBatchListView(APIView):
+    """
+    Create and list bulk invoice/receipt/quote email batches
+    
+    POST /api/invoices/email-batches/
+    {
+        "documents": [
+            {"id": "uuid", "document_type": "invoice"},  // "invoice", "receipt" or "quote"
+            {"id": "uuid", "document_type": "quote", "to": "someone@example.com"}  // optional "to"
+        ],
+        "from_email": "info@walkeasy.com.au",  // optional - defaults to clinic email
+        "cc": "cc@example.com",  // optional
+        "template_id": "uuid",  // optional - for custom header color
+        "attach_pdf": true,
+        "name": "October statements"  // optional
+    }
+    
+    Recipients default to the company (if billed to one) or patient email.
+    Returns 202 with the batch; emails are sent in the background.
+    Poll GET /api/invoices/email-batches/<id>/ for per-item progress.
+    
+    GET /api/invoices/email-batches/ lists the 50 most recent batches.
+    """
+    
+    def get(self, request):
+        batches = InvoiceEmailBatch.objects.select_related('created_by')[:50]
+        return Response(InvoiceEmailBatchSerializer(batches, many=True).data)
+    
+    def post(self, request):
+        data = request.data
+        documents = data.get('documents')
+        if not isinstance(documents, list) or not all(isinstance(d, dict) and d.get('id') for d in documents):
+            return Response({
+                'error': 'documents must be a list of {"id": ..., "document_type": ...}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Build email data from invoice/quote (now that we have clinician)
-        if document_type == 'quote':
-            email_data = self._build_quote_data(invoice, clinician)
-        else:
-            email_data = self._build_invoice_data(invoice, document_type, clinician)
+        from_email = data.get('from_email')
+        if not from_email:
+            from .models import EmailGlobalSettings
+            from_email = EmailGlobalSettings.get_settings().clinic_email or 'info@walkeasy.com.au'
         
-        # Create generator with clinician for signature (or None for company signature)
-        generator = EmailGenerator(
-            email_type=document_type,
-            header_color=header_color,
-            clinician=clinician
-        )
+        template = None
+        if data.get('template_id'):
+            template = EmailTemplate.objects.filter(id=data['template_id']).first()
         
-        # Generate email HTML
-        email_html = generator.generate(email_data)
+        cc_email = data.get('cc', '')
+        cc_list = [email.strip() for email in cc_email.split(',') if email.strip()] if cc_email else []
         
-        # Generate subject
-        preview = generator.generate_preview(email_data)
-        subject = preview['subject']
+        try:
+            batch = bulk_email.create_batch(
+                documents,
+                from_email=from_email,
+                created_by=request.user if request.user.is_authenticated else None,
+                name=(data.get('name') or '')[:255],
+                template=template,
+                cc_emails=cc_list,
+                attach_pdf=bool(data.get('attach_pdf', True)),
+            )
+        except bulk_email.BulkEmailError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        return email_html, subject
+        bulk_email.start_batch(batch)
+        return Response(InvoiceEmailBatchDetailSerializer(batch).data, status=status.HTTP_202_ACCEPTED)
+
+
+class InvoiceEmailBatchDetailView(APIView):
+    """
+    One invoice email batch with per-item progress
     
-    def _build_invoice_data(self, invoice, document_type, clinician=None):
-        """Build InvoiceEmailData or ReceiptEmailData from XeroInvoiceLink"""
-        from datetime import datetime
-        from .email_data_models import Contact, LineItem, PaymentMethod
-        
-        # Determine closing name based on whether it's from a clinician or company
-        closing_name = clinician.full_name if clinician else 'Walk Easy Team'
-        
-        # Parse line items (if available)
-        line_items = []
-        if hasattr(invoice, 'line_items') and invoice.line_items:
-            for item in invoice.line_items:
-                line_items.append(LineItem(
-                    description=item.get('Description', ''),
-                    quantity=Decimal(str(item.get('Quantity', 1))),
-                    unit_amount=Decimal(str(item.get('UnitAmount', 0))),
-                    tax_amount=Decimal(str(item.get('TaxAmount', 0))),
-                    total=Decimal(str(item.get('LineAmount', 0)))
-                ))
-        else:
-            # Create a single line item from invoice total if no line items available
+    GET /api/invoices/email-batches/<id>/
+    """
+    
+    def get(self, request, batch_id):
+        batch = get_object_or_404(InvoiceEmailBatch.objects.select_related('created_by'), pk=batch_id)
+        return Response(InvoiceEmailBatchDetailSerializer(batch).data)
+
+
+class InvoiceEmailBatchRetryView(APIView):
+    """
+    Re-queue the failed items of a batch
+    
+    POST /api/invoices/email-batches/<id>/retry/
+    """
+    
+    def post(self, request, batch_id):
+        batch = get_object_or_404(InvoiceEmailBatch, pk=batch_id)
+        requeued = bulk_email.retry_failed(batch)
+        return Response({'success': True, 'requeued': requeued})
+
+
+def document_pdf_attachment(invoice, document_type):
+    """
+    Render the invoice/receipt/quote PDF for `invoice` and return it as a
+    GmailService attachment dict. Raises if the PDF cannot be generated.
+    """
+    pdf_content = InvoiceDocumentService().render(invoice, document_type)
+    number = invoice.xero_quote_number if document_type == 'quote' else invoice.xero_invoice_number
+    pdf_filename = f"{number}_{document_type}.pdf"
+    logger.info(f"PDF attached: {pdf_filename} ({len(pdf_content)} bytes)")
+    return {
+        'content': pdf_content,
+        'filename': pdf_filename,
+        'mimetype': 'application/pdf'
+    }
+
+
+def resolve_sender_clinician(from_email):
+    """
+    Clinician whose signature goes on emails sent from `from_email`.
+    info@walkeasy.com.au (or no address) → None, i.e. the company signature.
+    """
+    if not from_email or from_email.lower() == 'info@walkeasy.com.au':
+        return None
+    
+    from clinicians.models import Clinician
+    clinician = Clinician.objects.filter(user__email__iexact=from_email, active=True).first()
+    if not clinician:
+        clinician = Clinician.objects.filter(email__iexact=from_email, active=True).first()
+    return clinician
+
+
+def generate_document_email(invoice, document_type, header_color=None, clinician=None):
+    """
+    Render the invoice/receipt/quote email for `invoice` (a XeroInvoiceLink
+    or XeroQuoteLink) with EmailGenerator.
+    
+    Returns:
+        Tuple of (email_html, subject)
+    """
+    # Build email data from invoice/quote
+    if document_type == 'quote':
+        email_data = build_quote_email_data(invoice, clinician)
+    else:
+        email_data = build_invoice_email_data(invoice, document_type, clinician)
+    
+    # Create generator with clinician for signature (or None for company signature)
+    generator = EmailGenerator(
+        email_type=document_type,
+        header_color=header_color,
+        clinician=clinician
+    )
+    
+    # Generate email HTML
+    email_html = generator.generate(email_data)
+    
+    # Generate subject
+    preview = generator.generate_preview(email_data)
+    subject = preview['subject']
+    
+    return email_html, subject
+
+
+def build_invoice_email_data(invoice, document_type, clinician=None):
+    """Build InvoiceEmailData or ReceiptEmailData from XeroInvoiceLink"""
+    from datetime import datetime
+    from .email_data_models import Contact, LineItem, PaymentMethod
+
+    # Determine closing name based on whether it's from a clinician or company
+    closing_name = clinician.full_name if clinician else 'Walk Easy Team'
+
+    # Parse line items (if available)
+    line_items = []
+    # Line item snapshot stored on the link (see XeroInvoiceLink.line_items)
+    if invoice.line_items:
+        for item in invoice.line_items:
             line_items.append(LineItem(
-                description=f'Invoice {invoice.xero_invoice_number}',
-                quantity=Decimal('1'),
-                unit_amount=Decimal(str(invoice.subtotal or 0)),
-                tax_amount=Decimal(str(invoice.total_tax or 0)),
-                total=Decimal(str(invoice.total or 0))
+                description=item.get('description', ''),
+                quantity=Decimal(str(item.get('quantity', 1))),
+                unit_amount=Decimal(str(item.get('unit_amount', 0))),
+                tax_amount=Decimal(str(item.get('tax_amount', 0))),
+                total=Decimal(str(item.get('line_amount', 0)))
             ))
-        
-        # Parse payment methods
-        payment_methods = []
-        if hasattr(invoice, 'payment_methods') and invoice.payment_methods:
-            for method in invoice.payment_methods:
-                payment_methods.append(PaymentMethod(
-                    method_type=method.get('type', 'bank'),
-                    account_name=method.get('account_name'),
-                    bsb=method.get('bsb'),
-                    account_number=method.get('account_number'),
-                    reference=invoice.xero_invoice_number
-                ))
-        else:
-            # Default payment method
+    else:
+        # Create a single line item from invoice total if no line items available
+        line_items.append(LineItem(
+            description=f'Invoice {invoice.xero_invoice_number}',
+            quantity=Decimal('1'),
+            unit_amount=Decimal(str(invoice.subtotal or 0)),
+            tax_amount=Decimal(str(invoice.total_tax or 0)),
+            total=Decimal(str(invoice.total or 0))
+        ))
+
+    # Parse payment methods
+    payment_methods = []
+    if hasattr(invoice, 'payment_methods') and invoice.payment_methods:
+        for method in invoice.payment_methods:
             payment_methods.append(PaymentMethod(
-                method_type='bank',
-                account_name='WalkEasy Nexus Pty Ltd',
-                bsb='062-692',
-                account_number='1060 3588',
+                method_type=method.get('type', 'bank'),
+                account_name=method.get('account_name'),
+                bsb=method.get('bsb'),
+                account_number=method.get('account_number'),
                 reference=invoice.xero_invoice_number
             ))
-        
-        # Determine status
-        status_val = invoice.status if hasattr(invoice, 'status') and invoice.status else 'DRAFT'
-        
-        # Get contact details
-        contact_name = 'Valued Customer'
-        contact_email = None
-        
-        if hasattr(invoice, 'contact_name') and invoice.contact_name:
-            contact_name = invoice.contact_name
-        elif hasattr(invoice, 'patient') and invoice.patient:
-            contact_name = invoice.patient.get_full_name()
-            if hasattr(invoice.patient, 'communication') and invoice.patient.communication:
-                contact_email = invoice.patient.communication.get('email')
-        
-        if hasattr(invoice, 'contact_email') and invoice.contact_email:
-            contact_email = invoice.contact_email
-        
-        # Build data dict based on document type
-        if document_type == 'receipt':
-            # Receipt-specific data (no due_date or amount_due)
-            data = {
-                'contact': Contact(
-                    name=contact_name,
-                    email=contact_email,
-                ),
-                'invoice_number': invoice.xero_invoice_number,
-                'amount_paid': Decimal(str(invoice.amount_paid or invoice.total or 0)),
-                'payment_method': 'Bank Transfer',
-                'receipt_number': invoice.xero_invoice_number,
-                'invoice_date': invoice.invoice_date,
-                'payment_date': datetime.now().date(),
-                'payment_reference': None,
-                'line_items': line_items,
-                'subtotal': Decimal(str(invoice.subtotal or 0)),
-                'tax_total': Decimal(str(invoice.total_tax or 0)),
-                'total': Decimal(str(invoice.total or 0)),
-                'clinic_name': closing_name,
-            }
-        else:
-            # Invoice-specific data (has due_date, amount_due, payment_methods)
-            data = {
-                'contact': Contact(
-                    name=contact_name,
-                    email=contact_email,
-                ),
-                'invoice_number': invoice.xero_invoice_number,
-                'invoice_date': invoice.invoice_date or datetime.now().date(),
-                'due_date': invoice.due_date or datetime.now().date(),
-                'subtotal': Decimal(str(invoice.subtotal or 0)),
-                'tax_total': Decimal(str(invoice.total_tax or 0)),
-                'total': Decimal(str(invoice.total or 0)),
-                'amount_paid': Decimal(str(invoice.amount_paid or 0)),
-                'amount_due': Decimal(str(invoice.amount_due or 0)),
-                'line_items': line_items,
-                'payment_methods': payment_methods,
-                'status': status_val,
-                'clinic_name': closing_name,
-            }
-        
-        return data
-    
-    def _build_quote_data(self, quote, clinician=None):
-        """Build QuoteEmailData from XeroQuoteLink"""
-        from datetime import datetime, timedelta
-        from .email_data_models import Contact, LineItem
-        
-        # Determine closing name based on whether it's from a clinician or company
-        closing_name = clinician.full_name if clinician else 'Walk Easy Team'
-        
-        # Parse line items (if available)
-        line_items = []
-        if hasattr(quote, 'line_items') and quote.line_items:
-            for item in quote.line_items:
-                line_items.append(LineItem(
-                    description=item.get('Description', ''),
-                    quantity=Decimal(str(item.get('Quantity', 1))),
-                    unit_amount=Decimal(str(item.get('UnitAmount', 0))),
-                    tax_amount=Decimal(str(item.get('TaxAmount', 0))),
-                    total=Decimal(str(item.get('LineAmount', 0)))
-                ))
-        else:
-            # Create a single line item from quote total if no line items available
-            line_items.append(LineItem(
-                description=f'Quote {quote.xero_quote_number}',
-                quantity=Decimal('1'),
-                unit_amount=Decimal(str(quote.subtotal or 0)),
-                tax_amount=Decimal(str(quote.total_tax or 0)),
-                total=Decimal(str(quote.total or 0))
-            ))
-        
-        # Get contact details
-        contact_name = 'Valued Customer'
-        contact_email = None
-        
-        if hasattr(quote, 'contact_name') and quote.contact_name:
-            contact_name = quote.contact_name
-        elif hasattr(quote, 'patient') and quote.patient:
-            contact_name = quote.patient.get_full_name()
-            if hasattr(quote.patient, 'communication') and quote.patient.communication:
-                contact_email = quote.patient.communication.get('email')
-        
-        if hasattr(quote, 'contact_email') and quote.contact_email:
-            contact_email = quote.contact_email
-        
-        # Calculate expiry date
-        quote_date = quote.quote_date or datetime.now().date()
-        expiry_date = quote.expiry_date or (quote_date + timedelta(days=30))
-        
+    else:
+        # Default payment method
+        payment_methods.append(PaymentMethod(
+            method_type='bank',
+            account_name='WalkEasy Nexus Pty Ltd',
+            bsb='062-692',
+            account_number='1060 3588',
+            reference=invoice.xero_invoice_number
+        ))
+
+    # Determine status
+    status_val = invoice.status if hasattr(invoice, 'status') and invoice.status else 'DRAFT'
+
+    # Get contact details
+    contact_name = 'Valued Customer'
+    contact_email = None
+
+    if hasattr(invoice, 'contact_name') and invoice.contact_name:
+        contact_name = invoice.contact_name
+    elif hasattr(invoice, 'patient') and invoice.patient:
+        contact_name = invoice.patient.get_full_name()
+        if hasattr(invoice.patient, 'communication') and invoice.patient.communication:
+            contact_email = invoice.patient.communication.get('email')
+
+    if hasattr(invoice, 'contact_email') and invoice.contact_email:
+        contact_email = invoice.contact_email
+
+    # Build data dict based on document type
+    if document_type == 'receipt':
+        # Receipt-specific data (no due_date or amount_due)
         data = {
             'contact': Contact(
                 name=contact_name,
                 email=contact_email,
             ),
-            'quote_number': quote.xero_quote_number,
-            'quote_date': quote_date,
-            'expiry_date': expiry_date,
-            'subtotal': Decimal(str(quote.subtotal or 0)),
-            'tax_total': Decimal(str(quote.total_tax or 0)),
-            'total': Decimal(str(quote.total or 0)),
+            'invoice_number': invoice.xero_invoice_number,
+            'amount_paid': Decimal(str(invoice.amount_paid or invoice.total or 0)),
+            'payment_method': 'Bank Transfer',
+            'receipt_number': invoice.xero_invoice_number,
+            'invoice_date': invoice.invoice_date,
+            'payment_date': datetime.now().date(),
+            'payment_reference': None,
             'line_items': line_items,
-            'status': quote.status if hasattr(quote, 'status') and quote.status else 'DRAFT',
+            'subtotal': Decimal(str(invoice.subtotal or 0)),
+            'tax_total': Decimal(str(invoice.total_tax or 0)),
+            'total': Decimal(str(invoice.total or 0)),
             'clinic_name': closing_name,
         }
-        
-        return data
+    else:
+        # Invoice-specific data (has due_date, amount_due, payment_methods)
+        data = {
+            'contact': Contact(
+                name=contact_name,
+                email=contact_email,
+            ),
+            'invoice_number': invoice.xero_invoice_number,
+            'invoice_date': invoice.invoice_date or datetime.now().date(),
+            'due_date': invoice.due_date or datetime.now().date(),
+            'subtotal': Decimal(str(invoice.subtotal or 0)),
+            'tax_total': Decimal(str(invoice.total_tax or 0)),
+            'total': Decimal(str(invoice.total or 0)),
+            'amount_paid': Decimal(str(invoice.amount_paid or 0)),
+            'amount_due': Decimal(str(invoice.amount_due or 0)),
+            'line_items': line_items,
+            'payment_methods': payment_methods,
+            'status': status_val,
+            'clinic_name': closing_name,
+        }
+
+    return data
+
+
+def build_quote_email_data(quote, clinician=None):
+    """Build QuoteEmailData from XeroQuoteLink"""
+    from datetime import datetime, timedelta
+    from .email_data_models import Contact, LineItem
+
+    # Determine closing name based on whether it's from a clinician or company
+    closing_name = clinician.full_name if clinician else 'Walk Easy Team'
+
+    # Parse line items (if available)
+    line_items = []
+    # Line item snapshot stored on the link (see XeroInvoiceLink.line_items)
+    if quote.line_items:
+        for item in quote.line_items:
+            line_items.append(LineItem(
+                description=item.get('description', ''),
+                quantity=Decimal(str(item.get('quantity', 1))),
+                unit_amount=Decimal(str(item.get('unit_amount', 0))),
+                tax_amount=Decimal(str(item.get('tax_amount', 0))),
+                total=Decimal(str(item.get('line_amount', 0)))
+            ))
+    else:
+        # Create a single line item from quote total if no line items available
+        line_items.append(LineItem(
+            description=f'Quote {quote.xero_quote_number}',
+            quantity=Decimal('1'),
+            unit_amount=Decimal(str(quote.subtotal or 0)),
+            tax_amount=Decimal(str(quote.total_tax or 0)),
+            total=Decimal(str(quote.total or 0))
+        ))
+
+    # Get contact details
+    contact_name = 'Valued Customer'
+    contact_email = None
+
+    if hasattr(quote, 'contact_name') and quote.contact_name:
+        contact_name = quote.contact_name
+    elif hasattr(quote, 'patient') and quote.patient:
+        contact_name = quote.patient.get_full_name()
+        if hasattr(quote.patient, 'communication') and quote.patient.communication:
+            contact_email = quote.patient.communication.get('email')
+
+    if hasattr(quote, 'contact_email') and quote.contact_email:
+        contact_email = quote.contact_email
+
+    # Calculate expiry date
+    quote_date = quote.quote_date or datetime.now().date()
+    expiry_date = quote.expiry_date or (quote_date + timedelta(days=30))
+
+    data = {
+        'contact': Contact(
+            name=contact_name,
+            email=contact_email,
+        ),
+        'quote_number': quote.xero_quote_number,
+        'quote_date': quote_date,
+        'expiry_date': expiry_date,
+        'subtotal': Decimal(str(quote.subtotal or 0)),
+        'tax_total': Decimal(str(quote.total_tax or 0)),
+        'total': Decimal(str(quote.total or 0)),
+        'line_items': line_items,
+        'status': quote.status if hasattr(quote, 'status') and quote.status else 'DRAFT',
+        'clinic_name': closing_name,
+    }
+
+    return data
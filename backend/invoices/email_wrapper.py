@@ -6,6 +6,48 @@ It uses the template's header_color to create beautiful gradient headers.
 """
 
 
+# Placeholders marking the data-dependent slots in a compiled skeleton
+SUBTITLE_SLOT = '\x00subtitle\x00'
+BODY_SLOT = '\x00body\x00'
+SIGNATURE_SLOT = '\x00signature\x00'
+
+
+class WrapperSkeleton:
+    """
+    Pre-rendered email shell split around its data-dependent slots.
+    Rendering is a single join instead of rebuilding ~4KB of HTML/CSS.
+    """
+    
+    def __init__(self, html: str):
+        self.head, rest = html.split(SUBTITLE_SLOT)
+        self.after_subtitle, rest = rest.split(BODY_SLOT)
+        self.after_body, self.tail = rest.split(SIGNATURE_SLOT)
+    
+    def render(self, subtitle_html: str, body_html: str, signature_html: str) -> str:
+        return ''.join((
+            self.head, subtitle_html,
+            self.after_subtitle, body_html,
+            self.after_body, signature_html,
+            self.tail,
+        ))
+
+
+def get_wrapper_skeleton(header_color: str, email_type: str, settings_version=None) -> WrapperSkeleton:
+    """Return the compiled skeleton for (email type, header colour, settings version)"""
+    from . import email_cache
+    
+    if settings_version is None:
+        settings_version = email_cache.settings_version()
+    key = (email_type, header_color, settings_version)
+    skeleton = email_cache.skeleton_cache.get(key)
+    if skeleton is None:
+        skeleton = WrapperSkeleton(_build_email_shell(
+            header_color, email_type, SUBTITLE_SLOT, BODY_SLOT, SIGNATURE_SLOT
+        ))
+        email_cache.skeleton_cache.set(key, skeleton)
+    return skeleton
+
+
 def wrap_email_html(
     body_html: str, 
     header_color: str = '#5b95cf', 
@@ -26,33 +68,24 @@ def wrap_email_html(
     Returns:
         Complete HTML email with professional styling (and clinician signature if provided)
     """
-    # Calculate lighter color for gradient (add 20% to RGB values)
-    lighter_color = lighten_color(header_color, 0.1)
-    
-    # Determine icon based on email type
-    icons = {
-        'invoice': '📄',
-        'receipt': '✓',
-        'quote': '💼',
-        'at_report': '📋',
-        'at report': '📋',
-        'letter': '✉️',
-        'payment': '⚠️',
-        'overdue': '⚠️',
-        'reminder': '⏰',
-    }
-    
-    email_type_lower = email_type.lower()
-    icon = next((v for k, v in icons.items() if k in email_type_lower), '📧')
+    from . import email_cache
     
-    # Append signature (clinician personal signature or company signature)
+    settings_version = email_cache.settings_version()
+    skeleton = get_wrapper_skeleton(header_color, email_type, settings_version)
+    subtitle_html = f'<p class="subtitle">{title}</p>' if title else ''
+    signature_html = _signature_html(clinician, settings_version)
+    return skeleton.render(subtitle_html, body_html, signature_html)
+
+
+def _signature_html(clinician, settings_version) -> str:
+    """Signature block: clinician personal signature, else company signature"""
     signature_html = ''
     try:
-        from .models import EmailGlobalSettings
+        from . import email_cache
         import logging
         logger = logging.getLogger(__name__)
         
-        settings = EmailGlobalSettings.get_settings()
+        settings = email_cache.get_email_settings(settings_version)
         
         logger.info(f"Email Signature Settings:")
         logger.info(f"  - use_email_signatures: {settings.use_email_signatures}")
@@ -89,8 +122,37 @@ def wrap_email_html(
         logger = logging.getLogger(__name__)
         logger.error(f"Error loading signature: {e}")
     
-    # Build complete HTML structure
-    html = f"""<!DOCTYPE html>
+    return signature_html
+
+
+def _build_email_shell(
+    header_color: str,
+    email_type: str,
+    subtitle_html: str,
+    body_html: str,
+    signature_html: str
+) -> str:
+    """Render the full email HTML structure around the given fragments"""
+    # Calculate lighter color for gradient (add 20% to RGB values)
+    lighter_color = lighten_color(header_color, 0.1)
+    
+    # Determine icon based on email type
+    icons = {
+        'invoice': '📄',
+        'receipt': '✓',
+        'quote': '💼',
+        'at_report': '📋',
+        'at report': '📋',
+        'letter': '✉️',
+        'payment': '⚠️',
+        'overdue': '⚠️',
+        'reminder': '⏰',
+    }
+    
+    email_type_lower = email_type.lower()
+    icon = next((v for k, v in icons.items() if k in email_type_lower), '📧')
+    
+    return f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -198,7 +260,7 @@ def wrap_email_html(
         <!-- Header -->
         <div class="header">
             <h1>{icon} {email_type}</h1>
-            {f'<p class="subtitle">{title}</p>' if title else ''}
+            {subtitle_html}
         </div>
         
         <!-- Content -->
@@ -209,8 +271,6 @@ def wrap_email_html(
     </div>
 </body>
 </html>"""
-    
-    return html
 
 
 def lighten_color(hex_color: str, amount: float = 0.1) -> str:
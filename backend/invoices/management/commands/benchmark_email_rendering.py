@@ -0,0 +1,102 @@
+"""
+Django management command to benchmark invoice email rendering
+
+Renders N invoice emails through EmailGenerator and reports timings.
+--cold clears the memoized settings, layouts and wrapper skeletons before
+every render, which approximates the cost before rendering was cached.
+
+Usage:
+    python manage.py benchmark_email_rendering
+    python manage.py benchmark_email_rendering --iterations 5000 --cold
+"""
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from invoices import email_cache
+from invoices.email_data_models import Contact, LineItem, PaymentMethod
+from invoices.email_generator import EmailGenerator
+from invoices.email_layouts import _cached_layout
+
+
+def sample_invoice(index):
+    """Invoice data for the n-th benchmark email (varies number, lines and status)"""
+    line_items = [
+        LineItem(
+            description=f'Orthotic review {line + 1}',
+            quantity=Decimal('1'),
+            unit_amount=Decimal('120.00'),
+            tax_amount=Decimal('12.00'),
+        )
+        for line in range(1 + index % 4)
+    ]
+    subtotal = sum((item.quantity * item.unit_amount for item in line_items), Decimal('0.00'))
+    tax_total = sum((item.tax_amount for item in line_items), Decimal('0.00'))
+    return {
+        'contact': Contact(name=f'Patient {index}', email=f'patient{index}@example.com'),
+        'invoice_number': f'INV-{100000 + index}',
+        'invoice_date': date.today(),
+        'due_date': date.today() + timedelta(days=14),
+        'subtotal': subtotal,
+        'tax_total': tax_total,
+        'total': subtotal + tax_total,
+        'line_items': line_items,
+        'payment_methods': [
+            PaymentMethod(method_type='bank', account_name='WalkEasy Pty Ltd', bsb='000-000', account_number='12345678'),
+        ],
+        'status': 'PAID' if index % 5 == 0 else 'AUTHORISED',
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark invoice email rendering (default: 1,000 emails)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=1000, help='Number of emails to render')
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Clear rendering caches before every email (uncached baseline)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        cold = options['cold']
+        payloads = [sample_invoice(i) for i in range(iterations)]
+
+        # Warm up once so both modes exclude import/first-connection costs
+        EmailGenerator('invoice').generate(sample_invoice(0))
+
+        timings = []
+        total_bytes = 0
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for payload in payloads:
+                if cold:
+                    email_cache.clear_local_caches()
+                    _cached_layout.cache_clear()
+                t0 = time.perf_counter()
+                html = EmailGenerator('invoice').generate(payload)
+                timings.append(time.perf_counter() - t0)
+                total_bytes += len(html)
+            elapsed = time.perf_counter() - started
+
+        timings_ms = sorted(t * 1000 for t in timings)
+        p95 = timings_ms[max(0, int(len(timings_ms) * 0.95) - 1)]
+
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(self.style.SUCCESS(f"EMAIL RENDERING BENCHMARK ({'cold' if cold else 'warm'})"))
+        self.stdout.write(self.style.SUCCESS('=' * 60))
+        self.stdout.write(f"  Emails rendered: {iterations}")
+        self.stdout.write(f"  Total time:      {elapsed * 1000:.1f} ms")
+        self.stdout.write(f"  Mean per email:  {statistics.mean(timings_ms):.3f} ms")
+        self.stdout.write(f"  Median:          {statistics.median(timings_ms):.3f} ms")
+        self.stdout.write(f"  p95:             {p95:.3f} ms")
+        self.stdout.write(f"  Emails/second:   {iterations / elapsed:.0f}")
+        self.stdout.write(f"  DB queries:      {len(queries)}")
+        self.stdout.write(f"  Output size:     {total_bytes / iterations:.0f} bytes/email")
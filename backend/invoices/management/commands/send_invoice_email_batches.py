@@ -0,0 +1,59 @@
+"""
+Django management command to send pending invoice email batch items
+
+Batches are normally sent by the web worker that created them. Run this
+(e.g. from a scheduled job) to resume batches whose worker was restarted,
+or to send a batch outside the web process.
+
+Usage:
+    python manage.py send_invoice_email_batches
+    python manage.py send_invoice_email_batches --batch <uuid> --workers 8
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from invoices import bulk_email
+from invoices.models import InvoiceEmailBatchItem
+
+
+class Command(BaseCommand):
+    help = 'Send pending invoice email batch items (and resume stale in-progress items)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch', help='Only send items of this batch id')
+        parser.add_argument('--workers', type=int, default=bulk_email.MAX_WORKERS)
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=30,
+            help='Re-queue items stuck in progress for longer than this',
+        )
+
+    def handle(self, *args, **options):
+        requeued = bulk_email.requeue_stale(timedelta(minutes=options['stale_minutes']))
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Re-queued {requeued} stale item(s)"))
+
+        items = InvoiceEmailBatchItem.objects.filter(status='pending')
+        if options['batch']:
+            items = items.filter(batch_id=options['batch'])
+        item_ids = list(items.values_list('id', flat=True))
+        batch_ids = list(items.order_by('batch__created_at').values_list('batch_id', flat=True).distinct())
+
+        if not batch_ids:
+            self.stdout.write('No pending items')
+            return
+
+        self.stdout.write(f"Sending {len(item_ids)} item(s) from {len(batch_ids)} batch(es)...")
+        for batch_id in batch_ids:
+            bulk_email.run_batch(batch_id, workers=options['workers'])
+
+        results = InvoiceEmailBatchItem.objects.filter(id__in=item_ids)
+        sent = results.filter(status='sent').count()
+        failed = results.filter(status='failed').count()
+        self.stdout.write(self.style.SUCCESS(f"✅ Sent: {sent}"))
+        if failed:
+            self.stdout.write(self.style.ERROR(f"❌ Failed: {failed}"))
+            for item in results.filter(status='failed').select_related('invoice_link', 'quote_link'):
+                self.stdout.write(f"   {item.document_type} {item.document_number}: {item.error}")
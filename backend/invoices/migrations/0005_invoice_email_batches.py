@@ -0,0 +1,65 @@
+# Generated by Django 4.2.25 on 2026-10-19 07:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xero_integration', '0006_add_clinician_to_invoice'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('gmail_integration', '0001_initial'),
+        ('invoices', '0004_customfundingsource'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceEmailBatch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(blank=True, help_text='Optional label, e.g. "October statements"', max_length=255)),
+                ('from_email', models.EmailField(help_text='Gmail connection / Send As address used for the whole batch', max_length=254)),
+                ('cc_emails', models.JSONField(blank=True, default=list)),
+                ('attach_pdf', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoice_email_batches', to=settings.AUTH_USER_MODEL)),
+                ('template', models.ForeignKey(blank=True, help_text='Template for header color (optional)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoice_email_batches', to='invoices.emailtemplate')),
+            ],
+            options={
+                'verbose_name': 'Invoice Email Batch',
+                'verbose_name_plural': 'Invoice Email Batches',
+                'db_table': 'invoice_email_batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='InvoiceEmailBatchItem',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('document_type', models.CharField(choices=[('invoice', 'Invoice'), ('receipt', 'Receipt'), ('quote', 'Quote')], default='invoice', max_length=10)),
+                ('to_email', models.CharField(blank=True, help_text='Recipient (defaults to the patient/company email)', max_length=500)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('error', models.TextField(blank=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='invoices.invoiceemailbatch')),
+                ('invoice_link', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='email_batch_items', to='xero_integration.xeroinvoicelink')),
+                ('quote_link', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='email_batch_items', to='xero_integration.xeroquotelink')),
+                ('sent_email', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='gmail_integration.sentemail')),
+            ],
+            options={
+                'verbose_name': 'Invoice Email Batch Item',
+                'verbose_name_plural': 'Invoice Email Batch Items',
+                'db_table': 'invoice_email_batch_items',
+                'ordering': ['batch', 'position'],
+                'indexes': [models.Index(fields=['batch', 'status'], name='invoice_ema_batch_i_ba4cec_idx'), models.Index(fields=['status', 'updated_at'], name='invoice_ema_status_872af2_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 """
 Email Template Models - Multi-Template Library System
 """
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
 from .custom_funding_model import CustomFundingSource  # Import custom funding source model
@@ -281,3 +283,138 @@ class EmailGlobalSettings(models.Model):
     
     def __str__(self):
         return 'Email Global Settings'
+
+
+class InvoiceEmailBatch(models.Model):
+    """
+    A bulk run of invoice/receipt/quote emails (e.g. month-end statements).
+    Each item renders its email and PDF and is sent on one Gmail connection;
+    processing happens in invoices/bulk_email.py.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255, blank=True, help_text='Optional label, e.g. "October statements"')
+    
+    # Sending options shared by every item
+    from_email = models.EmailField(help_text='Gmail connection / Send As address used for the whole batch')
+    template = models.ForeignKey(
+        EmailTemplate,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='invoice_email_batches',
+        help_text='Template for header color (optional)'
+    )
+    cc_emails = models.JSONField(default=list, blank=True)
+    attach_pdf = models.BooleanField(default=True)
+    
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='invoice_email_batches'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'invoice_email_batches'
+        ordering = ['-created_at']
+        verbose_name = 'Invoice Email Batch'
+        verbose_name_plural = 'Invoice Email Batches'
+    
+    def __str__(self):
+        return self.name or f"Invoice Email Batch {self.created_at:%Y-%m-%d %H:%M}"
+    
+    def status_counts(self):
+        """Return {status: count} for the batch's items"""
+        counts = dict.fromkeys([choice for choice, _label in InvoiceEmailBatchItem.STATUS_CHOICES], 0)
+        for row in self.items.values('status').annotate(count=models.Count('id')):
+            counts[row['status']] = row['count']
+        return counts
+    
+    @staticmethod
+    def status_from_counts(counts):
+        """pending / running / completed / completed_with_errors"""
+        total = sum(counts.values())
+        if total and counts['pending'] == total:
+            return 'pending'
+        if any(counts[status] for status in InvoiceEmailBatchItem.ACTIVE_STATUSES):
+            return 'running'
+        return 'completed_with_errors' if counts['failed'] else 'completed'
+
+
+class InvoiceEmailBatchItem(models.Model):
+    """One invoice, receipt or quote email in an InvoiceEmailBatch"""
+    DOCUMENT_TYPE_CHOICES = [
+        ('invoice', 'Invoice'),
+        ('receipt', 'Receipt'),
+        ('quote', 'Quote'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ['pending', 'sending']
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    batch = models.ForeignKey(InvoiceEmailBatch, on_delete=models.CASCADE, related_name='items')
+    position = models.PositiveIntegerField(default=0)
+    
+    document_type = models.CharField(max_length=10, choices=DOCUMENT_TYPE_CHOICES, default='invoice')
+    invoice_link = models.ForeignKey(
+        'xero_integration.XeroInvoiceLink',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='email_batch_items'
+    )
+    quote_link = models.ForeignKey(
+        'xero_integration.XeroQuoteLink',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='email_batch_items'
+    )
+    to_email = models.CharField(max_length=500, blank=True, help_text='Recipient (defaults to the patient/company email)')
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    error = models.TextField(blank=True)
+    sent_email = models.ForeignKey(
+        'gmail_integration.SentEmail',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'invoice_email_batch_items'
+        ordering = ['batch', 'position']
+        indexes = [
+            models.Index(fields=['batch', 'status']),
+            models.Index(fields=['status', 'updated_at']),
+        ]
+        verbose_name = 'Invoice Email Batch Item'
+        verbose_name_plural = 'Invoice Email Batch Items'
+    
+    def __str__(self):
+        return f"{self.document_type} {self.document_number} ({self.get_status_display()})"
+    
+    @property
+    def document(self):
+        return self.quote_link if self.document_type == 'quote' else self.invoice_link
+    
+    @property
+    def document_number(self):
+        document = self.document
+        if document is None:
+            return ''
+        return document.xero_quote_number if self.document_type == 'quote' else document.xero_invoice_number
@@ -0,0 +1,9 @@
+"""
+Signal wiring for invoices
+"""
+from ncc_api.caching import invalidate_on_change
+from .email_cache import SETTINGS_NAMESPACE
+
+# Saving the settings singleton bumps its version, so every worker reloads
+# settings and recompiles email skeletons on the next render
+invalidate_on_change(SETTINGS_NAMESPACE, 'invoices.EmailGlobalSettings')
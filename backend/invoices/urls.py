@@ -24,6 +24,9 @@ urlpatterns = [
     
     # Email Sending
     path('send-email/', email_views.SendInvoiceEmailView.as_view(), name='send_invoice_email'),
+    path('email-batches/', email_views.InvoiceEmailBatchListView.as_view(), name='invoice_email_batches'),
+    path('email-batches/<uuid:batch_id>/', email_views.InvoiceEmailBatchDetailView.as_view(), name='invoice_email_batch_detail'),
+    path('email-batches/<uuid:batch_id>/retry/', email_views.InvoiceEmailBatchRetryView.as_view(), name='invoice_email_batch_retry'),
     
     # Email Template API (viewsets)
     path('', include(router.urls)),
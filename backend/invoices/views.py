@@ -7,7 +7,7 @@ from django.http import HttpResponse
 from django.conf import settings
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from .document_pdf_generator import generate_invoice_pdf
+from .document_service import InvoiceDocumentService
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +88,7 @@ def generate_invoice_pdf_view(request):
         }
         
         # Generate PDF
+        from .document_pdf_generator import generate_invoice_pdf
         pdf_buffer = generate_invoice_pdf(invoice_data)
         
         # Return PDF
@@ -128,195 +129,16 @@ def generate_xero_invoice_pdf(request, invoice_link_id):
                 test_items_count = None
         
         from xero_integration.models import XeroInvoiceLink
-        from patients.models import Patient
-        from companies.models import Company
         
         # Get invoice link
         try:
-            invoice_link = XeroInvoiceLink.objects.get(id=invoice_link_id)
+            invoice_link = XeroInvoiceLink.objects.select_related('patient', 'company').get(id=invoice_link_id)
         except XeroInvoiceLink.DoesNotExist:
             return Response({
                 'error': 'Invoice not found'
             }, status=404)
         
-        # Get patient or company info
-        # IMPORTANT: Company takes precedence for address (determines who invoice is billed to)
-        patient_info = {
-            'name': '',
-            'address': '',
-            'suburb': '',
-            'state': '',
-            'postcode': '',
-        }
-        
-        patient_reference = None  # Separate reference for company billing
-        
-        if invoice_link.company:
-            # Company pays - use company's address BUT keep patient name for reference
-            company = invoice_link.company
-            patient_info['name'] = company.name
-            
-            # Get address from address_json
-            if company.address_json:
-                addr = company.address_json
-                patient_info['address'] = addr.get('street', '')
-                patient_info['suburb'] = addr.get('suburb', '')
-                patient_info['state'] = addr.get('state', '')
-                patient_info['postcode'] = addr.get('postcode', '')
-            
-            # Store patient reference separately for the Reference/PO# field
-            if invoice_link.patient:
-                patient = invoice_link.patient
-                patient_reference = {
-                    'name': f"{patient.first_name} {patient.last_name}",
-                    'ndis_number': patient.health_number if patient.health_number else ''
-                }
-        
-        elif invoice_link.patient:
-            # Patient pays directly - use patient's address
-            patient = invoice_link.patient
-            patient_info['name'] = f"{patient.title or ''} {patient.first_name} {patient.last_name}".strip()
-            
-            # Get address from address_json
-            if patient.address_json:
-                addr = patient.address_json
-                patient_info['address'] = addr.get('street', '')
-                patient_info['suburb'] = addr.get('suburb', '')
-                patient_info['state'] = addr.get('state', '')
-                patient_info['postcode'] = addr.get('postcode', '')
-            
-            # Get NDIS/health number
-            if patient.health_number:
-                patient_info['ndis_number'] = patient.health_number
-        
-        # Parse line items - fetch from Xero API since they're not stored in DB
-        line_items = []
-        xero_reference = None  # Will store the Reference/PO# from Xero invoice
-        
-        # Try to fetch full invoice details from Xero
-        try:
-            from xero_integration.services import XeroService
-            from xero_integration.models import XeroConnection
-            
-            # Check if we have an active Xero connection
-            connection = XeroConnection.objects.filter(is_active=True).first()
-            if connection:
-                xero_service = XeroService()  # XeroService doesn't take connection in __init__
-                xero_invoice = xero_service.get_invoice(invoice_link.xero_invoice_id)
-                
-                # Always regenerate reference from patient's CURRENT funding source
-                # This ensures PDFs always reflect the latest patient data, even if invoice was created months ago
-                if invoice_link.patient:
-                    # Force fresh query from database to avoid cached data
-                    from patients.models import Patient
-                    fresh_patient = Patient.objects.get(id=invoice_link.patient.id)
-                    
-                    from xero_integration.services import generate_smart_reference
-                    xero_reference = generate_smart_reference(fresh_patient)
-                    logger.info(f"Regenerated reference from current patient funding: {xero_reference}")
-                    logger.info(f"Patient funding_source: {fresh_patient.funding_source}, health_number: {fresh_patient.health_number}")
-                elif xero_invoice and hasattr(xero_invoice, 'reference'):
-                    # No patient link - use whatever is in Xero
-                    xero_reference = xero_invoice.reference
-                    logger.info(f"Using original Xero reference (no patient link): {xero_reference}")
-                else:
-                    xero_reference = None
-                
-                if xero_invoice and xero_invoice.line_items:
-                    for item in xero_invoice.line_items:
-                        # Determine GST rate based on tax_type
-                        # EXEMPTOUTPUT = GST Free (0%)
-                        # OUTPUT2 = GST on Income (10%)
-                        # INPUT2 = GST on Expenses (10%)
-                        gst_rate = 0.0
-                        if item.tax_type and ('OUTPUT2' in item.tax_type or 'INPUT2' in item.tax_type):
-                            gst_rate = 0.10
-                        
-                        # Get discount rate (Xero stores it as percentage)
-                        discount = float(item.discount_rate or 0)
-                        
-                        line_items.append({
-                            'description': item.description or '',
-                            'quantity': int(item.quantity or 1),
-                            'unit_price': float(item.unit_amount or 0),
-                            'discount': discount,
-                            'gst_rate': gst_rate,
-                        })
-        except Exception as e:
-            logger.warning(f"Could not fetch line items from Xero: {e}")
-        
-        # If no line items from Xero, add a placeholder
-        if not line_items:
-            line_items.append({
-                'description': 'Invoice item',
-                'quantity': 1,
-                'unit_price': float(invoice_link.total or 0),
-                'discount': 0,
-                'gst_rate': 0.0,
-            })
-        
-        # If test_items mode, generate multiple test line items
-        if test_items_count:
-            line_items = []
-            for i in range(1, test_items_count + 1):
-                line_items.append({
-                    'description': f'Test Line Item {i} - Custom orthotic device with adjustments and fitting',
-                    'quantity': 1,
-                    'unit_price': 150.00 + (i * 10),  # Varying prices
-                    'discount': 10 if i % 5 == 0 else 0,  # Every 5th item has 10% discount
-                    'gst_rate': 0.10 if i % 3 == 0 else 0.0,  # Every 3rd item has GST
-                })
-        
-        # Fetch payments from database
-        payments = []
-        try:
-            from xero_integration.models import XeroPayment
-            
-            # Get all payments for this invoice, ordered by date
-            payment_records = XeroPayment.objects.filter(
-                invoice_link=invoice_link,
-                status='AUTHORISED'  # Only show authorised payments
-            ).order_by('payment_date')
-            
-            for payment in payment_records:
-                payments.append({
-                    'date': payment.payment_date,  # Already a date object
-                    'reference': payment.reference or f'Payment {payment.xero_payment_id[:8]}',
-                    'amount': float(payment.amount),
-                })
-            
-            logger.info(f"Found {len(payments)} payment(s) for invoice {invoice_link.xero_invoice_number}")
-        except Exception as e:
-            logger.warning(f"Could not fetch payments: {e}")
-        
-        # Prepare invoice data
-        invoice_data = {
-            'invoice_number': invoice_link.xero_invoice_number,
-            'invoice_date': invoice_link.invoice_date or datetime.now(),
-            'due_date': invoice_link.due_date or (datetime.now() + timedelta(days=7)),
-            'patient': patient_info,
-            'patient_reference': patient_reference,  # Separate patient reference for company billing
-            'xero_reference': xero_reference,  # Reference/PO# from Xero invoice (funding-based)
-            'practitioner': {
-                'name': 'Craig Laird',
-                'qualification': 'CPed CM au',
-                'registration': '3454'
-            },
-            'line_items': line_items,
-            'payments': payments,
-            'payment_terms_days': 7,
-        }
-        
-        # Generate PDF (with receipt watermark if requested)
-        pdf_buffer = generate_invoice_pdf(invoice_data, debug=debug_mode, is_receipt=is_receipt)
-        
-        # Return PDF
-        response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
-        # Change filename based on receipt vs invoice
-        filename = f"Receipt_{invoice_link.xero_invoice_number}.pdf" if is_receipt else f"Invoice_{invoice_link.xero_invoice_number}.pdf"
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        return response
+        return _document_pdf_response(invoice_link, 'receipt' if is_receipt else 'invoice', debug_mode, test_items_count)
         
     except Exception as e:
         import traceback
@@ -328,6 +150,16 @@ def generate_xero_invoice_pdf(request, invoice_link_id):
         }, status=400)
 
 
+def _document_pdf_response(document, document_type, debug=False, test_items=None):
+    """Render a Xero invoice/receipt/quote link to a PDF download response"""
+    service = InvoiceDocumentService()
+    pdf_bytes = service.render(document, document_type, debug=debug, test_items=test_items)
+    
+    response = HttpResponse(pdf_bytes, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{service.filename(document, document_type)}"'
+    return response
+
+
 @api_view(['GET'])
 def generate_xero_receipt_pdf(request, invoice_link_id):
     """
@@ -340,7 +172,7 @@ def generate_xero_receipt_pdf(request, invoice_link_id):
         
         # Get invoice link
         try:
-            invoice_link = XeroInvoiceLink.objects.get(id=invoice_link_id)
+            invoice_link = XeroInvoiceLink.objects.select_related('patient', 'company').get(id=invoice_link_id)
         except XeroInvoiceLink.DoesNotExist:
             return Response({'error': 'Invoice not found'}, status=404)
         
@@ -351,15 +183,7 @@ def generate_xero_receipt_pdf(request, invoice_link_id):
                 'status': invoice_link.status
             }, status=400)
         
-        # Create a mutable copy of request.GET to add receipt=true
-        from django.http import QueryDict
-        new_get = QueryDict('', mutable=True)
-        new_get.update(request.GET)
-        new_get['receipt'] = 'true'
-        request.GET = new_get
-        
-        # Call the regular invoice PDF function with receipt mode
-        return generate_xero_invoice_pdf(request, invoice_link_id)
+        return _document_pdf_response(invoice_link, 'receipt')
         
     except Exception as e:
         import traceback
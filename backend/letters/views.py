@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from patients.models import Patient
+from patients.versions import conditional_patient_response
 from .models import PatientLetter
 from .serializers import PatientLetterSerializer, PatientLetterListSerializer
 
@@ -16,6 +17,10 @@ class PatientLetterViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = PatientLetterSerializer
     
+    @conditional_patient_response(lookup=('patient_id',))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def get_queryset(self):
         """Filter letters by patient_id from query params for list view only"""
         queryset = PatientLetter.objects.all()
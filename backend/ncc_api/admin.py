@@ -0,0 +1,33 @@
+"""
+Django admin configuration for API keys
+
+Keys are created with `manage.py api_keys create` (the raw key is only
+shown then); the admin lists and revokes them.
+"""
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import APIKey
+
+
+@admin.register(APIKey)
+class APIKeyAdmin(admin.ModelAdmin):
+    """Admin interface for APIKey model"""
+
+    list_display = ('name', 'prefix', 'user', 'created_at', 'last_used_at', 'expires_at', 'revoked_at')
+    list_filter = ('revoked_at', 'created_at')
+    search_fields = ('name', 'prefix', 'user__username')
+    readonly_fields = ('id', 'prefix', 'key_hash', 'created_at', 'last_used_at')
+    actions = ['revoke_keys']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Revoke selected API keys')
+    def revoke_keys(self, request, queryset):
+        # Saved one by one so the post_save handler drops each cached lookup
+        keys = list(queryset.filter(revoked_at__isnull=True))
+        for api_key in keys:
+            api_key.revoked_at = timezone.now()
+            api_key.save(update_fields=['revoked_at'])
+        self.message_user(request, f"Revoked {len(keys)} API key(s)")
@@ -0,0 +1,21 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class NccApiConfig(AppConfig):
+    name = 'ncc_api'
+    verbose_name = 'WalkEasy Nexus'
+
+    def ready(self):
+        # Connect handlers that drop cached API key lookups
+        from . import signals  # noqa: F401
+
+        # Answer Xero/SMS/Gmail/S3/OpenAI calls in-process (benchmarks, offline tests).
+        # Installed first so the HTTP hooks below wrap the fakes and time them too.
+        if settings.FAKE_INTEGRATIONS:
+            from . import fake_backends
+            fake_backends.install()
+
+        # Time outbound HTTP in every process: web workers, commands, batch threads
+        from .instrumentation import install_http_hooks
+        install_http_hooks()
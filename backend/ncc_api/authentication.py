@@ -0,0 +1,83 @@
+"""
+API key authentication for machine clients (scripts, integrations)
+
+    Authorization: Api-Key <key>
+
+Keys are looked up by their SHA-256 hash (see ncc_api.models.APIKey), so a
+request costs one fast hash and, once the key is cached, no database
+query - Basic auth ran a full PBKDF2 password hash on every request.
+
+The user behind each key is cached in the shared cache for
+API_KEY_CACHE_TIMEOUT seconds (unknown and revoked keys too, so repeated
+bad keys do not hit the database). Saving or deleting a key, or saving its
+user, drops the cached entry (ncc_api/signals.py). last_used_at is written
+at most once per LAST_USED_INTERVAL per key.
+
+Create keys with `manage.py api_keys create <username> <name>`.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import authentication, exceptions
+
+from .models import APIKey, hash_api_key
+
+KEYWORD = 'Api-Key'
+CACHE_PREFIX = 'api-key:'
+LAST_USED_PREFIX = 'api-key-used:'
+LAST_USED_INTERVAL = 300
+
+
+def invalidate(key_hashes):
+    """Drop cached lookups for these key hashes"""
+    cache.delete_many([CACHE_PREFIX + key_hash for key_hash in key_hashes])
+
+
+def _load(key_hash):
+    """Cache entry for a key: {'key_id', 'user', 'expires_at'}, or False if unusable"""
+    try:
+        api_key = APIKey.objects.select_related('user').get(key_hash=key_hash)
+    except APIKey.DoesNotExist:
+        return False
+    if api_key.revoked_at or not api_key.user.is_active:
+        return False
+    return {'key_id': str(api_key.pk), 'user': api_key.user, 'expires_at': api_key.expires_at}
+
+
+def _touch(key_id):
+    if cache.add(LAST_USED_PREFIX + key_id, True, LAST_USED_INTERVAL):
+        APIKey.objects.filter(pk=key_id).update(last_used_at=timezone.now())
+
+
+class APIKeyAuthentication(authentication.BaseAuthentication):
+    """
+    DRF authentication class. Sets request.user to the key's user and
+    request.auth to the key id.
+    """
+
+    def authenticate(self, request):
+        header = authentication.get_authorization_header(request).split()
+        if not header or header[0].lower() != KEYWORD.lower().encode():
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed('Invalid API key header. Expected "Api-Key <key>".')
+        try:
+            raw_key = header[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid API key header. Key contains invalid characters.')
+        return self.authenticate_key(raw_key)
+
+    def authenticate_key(self, raw_key):
+        key_hash = hash_api_key(raw_key)
+        entry = cache.get(CACHE_PREFIX + key_hash)
+        if entry is None:
+            entry = _load(key_hash)
+            cache.set(CACHE_PREFIX + key_hash, entry, settings.API_KEY_CACHE_TIMEOUT)
+
+        if not entry or (entry['expires_at'] and entry['expires_at'] <= timezone.now()):
+            raise exceptions.AuthenticationFailed('Invalid or expired API key.')
+        _touch(entry['key_id'])
+        return entry['user'], entry['key_id']
+
+    def authenticate_header(self, request):
+        return KEYWORD
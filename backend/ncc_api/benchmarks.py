@@ -0,0 +1,237 @@
+"""
+Endpoint benchmarks
+
+Measures latency, query count and peak Python memory for the hot endpoints
+against the synthetic dataset (`manage.py seed_load_test_data`) with the
+fake integrations on (FAKE_INTEGRATIONS=true, see ncc_api/fake_backends.py),
+and compares the results with a stored JSON baseline.
+
+Run with `manage.py benchmark_endpoints`. Each scenario is requested through
+the full middleware stack with the Django test client:
+
+- queries: the most queries made by COLD_REQUESTS requests, each sent
+  right after clearing the Django cache, so cached responses
+  (cached_response, conditional_patient_response) cannot hide an N+1 in
+  the views behind them; their median latency is reported as cold_ms
+- latency: p50/p95/mean over N timed requests, after warmup requests (so
+  cached endpoints are measured warm, as users see them)
+- memory: peak traced allocation (tracemalloc) of one extra request
+
+Clearing the cache drops everything in it, so run the benchmarks against
+a local cache, never a shared one.
+
+Latency depends on the machine and database, so only compare baselines
+recorded on the same setup. Query counts are deterministic and are the
+most reliable regression signal.
+"""
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+
+import django
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+DEFAULT_THRESHOLD = 0.25  # allowed relative increase in p50 latency and peak memory
+MIN_LATENCY_DELTA_MS = 5.0  # ignore latency changes smaller than this (timer noise)
+MIN_MEMORY_DELTA_KB = 256
+IMAGE_FIXTURE_BYTES = 200 * 1024
+COLD_REQUESTS = 3
+
+
+class BenchmarkError(Exception):
+    """Raised when the dataset or environment cannot run the benchmarks"""
+
+
+def load_fixtures():
+    """
+    Pick the records each scenario requests, deterministically: the busiest
+    patient and day, the largest image batch, the oldest invoice.
+    """
+    from appointments.models import Appointment
+    from images.models import ImageBatch
+    from patients.models import Patient
+    from sms_integration.models import SMSMessage
+    from xero_integration.models import XeroInvoiceLink
+    from . import fake_backends
+
+    if not Patient.objects.exists():
+        raise BenchmarkError('No patients. Run `manage.py seed_load_test_data` first.')
+
+    busiest = (
+        SMSMessage.objects.exclude(patient=None)
+        .values('patient').annotate(n=Count('id')).order_by('-n', 'patient').first()
+    )
+    patient_id = busiest['patient'] if busiest else Patient.objects.order_by('id').values_list('id', flat=True)[0]
+
+    busy_day = (
+        Appointment.objects.annotate(day=TruncDate('start_time'))
+        .values('day').annotate(n=Count('id')).order_by('-n', 'day').first()
+    )
+    day = busy_day['day'] if busy_day else timezone.localdate()
+
+    batch = ImageBatch.objects.filter(image_count__gt=0).order_by('-image_count', 'id').first()
+    if batch is not None:
+        # The download endpoint fetches every image from S3
+        bucket = os.environ.get('AWS_S3_BUCKET_NAME', '')
+        s3 = fake_backends.BACKENDS['s3']
+        for s3_key in batch.images.values_list('s3_key', flat=True):
+            s3.put_object(bucket, s3_key, b'\xff\xd8' + b'\0' * IMAGE_FIXTURE_BYTES, 'image/jpeg')
+
+    invoice = XeroInvoiceLink.objects.exclude(patient=None).order_by('created_at', 'id').first()
+    gmail_connection = fake_backends.ensure_gmail_connection()
+
+    return {
+        'patient_id': str(patient_id),
+        'day': day,
+        'batch_id': str(batch.pk) if batch else None,
+        'invoice_id': str(invoice.pk) if invoice else None,
+        'from_email': gmail_connection.email_address,
+    }
+
+
+def build_scenarios(fixtures):
+    """[{'name', 'method', 'path', 'data'}] for the hot endpoints"""
+    day = fixtures['day']
+    week_start = timezone.make_aware(datetime.combine(day - timedelta(days=day.weekday()), datetime.min.time()))
+    week = urlencode({'from': week_start.isoformat(), 'to': (week_start + timedelta(days=7)).isoformat()})
+    patient_id = fixtures['patient_id']
+
+    scenarios = [
+        {'name': 'patients_list', 'path': '/api/patients/'},
+        {'name': 'patients_list_search', 'path': '/api/patients/?search=smith'},
+        {'name': 'patient_detail', 'path': f'/api/patients/{patient_id}/'},
+        {'name': 'patient_chart', 'path': f'/api/patients/{patient_id}/chart/'},
+        {'name': 'calendar_data_week', 'path': f'/api/appointments/calendar_data/?{week}'},
+        {'name': 'day_appointments', 'path': f'/api/appointments/day/{day.isoformat()}/'},
+        {'name': 'sms_conversations', 'path': '/api/sms/conversations/'},
+        {'name': 'sms_patient_conversation', 'path': f'/api/sms/patient/{patient_id}/conversation/'},
+        {'name': 'sms_history', 'path': '/api/sms/history/'},
+        {'name': 'image_batches_list', 'path': f'/api/images/batches/?patient_id={patient_id}'},
+        {
+            'name': 'email_send',
+            'method': 'post',
+            'path': '/gmail/send/',
+            'data': {
+                'to_emails': ['benchmark@example.com'],
+                'subject': 'Benchmark',
+                'body_html': '<p>' + 'Benchmark email body. ' * 50 + '</p>',
+                'connection_email': fixtures['from_email'],
+            },
+        },
+    ]
+    if fixtures['batch_id']:
+        scenarios.append({'name': 'image_batch_download', 'path': f"/api/images/batches/{fixtures['batch_id']}/download/"})
+    if fixtures['invoice_id']:
+        scenarios.append({'name': 'invoice_pdf', 'path': f"/api/invoices/xero/{fixtures['invoice_id']}/pdf/"})
+
+    for scenario in scenarios:
+        scenario.setdefault('method', 'get')
+        scenario.setdefault('data', None)
+    return scenarios
+
+
+def _request(client, scenario):
+    if scenario['method'] == 'post':
+        response = client.post(scenario['path'], scenario['data'], content_type='application/json')
+    else:
+        response = client.get(scenario['path'])
+    if getattr(response, 'streaming', False):
+        b''.join(response.streaming_content)
+    if response.status_code >= 400:
+        raise BenchmarkError(f"{scenario['name']}: {scenario['method'].upper()} {scenario['path']} returned {response.status_code}")
+    return response
+
+
+def _timed_request(client, scenario):
+    started = time.perf_counter()
+    _request(client, scenario)
+    return (time.perf_counter() - started) * 1000
+
+
+def run_scenario(client, scenario, iterations, warmup):
+    # Warm per-process state (content types, connections) so cold counts are stable
+    for _ in range(warmup):
+        _request(client, scenario)
+
+    cold_timings = []
+    queries = 0
+    for _ in range(COLD_REQUESTS):
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            cold_timings.append(_timed_request(client, scenario))
+        queries = max(queries, len(captured.captured_queries))
+
+    timings = sorted(_timed_request(client, scenario) for _ in range(iterations))
+
+    tracemalloc.start()
+    try:
+        _request(client, scenario)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'cold_ms': round(statistics.median(cold_timings), 2),
+        'queries': queries,
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def environment():
+    """Describes where a baseline was recorded"""
+    from patients.models import Patient
+
+    return {
+        'recorded_at': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+        'patients': Patient.objects.count(),
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Regressions of `results` against `baseline` (both {name: metrics}).
+    Returns a list of human-readable messages; empty means no regression.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+        allowed_ms = max(previous['p50_ms'] * (1 + threshold), previous['p50_ms'] + MIN_LATENCY_DELTA_MS)
+        if current['p50_ms'] > allowed_ms:
+            regressions.append(f"{name}: p50 {previous['p50_ms']}ms -> {current['p50_ms']}ms (limit {allowed_ms:.1f}ms)")
+        allowed_kb = max(previous['peak_kb'] * (1 + threshold), previous['peak_kb'] + MIN_MEMORY_DELTA_KB)
+        if current['peak_kb'] > allowed_kb:
+            regressions.append(f"{name}: peak memory {previous['peak_kb']}KB -> {current['peak_kb']}KB (limit {allowed_kb:.0f}KB)")
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
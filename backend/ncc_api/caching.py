@@ -0,0 +1,170 @@
+"""
+Shared cache helpers for WalkEasy Nexus
+
+Namespace versions
+    Cache keys embed a per-namespace version number stored in the shared
+    cache. Bumping the version makes every key in the namespace unreachable
+    at once (old entries simply expire), which is how model changes
+    invalidate cached responses across all gunicorn workers.
+
+cached_response
+    Decorator for read-only viewset actions (list/retrieve). Responses are
+    keyed by namespace version, request path, query params and user scope,
+    and invalidated by post_save/post_delete on the models it depends on.
+
+LRUCache
+    Small thread-safe in-process cache for values that are expensive to
+    rebuild and cheap to keep per worker.
+"""
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from rest_framework.response import Response
+
+NAMESPACE_VERSION_PREFIX = 'ns-version:'
+DEFAULT_TIMEOUT = 300
+
+
+class LRUCache:
+    """Small thread-safe LRU used as the per-process first-level cache"""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def _initial_version():
+    # Time-based so a flushed cache never reuses an old version number
+    return int(time.time() * 1000)
+
+
+def get_namespace_versions(namespaces):
+    """Return {namespace: version} from the shared cache, creating missing versions"""
+    keys = {NAMESPACE_VERSION_PREFIX + name: name for name in namespaces}
+    found = cache.get_many(list(keys.keys()))
+    versions = {}
+    for key, name in keys.items():
+        version = found.get(key)
+        if version is None:
+            cache.add(key, _initial_version(), timeout=None)
+            version = cache.get(key)
+        versions[name] = version
+    return versions
+
+
+def get_namespace_version(namespace):
+    return get_namespace_versions([namespace])[namespace]
+
+
+def bump_namespace(*namespaces):
+    """Invalidate everything cached under the given namespaces"""
+    for name in namespaces:
+        key = NAMESPACE_VERSION_PREFIX + name
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Key missing (first use or evicted) - start a fresh version
+            cache.set(key, _initial_version(), timeout=None)
+
+
+def invalidate_on_change(namespace, *models):
+    """
+    Bump `namespace` whenever any of `models` is saved or deleted.
+    Models may be classes or lazy 'app_label.ModelName' strings.
+    """
+    def handler(sender, **kwargs):
+        bump_namespace(namespace)
+
+    for model in models:
+        label = model if isinstance(model, str) else model._meta.label
+        uid = f'cache_ns_{namespace}_{label.lower()}'
+        post_save.connect(handler, sender=model, weak=False, dispatch_uid=f'{uid}_save')
+        post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f'{uid}_delete')
+
+
+def default_scope(request):
+    """
+    Cache scope for a request. Data in the cached viewsets differs only by
+    staff status, so responses are shared between users of the same role.
+    """
+    user = getattr(request, 'user', None)
+    if not user or not user.is_authenticated:
+        return 'anon'
+    return 'staff' if user.is_staff else 'user'
+
+
+def user_scope(request):
+    """Per-user cache scope, for views whose data depends on who is asking"""
+    user = getattr(request, 'user', None)
+    if not user or not user.is_authenticated:
+        return 'anon'
+    return f'user-{user.pk}'
+
+
+def response_cache_key(namespace, version, request, scope):
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    raw = f"{request.path}|{params}|{scope(request)}"
+    digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()[:40]
+    return f"view:{namespace}:{version}:{digest}"
+
+
+def cached_response(namespace, invalidated_by=(), timeout=DEFAULT_TIMEOUT, scope=default_scope):
+    """
+    Cache successful GET responses of a viewset action.
+
+        @cached_response('patients', invalidated_by=['patients.Patient'])
+        def list(self, request, *args, **kwargs):
+            return super().list(request, *args, **kwargs)
+
+    Adds an X-Cache: HIT/MISS header so cache behaviour is visible in devtools.
+    """
+    invalidate_on_change(namespace, *invalidated_by)
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method != 'GET':
+                return method(self, request, *args, **kwargs)
+
+            key = response_cache_key(namespace, get_namespace_version(namespace), request, scope)
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = method(self, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                cache.set(key, response.data, timeout)
+                response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,810 @@
+"""
+Offline stand-ins for the external integrations
+
+With FAKE_INTEGRATIONS on (env FAKE_INTEGRATIONS=true), outbound HTTP to
+Xero, SMS Broadcast, Gmail, S3 and OpenAI is answered in-process instead of
+going to the network, so benchmarks and tests run on a disconnected box:
+
+- S3: in-memory object store (put/get/head/delete/list, multipart upload,
+  presigned GETs)
+- Xero: in-memory accounting API (contacts, invoices, quotes, payments) plus
+  the OAuth token and connections endpoints
+- SMS Broadcast: send and balance
+- Gmail: OAuth token, userinfo, sendAs and messages.send
+- OpenAI: canned chat completions, streaming included
+
+The stand-ins sit underneath the real client libraries (urllib3 for
+requests, xero-python and boto3; httpx for openai), so S3Service,
+XeroService, SMSService, GmailService and OpenAIService run unchanged,
+including their request building and response parsing, and the request
+instrumentation still sees every call.
+
+Latency and errors can be injected per integration (names as in
+ncc_api.instrumentation.INTEGRATION_HOSTS, '*' for all):
+    FAKE_INTEGRATIONS_LATENCY_MS="xero=250,s3=40,*=20"
+    FAKE_INTEGRATIONS_ERROR_RATE="sms_broadcast=0.05"
+or at runtime:
+    from ncc_api import fake_backends
+    fake_backends.configure(latency_ms={'xero': 250}, error_rate={'gmail': 0.1})
+Injected errors are 503 responses.
+
+Sent SMS and email are kept in each backend's `outbox` for inspection.
+"""
+import base64
+import functools
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from email import message_from_bytes
+from urllib.parse import parse_qs, unquote, urlsplit
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+
+from .instrumentation import integration_for_host
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_SIZE = 500
+
+# Credentials the real services insist on before making a call
+FAKE_ENVIRONMENT = {
+    'AWS_ACCESS_KEY_ID': 'fake-access-key',
+    'AWS_SECRET_ACCESS_KEY': 'fake-secret-key',
+    'AWS_S3_BUCKET_NAME': 'fake-bucket',
+    'XERO_CLIENT_ID': 'fake-xero-client',
+    'XERO_CLIENT_SECRET': 'fake-xero-secret',
+    'GMAIL_CLIENT_ID': 'fake-gmail-client',
+    'GMAIL_CLIENT_SECRET': 'fake-gmail-secret',
+    'SMSB_USERNAME': 'fake',
+    'SMSB_PASSWORD': 'fake',
+    'OPENAI_API_KEY': 'fake-openai-key',
+}
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def _parse_setting(value, cast):
+    """'xero=250,*=20' -> {'xero': 250.0, '*': 20.0}. Dicts pass through."""
+    if isinstance(value, dict):
+        return {name: cast(amount) for name, amount in value.items()}
+    result = {}
+    for part in (value or '').split(','):
+        if '=' in part:
+            name, amount = part.split('=', 1)
+            result[name.strip()] = cast(amount)
+    return result
+
+
+class FaultInjector:
+    """Per-integration latency and error rate"""
+
+    def __init__(self):
+        self.latency_ms = {}
+        self.error_rate = {}
+        self._rng = random.Random(0)
+        self._lock = threading.Lock()
+
+    def configure(self, latency_ms=None, error_rate=None, seed=None):
+        if latency_ms is not None:
+            self.latency_ms = _parse_setting(latency_ms, float)
+        if error_rate is not None:
+            self.error_rate = _parse_setting(error_rate, float)
+        if seed is not None:
+            self._rng = random.Random(seed)
+
+    def _value(self, values, integration):
+        return values.get(integration, values.get('*', 0))
+
+    def apply(self, integration):
+        """Sleep for the configured latency. Returns True if this call should fail."""
+        latency = self._value(self.latency_ms, integration)
+        if latency:
+            time.sleep(latency / 1000)
+        rate = self._value(self.error_rate, integration)
+        if not rate:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+
+faults = FaultInjector()
+
+
+# ---------------------------------------------------------------------------
+# Requests and responses
+# ---------------------------------------------------------------------------
+
+class FakeRequest:
+    def __init__(self, method, host, target, headers=None, body=None):
+        parts = urlsplit(target)
+        self.method = method.upper()
+        self.host = (parts.hostname or host or '').lower()
+        self.path = unquote(parts.path or '/')
+        self.query = parse_qs(parts.query, keep_blank_values=True)
+        self.headers = {str(key).lower(): str(value) for key, value in (headers or {}).items()}
+        if hasattr(body, 'read'):
+            body = body.read()
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.body = body or b''
+
+    def param(self, name, default=None):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def json(self):
+        return json.loads(self.body or b'{}')
+
+    def form(self):
+        return {key: values[0] for key, values in parse_qs(self.body.decode('utf-8')).items()}
+
+
+class FakeResponse:
+    def __init__(self, status=200, body=b'', content_type='application/json', headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.status = status
+        self.body = body
+        self.headers = {'Content-Type': content_type, 'Content-Length': str(len(body))}
+        self.headers.update(headers or {})
+
+
+def json_response(data, status=200):
+    return FakeResponse(status, json.dumps(data, default=str))
+
+
+def text_response(text, status=200):
+    return FakeResponse(status, text, content_type='text/plain')
+
+
+def xml_response(xml, status=200, headers=None):
+    return FakeResponse(status, '<?xml version="1.0" encoding="UTF-8"?>\n' + xml, 'application/xml', headers)
+
+
+REASONS = {200: 'OK', 201: 'Created', 204: 'No Content', 400: 'Bad Request', 401: 'Unauthorized',
+           404: 'Not Found', 503: 'Service Unavailable'}
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class FakeBackend:
+    """An in-process stand-in for one integration's HTTP API"""
+
+    name = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.outbox = deque(maxlen=OUTBOX_SIZE)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    def error_response(self):
+        return json_response({'error': f'Injected {self.name} failure'}, status=503)
+
+
+class FakeS3(FakeBackend):
+    """In-memory S3 object store (virtual-hosted and path-style requests)"""
+
+    name = 's3'
+    XMLNS = 'http://s3.amazonaws.com/doc/2006-03-01/'
+
+    def reset(self):
+        super().reset()
+        self.objects = {}  # (bucket, key) -> {'body', 'content_type', 'metadata', 'etag', 'last_modified'}
+        self.uploads = {}  # upload_id -> {'parts': {part_number: bytes}, 'headers'}
+        self._upload_ids = itertools.count(1)
+
+    @staticmethod
+    def _bucket_and_key(request):
+        host = request.host
+        if '.s3.' in host or '.s3-' in host:
+            return host.split('.s3', 1)[0], request.path.lstrip('/')
+        bucket, _, key = request.path.lstrip('/').partition('/')
+        return bucket, key
+
+    def _error(self, status, code, message):
+        return xml_response(f'<Error><Code>{code}</Code><Message>{escape(message)}</Message></Error>', status)
+
+    def _store(self, bucket, key, body, headers):
+        etag = f'"{uuid.uuid5(uuid.NAMESPACE_OID, str(len(body)) + key).hex}"'
+        self.objects[(bucket, key)] = {
+            'body': body,
+            'content_type': headers.get('content-type', 'binary/octet-stream'),
+            'metadata': {k: v for k, v in headers.items() if k.startswith('x-amz-meta-')},
+            'etag': etag,
+            'last_modified': datetime.now(dt_timezone.utc),
+        }
+        return etag
+
+    def put_object(self, bucket, key, body, content_type='binary/octet-stream'):
+        """Store an object directly (fixtures for benchmarks and tests)"""
+        with self._lock:
+            return self._store(bucket, key, body, {'content-type': content_type})
+
+    def handle(self, request):
+        bucket, key = self._bucket_and_key(request)
+        with self._lock:
+            if not key:
+                return self._bucket_request(request, bucket)
+            if 'uploads' in request.query or 'uploadId' in request.query:
+                return self._multipart(request, bucket, key)
+
+            if request.method == 'PUT':
+                etag = self._store(bucket, key, request.body, request.headers)
+                return FakeResponse(200, b'', headers={'ETag': etag})
+            if request.method == 'DELETE':
+                self.objects.pop((bucket, key), None)
+                return FakeResponse(204, b'')
+
+            obj = self.objects.get((bucket, key))
+            if obj is None:
+                if request.method == 'HEAD':
+                    return FakeResponse(404, b'')
+                return self._error(404, 'NoSuchKey', 'The specified key does not exist.')
+            headers = {
+                'ETag': obj['etag'],
+                'Last-Modified': obj['last_modified'].strftime('%a, %d %b %Y %H:%M:%S GMT'),
+                **obj['metadata'],
+            }
+            response = FakeResponse(200, obj['body'], obj['content_type'], headers)
+            if request.method == 'HEAD':
+                response.body = b''  # Content-Length still reports the object size
+            return response
+
+    def _bucket_request(self, request, bucket):
+        if request.method == 'HEAD':
+            return FakeResponse(200, b'')
+        if 'location' in request.query:
+            return xml_response(f'<LocationConstraint xmlns="{self.XMLNS}">ap-southeast-2</LocationConstraint>')
+        prefix = request.param('prefix', '')
+        max_keys = int(request.param('max-keys', 1000))
+        keys = sorted(key for (b, key) in self.objects if b == bucket and key.startswith(prefix))
+        contents = ''.join(
+            f"<Contents><Key>{escape(key)}</Key>"
+            f"<LastModified>{self.objects[(bucket, key)]['last_modified'].strftime('%Y-%m-%dT%H:%M:%S.000Z')}</LastModified>"
+            f"<ETag>{escape(self.objects[(bucket, key)]['etag'])}</ETag>"
+            f"<Size>{len(self.objects[(bucket, key)]['body'])}</Size>"
+            f"<StorageClass>STANDARD</StorageClass></Contents>"
+            for key in keys[:max_keys]
+        )
+        return xml_response(
+            f'<ListBucketResult xmlns="{self.XMLNS}"><Name>{escape(bucket)}</Name>'
+            f'<Prefix>{escape(prefix)}</Prefix><KeyCount>{min(len(keys), max_keys)}</KeyCount>'
+            f'<MaxKeys>{max_keys}</MaxKeys><IsTruncated>{str(len(keys) > max_keys).lower()}</IsTruncated>'
+            f'{contents}</ListBucketResult>'
+        )
+
+    def _multipart(self, request, bucket, key):
+        upload_id = request.param('uploadId')
+        if request.method == 'POST' and 'uploads' in request.query:
+            upload_id = f'upload-{next(self._upload_ids)}'
+            self.uploads[upload_id] = {'parts': {}, 'headers': request.headers}
+            return xml_response(
+                f'<InitiateMultipartUploadResult xmlns="{self.XMLNS}"><Bucket>{escape(bucket)}</Bucket>'
+                f'<Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>'
+            )
+        upload = self.uploads.get(upload_id)
+        if upload is None:
+            return self._error(404, 'NoSuchUpload', 'The specified upload does not exist.')
+        if request.method == 'PUT':
+            part_number = int(request.param('partNumber'))
+            upload['parts'][part_number] = request.body
+            return FakeResponse(200, b'', headers={'ETag': f'"part-{part_number}"'})
+        if request.method == 'DELETE':
+            self.uploads.pop(upload_id, None)
+            return FakeResponse(204, b'')
+        # Complete
+        self.uploads.pop(upload_id)
+        body = b''.join(part for _number, part in sorted(upload['parts'].items()))
+        etag = self._store(bucket, key, body, upload['headers'])
+        return xml_response(
+            f'<CompleteMultipartUploadResult xmlns="{self.XMLNS}"><Location>{escape(request.host)}/{escape(key)}</Location>'
+            f'<Bucket>{escape(bucket)}</Bucket><Key>{escape(key)}</Key><ETag>{escape(etag)}</ETag>'
+            f'</CompleteMultipartUploadResult>'
+        )
+
+    def error_response(self):
+        return self._error(503, 'SlowDown', 'Injected s3 failure')
+
+
+def xero_date(value):
+    """Date -> Xero's /Date(ms+0000)/ format"""
+    if value is None:
+        return None
+    moment = datetime(value.year, value.month, value.day, tzinfo=dt_timezone.utc)
+    return f'/Date({int(moment.timestamp() * 1000)}+0000)/'
+
+
+def parse_xero_date(value):
+    """Xero /Date(ms)/ or ISO string -> date"""
+    if not value:
+        return None
+    match = re.match(r'/Date\((-?\d+)', str(value))
+    if match:
+        return datetime.fromtimestamp(int(match.group(1)) / 1000, tz=dt_timezone.utc).date()
+    return date.fromisoformat(str(value)[:10])
+
+
+class FakeXero(FakeBackend):
+    """In-memory Xero accounting API for one organisation"""
+
+    name = 'xero'
+    TENANT_ID = 'fake-tenant-0000'
+    TENANT_NAME = 'Fake Clinic Pty Ltd'
+    TAXED = ('OUTPUT', 'OUTPUT2', 'INPUT2')
+
+    def reset(self):
+        super().reset()
+        self.contacts = {}
+        self.invoices = {}
+        self.quotes = {}
+        self.payments = {}
+        self._numbers = itertools.count(1)
+
+    def handle(self, request):
+        if request.host == 'identity.xero.com' or request.path.endswith('/connect/token'):
+            return json_response({
+                'access_token': f'fake-xero-access-{uuid.uuid4().hex}',
+                'refresh_token': f'fake-xero-refresh-{uuid.uuid4().hex}',
+                'id_token': '',
+                'expires_in': 1800,
+                'token_type': 'Bearer',
+                'scope': 'offline_access accounting.transactions accounting.contacts',
+            })
+        if request.path.rstrip('/') == '/connections':
+            return json_response([{
+                'id': str(uuid.uuid5(uuid.NAMESPACE_OID, self.TENANT_ID)),
+                'tenantId': self.TENANT_ID,
+                'tenantName': self.TENANT_NAME,
+                'tenantType': 'ORGANISATION',
+            }])
+
+        match = re.match(r'^/api\.xro/2\.0/(Contacts|Invoices|Quotes|Payments)(?:/([^/]+))?/?$', request.path)
+        if not match:
+            return json_response({'Message': f'Fake Xero has no endpoint {request.path}'}, status=404)
+        resource, resource_id = match.groups()
+        with self._lock:
+            handler = getattr(self, f'_{resource.lower()}')
+            return handler(request, resource_id)
+
+    # Resources
+
+    def _not_found(self, resource, resource_id):
+        return json_response({'Type': 'NotFound', 'Message': f'{resource} {resource_id} not found'}, status=404)
+
+    def _contacts(self, request, contact_id):
+        if request.method == 'GET':
+            if contact_id:
+                contact = self.contacts.get(contact_id)
+                return json_response({'Contacts': [contact]}) if contact else self._not_found('Contact', contact_id)
+            return json_response({'Contacts': list(self.contacts.values())})
+
+        results = []
+        for data in request.json().get('Contacts', []):
+            existing_id = contact_id or data.get('ContactID')
+            contact = self.contacts.get(existing_id)
+            if contact is None:
+                existing_id = str(uuid.uuid4())
+                contact = {'ContactID': existing_id, 'ContactNumber': '', 'ContactStatus': 'ACTIVE'}
+                self.contacts[existing_id] = contact
+            contact.update({key: value for key, value in data.items() if key != 'ContactID'})
+            results.append(contact)
+        return json_response({'Contacts': results})
+
+    def _line_items(self, line_items):
+        items, sub_total, total_tax = [], Decimal('0'), Decimal('0')
+        for item in line_items or []:
+            quantity = Decimal(str(item.get('Quantity') or 1))
+            unit_amount = Decimal(str(item.get('UnitAmount') or 0))
+            discount = Decimal(str(item.get('DiscountRate') or 0))
+            line_amount = (quantity * unit_amount * (1 - discount / 100)).quantize(Decimal('0.01'))
+            tax = (line_amount * Decimal('0.1')).quantize(Decimal('0.01')) if item.get('TaxType') in self.TAXED else Decimal('0')
+            items.append({
+                **item,
+                'LineItemID': item.get('LineItemID') or str(uuid.uuid4()),
+                'Quantity': float(quantity),
+                'UnitAmount': float(unit_amount),
+                'LineAmount': float(line_amount),
+                'TaxAmount': float(tax),
+            })
+            sub_total += line_amount
+            total_tax += tax
+        return items, sub_total, total_tax
+
+    def _apply_document(self, document, data, date_key):
+        """Merge request data into a stored invoice/quote and recompute totals"""
+        for key, value in data.items():
+            if key in ('Date', date_key):
+                document[key] = xero_date(parse_xero_date(value))
+            elif key not in ('LineItems', 'InvoiceID', 'QuoteID'):
+                document[key] = value
+        if 'LineItems' in data:
+            document['LineItems'], sub_total, total_tax = self._line_items(data['LineItems'])
+            document['SubTotal'] = float(sub_total)
+            document['TotalTax'] = float(total_tax)
+            document['Total'] = float(sub_total + total_tax)
+        document['UpdatedDateUTC'] = f'/Date({int(time.time() * 1000)}+0000)/'
+
+    def _invoices(self, request, invoice_id):
+        if request.method == 'GET':
+            if invoice_id:
+                invoice = self.invoices.get(invoice_id)
+                return json_response({'Invoices': [invoice]}) if invoice else self._not_found('Invoice', invoice_id)
+            return json_response({'Invoices': list(self.invoices.values())})
+
+        results = []
+        for data in request.json().get('Invoices', []):
+            existing_id = invoice_id or data.get('InvoiceID')
+            invoice = self.invoices.get(existing_id)
+            if invoice is None:
+                if existing_id:
+                    return self._not_found('Invoice', existing_id)
+                existing_id = str(uuid.uuid4())
+                invoice = {
+                    'InvoiceID': existing_id,
+                    'InvoiceNumber': f'INV-{next(self._numbers):05d}',
+                    'Type': 'ACCREC',
+                    'Status': 'DRAFT',
+                    'AmountPaid': 0.0,
+                    'CurrencyCode': 'AUD',
+                    'Date': xero_date(date.today()),
+                }
+                self.invoices[existing_id] = invoice
+            self._apply_document(invoice, data, 'DueDate')
+            invoice['AmountDue'] = round(invoice.get('Total', 0) - invoice['AmountPaid'], 2)
+            results.append(invoice)
+        return json_response({'Invoices': results})
+
+    def _quotes(self, request, quote_id):
+        if request.method == 'GET':
+            if quote_id:
+                quote = self.quotes.get(quote_id)
+                return json_response({'Quotes': [quote]}) if quote else self._not_found('Quote', quote_id)
+            return json_response({'Quotes': list(self.quotes.values())})
+
+        results = []
+        for data in request.json().get('Quotes', []):
+            existing_id = quote_id or data.get('QuoteID')
+            quote = self.quotes.get(existing_id)
+            if quote is None:
+                if existing_id:
+                    return self._not_found('Quote', existing_id)
+                existing_id = str(uuid.uuid4())
+                quote = {
+                    'QuoteID': existing_id,
+                    'QuoteNumber': f'QU-{next(self._numbers):05d}',
+                    'Status': 'DRAFT',
+                    'CurrencyCode': 'AUD',
+                    'Date': xero_date(date.today()),
+                }
+                self.quotes[existing_id] = quote
+            self._apply_document(quote, data, 'ExpiryDate')
+            results.append(quote)
+        return json_response({'Quotes': results})
+
+    def _payments(self, request, payment_id):
+        if request.method == 'GET':
+            if payment_id:
+                payment = self.payments.get(payment_id)
+                return json_response({'Payments': [payment]}) if payment else self._not_found('Payment', payment_id)
+            where = request.param('where', '')
+            payments = [p for p in self.payments.values() if not where or p['Invoice']['InvoiceID'] in where]
+            return json_response({'Payments': payments})
+
+        results = []
+        for data in request.json().get('Payments', []):
+            invoice_id = (data.get('Invoice') or {}).get('InvoiceID')
+            invoice = self.invoices.get(invoice_id)
+            if invoice is None:
+                return json_response({'Type': 'ValidationException', 'Message': 'Invoice not found'}, status=400)
+            amount = round(float(data.get('Amount') or 0), 2)
+            paid_on = parse_xero_date(data.get('Date')) or date.today()
+            payment = {
+                'PaymentID': str(uuid.uuid4()),
+                'Date': xero_date(paid_on),
+                'Amount': amount,
+                'Reference': data.get('Reference', ''),
+                'Status': 'AUTHORISED',
+                'PaymentType': 'ACCRECPAYMENT',
+                'Account': data.get('Account') or {},
+                'Invoice': {'InvoiceID': invoice_id, 'InvoiceNumber': invoice['InvoiceNumber']},
+            }
+            self.payments[payment['PaymentID']] = payment
+            invoice['AmountPaid'] = round(invoice['AmountPaid'] + amount, 2)
+            invoice['AmountDue'] = round(invoice.get('Total', 0) - invoice['AmountPaid'], 2)
+            if invoice['AmountDue'] <= 0:
+                invoice['Status'] = 'PAID'
+                invoice['FullyPaidOnDate'] = xero_date(paid_on)
+            results.append(payment)
+        return json_response({'Payments': results})
+
+
+class FakeSMSBroadcast(FakeBackend):
+    """SMS Broadcast advanced API (send and balance)"""
+
+    name = 'sms_broadcast'
+    BALANCE = 1000
+
+    def reset(self):
+        super().reset()
+        self._ids = itertools.count(100000)
+
+    def handle(self, request):
+        params = {key: values[0] for key, values in request.query.items()}
+        if request.method == 'POST' and request.body:
+            params.update(request.form())
+        if params.get('action') == 'balance':
+            return text_response(f'OK: {self.BALANCE}')
+
+        recipients = [to.strip() for to in params.get('to', '').split(',') if to.strip()]
+        if not recipients or not params.get('message'):
+            return text_response('BAD:: Missing recipient or message')
+        lines = []
+        with self._lock:
+            for to in recipients:
+                message_id = next(self._ids)
+                self.outbox.append({'id': str(message_id), 'to': to, 'from': params.get('from', ''), 'message': params['message']})
+                lines.append(f'OK: {to}: {message_id}')
+        return text_response('\n'.join(lines))
+
+    def error_response(self):
+        return text_response('ERROR: Injected sms_broadcast failure', status=503)
+
+
+class FakeGmail(FakeBackend):
+    """Google OAuth token/userinfo and the Gmail send/sendAs endpoints"""
+
+    name = 'gmail'
+    ACCOUNT_EMAIL = 'fake.sender@example.com'
+
+    def reset(self):
+        super().reset()
+        self._ids = itertools.count(1)
+
+    def handle(self, request):
+        if request.path.endswith('/token'):
+            return json_response({
+                'access_token': f'fake-gmail-access-{uuid.uuid4().hex}',
+                'expires_in': 3599,
+                'token_type': 'Bearer',
+                'scope': 'https://www.googleapis.com/auth/gmail.send',
+            })
+        if request.path.endswith('/userinfo'):
+            return json_response({'email': self.ACCOUNT_EMAIL, 'name': 'Fake Sender', 'verified_email': True})
+        if request.path.endswith('/settings/sendAs'):
+            return json_response({'sendAs': [
+                {'sendAsEmail': self.ACCOUNT_EMAIL, 'displayName': 'Fake Sender', 'isPrimary': True,
+                 'isDefault': True, 'verificationStatus': 'accepted'},
+            ]})
+        if request.path.endswith('/messages/send') and request.method == 'POST':
+            raw = request.json().get('raw', '')
+            message = message_from_bytes(base64.urlsafe_b64decode(raw + '=' * (-len(raw) % 4)))
+            with self._lock:
+                message_id = f'fake{next(self._ids):012x}'
+                self.outbox.append({
+                    'id': message_id,
+                    'from': message.get('From', ''),
+                    'to': message.get('To', ''),
+                    'subject': message.get('Subject', ''),
+                    'size': len(raw),
+                })
+            return json_response({'id': message_id, 'threadId': message_id, 'labelIds': ['SENT']})
+        return json_response({'error': {'code': 404, 'message': f'Fake Gmail has no endpoint {request.path}'}}, status=404)
+
+
+class FakeOpenAI(FakeBackend):
+    """
+    Canned chat completions. JSON-mode requests get "{}"; other requests get
+    the last user message back. Set `reply` to a callable(body) -> str for
+    other canned answers.
+    """
+
+    name = 'openai'
+    reply = None
+
+    def handle(self, request):
+        if not request.path.endswith('/chat/completions'):
+            return json_response({'error': {'message': f'Fake OpenAI has no endpoint {request.path}'}}, status=404)
+        body = request.json()
+        content = self._content(body)
+        prompt_tokens = sum(len(str(m.get('content', ''))) for m in body.get('messages', [])) // 4 + 1
+        completion_tokens = len(content) // 4 + 1
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                 'total_tokens': prompt_tokens + completion_tokens}
+        completion_id = f'chatcmpl-fake-{uuid.uuid4().hex[:12]}'
+        base = {'id': completion_id, 'created': int(time.time()), 'model': body.get('model', 'fake')}
+
+        if not body.get('stream'):
+            return json_response({
+                **base,
+                'object': 'chat.completion',
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+                'usage': usage,
+            })
+
+        events = []
+        for start in range(0, len(content), 40):
+            events.append({**base, 'object': 'chat.completion.chunk', 'choices': [
+                {'index': 0, 'delta': {'content': content[start:start + 40]}, 'finish_reason': None},
+            ]})
+        events.append({**base, 'object': 'chat.completion.chunk', 'choices': [
+            {'index': 0, 'delta': {}, 'finish_reason': 'stop'},
+        ]})
+        if (body.get('stream_options') or {}).get('include_usage'):
+            events.append({**base, 'object': 'chat.completion.chunk', 'choices': [], 'usage': usage})
+        stream = ''.join(f'data: {json.dumps(event)}\n\n' for event in events) + 'data: [DONE]\n\n'
+        return FakeResponse(200, stream, content_type='text/event-stream')
+
+    def _content(self, body):
+        if self.reply is not None:
+            return self.reply(body)
+        if (body.get('response_format') or {}).get('type') == 'json_object':
+            return '{}'
+        messages = [m for m in body.get('messages', []) if m.get('role') == 'user']
+        return str(messages[-1].get('content', '')) if messages else ''
+
+    def error_response(self):
+        return json_response({'error': {'message': 'Injected openai failure', 'type': 'server_error'}}, status=503)
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (FakeS3(), FakeXero(), FakeSMSBroadcast(), FakeGmail(), FakeOpenAI())
+}
+
+
+def backend_for_host(host):
+    """The fake backend answering for `host`, or None for hosts left alone"""
+    return BACKENDS.get(integration_for_host(host))
+
+
+def dispatch(backend, request):
+    if faults.apply(backend.name):
+        return backend.error_response()
+    try:
+        return backend.handle(request)
+    except Exception as e:
+        logger.error(f"Fake {backend.name} backend failed on {request.method} {request.path}: {e}", exc_info=True)
+        return json_response({'error': f'Fake {backend.name} backend error: {e}'}, status=500)
+
+
+# ---------------------------------------------------------------------------
+# Transport hooks
+# ---------------------------------------------------------------------------
+
+def _patch_urllib3():
+    from urllib3.connectionpool import HTTPConnectionPool
+    from urllib3.response import HTTPResponse
+
+    original = HTTPConnectionPool.urlopen
+
+    @functools.wraps(original)
+    def urlopen(self, method, url, *args, **kwargs):
+        backend = backend_for_host(urlsplit(url).hostname or self.host)
+        if backend is None:
+            return original(self, method, url, *args, **kwargs)
+        body = kwargs.get('body', args[0] if args else None)
+        headers = kwargs.get('headers', args[1] if len(args) > 1 else None)
+        response = dispatch(backend, FakeRequest(method, self.host, url, headers, body))
+        return HTTPResponse(
+            body=io.BytesIO(response.body),
+            headers=response.headers,
+            status=response.status,
+            reason=REASONS.get(response.status, ''),
+            preload_content=kwargs.get('preload_content', True),
+            decode_content=kwargs.get('decode_content', True),
+            request_method=method,
+            request_url=url,
+        )
+
+    HTTPConnectionPool.urlopen = urlopen
+
+
+def _patch_httpx():
+    try:
+        import httpx
+    except ImportError:
+        return
+
+    original = httpx.Client.send
+
+    @functools.wraps(original)
+    def send(self, request, *args, **kwargs):
+        backend = backend_for_host(request.url.host)
+        if backend is None:
+            return original(self, request, *args, **kwargs)
+        fake_request = FakeRequest(request.method, request.url.host, str(request.url), request.headers, request.read())
+        response = dispatch(backend, fake_request)
+        return httpx.Response(response.status, headers=response.headers, content=response.body, request=request)
+
+    httpx.Client.send = send
+
+
+def configure(latency_ms=None, error_rate=None, seed=None):
+    """Set injected latency (ms) and error rate (0-1) per integration"""
+    faults.configure(latency_ms=latency_ms, error_rate=error_rate, seed=seed)
+
+
+def reset():
+    """Clear every backend's stored state and outbox"""
+    for backend in BACKENDS.values():
+        with backend._lock:
+            backend.reset()
+
+
+def install():
+    """
+    Route integration traffic to the fake backends for the rest of the
+    process. Called at startup when settings.FAKE_INTEGRATIONS is on.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        for name, value in FAKE_ENVIRONMENT.items():
+            os.environ.setdefault(name, value)
+        faults.configure(
+            latency_ms=getattr(settings, 'FAKE_INTEGRATIONS_LATENCY_MS', ''),
+            error_rate=getattr(settings, 'FAKE_INTEGRATIONS_ERROR_RATE', ''),
+        )
+        _patch_urllib3()
+        _patch_httpx()
+        _installed = True
+    logger.warning("⚠️ FAKE_INTEGRATIONS is on: Xero, SMS Broadcast, Gmail, S3 and OpenAI calls are answered in-process")
+
+
+def ensure_xero_connection():
+    """Active XeroConnection for the fake organisation (XeroService needs one)"""
+    from django.utils import timezone
+    from xero_integration.models import XeroConnection
+
+    connection, _ = XeroConnection.objects.get_or_create(
+        tenant_id=FakeXero.TENANT_ID,
+        defaults={
+            'tenant_name': FakeXero.TENANT_NAME,
+            'access_token': 'fake-xero-access',
+            'refresh_token': 'fake-xero-refresh',
+            'expires_at': timezone.now() + timedelta(days=3650),
+            'scopes': 'offline_access accounting.transactions accounting.contacts',
+        },
+    )
+    XeroConnection.objects.exclude(pk=connection.pk).update(is_active=False)
+    XeroConnection.objects.filter(pk=connection.pk).update(is_active=True)
+    return connection
+
+
+def ensure_gmail_connection(email=FakeGmail.ACCOUNT_EMAIL):
+    """Active primary GmailConnection for the fake account"""
+    from django.utils import timezone
+    from gmail_integration.models import GmailConnection
+
+    connection, _ = GmailConnection.objects.get_or_create(
+        email_address=email,
+        defaults={
+            'display_name': 'Fake Sender',
+            'access_token': 'fake-gmail-access',
+            'refresh_token': 'fake-gmail-refresh',
+            'expires_at': timezone.now() + timedelta(days=3650),
+            'scopes': 'https://www.googleapis.com/auth/gmail.send',
+            'is_primary': True,
+        },
+    )
+    return connection
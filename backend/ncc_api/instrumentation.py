@@ -0,0 +1,277 @@
+"""
+Request-level performance instrumentation
+
+RequestInstrumentationMiddleware records, for every request:
+
+- wall time
+- DB query count and time (all database connections)
+- outbound HTTP call count and time, per integration (Xero, Gmail,
+  SMS Broadcast, S3, OpenAI, other)
+- response size
+
+and logs them as one structured JSON line on the 'ncc_api.requests' logger
+(python-json-logger formatter, see LOGGING in settings), and feeds the
+Prometheus metrics in ncc_api/metrics.py. With DEBUG on, a Server-Timing
+header is added so the breakdown shows up in the browser's network panel.
+
+Outbound HTTP is measured by wrapping urllib3's connection pool (used by
+requests, xero-python and boto3) and httpx (used by openai). The hooks are
+installed from NccApiConfig.ready(), so they also cover management
+commands and background threads that never pass through the middleware.
+Calls are attributed to the request through a context variable, so work
+handed to background threads is not counted against the request (it is
+still counted in the process-wide integration metrics).
+"""
+import contextvars
+import functools
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('ncc_api.requests')
+
+# Host suffix → integration name used in logs and metrics
+INTEGRATION_HOSTS = [
+    ('xero.com', 'xero'),
+    ('googleapis.com', 'gmail'),
+    ('smsbroadcast.com.au', 'sms_broadcast'),
+    ('amazonaws.com', 's3'),
+    ('openai.com', 'openai'),
+]
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+# Set while inside an instrumented HTTP call, so urllib3's internal retries
+# and redirects (recursive urlopen calls) are not counted twice
+_in_http_call = contextvars.ContextVar('in_http_call', default=False)
+
+_hooks_installed = False
+_hooks_lock = threading.Lock()
+
+
+def integration_for_host(host):
+    host = (host or '').lower()
+    for suffix, name in INTEGRATION_HOSTS:
+        if host == suffix or host.endswith('.' + suffix):
+            return name
+    return 'other'
+
+
+class RequestMetrics:
+    """Counters for one request"""
+
+    __slots__ = ('started', 'db_queries', 'db_ms', 'http')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_ms = 0.0
+        self.http = {}  # integration -> [calls, ms, errors]
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def add_http(self, integration, ms, error=False):
+        entry = self.http.setdefault(integration, [0, 0.0, 0])
+        entry[0] += 1
+        entry[1] += ms
+        if error:
+            entry[2] += 1
+
+    @property
+    def http_calls(self):
+        return sum(entry[0] for entry in self.http.values())
+
+    @property
+    def http_ms(self):
+        return sum(entry[1] for entry in self.http.values())
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_ms += (time.perf_counter() - started) * 1000
+
+
+def current_metrics():
+    """RequestMetrics of the request being handled in this context, or None"""
+    return _current.get()
+
+
+def record_http_call(host, started, error=False):
+    """
+    Record an outbound HTTP call that began at `started` (perf_counter):
+    always in the process metrics, and against the current request if any
+    """
+    from . import metrics as process_metrics
+
+    seconds = time.perf_counter() - started
+    integration = integration_for_host(host)
+    process_metrics.observe('ncc_integration_request_duration_seconds', seconds, integration=integration)
+    if error:
+        process_metrics.inc('ncc_integration_errors_total', integration=integration)
+
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_http(integration, seconds * 1000, error)
+
+
+# ---------------------------------------------------------------------------
+# Outbound HTTP hooks
+# ---------------------------------------------------------------------------
+
+def _wrap_urllib3():
+    from urllib3.connectionpool import HTTPConnectionPool
+
+    original = HTTPConnectionPool.urlopen
+
+    @functools.wraps(original)
+    def urlopen(self, method, url, *args, **kwargs):
+        if _in_http_call.get():
+            return original(self, method, url, *args, **kwargs)
+        token = _in_http_call.set(True)
+        started = time.perf_counter()
+        error = True
+        try:
+            response = original(self, method, url, *args, **kwargs)
+            error = response.status >= 500
+            return response
+        finally:
+            _in_http_call.reset(token)
+            record_http_call(self.host, started, error)
+
+    HTTPConnectionPool.urlopen = urlopen
+
+
+def _wrap_httpx():
+    try:
+        import httpx
+    except ImportError:
+        return
+
+    original = httpx.Client.send
+
+    @functools.wraps(original)
+    def send(self, request, *args, **kwargs):
+        if _in_http_call.get():
+            return original(self, request, *args, **kwargs)
+        token = _in_http_call.set(True)
+        started = time.perf_counter()
+        error = True
+        try:
+            response = original(self, request, *args, **kwargs)
+            error = response.status_code >= 500
+            return response
+        finally:
+            _in_http_call.reset(token)
+            record_http_call(request.url.host, started, error)
+
+    httpx.Client.send = send
+
+
+def install_http_hooks():
+    """Wrap the HTTP client libraries once per process"""
+    global _hooks_installed
+    with _hooks_lock:
+        if _hooks_installed:
+            return
+        _wrap_urllib3()
+        _wrap_httpx()
+        _hooks_installed = True
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+def _response_size(response):
+    if getattr(response, 'streaming', False):
+        length = response.get('Content-Length')
+        return int(length) if length and length.isdigit() else None
+    return len(response.content)
+
+
+def _route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return match.view_name or match.route
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Log per-request timing, DB and outbound HTTP usage as structured JSON.
+    Add it first in MIDDLEWARE so the timing covers the whole stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics.db_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        duration_ms = metrics.elapsed_ms()
+        self.log(request, response, metrics, duration_ms)
+        self.record(request, response, metrics, duration_ms)
+        if settings.DEBUG:
+            response['Server-Timing'] = self.server_timing(metrics, duration_ms)
+        return response
+
+    def log(self, request, response, metrics, duration_ms):
+        user = getattr(request, 'user', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': _route_name(request),
+            'status': response.status_code,
+            'duration_ms': round(duration_ms, 1),
+            'db_queries': metrics.db_queries,
+            'db_ms': round(metrics.db_ms, 1),
+            'http_calls': metrics.http_calls,
+            'http_ms': round(metrics.http_ms, 1),
+            'http': {
+                name: {'calls': calls, 'ms': round(ms, 1), 'errors': errors}
+                for name, (calls, ms, errors) in metrics.http.items()
+            },
+            'response_bytes': _response_size(response),
+            'user_id': user.pk if user is not None and user.is_authenticated else None,
+        }
+        logger.info('request', extra=record)
+
+    @staticmethod
+    def record(request, response, metrics, duration_ms):
+        """Feed the Prometheus metrics (ncc_api/metrics.py)"""
+        from . import metrics as process_metrics
+
+        # Unresolved paths (404s, scanners) share one label to bound cardinality
+        route = _route_name(request) or 'unmatched'
+        process_metrics.observe(
+            'ncc_http_request_duration_seconds', duration_ms / 1000, route=route, method=request.method,
+        )
+        process_metrics.inc(
+            'ncc_http_requests_total', route=route, method=request.method, status=f'{response.status_code // 100}xx',
+        )
+        process_metrics.inc('ncc_db_queries_total', metrics.db_queries, route=route)
+
+    @staticmethod
+    def server_timing(metrics, duration_ms):
+        parts = [
+            f'app;dur={duration_ms:.1f}',
+            f'db;dur={metrics.db_ms:.1f};desc="{metrics.db_queries} queries"',
+        ]
+        for name, (calls, ms, _errors) in metrics.http.items():
+            parts.append(f'{name};dur={ms:.1f};desc="{calls} calls"')
+        return ', '.join(parts)
@@ -0,0 +1,75 @@
+"""
+Manage API keys for scripts and integrations
+
+Usage:
+    python manage.py api_keys create <username> "<name>" [--expires-days 365]
+    python manage.py api_keys list [--all]
+    python manage.py api_keys revoke <prefix>
+
+Clients send the key as "Authorization: Api-Key <key>".
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ncc_api.models import APIKey
+
+
+class Command(BaseCommand):
+    help = 'Create, list and revoke API keys'
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest='action', required=True)
+
+        create = subparsers.add_parser('create', help='Create a key (printed once)')
+        create.add_argument('username', help='User the key acts as')
+        create.add_argument('name', help="What the key is for, e.g. 'FileMaker sync'")
+        create.add_argument('--expires-days', type=int, help='Expire the key after this many days')
+
+        listing = subparsers.add_parser('list', help='List keys')
+        listing.add_argument('--all', action='store_true', help='Include revoked keys')
+
+        revoke = subparsers.add_parser('revoke', help='Revoke a key by its prefix')
+        revoke.add_argument('prefix', help='First characters of the key (shown by list)')
+
+    def handle(self, *args, **options):
+        getattr(self, f"_{options['action']}")(options)
+
+    def _create(self, options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User not found: {options['username']}")
+        expires_at = None
+        if options['expires_days']:
+            expires_at = timezone.now() + timedelta(days=options['expires_days'])
+
+        api_key, raw_key = APIKey.create_key(user, options['name'], expires_at=expires_at)
+        self.stdout.write(self.style.SUCCESS(f"✅ Created API key '{api_key.name}' for {user.username}"))
+        self.stdout.write(f"\n   {raw_key}\n")
+        self.stdout.write(self.style.WARNING("⚠️  Store it now - it cannot be shown again."))
+
+    def _list(self, options):
+        keys = APIKey.objects.select_related('user')
+        if not options['all']:
+            keys = keys.filter(revoked_at__isnull=True)
+        if not keys:
+            self.stdout.write("No API keys")
+            return
+        for api_key in keys:
+            status = 'revoked' if api_key.revoked_at else ('active' if api_key.is_valid else 'expired')
+            last_used = api_key.last_used_at.strftime('%Y-%m-%d %H:%M') if api_key.last_used_at else 'never'
+            self.stdout.write(
+                f"   {api_key.prefix}  {api_key.name:<30} {api_key.user.username:<20} {status:<8} last used {last_used}"
+            )
+
+    def _revoke(self, options):
+        keys = list(APIKey.objects.filter(prefix=options['prefix'], revoked_at__isnull=True))
+        if not keys:
+            raise CommandError(f"No active API key with prefix {options['prefix']}")
+        if len(keys) > 1:
+            raise CommandError(f"{len(keys)} keys share prefix {options['prefix']}; revoke them in the admin")
+        keys[0].revoke()
+        self.stdout.write(self.style.SUCCESS(f"✅ Revoked API key '{keys[0].name}'"))
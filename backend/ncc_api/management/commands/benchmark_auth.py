@@ -0,0 +1,123 @@
+"""
+Benchmark per-request authentication overhead
+
+Times what each authentication path costs a request, before the view runs:
+
+- basic: DRF BasicAuthentication (PBKDF2 password hash every request)
+- api_key_uncached / api_key_cached: APIKeyAuthentication on a cache miss / hit
+- session_db / session_cached_db: loading the session and its user with the
+  old database session engine / the cached_db engine now configured
+
+Everything runs in a transaction that is rolled back.
+
+    python manage.py benchmark_auth --iterations 50
+"""
+import base64
+import statistics
+import time
+from importlib import import_module
+
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user, get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import BasicAuthentication
+
+from ncc_api.authentication import CACHE_PREFIX, APIKeyAuthentication
+from ncc_api.models import APIKey
+
+PASSWORD = 'benchmark-password'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-request authentication overhead (Basic, API key, sessions)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Timed runs per scenario (default: 50)')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+
+        self.stdout.write("=" * 70)
+        self.stdout.write("🔐 Authentication Benchmarks")
+        self.stdout.write("=" * 70)
+
+        with transaction.atomic():
+            results = self._run(options['iterations'])
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"\n{'scenario':<22} {'p50 ms':>9} {'mean ms':>9} {'queries':>8}")
+        for name, result in results.items():
+            self.stdout.write(f"{name:<22} {result['p50_ms']:>9.3f} {result['mean_ms']:>9.3f} {result['queries']:>8}")
+
+        self.stdout.write("\n" + "=" * 70)
+        self.stdout.write("📊 SUMMARY")
+        self.stdout.write("=" * 70)
+        for before, after in (('basic', 'api_key_cached'), ('session_db', 'session_cached_db')):
+            speedup = results[before]['p50_ms'] / max(results[after]['p50_ms'], 0.001)
+            self.stdout.write(
+                f"{before} -> {after}: {results[before]['p50_ms']:.3f}ms -> {results[after]['p50_ms']:.3f}ms "
+                f"({speedup:.0f}x), queries {results[before]['queries']} -> {results[after]['queries']}"
+            )
+
+    def _run(self, iterations):
+        user = get_user_model().objects.create_user(username='benchmark-auth', password=PASSWORD)
+        api_key, raw_key = APIKey.create_key(user, 'Benchmark')
+        factory = RequestFactory()
+
+        basic = BasicAuthentication()
+        basic_request = factory.get('/', HTTP_AUTHORIZATION=_basic_header(user.username, PASSWORD))
+        key_auth = APIKeyAuthentication()
+        key_request = factory.get('/', HTTP_AUTHORIZATION=f'Api-Key {raw_key}')
+
+        def api_key_uncached():
+            cache.delete(CACHE_PREFIX + api_key.key_hash)
+            key_auth.authenticate(key_request)
+
+        results = {
+            'basic': _measure(lambda: basic.authenticate(basic_request), iterations),
+            'api_key_uncached': _measure(api_key_uncached, iterations),
+            'api_key_cached': _measure(lambda: key_auth.authenticate(key_request), iterations),
+        }
+        for name, engine in (
+            ('session_db', 'django.contrib.sessions.backends.db'),
+            ('session_cached_db', 'django.contrib.sessions.backends.cached_db'),
+        ):
+            store_class = import_module(engine).SessionStore
+            session = store_class()
+            session[SESSION_KEY] = str(user.pk)
+            session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+            session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+            session.save()
+
+            def load_session(session_key=session.session_key, store_class=store_class):
+                request = factory.get('/')
+                request.session = store_class(session_key)
+                return get_user(request)
+
+            results[name] = _measure(load_session, iterations)
+        return results
+
+
+def _basic_header(username, password):
+    return 'Basic ' + base64.b64encode(f'{username}:{password}'.encode()).decode()
+
+
+def _measure(operation, iterations):
+    operation()  # warm up (fills caches)
+    timings = []
+    queries = 0
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            operation()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, len(captured.captured_queries))
+    return {
+        'p50_ms': statistics.median(timings),
+        'mean_ms': statistics.fmean(timings),
+        'queries': queries,
+    }
@@ -0,0 +1,113 @@
+"""
+Benchmark the hot API endpoints and gate on regressions.
+
+Needs the synthetic dataset and the fake integrations (nothing is sent to
+Xero, Gmail, SMS Broadcast, S3 or OpenAI):
+
+    python manage.py seed_load_test_data
+    FAKE_INTEGRATIONS=true python manage.py benchmark_endpoints --update-baseline
+    ... change code ...
+    FAKE_INTEGRATIONS=true python manage.py benchmark_endpoints
+
+Exits with an error when any scenario makes more queries than the baseline,
+or its p50 latency or peak memory grows by more than --threshold.
+"""
+import json
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from ncc_api import benchmarks
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark hot endpoints (latency, queries, memory) against a JSON baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per scenario (default: 20)')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per scenario first (default: 2)')
+        parser.add_argument('--only', nargs='+', help='Only run these scenarios')
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE, help=f'Baseline JSON (default: {DEFAULT_BASELINE})')
+        parser.add_argument('--update-baseline', action='store_true', help='Write the results as the new baseline')
+        parser.add_argument(
+            '--threshold', type=float, default=benchmarks.DEFAULT_THRESHOLD,
+            help=f'Allowed relative p50/memory increase (default: {benchmarks.DEFAULT_THRESHOLD})',
+        )
+        parser.add_argument('--output', help='Also write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        if not settings.FAKE_INTEGRATIONS:
+            raise CommandError('Benchmarks send email and call integrations; run with FAKE_INTEGRATIONS=true')
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+
+        self.stdout.write("=" * 70)
+        self.stdout.write("⏱️  Endpoint Benchmarks")
+        self.stdout.write("=" * 70)
+
+        try:
+            scenarios = benchmarks.build_scenarios(benchmarks.load_fixtures())
+        except benchmarks.BenchmarkError as e:
+            raise CommandError(str(e))
+        if options['only']:
+            unknown = set(options['only']) - {scenario['name'] for scenario in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+            scenarios = [scenario for scenario in scenarios if scenario['name'] in options['only']]
+
+        user, _ = User.objects.get_or_create(username='benchmark', defaults={'is_staff': True})
+        client = Client()
+        client.force_login(user)
+
+        results = {}
+        self.stdout.write(f"\n{'scenario':<28} {'p50 ms':>9} {'p95 ms':>9} {'cold ms':>9} {'queries':>8} {'peak KB':>9}")
+        for scenario in scenarios:
+            try:
+                result = benchmarks.run_scenario(client, scenario, options['iterations'], options['warmup'])
+            except benchmarks.BenchmarkError as e:
+                raise CommandError(str(e))
+            results[scenario['name']] = result
+            self.stdout.write(
+                f"{scenario['name']:<28} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['cold_ms']:>9.1f} "
+                f"{result['queries']:>8} {result['peak_kb']:>9.0f}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'environment': benchmarks.environment(), 'results': results}, f, indent=2, sort_keys=True)
+
+        if options['update_baseline']:
+            baseline = {}
+            if os.path.exists(options['baseline']):
+                baseline = benchmarks.load_baseline(options['baseline'])['results']
+            baseline.update(results)
+            benchmarks.save_baseline(options['baseline'], baseline)
+            self.stdout.write(self.style.SUCCESS(f"\n✅ Baseline written to {options['baseline']}"))
+            return
+
+        if not os.path.exists(options['baseline']):
+            self.stdout.write(self.style.WARNING(
+                f"\n⚠️  No baseline at {options['baseline']} - run with --update-baseline to record one"
+            ))
+            return
+
+        baseline = benchmarks.load_baseline(options['baseline'])
+        recorded = baseline.get('environment', {})
+        self.stdout.write("\n" + "=" * 70)
+        self.stdout.write("📊 SUMMARY")
+        self.stdout.write("=" * 70)
+        self.stdout.write(
+            f"Baseline: {recorded.get('recorded_at', '?')} "
+            f"({recorded.get('database', '?')}, {recorded.get('patients', '?')} patients)"
+        )
+        regressions = benchmarks.compare(results, baseline.get('results', {}), options['threshold'])
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(f"   ✗ {regression}"))
+            raise CommandError(f"{len(regressions)} benchmark regression(s)")
+        self.stdout.write(self.style.SUCCESS("✅ No regressions"))
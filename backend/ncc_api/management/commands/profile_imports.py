@@ -0,0 +1,162 @@
+"""
+Profile worker cold start.
+
+Starts fresh Python processes that do what a gunicorn worker does on boot
+(import ncc_api.wsgi) and then serve one request (which imports the
+URLconf and every view module), and reports:
+
+- boot and first-request time (median of --runs processes)
+- a `python -X importtime` summary: import time per project app, including
+  the third-party packages each app pulled in, and the slowest packages
+
+    python manage.py profile_imports
+    python manage.py profile_imports --runs 5 --path /api/patients/ --json imports.json
+
+Integration SDKs (xero_python, openai, boto3, pypdf, reportlab, PIL) should
+not appear here: they are imported on first use.
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in the child process; prints timings as JSON on the last stdout line
+CHILD_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+from ncc_api.wsgi import application
+booted = time.perf_counter()
+from django.test import Client
+client = Client()
+requested = time.perf_counter()
+response = client.get(sys.argv[1])
+finished = time.perf_counter()
+print(json.dumps({
+    'boot_ms': (booted - started) * 1000,
+    'first_request_ms': (finished - requested) * 1000,
+    'status': response.status_code,
+    'modules': len(sys.modules),
+}))
+'''
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+class Command(BaseCommand):
+    help = 'Profile worker boot and first-request time with python -X importtime'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='Processes to time (default: 3)')
+        parser.add_argument('--path', default='/api/metrics/', help='First request path (default: /api/metrics/)')
+        parser.add_argument('--top', type=int, default=15, help='Packages to list (default: 15)')
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this JSON file')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1')
+
+        self.stdout.write("=" * 70)
+        self.stdout.write("🚀 Cold Start Profile")
+        self.stdout.write("=" * 70)
+
+        runs = [self._run_child(options['path'])[0] for _ in range(options['runs'])]
+        timings, importtime = self._run_child(options['path'], importtime=True)
+        rows = parse_importtime(importtime)
+        per_app, pulled_in = attribute_to_apps(rows, project_packages())
+        packages = defaultdict(int)
+        for self_us, _cumulative, _depth, name in rows:
+            packages[name.split('.')[0]] += self_us
+
+        boot_ms = statistics.median(run['boot_ms'] for run in runs)
+        first_request_ms = statistics.median(run['first_request_ms'] for run in runs)
+
+        self.stdout.write("\n📦 Import time per app (including the packages it imported first)")
+        for app, total_us in sorted(per_app.items(), key=lambda item: -item[1]):
+            heaviest = sorted(pulled_in[app].items(), key=lambda item: -item[1])[:3]
+            extras = ', '.join(f"{name} {us / 1000:.0f}ms" for name, us in heaviest if us >= 5000)
+            self.stdout.write(f"   {app:<28} {total_us / 1000:>8.1f}ms   {extras}")
+
+        self.stdout.write("\n🐢 Slowest packages (self time)")
+        for name, total_us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"   {name:<28} {total_us / 1000:>8.1f}ms")
+
+        self.stdout.write("\n" + "=" * 70)
+        self.stdout.write("📊 SUMMARY")
+        self.stdout.write("=" * 70)
+        self.stdout.write(f"Worker boot:        {boot_ms:.0f}ms (median of {len(runs)})")
+        self.stdout.write(f"First request:      {first_request_ms:.0f}ms (GET {options['path']} -> {timings['status']})")
+        self.stdout.write(f"Modules loaded:     {timings['modules']}")
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as f:
+                json.dump({
+                    'boot_ms': round(boot_ms, 1),
+                    'first_request_ms': round(first_request_ms, 1),
+                    'modules': timings['modules'],
+                    'apps_ms': {app: round(us / 1000, 1) for app, us in per_app.items()},
+                    'packages_ms': {name: round(us / 1000, 1) for name, us in packages.items()},
+                }, f, indent=2, sort_keys=True)
+
+    def _run_child(self, path, importtime=False):
+        command = [sys.executable]
+        if importtime:
+            command += ['-X', 'importtime']
+        command += ['-c', CHILD_SCRIPT, path]
+        result = subprocess.run(
+            command, cwd=settings.BASE_DIR, env=os.environ.copy(),
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Profiling process failed:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def project_packages():
+    """Top-level packages of the apps that live in this repository"""
+    base_dir = str(settings.BASE_DIR)
+    return {
+        config.name.split('.')[0] for config in apps.get_app_configs()
+        if config.path.startswith(base_dir)
+    } | {'ncc_api'}
+
+
+def parse_importtime(stderr):
+    """[(self_us, cumulative_us, depth, module)] in the order Python reported them"""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((int(match[1]), int(match[2]), len(match[3]) // 2, match[4]))
+    return rows
+
+
+def attribute_to_apps(rows, packages):
+    """
+    Charge each module's self time to the nearest project app above it in the
+    import tree. Returns ({app: us}, {app: {third_party_package: us}}).
+
+    -X importtime reports children before their parent, so walking the rows
+    backwards visits every parent before its children.
+    """
+    per_app = defaultdict(int)
+    pulled_in = defaultdict(lambda: defaultdict(int))
+    stack = []  # (depth, owning app)
+    for self_us, _cumulative, depth, name in reversed(rows):
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        top = name.split('.')[0]
+        owner = top if top in packages else (stack[-1][1] if stack else None)
+        stack.append((depth, owner))
+        if owner is None:
+            continue
+        per_app[owner] += self_us
+        if top not in packages and top not in sys.stdlib_module_names:
+            pulled_in[owner][top] += self_us
+    return per_app, pulled_in
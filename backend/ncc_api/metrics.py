@@ -0,0 +1,242 @@
+"""
+Prometheus metrics for WalkEasy Nexus
+
+Counters and histograms are kept in memory per process and written to
+METRICS_DIR (one JSON file per process, at most every FLUSH_INTERVAL
+seconds and on every scrape). GET /api/metrics/ merges every process's
+file, so the numbers cover all gunicorn workers on the instance, including
+workers that have since been recycled. Queue depths are read from the
+database at scrape time.
+
+Recording:
+    from ncc_api import metrics
+    metrics.inc('ncc_sms_total', status='sent')
+    metrics.observe('ncc_integration_request_duration_seconds', 0.12, integration='xero')
+
+Request latency, status and DB query counters are recorded by
+RequestInstrumentationMiddleware; outbound integration calls by the HTTP
+hooks in ncc_api/instrumentation.py, which are installed in every process
+(web workers, management commands, batch threads). Short-lived processes
+such as process_at_report_batches flush once more when they exit.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 5  # seconds
+# Files of processes that have not written for this long are removed
+RETENTION_SECONDS = 60 * 60 * 24 * 7
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# name -> (type, help). Metrics must be declared here to be exported.
+METRICS = {
+    'ncc_http_request_duration_seconds': ('histogram', 'Request latency by URL name'),
+    'ncc_http_requests_total': ('counter', 'Requests by URL name, method and status class'),
+    'ncc_db_queries_total': ('counter', 'Database queries by URL name'),
+    'ncc_integration_request_duration_seconds': ('histogram', 'Outbound HTTP call latency by integration'),
+    'ncc_integration_errors_total': ('counter', 'Outbound HTTP calls that failed or returned 5xx, by integration'),
+    'ncc_sms_total': ('counter', 'SMS Broadcast sends by outcome'),
+    'ncc_emails_total': ('counter', 'Gmail sends by outcome'),
+    'ncc_s3_presigned_urls_total': ('counter', 'S3 presigned URLs generated'),
+    'ncc_openai_tokens_total': ('counter', 'OpenAI tokens used by kind and token type'),
+    'ncc_queue_depth': ('gauge', 'Items waiting or in progress per background queue'),
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class MetricsRegistry:
+    """In-process counters/histograms, flushed to a per-process file"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, label_key) -> float
+        self._histograms = {}  # (name, label_key) -> [bucket counts..., +Inf count, sum]
+        self._last_flush = 0.0
+        self._path = None
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._maybe_flush()
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    entry[index] += 1
+            entry[len(LATENCY_BUCKETS)] += 1  # +Inf / count
+            entry[-1] += value
+        self._maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, list(labels), list(entry)] for (name, labels), entry in self._histograms.items()],
+            }
+
+    # Shared-file persistence
+
+    @staticmethod
+    def directory():
+        return getattr(settings, 'METRICS_DIR', None) or os.path.join('/tmp', 'ncc-metrics')
+
+    def _file_path(self):
+        # pid + start time, so a reused pid never overwrites a dead worker's totals
+        if self._path is None:
+            self._path = os.path.join(self.directory(), f'{os.getpid()}-{int(time.time() * 1000)}.json')
+        return self._path
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        try:
+            path = self._file_path()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics file: {e}")
+
+    def flush_at_exit(self):
+        # Commands like `check` record nothing; don't leave empty files behind
+        with self._lock:
+            recorded = bool(self._counters or self._histograms)
+        if recorded:
+            self.flush()
+
+    def reset(self):
+        """Clear this process's metrics (tests/benchmarks)"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush_at_exit)
+
+
+def inc(name, amount=1, **labels):
+    """Add to a counter"""
+    if amount:
+        registry.inc(name, amount, **labels)
+
+
+def observe(name, value, **labels):
+    """Record a histogram observation (seconds)"""
+    registry.observe(name, value, **labels)
+
+
+# ---------------------------------------------------------------------------
+# Collection and exposition
+# ---------------------------------------------------------------------------
+
+def collect():
+    """Merge the metrics files of every process. Returns (counters, histograms)."""
+    registry.flush()
+    counters = {}
+    histograms = {}
+    now = time.time()
+    for path in glob.glob(os.path.join(registry.directory(), '*.json')):
+        try:
+            if now - os.path.getmtime(path) > RETENTION_SECONDS:
+                os.remove(path)
+                continue
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue  # removed or being replaced by its owner
+        for name, labels, value in data.get('counters', []):
+            key = (name, tuple(tuple(label) for label in labels))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, entry in data.get('histograms', []):
+            key = (name, tuple(tuple(label) for label in labels))
+            merged = histograms.get(key)
+            histograms[key] = list(entry) if merged is None else [a + b for a, b in zip(merged, entry)]
+    return counters, histograms
+
+
+def queue_depths():
+    """Current depth of the background work queues, from the database"""
+    from ai_services.models import ATReportBatchItem
+    from invoices.models import InvoiceEmailBatchItem
+    from sms_integration.models import SMSMessage
+
+    depths = {}
+    try:
+        depths['at_report_batch'] = ATReportBatchItem.objects.filter(
+            status__in=ATReportBatchItem.ACTIVE_STATUSES
+        ).count()
+        depths['invoice_email_batch'] = InvoiceEmailBatchItem.objects.filter(
+            status__in=InvoiceEmailBatchItem.ACTIVE_STATUSES
+        ).count()
+        depths['sms_pending'] = SMSMessage.objects.filter(status='pending').count()
+    except Exception as e:
+        logger.warning(f"Could not read queue depths: {e}")
+    return depths
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render():
+    """All metrics in Prometheus text exposition format (0.0.4)"""
+    counters, histograms = collect()
+    gauges = {('ncc_queue_depth', (('queue', queue),)): depth for queue, depth in queue_depths().items()}
+
+    lines = []
+    for name, (metric_type, help_text) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        if metric_type == 'histogram':
+            for (metric, labels), entry in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for index, bound in enumerate(LATENCY_BUCKETS):
+                    lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {entry[index]}')
+                count = entry[len(LATENCY_BUCKETS)]
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(entry[-1])}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        else:
+            values = counters if metric_type == 'counter' else gauges
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
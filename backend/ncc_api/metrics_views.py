@@ -0,0 +1,25 @@
+"""
+Prometheus metrics endpoint
+"""
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+
+from . import metrics
+
+
+def prometheus_metrics(request):
+    """
+    GET /api/metrics/ - all workers' metrics in Prometheus text format
+
+    Scrapers authenticate with `Authorization: Bearer <METRICS_TOKEN>`;
+    logged-in staff users can also view it.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+    token_ok = bool(token) and hmac.compare_digest(auth_header, f'Bearer {token}')
+    if not token_ok and not (request.user.is_authenticated and request.user.is_staff):
+        return JsonResponse({'error': 'Metrics require a metrics token or staff login'}, status=401)
+
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
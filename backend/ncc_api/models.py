@@ -0,0 +1,76 @@
+"""
+Project-level models
+
+Stores:
+- API keys for machine clients (scripts, integrations); see
+  ncc_api/authentication.py
+"""
+import hashlib
+import secrets
+import uuid
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+API_KEY_PREFIX_LENGTH = 8
+
+
+def hash_api_key(raw_key):
+    """
+    SHA-256 of a raw key. Keys are 256-bit random tokens, so a fast hash is
+    safe here - unlike passwords, they cannot be guessed from a dictionary.
+    """
+    return hashlib.sha256(raw_key.encode()).hexdigest()
+
+
+class APIKey(models.Model):
+    """
+    An API key acting as `user`. Only the hash is stored; the raw key is
+    shown once, when it is created.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='api_keys')
+    name = models.CharField(max_length=100, help_text="What the key is used for, e.g. 'FileMaker sync'")
+    prefix = models.CharField(max_length=API_KEY_PREFIX_LENGTH, help_text="First characters of the key, to identify it")
+    key_hash = models.CharField(max_length=64, unique=True, help_text="SHA-256 of the key")
+
+    # Status
+    expires_at = models.DateTimeField(null=True, blank=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    # Audit
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'api_keys'
+        ordering = ['-created_at']
+        verbose_name = 'API key'
+
+    def __str__(self):
+        return f"{self.name} ({self.prefix}…)"
+
+    @classmethod
+    def create_key(cls, user, name, expires_at=None):
+        """Create a key for `user`. Returns (api_key, raw_key)."""
+        raw_key = secrets.token_urlsafe(32)
+        api_key = cls.objects.create(
+            user=user,
+            name=name,
+            prefix=raw_key[:API_KEY_PREFIX_LENGTH],
+            key_hash=hash_api_key(raw_key),
+            expires_at=expires_at,
+        )
+        return api_key, raw_key
+
+    @property
+    def is_valid(self):
+        if self.revoked_at:
+            return False
+        return self.expires_at is None or self.expires_at > timezone.now()
+
+    def revoke(self):
+        self.revoked_at = timezone.now()
+        self.save(update_fields=['revoked_at'])
@@ -53,6 +53,7 @@ INSTALLED_APPS = [
     'allauth.socialaccount',
     'allauth.socialaccount.providers.google',
     # Project apps
+    'ncc_api',  # Project-wide management commands, offline integration stand-ins
     'patients',
     'appointments',
     'clinicians',
@@ -73,9 +74,12 @@ INSTALLED_APPS = [
     'companies',  # Medical practices, NDIS providers
     'contacts',  # General contacts and contact relationships
     'data_management',  # Data management and FileMaker reimport
+    'search',  # Unified search index (notes, letters, SMS, documents)
+    'sync',  # Change feed for offline-capable clients
 ]
 
 MIDDLEWARE = [
+    'ncc_api.instrumentation.RequestInstrumentationMiddleware',  # Per-request timing/DB/HTTP JSON logs (first, to time everything)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -119,6 +123,74 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Local memory in development and tests (pure Python, no server needed).
+# settings_production.py switches to a backend shared by all gunicorn workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ncc-default',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    }
+}
+
+
+# Sessions
+# Read from the cache, written through to the database, so an authenticated
+# request no longer queries the session table.
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
+# Logging
+# Per-request performance records (ncc_api/instrumentation.py) are emitted
+# as JSON lines; other loggers keep Django's defaults.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'pythonjsonlogger.jsonlogger.JsonFormatter',
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'json_console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'ncc_api.requests': {
+            'handlers': ['json_console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
+# Prometheus metrics (/api/metrics/, see ncc_api/metrics.py)
+# Each worker writes its counters to a file in METRICS_DIR; the endpoint
+# merges them. Scrapers send "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_DIR = os.getenv('METRICS_DIR', '/tmp/ncc-metrics')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Offline integration stand-ins (see ncc_api/fake_backends.py)
+# FAKE_INTEGRATIONS=true answers Xero, SMS Broadcast, Gmail, S3 and OpenAI
+# calls in-process. Latency/error injection per integration, e.g.
+# FAKE_INTEGRATIONS_LATENCY_MS="xero=250,*=20", FAKE_INTEGRATIONS_ERROR_RATE="s3=0.05"
+FAKE_INTEGRATIONS = os.getenv('FAKE_INTEGRATIONS', 'false').lower() in ('1', 'true', 'yes')
+FAKE_INTEGRATIONS_LATENCY_MS = os.getenv('FAKE_INTEGRATIONS_LATENCY_MS', '')
+FAKE_INTEGRATIONS_ERROR_RATE = os.getenv('FAKE_INTEGRATIONS_ERROR_RATE', '')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -191,13 +263,21 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',  # For browser-based auth
-        'rest_framework.authentication.BasicAuthentication',  # Fallback
+        'ncc_api.authentication.APIKeyAuthentication',  # Scripts/integrations: "Authorization: Api-Key <key>"
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',  # ✅ SECURITY: Require authentication for all API endpoints
     ],
 }
 
+# Basic auth hashes the password (PBKDF2) on every request; use API keys
+# instead. Set API_BASIC_AUTH=true to accept it for clients not yet migrated.
+if os.getenv('API_BASIC_AUTH', 'false').lower() in ('1', 'true', 'yes'):
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'].append('rest_framework.authentication.BasicAuthentication')
+
+# Seconds an API key lookup stays cached (ncc_api/authentication.py)
+API_KEY_CACHE_TIMEOUT = int(os.getenv('API_KEY_CACHE_TIMEOUT', '300'))
+
 # Django Allauth Configuration
 SITE_ID = 1  # Required for allauth
 
@@ -11,6 +11,7 @@ from .settings import *
 # Environment
 DEBUG = False
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'production')
+FAKE_INTEGRATIONS = False  # Never answer integration calls in-process in production
 
 # Security
 SECRET_KEY = os.getenv('SECRET_KEY')  # From Secret Manager
@@ -113,6 +114,7 @@ CORS_ALLOW_CREDENTIALS = True
 
 # Override middleware to remove CommonMiddleware (prevents trailing slash redirect loops)
 MIDDLEWARE = [
+    'ncc_api.instrumentation.RequestInstrumentationMiddleware',  # Per-request timing/DB/HTTP JSON logs (first, to time everything)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -128,10 +130,28 @@ MIDDLEWARE = [
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'pythonjsonlogger.jsonlogger.JsonFormatter',
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
         },
+        'json_console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        # Per-request performance records (Cloud Logging parses JSON lines)
+        'ncc_api.requests': {
+            'handlers': ['json_console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
     'root': {
         'handlers': ['console'],
@@ -139,11 +159,28 @@ LOGGING = {
     },
 }
 
-# Cache (optional - for future)
-# CACHES = {
-#     'default': {
-#         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
-#         'LOCATION': 'redis://redis:6379/0',
-#     }
-# }
-
+# Cache - shared across gunicorn workers
+# CACHE_URL=redis://host:6379/0 uses Redis (Memorystore); otherwise fall back
+# to a file-based cache in the container's /tmp, shared by workers on the instance
+CACHE_URL = os.getenv('CACHE_URL')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'TIMEOUT': 300,
+            'KEY_PREFIX': 'ncc',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', '/tmp/ncc-cache'),
+            'TIMEOUT': 300,
+            'KEY_PREFIX': 'ncc',
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
+        }
+    }
@@ -0,0 +1,24 @@
+"""
+Signal handlers that drop cached API key lookups (ncc_api/authentication.py)
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+
+from . import authentication
+from .models import APIKey
+
+
+def invalidate_api_key(sender, instance, **kwargs):
+    authentication.invalidate([instance.key_hash])
+
+
+def invalidate_user_api_keys(sender, instance, update_fields=None, **kwargs):
+    """A user's keys are cached with the user, e.g. deactivating them must take effect"""
+    if update_fields and set(update_fields) == {'last_login'}:
+        return  # every login saves the user
+    authentication.invalidate(APIKey.objects.filter(user=instance).values_list('key_hash', flat=True))
+
+
+post_save.connect(invalidate_api_key, sender=APIKey, dispatch_uid='api_key_save')
+post_delete.connect(invalidate_api_key, sender=APIKey, dispatch_uid='api_key_delete')
+post_save.connect(invalidate_user_api_keys, sender=get_user_model(), dispatch_uid='api_key_user_save')
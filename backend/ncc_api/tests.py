@@ -0,0 +1,64 @@
+import inspect
+import os
+from unittest import mock
+
+import requests
+from django.apps import apps
+from django.test import SimpleTestCase, override_settings
+from urllib3.connectionpool import HTTPConnectionPool
+
+from . import fake_backends, instrumentation
+
+SMS_BROADCAST_URL = 'https://api.smsbroadcast.com.au/api-adv.php'
+
+
+class FakeIntegrationInstrumentationTests(SimpleTestCase):
+    """The HTTP hooks must wrap the fake backends, not the other way round"""
+
+    def setUp(self):
+        patched = [(HTTPConnectionPool, 'urlopen')]
+        try:
+            import httpx
+            patched.append((httpx.Client, 'send'))
+        except ImportError:
+            pass
+        for owner, name in patched:
+            self.addCleanup(setattr, owner, name, getattr(owner, name))
+            setattr(owner, name, inspect.unwrap(getattr(owner, name)))
+        for module, flag in ((instrumentation, '_hooks_installed'), (fake_backends, '_installed')):
+            self.addCleanup(setattr, module, flag, getattr(module, flag))
+            setattr(module, flag, False)
+        environ = mock.patch.dict(os.environ)
+        environ.start()
+        self.addCleanup(environ.stop)
+        self.addCleanup(fake_backends.configure, latency_ms={}, error_rate={})
+
+        # Start-up as it runs with FAKE_INTEGRATIONS=true
+        with override_settings(FAKE_INTEGRATIONS=True):
+            apps.get_app_config('ncc_api').ready()
+
+    def get_balance(self):
+        metrics = instrumentation.RequestMetrics()
+        token = instrumentation._current.set(metrics)
+        try:
+            response = requests.get(SMS_BROADCAST_URL, params={'action': 'balance'})
+        finally:
+            instrumentation._current.reset(token)
+        return response, metrics
+
+    def test_faked_call_is_recorded(self):
+        response, metrics = self.get_balance()
+
+        self.assertEqual(response.text, 'OK: 1000')
+        self.assertEqual(metrics.http['sms_broadcast'][0], 1)
+        self.assertEqual(metrics.http['sms_broadcast'][2], 0)
+
+    def test_injected_latency_and_errors_are_recorded(self):
+        fake_backends.configure(latency_ms={'sms_broadcast': 20}, error_rate={'sms_broadcast': 1})
+
+        response, metrics = self.get_balance()
+
+        self.assertEqual(response.status_code, 503)
+        calls, ms, errors = metrics.http['sms_broadcast']
+        self.assertEqual((calls, errors), (1, 1))
+        self.assertGreaterEqual(ms, 20)
@@ -33,7 +33,9 @@ from xero_integration.views import (
     XeroTrackingCategoryViewSet,
     XeroSyncLogViewSet,
 )
+from settings.views import bootstrap
 from . import auth_views
+from .metrics_views import prometheus_metrics
 
 # Create API router
 router = routers.DefaultRouter()
@@ -82,8 +84,12 @@ urlpatterns = [
     path('api/', include('documents.urls')),  # S3 document management
     path('api/images/', include('images.urls')),  # Patient images
     path('api/ai/', include('ai_services.urls')),  # AI services
+    path('api/bootstrap/', bootstrap, name='bootstrap'),  # Cached reference data (clinics, clinicians, types, funding, templates)
     path('api/settings/', include('settings.urls')),  # Settings management (Funding Sources)
     path('api/letters/', include('letters.urls')),  # Patient letters
     path('api/data-management/', include('data_management.urls')),  # Data management and reimport
     path('api/invoices/', include('invoices.urls')),  # Invoice PDF generation
+    path('api/search/', include('search.urls')),  # Unified search (notes, letters, SMS, documents)
+    path('api/sync/', include('sync.urls')),  # Delta change feed for offline clients
+    path('api/metrics/', prometheus_metrics, name='metrics'),  # Prometheus metrics (all workers)
 ]
@@ -6,6 +6,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from patients.versions import conditional_patient_response
 from .models import Note
 from .serializers import NoteSerializer, NoteListSerializer
 
@@ -38,6 +39,10 @@ class NoteViewSet(viewsets.ModelViewSet):
             return NoteListSerializer
         return NoteSerializer
     
+    @conditional_patient_response(lookup=('patient_id', 'patient'))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def get_queryset(self):
         """Filter notes by patient if patient_id is provided"""
         queryset = super().get_queryset()
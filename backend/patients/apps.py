@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PatientsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'patients'
+
+    def ready(self):
+        # Connect the handlers that keep the contact tables and version stamps current
+        from . import signals  # noqa: F401
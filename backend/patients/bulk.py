@@ -0,0 +1,119 @@
+"""
+Bulk patient operations
+
+    POST /api/patients/bulk-archive/   {"ids": [...]}  or  {"filter": {...}}
+    POST /api/patients/bulk-restore/   (same selection)
+    POST /api/patients/bulk-update/    selection plus "clinic" and/or "funding_type"
+
+A filter selects patients by clinic, funding_type, archived, sex,
+created_before/created_after, no_appointments_since (no appointment on or
+after that date) and filemaker_import, e.g. inactive FileMaker imports:
+
+    {"filter": {"filemaker_import": true, "no_appointments_since": "2023-01-01"}}
+
+Only patients the operation would change are selected (archiving skips
+patients already archived, setting a clinic skips patients already in it).
+The selection is locked and changed with one UPDATE in one transaction;
+"dry_run": true returns the counts without changing anything.
+
+UPDATE bypasses save() and the signal handlers, so their side effects are
+applied here once per batch: the patient caches are invalidated, each
+changed patient's version is bumped and a sync change is recorded for it.
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from appointments.models import Appointment
+from ncc_api.caching import bump_namespace
+
+from .models import Patient
+from .versions import bump_patient_versions
+
+# One request changes at most this many patients; larger filters must be narrowed
+MAX_PATIENTS = 10000
+
+
+class TooManyPatients(Exception):
+    """The selection is larger than MAX_PATIENTS"""
+
+
+def select_patients(ids=None, filters=None):
+    """Patients matching an id list or a validated filter dict"""
+    queryset = Patient.objects.all()
+    if ids is not None:
+        return queryset.filter(pk__in=ids)
+
+    filters = filters or {}
+    for field in ('clinic', 'funding_type', 'archived', 'sex'):
+        if field in filters:
+            queryset = queryset.filter(**{field: filters[field]})
+    if 'created_before' in filters:
+        queryset = queryset.filter(created_at__date__lt=filters['created_before'])
+    if 'created_after' in filters:
+        queryset = queryset.filter(created_at__date__gte=filters['created_after'])
+    if 'no_appointments_since' in filters:
+        queryset = queryset.filter(~Exists(Appointment.objects.filter(
+            patient_id=OuterRef('pk'),
+            start_time__date__gte=filters['no_appointments_since'],
+        )))
+    if 'filemaker_import' in filters:
+        queryset = queryset.filter(filemaker_metadata__isnull=not filters['filemaker_import'])
+    return queryset
+
+
+def archive(queryset, archived_by=None, dry_run=False):
+    return _apply(
+        queryset.filter(archived=False),
+        {'archived': True, 'archived_at': timezone.now(), 'archived_by': archived_by},
+        dry_run,
+    )
+
+
+def restore(queryset, dry_run=False):
+    return _apply(
+        queryset.filter(archived=True),
+        {'archived': False, 'archived_at': None, 'archived_by': None},
+        dry_run,
+    )
+
+
+def update(queryset, values, dry_run=False):
+    """Set fields (clinic, funding_type) on every patient where any of them differs"""
+    changed = Q()
+    for field, value in values.items():
+        changed |= ~Q(**{field: value})
+    return _apply(queryset.filter(changed), values, dry_run)
+
+
+def _apply(queryset, values, dry_run):
+    """
+    Lock the selected patients and change them with one UPDATE.
+    Returns {'matched', 'updated', 'dry_run'}; raises TooManyPatients.
+    """
+    with transaction.atomic():
+        patient_ids = list(queryset.select_for_update().values_list('pk', flat=True)[:MAX_PATIENTS + 1])
+        if len(patient_ids) > MAX_PATIENTS:
+            raise TooManyPatients(
+                f"More than {MAX_PATIENTS} patients match; narrow the selection and repeat"
+            )
+        result = {'matched': len(patient_ids), 'updated': 0, 'dry_run': dry_run}
+        if dry_run or not patient_ids:
+            return result
+
+        # The locked ids rather than the filter, so rows committed since the
+        # SELECT are not changed without being reported
+        result['updated'] = Patient.objects.filter(pk__in=patient_ids).update(
+            **values, updated_at=timezone.now(),
+        )
+        _after_update(patient_ids)
+    return result
+
+
+def _after_update(patient_ids):
+    from sync.changelog import record_changes
+
+    bump_patient_versions(patient_ids)
+    record_changes('patient', patient_ids)
+    # After commit, so no request can re-cache the old rows in between
+    transaction.on_commit(lambda: bump_namespace('patients'))
@@ -0,0 +1,183 @@
+"""
+Patient chart: everything the patient page shows, in one response
+
+GET /api/patients/{id}/chart/ returns the patient plus, for each section,
+its total count and the first page of rows:
+
+    {
+        "patient": {...},
+        "notes": {"count": 42, "results": [...]},
+        ...
+        "sms": {"unread_count": 2}
+    }
+
+?include=notes,appointments limits the sections (the patient is always
+included); ?limit=N sets the page size per section (default 20, max 100).
+
+Query count is fixed, whatever the patient has: one query loads the
+patient with every section count as a subquery, one loads the active
+referrers, then one query per non-empty section (two for images, which
+prefetch each batch's images for the thumbnail).
+
+Responses carry an ETag and are cached per patient version; see
+patients/versions.py.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Func, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+
+from appointments.models import Appointment
+from appointments.serializers import AppointmentSerializer
+from documents.models import Document
+from documents.serializers import DocumentSerializer
+from images.models import Image, ImageBatch
+from images.serializers import ImageBatchListSerializer
+from letters.models import PatientLetter
+from letters.serializers import PatientLetterListSerializer
+from notes.models import Note
+from notes.serializers import NoteListSerializer
+from reminders.models import Reminder
+from reminders.serializers import ReminderListSerializer
+from sms_integration.models import SMSInbound
+from xero_integration.models import XeroInvoiceLink
+from xero_integration.serializers import XeroInvoiceLinkSerializer
+
+from .models import Patient
+from .serializers import PatientSerializer
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class ChartSection:
+    """
+    One section of the chart.
+
+    `queryset(patient_id)` returns the section's rows for a patient, or for
+    OuterRef('pk') when used as the count subquery. Sections without a
+    serializer only report a count.
+    """
+
+    def __init__(self, name, queryset, serializer=None, count_key='count'):
+        self.name = name
+        self.queryset = queryset
+        self.serializer = serializer
+        self.count_key = count_key
+
+    def count_subquery(self):
+        # COUNT as a plain function, so Django adds no GROUP BY to the subquery
+        rows = self.queryset(OuterRef('pk')).order_by().annotate(n=Func('pk', function='COUNT')).values('n')
+        return Coalesce(Subquery(rows[:1], output_field=IntegerField()), 0)
+
+
+def _patient_content_type():
+    # Cached by ContentTypeManager after the first lookup
+    return ContentType.objects.get_for_model(Patient)
+
+
+SECTIONS = [
+    ChartSection(
+        'notes',
+        lambda patient_id: Note.objects.filter(patient_id=patient_id).order_by('-created_at'),
+        NoteListSerializer,
+    ),
+    ChartSection(
+        'letters',
+        lambda patient_id: PatientLetter.objects.filter(patient_id=patient_id).order_by('-updated_at'),
+        PatientLetterListSerializer,
+    ),
+    ChartSection(
+        'documents',
+        lambda patient_id: Document.objects.filter(
+            content_type=_patient_content_type(), object_id=patient_id, is_active=True,
+        ).order_by('-uploaded_at'),
+        DocumentSerializer,
+    ),
+    ChartSection(
+        'images',
+        lambda patient_id: ImageBatch.objects.filter(
+            content_type=_patient_content_type(), object_id=patient_id,
+        ).select_related('uploaded_by').prefetch_related(
+            Prefetch('images', queryset=Image.objects.order_by('batch', 'order', 'uploaded_at'))
+        ).order_by('-uploaded_at'),
+        ImageBatchListSerializer,
+    ),
+    ChartSection(
+        'appointments',
+        lambda patient_id: Appointment.objects.filter(patient_id=patient_id).select_related(
+            'patient', 'clinic', 'clinician', 'appointment_type',
+        ).order_by('-start_time'),
+        AppointmentSerializer,
+    ),
+    ChartSection(
+        'reminders',
+        lambda patient_id: Reminder.objects.filter(patient_id=patient_id).select_related(
+            'patient', 'clinic',
+        ).order_by('-created_at'),
+        ReminderListSerializer,
+    ),
+    ChartSection(
+        'invoices',
+        lambda patient_id: XeroInvoiceLink.objects.filter(patient_id=patient_id).select_related(
+            'patient', 'company', 'clinician', 'appointment__patient',
+        ).order_by('-created_at'),
+        XeroInvoiceLinkSerializer,
+    ),
+    ChartSection(
+        'sms',
+        lambda patient_id: SMSInbound.objects.filter(patient_id=patient_id, is_processed=False),
+        count_key='unread_count',
+    ),
+]
+SECTIONS_BY_NAME = {section.name: section for section in SECTIONS}
+
+
+def parse_include(value):
+    """
+    Section names from an ?include= value (all sections when empty).
+    Raises ValueError naming any unknown sections.
+    """
+    if not value:
+        return [section.name for section in SECTIONS]
+    names = [name.strip() for name in value.split(',') if name.strip() and name.strip() != 'patient']
+    unknown = [name for name in names if name not in SECTIONS_BY_NAME]
+    if unknown:
+        raise ValueError(
+            f"Unknown chart sections: {', '.join(unknown)}. "
+            f"Available: {', '.join(SECTIONS_BY_NAME)}"
+        )
+    return list(dict.fromkeys(names))
+
+
+def parse_limit(value):
+    """Page size from a ?limit= value. Raises ValueError if it is not a number."""
+    if value in (None, ''):
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"limit must be a number, got {value!r}")
+    return max(1, min(limit, MAX_LIMIT))
+
+
+def build_chart(patient_id, include, limit=DEFAULT_LIMIT, context=None):
+    """
+    The chart for `patient_id` with the `include` sections.
+    Raises Patient.DoesNotExist if there is no such patient.
+    """
+    sections = [SECTIONS_BY_NAME[name] for name in include]
+    patient = (
+        Patient.objects.select_related('clinic', 'funding_type')
+        .annotate(**{f'chart_{section.name}_count': section.count_subquery() for section in sections})
+        .get(pk=patient_id)
+    )
+
+    chart = {'patient': PatientSerializer(patient, context=context).data}
+    for section in sections:
+        count = getattr(patient, f'chart_{section.name}_count')
+        data = {section.count_key: count}
+        if section.serializer is not None:
+            rows = list(section.queryset(patient.pk)[:limit]) if count else []
+            data['results'] = section.serializer(rows, many=True, context=context).data
+        chart[section.name] = data
+    return chart
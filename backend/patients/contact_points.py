@@ -0,0 +1,226 @@
+"""
+Parse patient contact_json / emergency_json / address_json into rows for
+PatientContactPoint and PatientAddress.
+
+Shapes found in real data:
+
+contact_json
+    {"mobile": "0412 345 678", "phone": "...", "email": "a@b"}          legacy strings
+    {"mobile": {"home": {"value": "...", "default": true}}, ...}       nested label objects
+    {"mobile": {"home": "..."}}                                        nested strings
+    {"phones": [{"type": "mobile", "number": "...", "label": "Mobile",
+                 "default": true}], "emails": [{"address": "..."}]}    arrays
+    (array phones may use "phone" instead of "number", "is_default"
+    instead of "default"; array emails may be strings or "value")
+
+emergency_json
+    {"mother": {"name": "...", "mobile": "..."}, "father": ..., "emergency": ..., "guardian": ...}
+
+address_json
+    {"street": ..., "street2": ..., "suburb": ..., "state": ..., "postcode": ...,
+     "type": "home", "default": true}                                  one address
+    [{...}, {...}]                                                     several
+    {"home": {...}, "postal": {...}}                                   keyed by type
+
+Labels, defaults and ordering match what the SMS views have always shown:
+default first, then mobile, phone, emergency. When nothing is marked
+default the first mobile (or first phone) is.
+
+Pure functions only: the data migration imports this module.
+"""
+import re
+
+EMERGENCY_CONTACT_TYPES = ['mother', 'father', 'emergency', 'guardian']
+PHONE_TYPE_ORDER = {'mobile': 0, 'phone': 1, 'emergency': 2}
+ADDRESS_KEYS = ('street', 'street2', 'suburb', 'state', 'postcode')
+
+
+def normalize_phone(phone):
+    """Digits only, with a leading 0 replaced by the 61 country code"""
+    if not phone:
+        return None
+    normalized = re.sub(r'[^\d+]', '', str(phone))
+    if normalized.startswith('+'):
+        normalized = normalized[1:]
+    if normalized.startswith('0'):
+        normalized = '61' + normalized[1:]
+    return normalized or None
+
+
+def normalize_email(email):
+    email = str(email or '').strip().lower()
+    return email or None
+
+
+def _text(value):
+    return str(value).strip() if value is not None else ''
+
+
+def _phones(contact_json, emergency_json):
+    phones = []
+
+    for entry in contact_json.get('phones') or []:
+        if isinstance(entry, dict):
+            number = _text(entry.get('number') or entry.get('phone'))
+            if number:
+                phone_type = entry.get('type') or 'phone'
+                phones.append({
+                    'value': number,
+                    'label': f"{phone_type.title()} - {entry.get('label', 'Unknown')}",
+                    'is_default': bool(entry.get('is_default') or entry.get('default')),
+                    'type': phone_type,
+                })
+
+    for phone_type, legacy_label in (('mobile', 'Mobile - Home'), ('phone', 'Phone - Home')):
+        value = contact_json.get(phone_type)
+        if isinstance(value, (str, int)) and _text(value):
+            phones.append({
+                'value': _text(value),
+                'label': legacy_label,
+                # A legacy mobile string is the default unless an array said otherwise
+                'is_default': phone_type == 'mobile' and not phones,
+                'type': phone_type,
+            })
+        elif isinstance(value, dict):
+            for key, entry in value.items():
+                if isinstance(entry, dict) and _text(entry.get('value')):
+                    phones.append({
+                        'value': _text(entry['value']),
+                        'label': f"{phone_type.title()} - {key.title()}",
+                        'is_default': bool(entry.get('default')),
+                        'type': phone_type,
+                    })
+                elif isinstance(entry, str) and entry.strip():
+                    phones.append({
+                        'value': entry.strip(),
+                        'label': f"{phone_type.title()} - {key.title()}",
+                        'is_default': False,
+                        'type': phone_type,
+                    })
+
+    for contact_type in EMERGENCY_CONTACT_TYPES:
+        contact = emergency_json.get(contact_type)
+        if isinstance(contact, dict):
+            number = _text(contact.get('mobile') or contact.get('phone'))
+            if number:
+                phones.append({
+                    'value': number,
+                    'label': contact_type.title(),
+                    'is_default': False,
+                    'type': 'emergency',
+                })
+
+    if phones and not any(phone['is_default'] for phone in phones):
+        mobiles = [phone for phone in phones if phone['type'] == 'mobile']
+        (mobiles or phones)[0]['is_default'] = True
+
+    phones.sort(key=lambda phone: (not phone['is_default'], PHONE_TYPE_ORDER.get(phone['type'], 3)))
+    return phones
+
+
+def _emails(contact_json):
+    emails = []
+
+    email = contact_json.get('email')
+    if isinstance(email, str) and email.strip():
+        emails.append({'value': email.strip(), 'label': 'Email - Home', 'is_default': True})
+    elif isinstance(email, dict):
+        for key, entry in email.items():
+            if isinstance(entry, dict) and _text(entry.get('value')):
+                emails.append({
+                    'value': _text(entry['value']),
+                    'label': f"Email - {key.title()}",
+                    'is_default': bool(entry.get('default')),
+                })
+            elif isinstance(entry, str) and entry.strip():
+                emails.append({'value': entry.strip(), 'label': f"Email - {key.title()}", 'is_default': False})
+
+    for entry in contact_json.get('emails') or []:
+        if isinstance(entry, dict):
+            raw = entry.get('address') or entry.get('value') or ''
+            label = f"Email - {entry.get('label', 'Unknown')}"
+            is_default = bool(entry.get('is_default') or entry.get('default'))
+        else:
+            raw, label, is_default = entry, 'Email', False
+        # Some imported rows hold several comma-separated addresses
+        for address in str(raw or '').split(','):
+            if address.strip():
+                emails.append({'value': address.strip(), 'label': label, 'is_default': is_default})
+                is_default = False
+
+    if emails and not any(entry['is_default'] for entry in emails):
+        emails[0]['is_default'] = True
+    emails.sort(key=lambda entry: not entry['is_default'])
+    return emails
+
+
+def parse_contact_points(contact_json, emergency_json=None):
+    """
+    Phones and emails as PatientContactPoint field dicts, in display order
+    """
+    contact_json = contact_json if isinstance(contact_json, dict) else {}
+    emergency_json = emergency_json if isinstance(emergency_json, dict) else {}
+
+    points = []
+    for phone in _phones(contact_json, emergency_json):
+        points.append(dict(phone, kind='phone', normalized_value=normalize_phone(phone['value']) or ''))
+    for email in _emails(contact_json):
+        points.append(dict(email, kind='email', type='email', normalized_value=normalize_email(email['value']) or ''))
+
+    for position, point in enumerate(points):
+        point['position'] = position
+        point['value'] = point['value'][:255]
+        point['label'] = point['label'][:100]
+        point['normalized_value'] = point['normalized_value'][:255]
+    return points
+
+
+def parse_addresses(address_json):
+    """Addresses as PatientAddress field dicts, default first"""
+    if isinstance(address_json, list):
+        entries = [(None, entry) for entry in address_json]
+    elif isinstance(address_json, dict) and any(key in address_json for key in ADDRESS_KEYS + ('address_1',)):
+        entries = [(None, address_json)]
+    elif isinstance(address_json, dict):
+        entries = list(address_json.items())
+    else:
+        entries = []
+
+    addresses = []
+    for key, entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        address = {
+            'type': _text(entry.get('type') or key or 'home')[:50],
+            'street': _text(entry.get('street') or entry.get('address_1'))[:255],
+            'street2': _text(entry.get('street2') or entry.get('address_2'))[:255],
+            'suburb': _text(entry.get('suburb'))[:100],
+            'state': _text(entry.get('state'))[:50],
+            'postcode': _text(entry.get('postcode'))[:10],
+            'is_default': bool(entry.get('default') or entry.get('is_default')),
+        }
+        if address['street'] or address['suburb'] or address['postcode']:
+            addresses.append(address)
+
+    if addresses and not any(address['is_default'] for address in addresses):
+        addresses[0]['is_default'] = True
+    addresses.sort(key=lambda address: not address['is_default'])
+    for position, address in enumerate(addresses):
+        address['position'] = position
+    return addresses
+
+
+def build_rows(patient, point_model, address_model):
+    """
+    Unsaved PatientContactPoint and PatientAddress rows for `patient`. The
+    model classes are passed in so the data migration can use historical models.
+    """
+    points = [
+        point_model(patient_id=patient.pk, **point)
+        for point in parse_contact_points(patient.contact_json, patient.emergency_json)
+    ]
+    addresses = [
+        address_model(patient_id=patient.pk, **address)
+        for address in parse_addresses(patient.address_json)
+    ]
+    return points, addresses
@@ -0,0 +1,333 @@
+"""
+Duplicate patient detection and merge
+
+Detection
+    Comparing every pair of patients is O(n²). Instead each patient gets
+    blocking keys and only patients sharing a key are compared:
+
+    - phonetic surname (Soundex) plus first initial
+    - date of birth
+    - normalized phone number (from PatientContactPoint)
+    - health number
+
+    Blocks larger than MAX_BLOCK_SIZE (e.g. a clinic phone number entered
+    for many patients) say little and are skipped. Each candidate pair is
+    scored 0-100 from the fields that agree or conflict; pairs scoring
+    at least MIN_SCORE are returned, best first.
+
+Merge
+    merge_patients() moves everything linked to the duplicate (the
+    MERGED_RELATIONS and GENERIC_MERGED_RELATIONS below) onto the primary
+    with one UPDATE per table, fills the primary's blank fields from the
+    duplicate and archives the duplicate with merged_into set, all in one
+    transaction. Rows that would break a unique constraint (a referrer or
+    Xero connection the primary already has) stay with the duplicate.
+
+    The moves use QuerySet.update(), so the affected sync feed rows are
+    recorded here; the two patient saves bump both versions and the
+    patient caches through the usual signals.
+"""
+import re
+import uuid
+from collections import defaultdict, namedtuple
+from itertools import combinations
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Patient, PatientContactPoint
+
+MIN_SCORE = 50
+MAX_BLOCK_SIZE = 50
+
+# (model label, field pointing at the patient, field unique together with it)
+MERGED_RELATIONS = [
+    ('appointments.Appointment', 'patient', None),
+    ('appointments.Encounter', 'patient', None),
+    ('notes.Note', 'patient', None),
+    ('letters.PatientLetter', 'patient', None),
+    ('reminders.Reminder', 'patient', None),
+    ('sms_integration.SMSMessage', 'patient', None),
+    ('sms_integration.SMSInbound', 'patient', None),
+    ('referrers.PatientReferrer', 'patient', 'referrer'),
+    ('coordinators.PatientCoordinator', 'patient', None),
+    ('xero_integration.XeroContactLink', 'patient', 'connection'),
+    ('xero_integration.XeroInvoiceLink', 'patient', None),
+    ('xero_integration.XeroQuoteLink', 'patient', None),
+    ('search.SearchEntry', 'patient', None),
+    ('patients.Patient', 'merged_into', None),
+]
+
+# (model label, content type field, object id field, the other end's fields or None)
+GENERIC_MERGED_RELATIONS = [
+    ('documents.Document', 'content_type', 'object_id', None),
+    ('images.ImageBatch', 'content_type', 'object_id', None),
+    ('contacts.ContactRelationship', 'from_content_type', 'from_object_id', ('to_content_type', 'to_object_id')),
+    ('contacts.ContactRelationship', 'to_content_type', 'to_object_id', ('from_content_type', 'from_object_id')),
+]
+
+# Copied from the duplicate when blank on the primary
+FILL_FIELDS = [
+    'title', 'middle_names', 'dob', 'sex', 'health_number', 'funding_source', 'funding_type_id',
+    'clinic_id', 'coordinator_name', 'coordinator_date', 'plan_start_date', 'plan_end_date',
+    'ndis_plan_start_date', 'ndis_plan_end_date', 'contact_json', 'address_json', 'emergency_json',
+]
+
+SOUNDEX_CODES = {
+    letter: digit
+    for letters, digit in (('BFPV', '1'), ('CGJKQSXZ', '2'), ('DT', '3'), ('L', '4'), ('MN', '5'), ('R', '6'))
+    for letter in letters
+}
+
+Record = namedtuple('Record', 'id mrn first_name last_name dob sex health_number created_at phones')
+
+
+def soundex(name):
+    """American Soundex code of `name` ('' if it has no letters)"""
+    letters = [letter for letter in (name or '').upper() if 'A' <= letter <= 'Z']
+    if not letters:
+        return ''
+    code = letters[0]
+    previous = SOUNDEX_CODES.get(letters[0], '')
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # H and W do not separate letters with the same code; vowels do
+        if letter not in 'HW':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def normalize_name(name):
+    return re.sub(r'[^a-z]', '', (name or '').lower())
+
+
+def normalize_health_number(value):
+    return re.sub(r'[^0-9A-Z]', '', (value or '').upper())
+
+
+def _load_records():
+    phones = defaultdict(set)
+    for patient_id, number in PatientContactPoint.objects.filter(
+        kind='phone', type__in=('mobile', 'phone'), patient__archived=False,
+    ).exclude(normalized_value='').values_list('patient_id', 'normalized_value'):
+        phones[patient_id].add(number)
+
+    rows = Patient.objects.filter(archived=False).values_list(
+        'id', 'mrn', 'first_name', 'last_name', 'dob', 'sex', 'health_number', 'created_at',
+    )
+    return [
+        Record(*row[:6], normalize_health_number(row[6]), row[7], phones.get(row[0], set()))
+        for row in rows
+    ]
+
+
+def _blocking_keys(record):
+    surname = soundex(record.last_name)
+    if surname:
+        yield ('surname', surname + normalize_name(record.first_name)[:1])
+    if record.dob:
+        yield ('dob', record.dob)
+    for number in record.phones:
+        yield ('phone', number)
+    if record.health_number:
+        yield ('health_number', record.health_number)
+
+
+def score_pair(a, b):
+    """Score (0-100) and reasons for two patient Records being the same person"""
+    score = 0
+    reasons = []
+
+    if a.health_number and b.health_number:
+        if a.health_number == b.health_number:
+            score += 40
+            reasons.append('same health number')
+        else:
+            score -= 30
+
+    if a.dob and b.dob:
+        if a.dob == b.dob:
+            score += 25
+            reasons.append('same date of birth')
+        elif (a.dob.year, a.dob.month, a.dob.day) == (b.dob.year, b.dob.day, b.dob.month):
+            score += 10
+            reasons.append('date of birth with day and month swapped')
+        else:
+            score -= 20
+
+    last_a, last_b = normalize_name(a.last_name), normalize_name(b.last_name)
+    if last_a and last_a == last_b:
+        score += 20
+        reasons.append('same surname')
+    elif soundex(last_a) and soundex(last_a) == soundex(last_b):
+        score += 10
+        reasons.append('surname sounds alike')
+
+    first_a, first_b = normalize_name(a.first_name), normalize_name(b.first_name)
+    if first_a and first_a == first_b:
+        score += 20
+        reasons.append('same first name')
+    elif first_a and first_b and (first_a.startswith(first_b) or first_b.startswith(first_a)):
+        score += 10
+        reasons.append('first name shortened')
+    elif soundex(first_a) and soundex(first_a) == soundex(first_b):
+        score += 10
+        reasons.append('first name sounds alike')
+    elif first_a and first_b:
+        score -= 20
+
+    if a.phones & b.phones:
+        score += 15
+        reasons.append('shared phone number')
+
+    if a.sex and b.sex and a.sex != b.sex:
+        score -= 15
+
+    return max(0, min(score, 100)), reasons
+
+
+def _summary(record):
+    return {
+        'id': str(record.id),
+        'mrn': record.mrn,
+        'name': f'{record.first_name} {record.last_name}'.strip(),
+        'dob': record.dob.isoformat() if record.dob else None,
+        'health_number': record.health_number or None,
+        'created_at': record.created_at.isoformat() if record.created_at else None,
+    }
+
+
+def find_duplicates(min_score=MIN_SCORE):
+    """
+    Candidate duplicate pairs among active patients, best first:
+
+        {'patients', 'compared', 'skipped_blocks',
+         'candidates': [{'score', 'reasons', 'primary', 'duplicate'}, ...]}
+
+    The suggested primary is the older record.
+    """
+    records = _load_records()
+    by_id = {record.id: record for record in records}
+
+    blocks = defaultdict(list)
+    for record in records:
+        for key in _blocking_keys(record):
+            blocks[key].append(record.id)
+
+    pairs = set()
+    skipped_blocks = 0
+    for ids in blocks.values():
+        if len(ids) > MAX_BLOCK_SIZE:
+            skipped_blocks += 1
+            continue
+        for a, b in combinations(sorted(set(ids)), 2):
+            pairs.add((a, b))
+
+    candidates = []
+    for a, b in pairs:
+        score, reasons = score_pair(by_id[a], by_id[b])
+        if score >= min_score:
+            primary, duplicate = sorted((by_id[a], by_id[b]), key=lambda record: (record.created_at, str(record.id)))
+            candidates.append({
+                'score': score,
+                'reasons': reasons,
+                'primary': _summary(primary),
+                'duplicate': _summary(duplicate),
+            })
+    candidates.sort(key=lambda candidate: (-candidate['score'], candidate['primary']['name']))
+
+    return {
+        'patients': len(records),
+        'compared': len(pairs),
+        'skipped_blocks': skipped_blocks,
+        'candidates': candidates,
+    }
+
+
+def _is_blank(value):
+    return value is None or value == '' or value == {} or value == []
+
+
+def merge_patients(primary_id, duplicate_id, merged_by=None, dry_run=False):
+    """
+    Merge the duplicate patient into the primary.
+
+    Returns {'primary', 'duplicate', 'moved': {model label: rows}, 'filled': [fields], 'dry_run'}.
+    Raises Patient.DoesNotExist, or ValueError if the pair cannot be merged.
+    """
+    from sync.changelog import get_source_models, record_changes
+
+    primary_id, duplicate_id = uuid.UUID(str(primary_id)), uuid.UUID(str(duplicate_id))
+    if primary_id == duplicate_id:
+        raise ValueError('Cannot merge a patient into itself')
+
+    with transaction.atomic():
+        patients = Patient.objects.select_for_update().in_bulk([primary_id, duplicate_id])
+        if primary_id not in patients or duplicate_id not in patients:
+            raise Patient.DoesNotExist('Patient not found')
+        primary, duplicate = patients[primary_id], patients[duplicate_id]
+        if primary.merged_into_id:
+            raise ValueError(f'{primary} has already been merged into another patient')
+        if duplicate.merged_into_id:
+            raise ValueError(f'{duplicate} has already been merged into another patient')
+
+        sync_types = get_source_models()
+        moved = defaultdict(int)
+
+        def move(model, rows, values):
+            if dry_run:
+                count = rows.count()
+            elif model in sync_types:
+                ids = list(rows.values_list('pk', flat=True))
+                count = model.objects.filter(pk__in=ids).update(**values)
+                record_changes(sync_types[model], ids)
+            else:
+                count = rows.update(**values)
+            moved[model._meta.label] += count
+
+        for label, field, unique_with in MERGED_RELATIONS:
+            model = apps.get_model(label)
+            rows = model.objects.filter(**{field: duplicate})
+            if unique_with:
+                taken = model.objects.filter(**{field: primary, f'{unique_with}__isnull': False}).values(unique_with)
+                rows = rows.exclude(**{f'{unique_with}__in': taken})
+            move(model, rows, {field: primary})
+
+        patient_type = ContentType.objects.get_for_model(Patient)
+        for label, type_field, id_field, other_end in GENERIC_MERGED_RELATIONS:
+            model = apps.get_model(label)
+            rows = model.objects.filter(**{type_field: patient_type, id_field: duplicate.pk})
+            if other_end:
+                # A link between the two patients would become a link to itself
+                rows = rows.exclude(**{other_end[0]: patient_type, other_end[1]: primary.pk})
+            move(model, rows, {id_field: primary.pk})
+
+        filled = [
+            field for field in FILL_FIELDS
+            if _is_blank(getattr(primary, field)) and not _is_blank(getattr(duplicate, field))
+        ]
+        if not dry_run:
+            for field in filled:
+                setattr(primary, field, getattr(duplicate, field))
+            primary.save()
+
+            duplicate.merged_into = primary
+            if not duplicate.archived:
+                duplicate.archived = True
+                duplicate.archived_at = timezone.now()
+                duplicate.archived_by = merged_by
+            duplicate.save()
+
+    return {
+        'primary': str(primary.pk),
+        'duplicate': str(duplicate.pk),
+        'moved': {label: count for label, count in moved.items() if count},
+        'filled': [field.removesuffix('_id') for field in filled],
+        'dry_run': dry_run,
+    }
@@ -0,0 +1,66 @@
+"""
+List likely duplicate patients (see patients/dedupe.py), optionally merging
+pairs that score at least --merge-above.
+
+Usage:
+    python manage.py find_duplicate_patients
+    python manage.py find_duplicate_patients --min-score 70 --limit 200
+    python manage.py find_duplicate_patients --merge-above 95 --dry-run
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from patients.dedupe import MIN_SCORE, find_duplicates, merge_patients
+
+
+class Command(BaseCommand):
+    help = 'List candidate duplicate patients, best match first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-score', type=int, default=MIN_SCORE, help=f'Lowest score to list (default: {MIN_SCORE})')
+        parser.add_argument('--limit', type=int, default=50, help='Pairs to print (default: 50)')
+        parser.add_argument('--merge-above', type=int, help='Merge every pair scoring at least this (into the older record)')
+        parser.add_argument('--dry-run', action='store_true', help='With --merge-above, only report what would move')
+
+    def handle(self, *args, **options):
+        if options['merge_above'] is not None and options['merge_above'] < 90:
+            raise CommandError('--merge-above must be at least 90; review lower scores by hand')
+
+        self.stdout.write("=" * 70)
+        self.stdout.write("🔍 Find Duplicate Patients")
+        self.stdout.write("=" * 70)
+
+        result = find_duplicates(options['min_score'])
+        candidates = result['candidates']
+        for candidate in candidates[:options['limit']]:
+            primary, duplicate = candidate['primary'], candidate['duplicate']
+            self.stdout.write(
+                f"\n{candidate['score']:>3}  {primary['name']} ({primary['dob'] or 'no DOB'}, MRN {primary['mrn'] or '-'})"
+                f"\n     {duplicate['name']} ({duplicate['dob'] or 'no DOB'}, MRN {duplicate['mrn'] or '-'})"
+                f"\n     {', '.join(candidate['reasons'])}"
+            )
+
+        merged = 0
+        if options['merge_above'] is not None:
+            # A patient merged away in an earlier pair cannot be merged again
+            seen = set()
+            for candidate in candidates:
+                if candidate['score'] < options['merge_above']:
+                    break
+                primary_id, duplicate_id = candidate['primary']['id'], candidate['duplicate']['id']
+                if primary_id in seen or duplicate_id in seen:
+                    continue
+                seen.update((primary_id, duplicate_id))
+                merge = merge_patients(primary_id, duplicate_id, merged_by='find_duplicate_patients', dry_run=options['dry_run'])
+                merged += 1
+                self.stdout.write(f"🔗 {candidate['duplicate']['name']} → {candidate['primary']['name']}: {merge['moved'] or 'nothing to move'}")
+
+        self.stdout.write("\n" + "=" * 70)
+        self.stdout.write("📊 SUMMARY")
+        self.stdout.write("=" * 70)
+        self.stdout.write(f"Patients checked: {result['patients']}")
+        self.stdout.write(f"Pairs compared: {result['compared']}")
+        self.stdout.write(f"Oversized blocks skipped: {result['skipped_blocks']}")
+        self.stdout.write(f"Candidates (score ≥ {options['min_score']}): {len(candidates)}")
+        if options['merge_above'] is not None:
+            verb = 'Would merge' if options['dry_run'] else 'Merged'
+            self.stdout.write(f"{verb}: {merged}")
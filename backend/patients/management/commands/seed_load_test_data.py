@@ -0,0 +1,578 @@
+"""
+Generate a production-sized synthetic clinic dataset for performance work.
+
+Creates patients with the contact_json shapes found in real data (nested
+label objects, legacy strings, phones/emails arrays, empty), plus years of
+appointments, notes, letters, SMS threads, Xero contacts/invoices/quotes,
+documents and image batches. Everything is written with bulk_create in
+batches and generated from a seeded RNG, so the same --seed always produces
+the same dataset (dates are relative to --anchor-date).
+
+Generated patients are tagged in filemaker_metadata ({"synthetic": true}) so
+--clear removes only generated data.
+
+Usage:
+    python manage.py seed_load_test_data
+    python manage.py seed_load_test_data --patients 5000 --years 2 --seed 7
+    python manage.py seed_load_test_data --clear --index
+"""
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from appointments.models import Appointment, AppointmentType
+from clinicians.models import Clinic, Clinician
+from documents.models import Document
+from images.models import Image, ImageBatch
+from letters.models import PatientLetter
+from ncc_api.caching import bump_namespace
+from notes.models import Note
+from patients.contact_points import build_rows
+from patients.models import Patient, PatientAddress, PatientContactPoint
+from settings.models import FundingSource
+from sms_integration.models import SMSInbound, SMSMessage
+from xero_integration.models import XeroContactLink, XeroInvoiceLink, XeroQuoteLink
+
+FIRST_NAMES = [
+    'John', 'Jane', 'Michael', 'Sarah', 'David', 'Emma', 'James', 'Olivia', 'Robert', 'Sophia',
+    'William', 'Isabella', 'Richard', 'Charlotte', 'Joseph', 'Mia', 'Thomas', 'Amelia', 'Charles',
+    'Harper', 'Christopher', 'Evelyn', 'Daniel', 'Abigail', 'Matthew', 'Emily', 'Anthony',
+    'Elizabeth', 'Mark', 'Sofia', 'Steven', 'Ella', 'Paul', 'Grace', 'Andrew', 'Chloe', 'Joshua',
+    'Victoria', 'Kevin', 'Aria', 'Brian', 'Luna', 'George', 'Layla', 'Edward', 'Zoe', 'Liam',
+    'Noah', 'Ava', 'Jack', 'Ruby', 'Oliver', 'Matilda', 'Henry', 'Ivy', 'Lachlan', 'Isla',
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+    'Martinez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin', 'Lee',
+    'Thompson', 'White', 'Harris', 'Clark', 'Lewis', 'Robinson', 'Walker', 'Young', 'Allen',
+    'King', 'Wright', 'Scott', 'Torres', 'Nguyen', 'Hill', 'Green', 'Adams', 'Nelson', 'Baker',
+    'Hall', 'Campbell', 'Mitchell', 'Carter', 'Roberts', 'Kelly', 'O\'Brien', 'Murphy', 'Ryan',
+    'Tran', 'Le', 'Pham', 'Singh', 'Patel', 'Chen', 'Wang', 'Smyth', 'Smithe', 'Thomson',
+]
+TITLES = ['Mr', 'Mrs', 'Ms', 'Miss', 'Dr']
+SUBURBS = [
+    ('Newcastle', '2300'), ('Tamworth', '2340'), ('Port Macquarie', '2444'), ('Armidale', '2350'),
+    ('Maitland', '2320'), ('Cessnock', '2325'), ('Charlestown', '2290'), ('Raymond Terrace', '2324'),
+]
+STREETS = ['Main', 'High', 'Park', 'Oak', 'Elm', 'King', 'Queen', 'Victoria', 'Hunter', 'Church']
+REFERENCE_CLINICS = ['Newcastle', 'Tamworth', 'Port Macquarie', 'Armidale']
+REFERENCE_CLINICIANS = ['Alex Morgan', 'Sam Taylor', 'Jordan Lee', 'Casey Nguyen', 'Riley Smith', 'Jamie Brown']
+REFERENCE_APPOINTMENT_TYPES = [
+    ('Initial Assessment', 60), ('Review', 30), ('Casting', 45), ('Fitting', 30), ('Follow-up', 15),
+]
+LETTER_TYPES = ['Support Letter', 'Follow-up Letter', 'Referral Response', 'NDIS Report', 'Quote Cover Letter']
+DOCUMENT_CATEGORIES = ['referral', 'erf', 'purchase_order', 'quote', 'remittance_advice', 'medical']
+IMAGE_CATEGORIES = ['dorsal', 'plantar', 'medial', 'lateral', 'posterior', 'casts', 'r_shoe', 'l_shoe', 'afo']
+LINE_ITEMS = [
+    ('Custom foot orthoses (pair)', '480.00'), ('Orthotic review and adjustment', '95.00'),
+    ('Initial biomechanical assessment', '150.00'), ('Custom made footwear (pair)', '1650.00'),
+    ('Footwear modification', '220.00'), ('AFO supply and fitting', '1250.00'),
+]
+NOTE_SNIPPETS = [
+    'Patient reports reduced pain since last review.',
+    'Casts taken for custom orthoses, sent to workshop.',
+    'Footwear fitted, minor pressure on 5th MTPJ, adjusted.',
+    'Discussed NDIS plan funding with coordinator.',
+    'Patient did not attend, rebooking SMS sent.',
+    'Review in 6 weeks. Continue wearing orthoses daily.',
+]
+SMS_REPLIES = ['Yes', 'YES thanks', 'Confirmed', 'Can I reschedule?', 'No', 'Running 10 min late']
+SMS_SENDER_NUMBER = '61400000000'
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    Let bulk_create keep the created_at/updated_at values we set, instead of
+    auto_now/auto_now_add overwriting them with the current time
+    """
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, deterministic synthetic dataset for load and performance testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--patients', type=int, default=50000, help='Patients to create (default: 50000)')
+        parser.add_argument('--years', type=int, default=3, help='Years of history per patient (default: 3)')
+        parser.add_argument('--seed', type=int, default=42, help='RNG seed (default: 42)')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Patients generated per batch; also the bulk_create batch size (default: 1000)',
+        )
+        parser.add_argument(
+            '--anchor-date', type=date.fromisoformat, default=None,
+            help='"Today" for generated dates, YYYY-MM-DD (default: today)',
+        )
+        parser.add_argument('--clear', action='store_true', help='Delete previously generated data first')
+        parser.add_argument(
+            '--index', action='store_true',
+            help='Rebuild the search index afterwards (bulk_create bypasses the indexing signals)',
+        )
+
+    def handle(self, *args, **options):
+        if options['patients'] < 0 or options['batch_size'] < 1 or options['years'] < 1:
+            raise CommandError('--patients must be >= 0, --batch-size and --years must be >= 1')
+
+        self.rng = random.Random(options['seed'])
+        self.seed = options['seed']
+        self.years = options['years']
+        self.batch_size = options['batch_size']
+        self.anchor = options['anchor_date'] or date.today()
+        self.tz = timezone.get_current_timezone()
+        self.patient_ct = ContentType.objects.get_for_model(Patient)
+
+        self.stdout.write("=" * 70)
+        self.stdout.write("🧪 Synthetic Load Test Data")
+        self.stdout.write("=" * 70)
+
+        if options['clear']:
+            self.clear()
+
+        self.load_reference_data()
+
+        total = options['patients']
+        counts = {}
+        started = timezone.now()
+        for offset in range(0, total, self.batch_size):
+            batch_counts = self.create_batch(offset, min(self.batch_size, total - offset))
+            for name, count in batch_counts.items():
+                counts[name] = counts.get(name, 0) + count
+            self.stdout.write(f"   {min(offset + self.batch_size, total)}/{total} patients")
+
+        # bulk_create does not fire the post_save handlers that invalidate caches
+        bump_namespace('patients')
+        if options['index']:
+            call_command('rebuild_search_index', stdout=self.stdout)
+
+        elapsed = (timezone.now() - started).total_seconds()
+        self.stdout.write("\n" + "=" * 70)
+        self.stdout.write("📊 SUMMARY")
+        self.stdout.write("=" * 70)
+        for name, count in counts.items():
+            self.stdout.write(f"{name:<20} {count}")
+        self.stdout.write(f"\n✅ Done in {elapsed:.1f}s (seed {self.seed})")
+        if not options['index']:
+            self.stdout.write("   Run `manage.py rebuild_search_index` to index the generated notes, letters and SMS.")
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    def clear(self):
+        patient_ids = list(
+            Patient.objects.filter(filemaker_metadata__synthetic=True).values_list('id', flat=True)
+        )
+        self.stdout.write(self.style.WARNING(f'Clearing {len(patient_ids)} synthetic patients...'))
+        with transaction.atomic():
+            for start in range(0, len(patient_ids), self.batch_size):
+                ids = patient_ids[start:start + self.batch_size]
+                SMSInbound.objects.filter(patient_id__in=ids).delete()
+                SMSMessage.objects.filter(patient_id__in=ids).delete()
+                XeroQuoteLink.objects.filter(patient_id__in=ids).delete()
+                XeroInvoiceLink.objects.filter(patient_id__in=ids).delete()
+                Appointment.objects.filter(patient_id__in=ids).delete()  # PROTECT on patient
+                Document.objects.filter(content_type=self.patient_ct, object_id__in=ids).delete()
+                ImageBatch.objects.filter(content_type=self.patient_ct, object_id__in=ids).delete()
+                Patient.objects.filter(id__in=ids).delete()  # cascades notes, letters, contact links
+        self.stdout.write(self.style.SUCCESS('✓ Synthetic data cleared'))
+
+    def load_reference_data(self):
+        """Use existing clinics/clinicians/types, creating a small synthetic set if there are none"""
+        self.clinics = list(Clinic.objects.order_by('name'))
+        if not self.clinics:
+            self.clinics = [Clinic.objects.create(name=name) for name in REFERENCE_CLINICS]
+
+        self.clinicians = list(Clinician.objects.filter(active=True).order_by('full_name'))
+        if not self.clinicians:
+            self.clinicians = [
+                Clinician.objects.create(full_name=name, clinic=self.clinics[i % len(self.clinics)])
+                for i, name in enumerate(REFERENCE_CLINICIANS)
+            ]
+
+        self.appointment_types = list(AppointmentType.objects.filter(is_active=True).order_by('name'))
+        if not self.appointment_types:
+            self.appointment_types = [
+                AppointmentType.objects.create(name=name, default_duration_minutes=minutes)
+                for name, minutes in REFERENCE_APPOINTMENT_TYPES
+            ]
+
+        self.funding_sources = list(FundingSource.objects.filter(active=True).order_by('name'))
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+
+    def create_batch(self, offset, size):
+        rows = {
+            'patients': [], 'contact_points': [], 'addresses': [], 'appointments': [], 'notes': [], 'letters': [], 'sms_sent': [],
+            'sms_received': [], 'xero_contacts': [], 'xero_invoices': [], 'xero_quotes': [],
+            'documents': [], 'image_batches': [], 'images': [],
+        }
+        for index in range(offset, offset + size):
+            self.build_patient(index, rows)
+
+        models = [
+            ('patients', Patient), ('contact_points', PatientContactPoint), ('addresses', PatientAddress),
+            ('appointments', Appointment), ('notes', Note),
+            ('letters', PatientLetter), ('sms_sent', SMSMessage), ('sms_received', SMSInbound),
+            ('xero_contacts', XeroContactLink), ('xero_invoices', XeroInvoiceLink),
+            ('xero_quotes', XeroQuoteLink), ('documents', Document),
+            ('image_batches', ImageBatch), ('images', Image),
+        ]
+        with transaction.atomic(), explicit_timestamps(*[model for _name, model in models]):
+            for name, model in models:
+                model.objects.bulk_create(rows[name], batch_size=self.batch_size)
+        return {name: len(objects) for name, objects in rows.items()}
+
+    def when(self, days_ago, hour=None):
+        """Aware datetime `days_ago` days before the anchor date (negative = future)"""
+        day = self.anchor - timedelta(days=days_ago)
+        hour = self.rng.randint(8, 16) if hour is None else hour
+        minute = self.rng.choice([0, 15, 30, 45])
+        return timezone.make_aware(datetime.combine(day, time(hour, minute)), self.tz)
+
+    def contact_json(self, first_name, last_name, mobile):
+        """One of the contact_json shapes in use, weighted roughly like production"""
+        rng = self.rng
+        email = f"{first_name.lower()}.{last_name.lower().replace(chr(39), '')}{rng.randint(1, 999)}@example.com"
+        landline = f"02{rng.randint(40000000, 49999999)}"
+        shape = rng.random()
+        if shape < 0.55:
+            # Nested label objects (FileMaker import / current UI)
+            contact = {'mobile': {'home': {'value': mobile, 'default': True}}}
+            if rng.random() < 0.4:
+                contact['phone'] = {'home': {'value': landline, 'default': False}}
+            if rng.random() < 0.15:
+                contact['mobile']['work'] = {'value': f"04{rng.randint(10000000, 99999999)}", 'default': False}
+            if rng.random() < 0.8:
+                contact['email'] = {'home': {'value': email, 'default': True}}
+            return contact
+        if shape < 0.75:
+            # Legacy flat strings
+            contact = {'mobile': mobile}
+            if rng.random() < 0.7:
+                contact['email'] = email
+            if rng.random() < 0.3:
+                contact['phone'] = landline
+            return contact
+        if shape < 0.9:
+            # phones/emails arrays
+            phones = [{'type': 'mobile', 'number': mobile, 'label': 'Mobile', 'default': True}]
+            if rng.random() < 0.3:
+                phones.append({'type': 'phone', 'number': landline, 'label': 'Home'})
+            return {'phones': phones, 'emails': [{'address': email, 'label': 'Home', 'default': True}]}
+        if shape < 0.95:
+            # Formatted numbers as typed in by hand
+            return {'mobile': f"{mobile[:4]} {mobile[4:7]} {mobile[7:]}", 'phone': f"({landline[:2]}) {landline[2:6]} {landline[6:]}"}
+        return None
+
+    def build_patient(self, index, rows):
+        rng = self.rng
+        years_days = 365 * self.years
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        mobile = f"04{rng.randint(10000000, 99999999)}"
+        clinic = rng.choice(self.clinics)
+        suburb, postcode = rng.choice(SUBURBS)
+        created_at = self.when(rng.randint(0, years_days + 365))
+        archived = rng.random() < 0.08
+
+        patient = Patient(
+            id=_uuid(rng),
+            mrn=f"SYN{index:07d}",
+            title=rng.choice([None, None, None] + TITLES),
+            first_name=first_name,
+            middle_names=rng.choice([None, None, None, 'Anne', 'Marie', 'John', 'Lee', 'James']),
+            last_name=last_name,
+            dob=self.anchor - timedelta(days=rng.randint(5 * 365, 95 * 365)),
+            sex=rng.choice(['M', 'F', 'O', 'U']),
+            health_number=f"43{rng.randint(10000000, 99999999)}" if rng.random() < 0.6 else None,
+            clinic=clinic,
+            funding_type=rng.choice(self.funding_sources) if self.funding_sources and rng.random() < 0.9 else None,
+            contact_json=self.contact_json(first_name, last_name, mobile),
+            address_json={
+                'street': f"{rng.randint(1, 400)} {rng.choice(STREETS)} Street",
+                'suburb': suburb,
+                'state': 'NSW',
+                'postcode': postcode,
+                'type': 'home',
+                'default': True,
+            } if rng.random() < 0.9 else None,
+            filemaker_metadata={'synthetic': True, 'seed': self.seed},
+            archived=archived,
+            archived_at=self.when(rng.randint(0, 200)) if archived else None,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        rows['patients'].append(patient)
+        points, addresses = build_rows(patient, PatientContactPoint, PatientAddress)
+        rows['contact_points'].extend(points)
+        rows['addresses'].extend(addresses)
+
+        history_days = max(1, min(years_days, (self.anchor - created_at.date()).days))
+        appointments = self.build_appointments(patient, clinic, mobile, history_days, rows)
+        self.build_notes(patient, history_days, rows)
+        self.build_letters(patient, history_days, rows)
+        self.build_xero(patient, appointments, rows)
+        self.build_files(patient, history_days, rows)
+
+    def build_appointments(self, patient, clinic, mobile, history_days, rows):
+        rng = self.rng
+        appointments = []
+        # Busy patients come every few weeks, most a few times a year
+        per_year = rng.choice([0, 1, 2, 3, 3, 4, 4, 6, 8, 12])
+        count = round(per_year * history_days / 365)
+        has_upcoming = not patient.archived and rng.random() < 0.3
+        count += has_upcoming
+        for n in range(count):
+            upcoming = has_upcoming and n == count - 1
+            days_ago = -rng.randint(1, 60) if upcoming else rng.randint(1, history_days)
+            start = self.when(days_ago)
+            appointment_type = rng.choice(self.appointment_types)
+            if days_ago < 0:
+                status = Appointment.STATUS_SCHEDULED
+            else:
+                status = rng.choices(
+                    [Appointment.STATUS_COMPLETED, Appointment.STATUS_CANCELLED, Appointment.STATUS_NO_SHOW],
+                    weights=[85, 10, 5],
+                )[0]
+            booked_at = start - timedelta(days=rng.randint(7, 60))
+            appointment = Appointment(
+                id=_uuid(rng),
+                clinic=clinic,
+                patient=patient,
+                clinician=rng.choice(self.clinicians),
+                appointment_type=appointment_type,
+                start_time=start,
+                end_time=start + timedelta(minutes=appointment_type.default_duration_minutes or 30),
+                status=status,
+                created_at=booked_at,
+                updated_at=start if days_ago >= 0 else booked_at,
+            )
+            appointments.append(appointment)
+            rows['appointments'].append(appointment)
+
+            if rng.random() < 0.75:
+                self.build_sms_thread(patient, appointment, mobile, rows)
+        return appointments
+
+    def build_sms_thread(self, patient, appointment, mobile, rows):
+        rng = self.rng
+        sent_at = appointment.start_time - timedelta(days=1)
+        if sent_at > timezone.make_aware(datetime.combine(self.anchor, time(23, 59)), self.tz):
+            status = 'pending'
+        else:
+            status = rng.choices(['delivered', 'sent', 'failed'], weights=[88, 8, 4])[0]
+        message = (
+            f"Hi {patient.first_name}, reminder of your appointment on "
+            f"{appointment.start_time:%d/%m} at {appointment.start_time:%I:%M%p}. Reply YES to confirm."
+        )
+        rows['sms_sent'].append(SMSMessage(
+            id=_uuid(rng),
+            patient=patient,
+            appointment=appointment,
+            phone_number=mobile,
+            message=message,
+            status=status,
+            external_message_id=f"syn-{rng.getrandbits(40):x}" if status != 'pending' else '',
+            created_at=sent_at - timedelta(minutes=5),
+            scheduled_at=sent_at,
+            sent_at=sent_at if status in ('sent', 'delivered') else None,
+            delivered_at=sent_at + timedelta(seconds=rng.randint(2, 90)) if status == 'delivered' else None,
+            error_message='Invalid number' if status == 'failed' else '',
+            sms_count=1,
+        ))
+        if status == 'delivered' and rng.random() < 0.5:
+            rows['sms_received'].append(SMSInbound(
+                id=_uuid(rng),
+                from_number=f"61{mobile[1:]}",
+                to_number=SMS_SENDER_NUMBER,
+                message=rng.choice(SMS_REPLIES),
+                external_message_id=f"syn-in-{rng.getrandbits(40):x}",
+                received_at=sent_at + timedelta(minutes=rng.randint(1, 600)),
+                patient=patient,
+                is_processed=True,
+            ))
+
+    def build_notes(self, patient, history_days, rows):
+        rng = self.rng
+        note_types = [choice for choice, _label in Note.NOTE_TYPE_CHOICES]
+        for _ in range(rng.choice([0, 1, 2, 3, 4, 6, 10, 20])):
+            created_at = self.when(rng.randint(0, history_days))
+            rows['notes'].append(Note(
+                id=_uuid(rng),
+                patient=patient,
+                note_type=rng.choices(note_types, weights=[50, 5, 10, 15, 5, 3, 10, 2])[0],
+                content=' '.join(rng.sample(NOTE_SNIPPETS, rng.randint(1, 4))),
+                created_by=rng.choice(self.clinicians).full_name,
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+
+    def build_letters(self, patient, history_days, rows):
+        rng = self.rng
+        for _ in range(rng.choice([0, 0, 0, 1, 1, 2, 4])):
+            created_at = self.when(rng.randint(0, history_days))
+            pages = [
+                f"<p>Dear Sir/Madam,</p><p>Re: {patient.first_name} {patient.last_name}</p>"
+                + ''.join(f"<p>{rng.choice(NOTE_SNIPPETS)}</p>" for _ in range(rng.randint(3, 12)))
+                for _ in range(rng.randint(1, 3))
+            ]
+            rows['letters'].append(PatientLetter(
+                id=_uuid(rng),
+                patient=patient,
+                letter_type=rng.choice(LETTER_TYPES),
+                recipient_name=rng.choice(['', 'Dr Smith', 'NDIS Planner', 'Support Coordinator']),
+                subject=f"{patient.first_name} {patient.last_name}",
+                pages=pages,
+                created_at=created_at,
+                updated_at=created_at + timedelta(minutes=rng.randint(0, 120)),
+            ))
+
+    def build_xero(self, patient, appointments, rows):
+        rng = self.rng
+        if rng.random() >= 0.6:
+            return
+        rows['xero_contacts'].append(XeroContactLink(
+            id=_uuid(rng),
+            patient=patient,
+            xero_contact_id=str(_uuid(rng)),
+            xero_contact_name=f"{patient.first_name} {patient.last_name}",
+            created_at=patient.created_at,
+            updated_at=patient.created_at,
+        ))
+
+        for appointment in appointments:
+            if appointment.status != Appointment.STATUS_COMPLETED or rng.random() >= 0.5:
+                continue
+            line_items = self.line_items()
+            total = sum(Decimal(item['line_amount']) for item in line_items)
+            status = rng.choices(['PAID', 'AUTHORISED', 'DRAFT', 'VOIDED'], weights=[70, 20, 7, 3])[0]
+            invoice_date = appointment.start_time.date()
+            rows['xero_invoices'].append(XeroInvoiceLink(
+                id=_uuid(rng),
+                appointment=appointment,
+                patient=patient,
+                clinician=appointment.clinician,
+                xero_invoice_id=f"syn-{_uuid(rng)}",
+                xero_invoice_number=f"SYN-{len(rows['xero_invoices']) + rng.getrandbits(24)}",
+                status=status,
+                total=total,
+                subtotal=total,
+                amount_paid=total if status == 'PAID' else 0,
+                amount_due=0 if status == 'PAID' else total,
+                line_items=line_items,
+                invoice_date=invoice_date,
+                due_date=invoice_date + timedelta(days=7),
+                created_at=appointment.start_time,
+                updated_at=appointment.start_time,
+            ))
+
+        if appointments and rng.random() < 0.15:
+            line_items = self.line_items()
+            total = sum(Decimal(item['line_amount']) for item in line_items)
+            quote_date = appointments[0].start_time.date()
+            rows['xero_quotes'].append(XeroQuoteLink(
+                id=_uuid(rng),
+                patient=patient,
+                xero_quote_id=f"syn-{_uuid(rng)}",
+                xero_quote_number=f"QU-SYN-{rng.getrandbits(24)}",
+                status=rng.choice(['DRAFT', 'SENT', 'ACCEPTED']),
+                total=total,
+                subtotal=total,
+                line_items=line_items,
+                quote_date=quote_date,
+                expiry_date=quote_date + timedelta(days=30),
+                created_at=appointments[0].start_time,
+                updated_at=appointments[0].start_time,
+            ))
+
+    def line_items(self):
+        items = []
+        for description, amount in self.rng.sample(LINE_ITEMS, self.rng.randint(1, 3)):
+            items.append({
+                'description': description,
+                'quantity': 1.0,
+                'unit_amount': amount,
+                'discount': None,
+                'tax_type': 'EXEMPTOUTPUT',
+                'tax_amount': '0.00',
+                'line_amount': amount,
+                'account_code': '200',
+            })
+        return items
+
+    def build_files(self, patient, history_days, rows):
+        rng = self.rng
+        for _ in range(rng.choice([0, 0, 1, 1, 2, 3, 5])):
+            uploaded_at = self.when(rng.randint(0, history_days))
+            category = rng.choice(DOCUMENT_CATEGORIES)
+            file_name = f"{category}_{rng.getrandbits(32):08x}.pdf"
+            rows['documents'].append(Document(
+                id=_uuid(rng),
+                content_type=self.patient_ct,
+                object_id=patient.id,
+                file_name=file_name,
+                original_name=file_name,
+                file_size=rng.randint(40_000, 4_000_000),
+                mime_type='application/pdf',
+                s3_bucket='synthetic',
+                s3_key=f"documents/patients/{patient.id}/{file_name}",
+                category=category,
+                document_date=uploaded_at.date(),
+                uploaded_at=uploaded_at,
+                updated_at=uploaded_at,
+            ))
+
+        for _ in range(rng.choice([0, 0, 0, 1, 1, 2])):
+            uploaded_at = self.when(rng.randint(0, history_days))
+            batch = ImageBatch(
+                id=_uuid(rng),
+                content_type=self.patient_ct,
+                object_id=patient.id,
+                name=f"{uploaded_at:%d/%m/%Y} - Casting",
+                image_count=rng.randint(2, 12),
+                uploaded_at=uploaded_at,
+            )
+            rows['image_batches'].append(batch)
+            for order in range(batch.image_count):
+                key = f"images/patients/{patient.id}/{batch.id}/{order:02d}.jpg"
+                rows['images'].append(Image(
+                    id=_uuid(rng),
+                    batch=batch,
+                    s3_key=key,
+                    s3_thumbnail_key=key.replace('.jpg', '_thumb.jpg'),
+                    original_name=f"IMG_{rng.randint(1000, 9999)}.jpg",
+                    file_size=rng.randint(800_000, 6_000_000),
+                    thumbnail_size=rng.randint(15_000, 60_000),
+                    width=4032,
+                    height=3024,
+                    category=rng.choice(IMAGE_CATEGORIES),
+                    date_taken=uploaded_at.date(),
+                    uploaded_at=uploaded_at,
+                    order=order,
+                ))
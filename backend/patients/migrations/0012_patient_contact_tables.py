@@ -0,0 +1,56 @@
+# Generated by Django 4.2.25 on 2026-10-19 08:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0011_remove_funding_source_choices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientContactPoint',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('phone', 'Phone'), ('email', 'Email')], max_length=10)),
+                ('type', models.CharField(help_text='mobile, phone, emergency or email', max_length=20)),
+                ('label', models.CharField(blank=True, help_text="Display label, e.g. 'Mobile - Home', 'Mother'", max_length=100)),
+                ('value', models.CharField(help_text='As entered', max_length=255)),
+                ('normalized_value', models.CharField(help_text='Phones: digits with 61 country code; emails: lowercase', max_length=255)),
+                ('is_default', models.BooleanField(default=False)),
+                ('position', models.PositiveSmallIntegerField(default=0, help_text='Display order (default first)')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contact_points', to='patients.patient')),
+            ],
+            options={
+                'db_table': 'patient_contact_points',
+                'ordering': ['position'],
+                'indexes': [models.Index(fields=['kind', 'normalized_value'], name='patient_con_kind_29b42b_idx'), models.Index(fields=['patient', 'position'], name='patient_con_patient_4c781f_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PatientAddress',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('type', models.CharField(default='home', max_length=50)),
+                ('street', models.CharField(blank=True, max_length=255)),
+                ('street2', models.CharField(blank=True, max_length=255)),
+                ('suburb', models.CharField(blank=True, max_length=100)),
+                ('state', models.CharField(blank=True, max_length=50)),
+                ('postcode', models.CharField(blank=True, max_length=10)),
+                ('is_default', models.BooleanField(default=False)),
+                ('position', models.PositiveSmallIntegerField(default=0, help_text='Display order (default first)')),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='addresses', to='patients.patient')),
+            ],
+            options={
+                'verbose_name_plural': 'Patient addresses',
+                'db_table': 'patient_addresses',
+                'ordering': ['position'],
+                'indexes': [models.Index(fields=['postcode'], name='patient_add_postcod_b846d0_idx'), models.Index(django.db.models.functions.text.Lower('suburb'), name='patient_address_suburb_lower'), models.Index(fields=['patient', 'position'], name='patient_add_patient_0655f9_idx')],
+            },
+        ),
+    ]
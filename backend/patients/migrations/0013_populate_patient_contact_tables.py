@@ -0,0 +1,46 @@
+# Generated by Django 4.2.25 on 2026-10-19 08:25
+
+from django.db import migrations
+
+from patients.contact_points import build_rows
+
+BATCH_SIZE = 2000
+
+
+def populate_contact_tables(apps, schema_editor):
+    """
+    Parse every patient's contact_json/emergency_json/address_json (all the
+    legacy shapes, see patients/contact_points.py) into the new tables.
+    """
+    Patient = apps.get_model('patients', 'Patient')
+    PatientContactPoint = apps.get_model('patients', 'PatientContactPoint')
+    PatientAddress = apps.get_model('patients', 'PatientAddress')
+
+    points, addresses = [], []
+    patients = Patient.objects.only('id', 'contact_json', 'emergency_json', 'address_json')
+    for patient in patients.iterator(chunk_size=BATCH_SIZE):
+        patient_points, patient_addresses = build_rows(patient, PatientContactPoint, PatientAddress)
+        points.extend(patient_points)
+        addresses.extend(patient_addresses)
+        if len(points) >= BATCH_SIZE:
+            PatientContactPoint.objects.bulk_create(points)
+            PatientAddress.objects.bulk_create(addresses)
+            points, addresses = [], []
+    PatientContactPoint.objects.bulk_create(points)
+    PatientAddress.objects.bulk_create(addresses)
+
+
+def clear_contact_tables(apps, schema_editor):
+    apps.get_model('patients', 'PatientContactPoint').objects.all().delete()
+    apps.get_model('patients', 'PatientAddress').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0012_patient_contact_tables'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_contact_tables, clear_contact_tables),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.25 on 2026-10-19 08:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0013_populate_patient_contact_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientVersion',
+            fields=[
+                ('patient', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='version_stamp', serialize=False, to='patients.patient')),
+                ('version', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'patient_versions',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.25 on 2026-10-19 08:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0014_patient_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='merged_into',
+            field=models.ForeignKey(blank=True, help_text='Patient this duplicate was merged into (see patients/dedupe.py)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='merged_patients', to='patients.patient'),
+        ),
+    ]
@@ -3,7 +3,8 @@ Patient models for WalkEasy Nexus
 Based on schema from: 02-Target-Postgres-Schema.md
 """
 import uuid
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 
@@ -204,6 +205,15 @@ class Patient(models.Model):
         help_text="User who archived this patient (optional)"
     )
     
+    merged_into = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='merged_patients',
+        help_text="Patient this duplicate was merged into (see patients/dedupe.py)"
+    )
+    
     # Contact information (stored as JSON for flexibility)
     contact_json = models.JSONField(
         null=True,
@@ -313,8 +323,148 @@ class Patient(models.Model):
         if self.contact_json and 'email' in self.contact_json:
             return self.contact_json['email']
         return None
+
+    def default_phone(self, types=('mobile', 'phone')):
+        """
+        Default phone number of one of `types` (from PatientContactPoint,
+        prefetch 'contact_points' when calling this for many patients)
+        """
+        for point in self.contact_points.all():
+            if point.kind == 'phone' and point.type in types:
+                return point.value
+        return None
+
+    def default_email(self):
+        """Default email address (from PatientContactPoint)"""
+        for point in self.contact_points.all():
+            if point.kind == 'email':
+                return point.value
+        return None
+
+    def default_address(self):
+        """Default PatientAddress, or None"""
+        addresses = list(self.addresses.all())
+        return addresses[0] if addresses else None
+
+    def sync_contact_tables(self):
+        """Rebuild this patient's PatientContactPoint/PatientAddress rows from the JSON fields"""
+        from .contact_points import build_rows
+
+        points, addresses = build_rows(self, PatientContactPoint, PatientAddress)
+        with transaction.atomic():
+            PatientContactPoint.objects.filter(patient=self).delete()
+            PatientAddress.objects.filter(patient=self).delete()
+            PatientContactPoint.objects.bulk_create(points)
+            PatientAddress.objects.bulk_create(addresses)
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        prefetched.pop('contact_points', None)
+        prefetched.pop('addresses', None)
     
     @property
     def display_name(self):
         """Property for easy display name access"""
         return self.get_full_name()
+
+
+class PatientContactPoint(models.Model):
+    """
+    One phone number or email address of a patient, parsed from
+    contact_json/emergency_json (see patients/contact_points.py).
+    Rebuilt whenever the patient is saved; the JSON stays the source of truth.
+    """
+
+    KIND_CHOICES = [
+        ('phone', 'Phone'),
+        ('email', 'Email'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='contact_points')
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    type = models.CharField(max_length=20, help_text="mobile, phone, emergency or email")
+    label = models.CharField(max_length=100, blank=True, help_text="Display label, e.g. 'Mobile - Home', 'Mother'")
+    value = models.CharField(max_length=255, help_text="As entered")
+    normalized_value = models.CharField(
+        max_length=255,
+        help_text="Phones: digits with 61 country code; emails: lowercase",
+    )
+    is_default = models.BooleanField(default=False)
+    position = models.PositiveSmallIntegerField(default=0, help_text="Display order (default first)")
+
+    class Meta:
+        db_table = 'patient_contact_points'
+        ordering = ['position']
+        indexes = [
+            models.Index(fields=['kind', 'normalized_value']),  # find patient by phone/email
+            models.Index(fields=['patient', 'position']),
+        ]
+
+    def __str__(self):
+        return f"{self.label}: {self.value}"
+
+    def as_phone_option(self):
+        """The dict get_available_phone_numbers() returns"""
+        return {'value': self.value, 'label': self.label, 'is_default': self.is_default, 'type': self.type}
+
+
+class PatientAddress(models.Model):
+    """
+    A patient address parsed from address_json (see patients/contact_points.py).
+    Rebuilt whenever the patient is saved; the JSON stays the source of truth.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    patient = models.ForeignKey(Patient, on_delete=models.CASCADE, related_name='addresses')
+
+    type = models.CharField(max_length=50, default='home')
+    street = models.CharField(max_length=255, blank=True)
+    street2 = models.CharField(max_length=255, blank=True)
+    suburb = models.CharField(max_length=100, blank=True)
+    state = models.CharField(max_length=50, blank=True)
+    postcode = models.CharField(max_length=10, blank=True)
+    is_default = models.BooleanField(default=False)
+    position = models.PositiveSmallIntegerField(default=0, help_text="Display order (default first)")
+
+    class Meta:
+        db_table = 'patient_addresses'
+        ordering = ['position']
+        verbose_name_plural = 'Patient addresses'
+        indexes = [
+            models.Index(fields=['postcode']),
+            models.Index(Lower('suburb'), name='patient_address_suburb_lower'),
+            models.Index(fields=['patient', 'position']),
+        ]
+
+    def __str__(self):
+        return ', '.join(part for part in (self.street, self.suburb, self.state, self.postcode) if part)
+
+
+class PatientVersion(models.Model):
+    """
+    Version stamp for everything shown about a patient: the patient row and
+    their notes, letters, documents, images, appointments, reminders, SMS,
+    referrers and Xero links (see patients/versions.py).
+
+    Kept out of the patients table so a Patient.save() with a stale
+    in-memory copy can never write an old version back; only
+    bump_patient_versions() writes here, with an atomic increment.
+    """
+
+    patient = models.OneToOneField(
+        Patient,
+        primary_key=True,
+        # Rows are removed by a post_delete handler, after related rows have
+        # been deleted (and bumped the version) during a cascade
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='version_stamp',
+    )
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'patient_versions'
+
+    def __str__(self):
+        return f"{self.patient_id} v{self.version}"
@@ -1,9 +1,29 @@
 """
 API Serializers for Patient models
 """
+from django.db.models import Prefetch
 from rest_framework import serializers
+from clinicians.models import Clinic
+from settings.models import FundingSource
 from .models import Patient
 
+ACTIVE_REFERRERS_ATTR = 'active_patient_referrers'
+
+
+def active_referrers_prefetch():
+    """
+    Prefetch for PatientListSerializer.referrers, so serializing many
+    patients takes one referrer query instead of one per patient
+    """
+    from referrers.models import PatientReferrer
+    return Prefetch(
+        'patient_referrers',
+        queryset=PatientReferrer.objects.filter(status='ACTIVE').select_related(
+            'referrer', 'referrer__specialty'
+        ).order_by('-is_primary', '-referral_date', '-updated_at'),
+        to_attr=ACTIVE_REFERRERS_ATTR,
+    )
+
 
 class PatientSerializer(serializers.ModelSerializer):
     """Serializer for Patient model"""
@@ -21,11 +41,11 @@ class PatientSerializer(serializers.ModelSerializer):
             'dob', 'sex', 'title', 'health_number', 'funding_source', 'funding_type', 'clinic',
             'coordinator_name', 'coordinator_date', 'plan_start_date', 'plan_end_date',
             'plan_dates_json', 'ndis_plan_start_date', 'ndis_plan_end_date', 'notes', 'filemaker_metadata', 'contact_json', 'address_json', 'emergency_json',
-            'flags_json', 'archived', 'archived_at', 'archived_by',
+            'flags_json', 'archived', 'archived_at', 'archived_by', 'merged_into',
             'created_at', 'updated_at',
             'age', 'full_name', 'mobile', 'email', 'referrers'  # computed fields
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'archived_at', 'age', 'full_name', 'mobile', 'email', 'referrers']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'archived_at', 'merged_into', 'age', 'full_name', 'mobile', 'email', 'referrers']
     
     def to_representation(self, instance):
         """Customize serialization to include related object names"""
@@ -146,11 +166,13 @@ class PatientListSerializer(serializers.ModelSerializer):
     def get_referrers(self, obj):
         """Get patient's referrers (PatientReferrer relationships)"""
         try:
-            from referrers.models import PatientReferrer
-            patient_referrers = PatientReferrer.objects.filter(
-                patient=obj,
-                status='ACTIVE'
-            ).select_related('referrer', 'referrer__specialty').order_by('-is_primary', '-referral_date', '-updated_at')
+            patient_referrers = getattr(obj, ACTIVE_REFERRERS_ATTR, None)
+            if patient_referrers is None:
+                from referrers.models import PatientReferrer
+                patient_referrers = PatientReferrer.objects.filter(
+                    patient=obj,
+                    status='ACTIVE'
+                ).select_related('referrer', 'referrer__specialty').order_by('-is_primary', '-referral_date', '-updated_at')
             
             return [{
                 'id': str(pr.id),
@@ -167,3 +189,51 @@ class PatientListSerializer(serializers.ModelSerializer):
             # If referrers app not available or error, return empty list
             return []
 
+
+class PatientBulkFilterSerializer(serializers.Serializer):
+    """Filter expression for bulk operations (see patients/bulk.py)"""
+    clinic = serializers.PrimaryKeyRelatedField(queryset=Clinic.objects.all(), required=False, allow_null=True)
+    funding_type = serializers.PrimaryKeyRelatedField(queryset=FundingSource.objects.all(), required=False, allow_null=True)
+    archived = serializers.BooleanField(required=False)
+    sex = serializers.CharField(required=False)
+    created_before = serializers.DateField(required=False)
+    created_after = serializers.DateField(required=False)
+    no_appointments_since = serializers.DateField(required=False)
+    filemaker_import = serializers.BooleanField(required=False)
+    
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError('Filter must have at least one condition')
+        return attrs
+
+
+class PatientBulkSerializer(serializers.Serializer):
+    """Selection for a bulk operation: a list of ids or a filter, not both"""
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False)
+    filter = PatientBulkFilterSerializer(required=False)
+    dry_run = serializers.BooleanField(default=False)
+    
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError('Provide either ids or filter')
+        return attrs
+
+
+class PatientBulkUpdateSerializer(PatientBulkSerializer):
+    """Selection plus the fields to set"""
+    UPDATE_FIELDS = ('clinic', 'funding_type')
+    
+    clinic = serializers.PrimaryKeyRelatedField(queryset=Clinic.objects.all(), required=False, allow_null=True)
+    funding_type = serializers.PrimaryKeyRelatedField(queryset=FundingSource.objects.all(), required=False, allow_null=True)
+    
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if not any(field in attrs for field in self.UPDATE_FIELDS):
+            raise serializers.ValidationError(f"Provide at least one of: {', '.join(self.UPDATE_FIELDS)}")
+        return attrs
+
+
+class PatientMergeSerializer(serializers.Serializer):
+    """Body of POST /api/patients/{id}/merge/"""
+    duplicate = serializers.UUIDField()
+    dry_run = serializers.BooleanField(default=False)
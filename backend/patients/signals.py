@@ -0,0 +1,115 @@
+"""
+Signal handlers for patients:
+
+- keep PatientContactPoint/PatientAddress in sync with the patient's
+  contact JSON fields
+- bump the patient's version stamp (patients/versions.py) when the
+  patient or anything shown with them changes. A row moved to another
+  patient bumps both: pre_save notes who it belonged to before.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .models import Patient, PatientVersion
+from .versions import bump_patient_versions
+
+CONTACT_FIELDS = {'contact_json', 'emergency_json', 'address_json'}
+
+# Models with a `patient` foreign key whose rows appear in patient-scoped responses
+PATIENT_RELATED_MODELS = [
+    'notes.Note',
+    'letters.PatientLetter',
+    'appointments.Appointment',
+    'reminders.Reminder',
+    'sms_integration.SMSMessage',
+    'sms_integration.SMSInbound',
+    'referrers.PatientReferrer',
+    'xero_integration.XeroContactLink',
+    'xero_integration.XeroInvoiceLink',
+    'xero_integration.XeroQuoteLink',
+]
+
+# Models linked to a patient through content_type/object_id
+GENERIC_RELATED_MODELS = [
+    'documents.Document',
+    'images.ImageBatch',
+]
+
+
+def sync_contact_tables(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return  # loaddata
+    if update_fields is not None and not CONTACT_FIELDS & set(update_fields):
+        return
+    instance.sync_contact_tables()
+
+
+def bump_patient(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_patient_versions([instance.pk])
+
+
+def delete_patient_version(sender, instance, **kwargs):
+    PatientVersion.objects.filter(patient_id=instance.pk).delete()
+
+
+def _is_update(instance, raw, update_fields, fields):
+    if raw or instance._state.adding:
+        return False
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+def remember_related_patient(sender, instance, raw=False, update_fields=None, **kwargs):
+    if _is_update(instance, raw, update_fields, {'patient', 'patient_id'}):
+        instance._previous_patient_id = sender.objects.filter(pk=instance.pk).values_list('patient_id', flat=True).first()
+
+
+def bump_related_patient(sender, instance, raw=False, **kwargs):
+    previous_patient_id = instance.__dict__.pop('_previous_patient_id', None)
+    if not raw:
+        bump_patient_versions([instance.patient_id, previous_patient_id])
+
+
+def remember_generic_related_patient(sender, instance, raw=False, update_fields=None, **kwargs):
+    if _is_update(instance, raw, update_fields, {'content_type', 'content_type_id', 'object_id'}):
+        instance._previous_patient_id = sender.objects.filter(
+            pk=instance.pk,
+            content_type=ContentType.objects.get_for_model(Patient),
+        ).values_list('object_id', flat=True).first()
+
+
+def bump_generic_related_patient(sender, instance, raw=False, **kwargs):
+    previous_patient_id = instance.__dict__.pop('_previous_patient_id', None)
+    if raw:
+        return
+    patient_ids = [previous_patient_id]
+    if instance.content_type_id == ContentType.objects.get_for_model(Patient).pk:
+        patient_ids.append(instance.object_id)
+    bump_patient_versions(patient_ids)
+
+
+def bump_image_patient(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    from images.models import ImageBatch
+    patient_ids = ImageBatch.objects.filter(
+        pk=instance.batch_id,
+        content_type=ContentType.objects.get_for_model(Patient),
+    ).values_list('object_id', flat=True)
+    bump_patient_versions(patient_ids)
+
+
+post_save.connect(sync_contact_tables, sender=Patient, dispatch_uid='patient_contact_tables')
+
+post_save.connect(bump_patient, sender=Patient, dispatch_uid='patient_version_patient_save')
+post_delete.connect(delete_patient_version, sender=Patient, dispatch_uid='patient_version_patient_delete')
+for label in PATIENT_RELATED_MODELS:
+    pre_save.connect(remember_related_patient, sender=label, dispatch_uid=f'patient_version_{label.lower()}_pre_save')
+    post_save.connect(bump_related_patient, sender=label, dispatch_uid=f'patient_version_{label.lower()}_save')
+    post_delete.connect(bump_related_patient, sender=label, dispatch_uid=f'patient_version_{label.lower()}_delete')
+for label in GENERIC_RELATED_MODELS:
+    pre_save.connect(remember_generic_related_patient, sender=label, dispatch_uid=f'patient_version_{label.lower()}_pre_save')
+    post_save.connect(bump_generic_related_patient, sender=label, dispatch_uid=f'patient_version_{label.lower()}_save')
+    post_delete.connect(bump_generic_related_patient, sender=label, dispatch_uid=f'patient_version_{label.lower()}_delete')
+post_save.connect(bump_image_patient, sender='images.Image', dispatch_uid='patient_version_images.image_save')
+post_delete.connect(bump_image_patient, sender='images.Image', dispatch_uid='patient_version_images.image_delete')
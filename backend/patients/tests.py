@@ -1,3 +1,357 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from documents.models import Document
+from notes.models import Note
+from referrers.models import PatientReferrer, Referrer
+from xero_integration.models import XeroConnection, XeroContactLink
+
+from .contact_points import normalize_phone, parse_addresses, parse_contact_points
+from .dedupe import Record, find_duplicates, merge_patients, score_pair, soundex
+from .models import Patient
+from .versions import get_patient_version
+
+
+def _summary(points):
+    return [(point['kind'], point['label'], point['value'], point['is_default']) for point in points]
+
+
+class ParseContactPointsTests(TestCase):
+
+    def test_legacy_strings(self):
+        points = parse_contact_points({'mobile': '0412 345 678', 'phone': '02 9999 0000', 'email': 'a@example.com'})
+        self.assertEqual(_summary(points), [
+            ('phone', 'Mobile - Home', '0412 345 678', True),
+            ('phone', 'Phone - Home', '02 9999 0000', False),
+            ('email', 'Email - Home', 'a@example.com', True),
+        ])
+        self.assertEqual(points[0]['normalized_value'], '61412345678')
+        self.assertEqual([point['position'] for point in points], [0, 1, 2])
+
+    def test_nested_label_objects_use_the_default_flag(self):
+        points = parse_contact_points({'mobile': {
+            'home': {'value': '0400 000 001'},
+            'work': {'value': '0400 000 002', 'default': True},
+        }})
+        self.assertEqual(_summary(points), [
+            ('phone', 'Mobile - Work', '0400 000 002', True),
+            ('phone', 'Mobile - Home', '0400 000 001', False),
+        ])
+
+    def test_nested_strings_default_to_the_first_mobile(self):
+        points = parse_contact_points({'phone': {'home': '02 1111 2222'}, 'mobile': {'work': '0400 000 003'}})
+        self.assertEqual(_summary(points), [
+            ('phone', 'Mobile - Work', '0400 000 003', True),
+            ('phone', 'Phone - Home', '02 1111 2222', False),
+        ])
+
+    def test_arrays(self):
+        points = parse_contact_points({
+            'phones': [
+                {'type': 'phone', 'phone': '02 3333 4444', 'label': 'Work'},
+                {'type': 'mobile', 'number': '0400 000 004', 'label': 'Personal', 'is_default': True},
+            ],
+            'emails': ['x@example.com, z@example.com', {'value': 'w@example.com', 'label': 'Work', 'default': True}],
+        })
+        self.assertEqual(_summary(points), [
+            ('phone', 'Mobile - Personal', '0400 000 004', True),
+            ('phone', 'Phone - Work', '02 3333 4444', False),
+            ('email', 'Email - Work', 'w@example.com', True),
+            ('email', 'Email', 'x@example.com', False),
+            ('email', 'Email', 'z@example.com', False),
+        ])
+
+    def test_emergency_contacts_come_after_the_default_phone(self):
+        points = parse_contact_points({'phone': '02 5555 6666'}, {'mother': {'name': 'Mary', 'mobile': '0400 000 005'}})
+        self.assertEqual(_summary(points), [
+            ('phone', 'Phone - Home', '02 5555 6666', True),
+            ('phone', 'Mother', '0400 000 005', False),
+        ])
+        self.assertEqual(points[1]['type'], 'emergency')
+
+    def test_ignores_non_dict_json(self):
+        self.assertEqual(parse_contact_points(None, 'junk'), [])
+        self.assertEqual(parse_contact_points(['0400 000 006']), [])
+
+    def test_normalize_phone(self):
+        self.assertEqual(normalize_phone('(02) 9999-0000'), '61299990000')
+        self.assertEqual(normalize_phone('+61 412 345 678'), '61412345678')
+        self.assertIsNone(normalize_phone(''))
+
+
+class ParseAddressesTests(TestCase):
+
+    def test_single_address(self):
+        addresses = parse_addresses({'street': '1 Main St', 'suburb': 'Town', 'state': 'NSW', 'postcode': '2000'})
+        self.assertEqual(len(addresses), 1)
+        self.assertEqual(addresses[0]['type'], 'home')
+        self.assertTrue(addresses[0]['is_default'])
+        self.assertEqual(addresses[0]['position'], 0)
+
+    def test_list_puts_the_default_first(self):
+        addresses = parse_addresses([
+            {'street': 'PO Box 1', 'type': 'postal'},
+            {'street': '2 High St', 'type': 'home', 'default': True},
+        ])
+        self.assertEqual([(a['type'], a['street'], a['is_default']) for a in addresses], [
+            ('home', '2 High St', True),
+            ('postal', 'PO Box 1', False),
+        ])
+
+    def test_keyed_by_type(self):
+        addresses = parse_addresses({
+            'home': {'street': '3 Low St'},
+            'postal': {'address_1': 'PO Box 2', 'is_default': True},
+        })
+        self.assertEqual([(a['type'], a['street'], a['position']) for a in addresses], [
+            ('postal', 'PO Box 2', 0),
+            ('home', '3 Low St', 1),
+        ])
+
+    def test_without_a_default_the_first_is_default(self):
+        addresses = parse_addresses([{'street': '4 First St'}, {'street': '5 Second St'}])
+        self.assertEqual([a['is_default'] for a in addresses], [True, False])
+
+    def test_drops_empty_entries(self):
+        self.assertEqual(parse_addresses({'home': {'state': 'NSW'}, 'postal': 'PO Box 3'}), [])
+        self.assertEqual(parse_addresses(None), [])
+
+
+class PatientContactTablesTests(TestCase):
+
+    def test_save_rebuilds_contact_points(self):
+        patient = Patient.objects.create(
+            first_name='Jane', last_name='Citizen',
+            contact_json={'mobile': '0412 345 678', 'email': 'jane@example.com'},
+            address_json={'street': '1 Main St', 'suburb': 'Town'},
+        )
+        self.assertEqual(patient.default_phone(), '0412 345 678')
+        self.assertEqual(patient.default_email(), 'jane@example.com')
+        self.assertEqual(patient.default_address().street, '1 Main St')
+
+        patient.contact_json = {'emails': [{'address': 'new@example.com'}]}
+        patient.save(update_fields=['contact_json'])
+        self.assertIsNone(patient.default_phone())
+        self.assertEqual(patient.default_email(), 'new@example.com')
+
+
+class PatientVersionTests(TestCase):
+
+    def setUp(self):
+        self.first = Patient.objects.create(first_name='Jane', last_name='Citizen')
+        self.second = Patient.objects.create(first_name='John', last_name='Smith')
+
+    def versions(self):
+        return get_patient_version(self.first.pk), get_patient_version(self.second.pk)
+
+    def test_moving_a_row_bumps_both_patients(self):
+        note = Note.objects.create(patient=self.first, content='Seen for orthotics')
+        first, second = self.versions()
+
+        note.patient = self.second
+        note.save()
+
+        self.assertEqual(self.versions(), (first + 1, second + 1))
+
+    def test_editing_a_row_bumps_only_its_patient(self):
+        note = Note.objects.create(patient=self.first, content='Seen for orthotics')
+        first, second = self.versions()
+
+        note.content = 'Seen for orthotic review'
+        note.save(update_fields=['content'])
+
+        self.assertEqual(self.versions(), (first + 1, second))
+
+    def test_moving_a_document_bumps_both_patients(self):
+        document = Document.objects.create(
+            content_type=ContentType.objects.get_for_model(Patient), object_id=self.first.pk,
+            file_name='referral.pdf', original_name='referral.pdf', file_size=1,
+            mime_type='application/pdf', s3_bucket='bucket', s3_key='documents/referral.pdf',
+        )
+        first, second = self.versions()
+
+        document.object_id = self.second.pk
+        document.save()
+
+        self.assertEqual(self.versions(), (first + 1, second + 1))
+
+
+class SoundexTests(TestCase):
+
+    def test_standard_codes(self):
+        self.assertEqual(soundex('Robert'), 'R163')
+        self.assertEqual(soundex('Rupert'), 'R163')
+        self.assertEqual(soundex('Tymczak'), 'T522')
+        self.assertEqual(soundex('Lee'), 'L000')
+
+    def test_h_and_w_do_not_separate_same_codes(self):
+        # S and C share code 2; the H between them does not split them
+        self.assertEqual(soundex('Ashcraft'), 'A261')
+        self.assertEqual(soundex('Pfister'), 'P236')
+
+    def test_ignores_non_letters(self):
+        self.assertEqual(soundex("O'Brien"), soundex('OBrien'))
+        self.assertEqual(soundex('Smith-Jones'), soundex('SmithJones'))
+        self.assertEqual(soundex('123'), '')
+        self.assertEqual(soundex(None), '')
+
+
+def _record(first_name='Jane', last_name='Citizen', dob=None, sex='', health_number='', phones=()):
+    return Record(None, '', first_name, last_name, dob, sex, health_number, None, set(phones))
+
+
+class ScorePairTests(TestCase):
+
+    def test_same_person(self):
+        score, reasons = score_pair(_record(dob=date(1980, 3, 4)), _record(dob=date(1980, 3, 4)))
+        self.assertEqual(score, 65)
+        self.assertIn('same date of birth', reasons)
+
+    def test_swapped_day_and_month(self):
+        score, reasons = score_pair(_record(dob=date(1980, 3, 4)), _record(dob=date(1980, 4, 3)))
+        self.assertEqual(score, 50)
+        self.assertIn('date of birth with day and month swapped', reasons)
+
+    def test_conflicting_dob_and_health_number_count_against(self):
+        score, _ = score_pair(
+            _record(dob=date(1980, 3, 4), health_number='1111'),
+            _record(dob=date(1981, 3, 4), health_number='2222'),
+        )
+        self.assertEqual(score, 0)
+
+    def test_sounds_alike_and_shortened_names(self):
+        score, reasons = score_pair(_record('Kath', 'Smith'), _record('Katherine', 'Smyth'))
+        self.assertEqual(reasons, ['surname sounds alike', 'first name shortened'])
+        self.assertEqual(score, 20)
+
+
+class MergePatientsTests(TestCase):
+
+    def setUp(self):
+        self.primary = Patient.objects.create(first_name='Jane', last_name='Citizen', dob=date(1980, 3, 4))
+        self.duplicate = Patient.objects.create(
+            first_name='Jane', last_name='Citizen', dob=date(1980, 3, 4), health_number='1234 56789',
+        )
+
+    def test_finds_the_pair_with_the_older_record_as_primary(self):
+        candidates = find_duplicates()['candidates']
+        self.assertEqual(len(candidates), 1)
+        self.assertEqual(candidates[0]['primary']['id'], str(self.primary.pk))
+        self.assertEqual(candidates[0]['duplicate']['id'], str(self.duplicate.pk))
+
+    def test_moves_related_rows_and_archives_the_duplicate(self):
+        Note.objects.create(patient=self.duplicate, content='Seen for orthotics')
+
+        result = merge_patients(self.primary.pk, self.duplicate.pk, merged_by='tester')
+
+        self.assertEqual(result['moved']['notes.Note'], 1)
+        self.assertEqual(result['filled'], ['health_number'])
+        self.assertEqual(Note.objects.get().patient_id, self.primary.pk)
+        self.primary.refresh_from_db()
+        self.duplicate.refresh_from_db()
+        self.assertEqual(self.primary.health_number, '1234 56789')
+        self.assertEqual(self.duplicate.merged_into_id, self.primary.pk)
+        self.assertTrue(self.duplicate.archived)
+        self.assertEqual(self.duplicate.archived_by, 'tester')
+
+    def test_dry_run_changes_nothing(self):
+        Note.objects.create(patient=self.duplicate, content='Seen for orthotics')
+
+        result = merge_patients(self.primary.pk, self.duplicate.pk, dry_run=True)
+
+        self.assertEqual(result['moved']['notes.Note'], 1)
+        self.assertEqual(Note.objects.get().patient_id, self.duplicate.pk)
+        self.duplicate.refresh_from_db()
+        self.assertIsNone(self.duplicate.merged_into_id)
+
+    def test_keeps_rows_that_would_break_unique_constraints(self):
+        shared, other = Referrer.objects.create(first_name='Ann', last_name='Lee'), Referrer.objects.create(first_name='Bob', last_name='Ng')
+        PatientReferrer.objects.create(patient=self.primary, referrer=shared)
+        PatientReferrer.objects.create(patient=self.duplicate, referrer=shared)
+        PatientReferrer.objects.create(patient=self.duplicate, referrer=other)
+
+        connections = [
+            XeroConnection.objects.create(
+                tenant_id=tenant_id, access_token='a', refresh_token='r',
+                expires_at=timezone.now() + timedelta(minutes=30), scopes='accounting.contacts',
+            )
+            for tenant_id in ('tenant-1', 'tenant-2')
+        ]
+        XeroContactLink.objects.create(connection=connections[0], patient=self.primary, xero_contact_id='c1')
+        XeroContactLink.objects.create(connection=connections[0], patient=self.duplicate, xero_contact_id='c2')
+        XeroContactLink.objects.create(connection=connections[1], patient=self.duplicate, xero_contact_id='c3')
+
+        result = merge_patients(self.primary.pk, self.duplicate.pk)
+
+        self.assertEqual(result['moved']['referrers.PatientReferrer'], 1)
+        self.assertEqual(result['moved']['xero_integration.XeroContactLink'], 1)
+        self.assertEqual(
+            set(PatientReferrer.objects.filter(patient=self.primary).values_list('referrer_id', flat=True)),
+            {shared.pk, other.pk},
+        )
+        self.assertEqual(PatientReferrer.objects.get(patient=self.duplicate).referrer_id, shared.pk)
+        self.assertEqual(
+            set(XeroContactLink.objects.filter(patient=self.primary).values_list('xero_contact_id', flat=True)),
+            {'c1', 'c3'},
+        )
+        self.assertEqual(XeroContactLink.objects.get(patient=self.duplicate).xero_contact_id, 'c2')
+
+    def test_refuses_to_merge_twice(self):
+        merge_patients(self.primary.pk, self.duplicate.pk)
+        third = Patient.objects.create(first_name='Jane', last_name='Citizen')
+
+        with self.assertRaisesMessage(ValueError, 'has already been merged'):
+            merge_patients(self.primary.pk, self.duplicate.pk)
+        with self.assertRaisesMessage(ValueError, 'has already been merged'):
+            merge_patients(third.pk, self.duplicate.pk)
+
+    def test_refuses_to_merge_into_itself(self):
+        with self.assertRaisesMessage(ValueError, 'into itself'):
+            merge_patients(self.primary.pk, self.primary.pk)
+
+
+class MergeViewTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('clinician', password='pw'))
+        self.primary = Patient.objects.create(first_name='Jane', last_name='Citizen')
+        self.duplicate = Patient.objects.create(first_name='Jane', last_name='Citizen')
+
+    def merge(self, data, format=None):
+        return self.client.post(f'/api/patients/{self.primary.pk}/merge/', data, format=format)
+
+    def test_form_dry_run_false_merges(self):
+        response = self.merge({'duplicate': str(self.duplicate.pk), 'dry_run': 'false'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.data['dry_run'])
+        self.duplicate.refresh_from_db()
+        self.assertEqual(self.duplicate.merged_into_id, self.primary.pk)
+
+    def test_dry_run(self):
+        response = self.merge({'duplicate': str(self.duplicate.pk), 'dry_run': True}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['dry_run'])
+        self.duplicate.refresh_from_db()
+        self.assertIsNone(self.duplicate.merged_into_id)
+
+    def test_malformed_duplicate_is_a_field_error(self):
+        response = self.merge({'duplicate': 'nope'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('duplicate', response.data['error'])
+
+    def test_already_merged_is_a_bad_request(self):
+        self.merge({'duplicate': str(self.duplicate.pk)})
+
+        response = self.merge({'duplicate': str(self.duplicate.pk)})
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('already been merged', response.data['error'])
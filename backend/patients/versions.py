@@ -0,0 +1,179 @@
+"""
+Per-patient version stamps and conditional GET
+
+Every change to a patient or to anything shown with them (notes, letters,
+documents, images, appointments, reminders, SMS, referrers, Xero links)
+bumps that patient's PatientVersion, from the signal handlers in
+patients/signals.py. Code that writes with QuerySet.update() or
+bulk_create() bypasses signals and must call bump_patient_versions()
+itself.
+
+Patient-scoped GET endpoints send a weak ETag built from:
+
+- the patient version
+- the reference-data versions (clinic, clinician, appointment type and
+  funding names appear in these responses), plus a namespace for
+  referrers and companies
+- the request path, query string and cache scope
+
+A request whose If-None-Match matches gets a 304 before the view runs, so
+nothing is queried or serialized beyond reading the version.
+
+Endpoints that return pre-signed S3 URLs pass refresh_every, which changes
+the ETag periodically so clients never keep an expired URL.
+"""
+import functools
+import hashlib
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from ncc_api.caching import default_scope, get_namespace_versions, invalidate_on_change
+from settings import reference_data
+
+from .models import PatientVersion
+
+# Names embedded in patient-scoped responses that are not in reference_data
+RELATED_NAMESPACE = 'patient_related_names'
+invalidate_on_change(RELATED_NAMESPACE, 'referrers.Referrer', 'referrers.Specialty', 'companies.Company')
+
+ETAG_NAMESPACES = [
+    reference_data.NAMESPACE_PREFIX + name
+    for name in ('clinics', 'clinicians', 'appointment_types', 'funding_sources')
+] + [RELATED_NAMESPACE]
+
+# Pre-signed URLs expire after an hour; refresh well before that
+PRESIGNED_URL_REFRESH = 30 * 60
+
+RESPONSE_KEY_PREFIX = 'patient-response:'
+
+# Ids per statement when bumping many patients (SQLite caps query parameters)
+BUMP_BATCH_SIZE = 500
+
+
+def bump_patient_versions(patient_ids):
+    """Increment the version of each patient in `patient_ids`"""
+    patient_ids = list({patient_id for patient_id in patient_ids if patient_id})
+    now = timezone.now()
+    for start in range(0, len(patient_ids), BUMP_BATCH_SIZE):
+        batch = patient_ids[start:start + BUMP_BATCH_SIZE]
+        PatientVersion.objects.bulk_create(
+            [PatientVersion(patient_id=patient_id) for patient_id in batch],
+            ignore_conflicts=True,
+        )
+        PatientVersion.objects.filter(patient_id__in=batch).update(
+            version=F('version') + 1,
+            updated_at=now,
+        )
+
+
+def get_patient_version(patient_id):
+    """Current version of a patient (0 if nothing has changed since the stamps were added)"""
+    version = PatientVersion.objects.filter(patient_id=patient_id).values_list('version', flat=True).first()
+    return version or 0
+
+
+def patient_etag(request, patient_id, refresh_every=None):
+    """Weak ETag for a GET of a patient-scoped resource"""
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    versions = get_namespace_versions(ETAG_NAMESPACES)
+    parts = [
+        str(patient_id),
+        str(get_patient_version(patient_id)),
+        ','.join(str(versions[name]) for name in ETAG_NAMESPACES),
+        request.path,
+        str(params),
+        default_scope(request),
+    ]
+    if refresh_every:
+        parts.append(str(int(time.time() // refresh_every)))
+    digest = hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request, etag):
+    """True if the request's If-None-Match includes `etag` (weak comparison)"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    tags = parse_etags(header)
+    if '*' in tags:
+        return True
+    opaque = etag.removeprefix('W/')
+    return any(tag.removeprefix('W/') == opaque for tag in tags)
+
+
+def not_modified_response(etag):
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    set_etag_headers(response, etag)
+    return response
+
+
+def set_etag_headers(response, etag):
+    response['ETag'] = etag
+    # Let browsers store the response but revalidate it on every use
+    response['Cache-Control'] = 'private, no-cache'
+
+
+def _patient_id(request, kwargs, lookup):
+    for name in lookup:
+        value = kwargs.get(name) or request.query_params.get(name)
+        if value:
+            try:
+                return uuid.UUID(str(value))
+            except ValueError:
+                return None
+    return None
+
+
+def conditional_patient_response(lookup=('patient_id',), refresh_every=None, cache_timeout=None):
+    """
+    ETag / If-None-Match for a GET viewset action scoped to one patient.
+
+        @conditional_patient_response(lookup=('pk',))
+        def retrieve(self, request, *args, **kwargs):
+            ...
+
+    The patient id is read from the URL kwargs or query params named in
+    `lookup`; requests without one (e.g. unfiltered lists) pass straight
+    through. With `cache_timeout`, response data is also cached under the
+    ETag, so it is reused until anything about the patient changes.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            patient_id = _patient_id(request, kwargs, lookup) if request.method == 'GET' else None
+            if patient_id is None:
+                return method(self, request, *args, **kwargs)
+
+            etag = patient_etag(request, patient_id, refresh_every)
+            if etag_matches(request, etag):
+                return not_modified_response(etag)
+
+            if cache_timeout:
+                data = cache.get(RESPONSE_KEY_PREFIX + etag)
+                if data is not None:
+                    response = Response(data)
+                    response['X-Cache'] = 'HIT'
+                    set_etag_headers(response, etag)
+                    return response
+
+            response = method(self, request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                if cache_timeout:
+                    cache.set(RESPONSE_KEY_PREFIX + etag, response.data, cache_timeout)
+                    response['X-Cache'] = 'MISS'
+                set_etag_headers(response, etag)
+            return response
+        return wrapper
+    return decorator
@@ -5,9 +5,28 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
+from ncc_api.caching import DEFAULT_TIMEOUT, cached_response
+from . import bulk as patient_bulk
+from . import chart as patient_chart
+from . import dedupe
 from .models import Patient
-from .serializers import PatientSerializer, PatientListSerializer
+from .serializers import (
+    PatientSerializer, PatientListSerializer, PatientBulkSerializer, PatientBulkUpdateSerializer,
+    PatientMergeSerializer,
+)
+from .versions import PRESIGNED_URL_REFRESH, conditional_patient_response
+
+# Models whose changes show up in serialized patients (clinic/funding names, referrers)
+PATIENT_CACHE_DEPENDENCIES = [
+    'patients.Patient',
+    'clinicians.Clinic',
+    'settings.FundingSource',
+    'referrers.PatientReferrer',
+    'referrers.Referrer',
+    'referrers.Specialty',
+]
 
 
 class PatientViewSet(viewsets.ModelViewSet):
@@ -44,6 +63,34 @@ class PatientViewSet(viewsets.ModelViewSet):
             return PatientListSerializer
         return PatientSerializer
     
+    @cached_response('patients', invalidated_by=PATIENT_CACHE_DEPENDENCIES)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @conditional_patient_response(lookup=('pk',))
+    @cached_response('patients', invalidated_by=PATIENT_CACHE_DEPENDENCIES)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
+    @action(detail=True, methods=['get'])
+    @conditional_patient_response(lookup=('pk',), refresh_every=PRESIGNED_URL_REFRESH, cache_timeout=DEFAULT_TIMEOUT)
+    def chart(self, request, pk=None):
+        """
+        Patient plus counts and the first page of each chart section
+        (see patients/chart.py). ?include=notes,letters,... ?limit=20
+        """
+        try:
+            include = patient_chart.parse_include(request.query_params.get('include'))
+            limit = patient_chart.parse_limit(request.query_params.get('limit'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            data = patient_chart.build_chart(pk, include, limit, context=self.get_serializer_context())
+        except (Patient.DoesNotExist, DjangoValidationError):
+            return Response({'error': 'Patient not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(data)
+    
     @action(detail=True, methods=['patch'])
     def archive(self, request, pk=None):
         """Archive a patient (soft delete)"""
@@ -80,7 +127,94 @@ class PatientViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(patient)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['post'], url_path='bulk-archive')
+    def bulk_archive(self, request):
+        """Archive many patients by ids or filter (see patients/bulk.py)"""
+        archived_by = request.user.username if request.user.is_authenticated else None
+        return self._bulk(
+            request, PatientBulkSerializer,
+            lambda patients, data: patient_bulk.archive(patients, archived_by, data['dry_run']),
+        )
+    
+    @action(detail=False, methods=['post'], url_path='bulk-restore')
+    def bulk_restore(self, request):
+        """Restore many archived patients by ids or filter"""
+        return self._bulk(
+            request, PatientBulkSerializer,
+            lambda patients, data: patient_bulk.restore(patients, data['dry_run']),
+        )
+    
+    @action(detail=False, methods=['post'], url_path='bulk-update')
+    def bulk_update(self, request):
+        """Set clinic and/or funding_type on many patients by ids or filter"""
+        return self._bulk(
+            request, PatientBulkUpdateSerializer,
+            lambda patients, data: patient_bulk.update(
+                patients,
+                {field: data[field] for field in PatientBulkUpdateSerializer.UPDATE_FIELDS if field in data},
+                data['dry_run'],
+            ),
+        )
+    
+    def _bulk(self, request, serializer_class, operation):
+        serializer = serializer_class(data=request.data)
+        if not serializer.is_valid():
+            return Response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        patients = patient_bulk.select_patients(data.get('ids'), data.get('filter'))
+        try:
+            result = operation(patients, data)
+        except patient_bulk.TooManyPatients as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+    
+    @action(detail=False, methods=['get'])
+    @cached_response('patients', invalidated_by=PATIENT_CACHE_DEPENDENCIES)
+    def duplicates(self, request):
+        """
+        Candidate duplicate patients, best match first (see patients/dedupe.py).
+        ?min_score=50 ?limit=100
+        """
+        try:
+            min_score = int(request.query_params.get('min_score', dedupe.MIN_SCORE))
+            limit = int(request.query_params.get('limit', 100))
+        except ValueError:
+            return Response({'error': 'min_score and limit must be numbers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = dedupe.find_duplicates(min_score)
+        return Response({
+            'patients': result['patients'],
+            'compared': result['compared'],
+            'skipped_blocks': result['skipped_blocks'],
+            'count': len(result['candidates']),
+            'results': result['candidates'][:max(1, limit)],
+        })
+    
+    @action(detail=True, methods=['post'])
+    def merge(self, request, pk=None):
+        """
+        Merge the patient in {"duplicate": id} into this one. {"dry_run": true}
+        reports what would move without changing anything.
+        """
+        serializer = PatientMergeSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        
+        try:
+            result = dedupe.merge_patients(
+                pk, data['duplicate'],
+                merged_by=request.user.username if request.user.is_authenticated else None,
+                dry_run=data['dry_run'],
+            )
+        except Patient.DoesNotExist:
+            return Response({'error': 'Patient not found'}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
+    
     @action(detail=False, methods=['get'])
+    @cached_response('patients', invalidated_by=PATIENT_CACHE_DEPENDENCIES)
     def archived(self, request):
         """List all archived patients"""
         archived_patients = Patient.objects.filter(archived=True).order_by('-archived_at')
@@ -5,6 +5,7 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from patients.versions import conditional_patient_response
 from .models import Reminder
 from .serializers import ReminderSerializer, ReminderListSerializer
 
@@ -19,6 +20,10 @@ class ReminderViewSet(viewsets.ModelViewSet):
     search_fields = ['note', 'patient__first_name', 'patient__last_name']
     ordering_fields = ['created_at', 'reminder_date', 'status']
     
+    @conditional_patient_response(lookup=('patient',))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def get_queryset(self):
         """Filter reminders by status"""
         queryset = super().get_queryset()
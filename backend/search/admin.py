@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import SearchEntry
+
+
+@admin.register(SearchEntry)
+class SearchEntryAdmin(admin.ModelAdmin):
+    list_display = ['source_type', 'title', 'patient', 'source_created_at', 'indexed_at']
+    list_filter = ['source_type']
+    search_fields = ['title', 'search_text', 'patient__first_name', 'patient__last_name']
+    readonly_fields = ['id', 'source_type', 'source_id', 'indexed_at']
+    raw_id_fields = ['patient']
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'search'
+    verbose_name = 'Search Index'
+
+    def ready(self):
+        # Connect post_save/post_delete handlers that keep the index current
+        from . import signals  # noqa: F401
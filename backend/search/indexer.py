@@ -0,0 +1,206 @@
+"""
+Search index maintenance
+Turns notes, letters, SMS messages and documents into SearchEntry rows
+"""
+import html
+import logging
+import re
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+
+from .models import SearchEntry
+
+logger = logging.getLogger(__name__)
+
+TAG_RE = re.compile(r'<[^<]+?>')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def html_to_text(value):
+    """Strip HTML tags/entities (TipTap letter pages) down to plain text"""
+    if not value:
+        return ''
+    text = TAG_RE.sub(' ', value)
+    text = html.unescape(text)
+    return WHITESPACE_RE.sub(' ', text).strip()
+
+
+def normalize_text(value):
+    """Lower-case and collapse whitespace so matching is case-insensitive"""
+    return WHITESPACE_RE.sub(' ', value or '').strip().lower()
+
+
+def _patient_content_type_id():
+    """ContentType id for Patient (ContentType manager caches the lookup)"""
+    return ContentType.objects.get_for_model(apps.get_model('patients', 'Patient')).id
+
+
+# ---------------------------------------------------------------------------
+# Entry builders - each returns a dict of SearchEntry fields, or None when the
+# source record should not be searchable (e.g. inactive documents)
+# ---------------------------------------------------------------------------
+
+def _note_entry(note):
+    return {
+        'patient_id': note.patient_id,
+        'title': note.get_note_type_display(),
+        'content': note.content or '',
+        'source_created_at': note.created_at,
+    }
+
+
+def _letter_entry(letter):
+    pages = letter.pages if isinstance(letter.pages, list) else []
+    content = '\n'.join(html_to_text(page) for page in pages if isinstance(page, str))
+    title = letter.subject or letter.letter_type
+    if letter.recipient_name:
+        title = f"{title} ({letter.recipient_name})"
+    return {
+        'patient_id': letter.patient_id,
+        'title': title,
+        'content': content,
+        'source_created_at': letter.created_at,
+    }
+
+
+def _sms_outbound_entry(message):
+    return {
+        'patient_id': message.patient_id,
+        'title': f"SMS to {message.phone_number}",
+        'content': message.message or '',
+        'source_created_at': message.sent_at or message.created_at,
+    }
+
+
+def _sms_inbound_entry(message):
+    return {
+        'patient_id': message.patient_id,
+        'title': f"SMS from {message.from_number}",
+        'content': message.message or '',
+        'source_created_at': message.received_at,
+    }
+
+
+def _document_entry(document):
+    if not document.is_active:
+        return None
+    if document.content_type_id != _patient_content_type_id() or not document.object_id:
+        return None
+    content = ' '.join(part for part in [document.category, document.description] if part)
+    return {
+        'patient_id': document.object_id,
+        'title': document.original_name or document.file_name,
+        'content': content,
+        'source_created_at': document.uploaded_at,
+    }
+
+
+# source_type -> (app_label, model_name, builder)
+SOURCES = {
+    'note': ('notes', 'Note', _note_entry),
+    'letter': ('letters', 'PatientLetter', _letter_entry),
+    'sms_outbound': ('sms_integration', 'SMSMessage', _sms_outbound_entry),
+    'sms_inbound': ('sms_integration', 'SMSInbound', _sms_inbound_entry),
+    'document': ('documents', 'Document', _document_entry),
+}
+
+
+def get_source_models():
+    """Return {model class: source_type} for every indexed model"""
+    return {
+        apps.get_model(app_label, model_name): source_type
+        for source_type, (app_label, model_name, _builder) in SOURCES.items()
+    }
+
+
+def _source_type_for(instance):
+    for source_type, (app_label, model_name, _builder) in SOURCES.items():
+        meta = instance._meta
+        if meta.app_label == app_label and meta.object_name == model_name:
+            return source_type
+    return None
+
+
+def _build_fields(source_type, instance):
+    builder = SOURCES[source_type][2]
+    data = builder(instance)
+    if data is None:
+        return None
+    data['search_text'] = normalize_text(f"{data['title']} {data['content']}")
+    return data
+
+
+def index_instance(instance):
+    """
+    Create/update/remove the SearchEntry for a single source record.
+    Never raises - indexing must not break the save that triggered it.
+    """
+    source_type = _source_type_for(instance)
+    if not source_type:
+        return
+    try:
+        data = _build_fields(source_type, instance)
+        if data is None:
+            SearchEntry.objects.filter(source_type=source_type, source_id=instance.pk).delete()
+            return
+        SearchEntry.objects.update_or_create(
+            source_type=source_type,
+            source_id=instance.pk,
+            defaults=data,
+        )
+    except Exception as e:
+        logger.error(f"Failed to index {source_type} {instance.pk}: {e}")
+
+
+def remove_instance(instance):
+    """Delete the SearchEntry for a deleted source record"""
+    source_type = _source_type_for(instance)
+    if not source_type:
+        return
+    try:
+        SearchEntry.objects.filter(source_type=source_type, source_id=instance.pk).delete()
+    except Exception as e:
+        logger.error(f"Failed to remove {source_type} {instance.pk} from search index: {e}")
+
+
+def _source_queryset(source_type):
+    app_label, model_name, _builder = SOURCES[source_type]
+    queryset = apps.get_model(app_label, model_name).objects.all()
+    if source_type == 'document':
+        queryset = queryset.filter(is_active=True, content_type_id=_patient_content_type_id())
+    return queryset.order_by()
+
+
+def rebuild_index(source_types=None, batch_size=500, progress=None):
+    """
+    Rebuild the index for the given source types (default: all) from scratch.
+    Needed after bulk imports, which bypass the post_save signals.
+
+    Returns {source_type: number of entries written}.
+    """
+    counts = {}
+    for source_type in source_types or SOURCES.keys():
+        SearchEntry.objects.filter(source_type=source_type).delete()
+
+        written = 0
+        batch = []
+        for instance in _source_queryset(source_type).iterator(chunk_size=batch_size):
+            data = _build_fields(source_type, instance)
+            if data is None:
+                continue
+            batch.append(SearchEntry(source_type=source_type, source_id=instance.pk, **data))
+            if len(batch) >= batch_size:
+                SearchEntry.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+                if progress:
+                    progress(source_type, written)
+        if batch:
+            SearchEntry.objects.bulk_create(batch)
+            written += len(batch)
+
+        counts[source_type] = written
+        if progress:
+            progress(source_type, written)
+    return counts
@@ -0,0 +1,51 @@
+"""
+Rebuild the unified search index.
+
+Bulk imports (FileMaker, Excel) use bulk_create and bypass the post_save
+signals that normally keep the index current, so run this afterwards.
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --types note letter
+"""
+from django.core.management.base import BaseCommand
+from search.indexer import SOURCES, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the unified search index for notes, letters, SMS and documents'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--types',
+            nargs='+',
+            choices=list(SOURCES.keys()),
+            help='Only rebuild these source types (default: all)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows per bulk insert (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("=" * 70)
+        self.stdout.write("🔎 Rebuild Search Index")
+        self.stdout.write("=" * 70)
+
+        def progress(source_type, written):
+            self.stdout.write(f"   {source_type}: {written} indexed")
+
+        counts = rebuild_index(
+            source_types=options.get('types'),
+            batch_size=options['batch_size'],
+            progress=progress,
+        )
+
+        self.stdout.write("\n" + "=" * 70)
+        self.stdout.write("📊 SUMMARY")
+        self.stdout.write("=" * 70)
+        for source_type, written in counts.items():
+            self.stdout.write(f"{source_type:<15} {written}")
+        self.stdout.write("\n✅ Search index rebuilt!")
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.25 on 2026-10-19 07:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('patients', '0011_remove_funding_source_choices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('source_type', models.CharField(choices=[('note', 'Note'), ('letter', 'Letter'), ('sms_outbound', 'SMS Sent'), ('sms_inbound', 'SMS Received'), ('document', 'Document')], help_text='Kind of record this entry was built from', max_length=20)),
+                ('source_id', models.UUIDField(help_text='Primary key of the source record')),
+                ('title', models.CharField(blank=True, help_text='Short label shown in results', max_length=255)),
+                ('content', models.TextField(blank=True, help_text='Plain-text content (HTML stripped)')),
+                ('search_text', models.TextField(blank=True, help_text='Lower-cased, whitespace-collapsed title + content used for matching')),
+                ('source_created_at', models.DateTimeField(blank=True, help_text='When the source record was created/sent/received', null=True)),
+                ('indexed_at', models.DateTimeField(auto_now=True)),
+                ('patient', models.ForeignKey(blank=True, help_text='Patient the source record belongs to (null for unmatched SMS)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='patients.patient')),
+            ],
+            options={
+                'verbose_name': 'Search Entry',
+                'verbose_name_plural': 'Search Entries',
+                'db_table': 'search_entries',
+                'ordering': ['-source_created_at'],
+                'indexes': [models.Index(fields=['patient', '-source_created_at'], name='search_entr_patient_41a279_idx'), models.Index(fields=['source_type', '-source_created_at'], name='search_entr_source__d3c6ee_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchentry',
+            constraint=models.UniqueConstraint(fields=('source_type', 'source_id'), name='unique_search_entry_source'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+"""
+Trigram GIN index on search_entries.search_text (PostgreSQL only)
+
+The search view filters with search_text LIKE '%term%'. A B-tree index
+cannot serve a leading wildcard, so without this every search scans the
+whole table; pg_trgm's gin_trgm_ops serves LIKE directly. SQLite (local
+development) has no equivalent, so this is a no-op there.
+"""
+from django.db import migrations
+
+INDEX_NAME = 'search_entries_text_trgm'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} '
+        'ON search_entries USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,73 @@
+"""
+Search index models for WalkEasy Nexus
+Denormalized plain-text copy of notes, letters, SMS and documents for patient search
+"""
+import uuid
+from django.db import models
+
+
+class SearchEntry(models.Model):
+    """
+    One searchable record per source object (note, letter, SMS, document).
+    Rows are kept current by the signal handlers in search/signals.py and can
+    be rebuilt from scratch with `python manage.py rebuild_search_index`.
+    """
+
+    SOURCE_TYPE_CHOICES = [
+        ('note', 'Note'),
+        ('letter', 'Letter'),
+        ('sms_outbound', 'SMS Sent'),
+        ('sms_inbound', 'SMS Received'),
+        ('document', 'Document'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # Source record (all indexed models use UUID primary keys)
+    source_type = models.CharField(
+        max_length=20,
+        choices=SOURCE_TYPE_CHOICES,
+        help_text="Kind of record this entry was built from"
+    )
+    source_id = models.UUIDField(help_text="Primary key of the source record")
+
+    patient = models.ForeignKey(
+        'patients.Patient',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='search_entries',
+        help_text="Patient the source record belongs to (null for unmatched SMS)"
+    )
+
+    # Indexed content
+    title = models.CharField(max_length=255, blank=True, help_text="Short label shown in results")
+    content = models.TextField(blank=True, help_text="Plain-text content (HTML stripped)")
+    search_text = models.TextField(
+        blank=True,
+        help_text="Lower-cased, whitespace-collapsed title + content used for matching"
+    )
+
+    # Timestamps
+    source_created_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the source record was created/sent/received"
+    )
+    indexed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'search_entries'
+        ordering = ['-source_created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['source_type', 'source_id'], name='unique_search_entry_source'),
+        ]
+        indexes = [
+            models.Index(fields=['patient', '-source_created_at']),
+            models.Index(fields=['source_type', '-source_created_at']),
+        ]
+        verbose_name = 'Search Entry'
+        verbose_name_plural = 'Search Entries'
+
+    def __str__(self):
+        return f"{self.get_source_type_display()}: {self.title or self.source_id}"
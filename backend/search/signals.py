@@ -0,0 +1,24 @@
+"""
+Signal handlers that keep the search index in step with its source models
+"""
+from django.db.models.signals import post_save, post_delete
+
+from . import indexer
+
+
+def index_on_save(sender, instance, raw=False, **kwargs):
+    """Re-index a record whenever it is saved (skipped for fixture loading)"""
+    if raw:
+        return
+    indexer.index_instance(instance)
+
+
+def remove_on_delete(sender, instance, **kwargs):
+    """Drop a record from the index when it is deleted"""
+    indexer.remove_instance(instance)
+
+
+for model in indexer.get_source_models():
+    label = model._meta.label_lower
+    post_save.connect(index_on_save, sender=model, dispatch_uid=f'search_index_save_{label}')
+    post_delete.connect(remove_on_delete, sender=model, dispatch_uid=f'search_index_delete_{label}')
@@ -0,0 +1,81 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from notes.models import Note
+from patients.models import Patient
+
+from .models import SearchEntry
+from .views import build_snippet, parse_terms
+
+
+class ParseTermsTests(TestCase):
+
+    def test_splits_lowercases_and_dedupes(self):
+        self.assertEqual(parse_terms('Orthotic  REVIEW orthotic'), ['orthotic', 'review'])
+
+    def test_keeps_quoted_phrases(self):
+        self.assertEqual(parse_terms('"heel pain" left'), ['heel pain', 'left'])
+
+    def test_drops_short_terms(self):
+        self.assertEqual(parse_terms('a of x'), ['of'])
+
+
+class BuildSnippetTests(TestCase):
+
+    def test_marks_terms_and_escapes_html(self):
+        self.assertEqual(
+            build_snippet('Left <b>heel</b> pain', ['heel']),
+            'Left &lt;b&gt;<mark>heel</mark>&lt;/b&gt; pain',
+        )
+
+    def test_trims_long_text_around_first_match(self):
+        snippet = build_snippet('x' * 300 + ' heel ' + 'y' * 300, ['heel'])
+        self.assertTrue(snippet.startswith('…'))
+        self.assertTrue(snippet.endswith('…'))
+        self.assertIn('<mark>heel</mark>', snippet)
+
+
+class SearchViewTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('clinician', password='pw'))
+        self.patient = Patient.objects.create(first_name='Jane', last_name='Citizen')
+        self.other = Patient.objects.create(first_name='John', last_name='Smith')
+        Note.objects.create(patient=self.patient, content='Orthotic review, heel pain improving', note_type='general')
+        Note.objects.create(patient=self.other, content='Orthotic fitting booked', note_type='general')
+
+    def test_notes_are_indexed_on_save(self):
+        self.assertEqual(SearchEntry.objects.filter(source_type='note').count(), 2)
+
+    def test_all_terms_must_match(self):
+        response = self.client.get('/api/search/', {'q': 'orthotic heel'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_hits'], 1)
+        self.assertEqual(response.data['results'][0]['patient_id'], str(self.patient.pk))
+
+    def test_filters_by_patient(self):
+        response = self.client.get('/api/search/', {'q': 'orthotic', 'patient_id': str(self.other.pk)})
+        self.assertEqual([group['patient_id'] for group in response.data['results']], [str(self.other.pk)])
+
+    def test_requires_a_query(self):
+        self.assertEqual(self.client.get('/api/search/', {'q': 'a'}).status_code, 400)
+
+    def test_rejects_bad_patient_id(self):
+        response = self.client.get('/api/search/', {'q': 'orthotic', 'patient_id': 'bad'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_non_numeric_limit(self):
+        response = self.client.get('/api/search/', {'q': 'orthotic', 'limit': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_clamps_limit_to_at_least_one(self):
+        response = self.client.get('/api/search/', {'q': 'orthotic', 'limit': '-5'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_hits'], 1)
+        self.assertTrue(response.data['truncated'])
+
+    def test_rejects_unknown_types(self):
+        response = self.client.get('/api/search/', {'q': 'orthotic', 'types': 'note,fax'})
+        self.assertEqual(response.status_code, 400)
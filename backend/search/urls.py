@@ -0,0 +1,9 @@
+"""
+URL Configuration for Search API
+"""
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.search, name='search'),
+]
@@ -0,0 +1,146 @@
+"""
+Unified search across clinical notes, letters, SMS and documents
+
+Each term is matched with search_text LIKE '%term%'. On PostgreSQL this is
+served by the pg_trgm GIN index from migration 0002 instead of a table scan.
+"""
+import html
+import re
+import uuid
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+
+from .indexer import normalize_text
+from .models import SearchEntry
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+MIN_TERM_LENGTH = 2
+SNIPPET_RADIUS = 80
+
+
+def parse_terms(query):
+    """Split a query into unique lower-case terms (quoted phrases kept together)"""
+    terms = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', query or ''):
+        term = normalize_text(phrase or word)
+        if len(term) >= MIN_TERM_LENGTH and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def build_snippet(text, terms):
+    """
+    Return an HTML-escaped excerpt of `text` around the first matching term,
+    with every term occurrence wrapped in <mark>.
+    """
+    if not text:
+        return ''
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms if lowered.find(term) != -1]
+    first = min(positions) if positions else 0
+
+    start = max(0, first - SNIPPET_RADIUS)
+    end = min(len(text), first + SNIPPET_RADIUS * 2)
+    excerpt = text[start:end]
+
+    pattern = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    parts = []
+    last = 0
+    for match in pattern.finditer(excerpt):
+        parts.append(html.escape(excerpt[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group(0))}</mark>")
+        last = match.end()
+    parts.append(html.escape(excerpt[last:]))
+
+    snippet = ''.join(parts)
+    if start > 0:
+        snippet = '…' + snippet
+    if end < len(text):
+        snippet = snippet + '…'
+    return snippet
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search(request):
+    """
+    Search the unified index
+    GET /api/search/?q=orthotic review&types=note,letter&patient_id=<uuid>&limit=50
+
+    - q: search terms (all must match; use "quotes" for phrases)
+    - types: optional comma-separated source types (note, letter, sms_outbound, sms_inbound, document)
+    - patient_id: optional, restrict to one patient
+    - limit: max hits returned (default 50, max 200)
+
+    Returns hits grouped by patient, most recent first.
+    """
+    terms = parse_terms(request.query_params.get('q', ''))
+    if not terms:
+        return Response(
+            {'error': f'q is required (terms must be at least {MIN_TERM_LENGTH} characters)'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    queryset = SearchEntry.objects.select_related('patient')
+    for term in terms:
+        # LIKE '%term%' (search_text is already lower-case), see module docstring
+        queryset = queryset.filter(search_text__contains=term)
+
+    types = request.query_params.get('types')
+    if types:
+        valid_types = dict(SearchEntry.SOURCE_TYPE_CHOICES)
+        requested = [t.strip() for t in types.split(',') if t.strip()]
+        invalid = [t for t in requested if t not in valid_types]
+        if invalid:
+            return Response(
+                {'error': f"Invalid types: {', '.join(invalid)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = queryset.filter(source_type__in=requested)
+
+    try:
+        patient_id = request.query_params.get('patient_id')
+        if patient_id:
+            queryset = queryset.filter(patient_id=uuid.UUID(patient_id))
+    except ValueError:
+        return Response({'error': 'patient_id must be a UUID'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    # Fetch one extra row to report whether results were truncated
+    entries = list(queryset.order_by('-source_created_at')[:limit + 1])
+    truncated = len(entries) > limit
+    entries = entries[:limit]
+
+    groups = {}
+    for entry in entries:
+        key = str(entry.patient_id) if entry.patient_id else None
+        if key not in groups:
+            groups[key] = {
+                'patient_id': key,
+                'patient_name': entry.patient.get_full_name() if entry.patient else 'Unmatched',
+                'hits': [],
+            }
+        groups[key]['hits'].append({
+            'source_type': entry.source_type,
+            'source_id': str(entry.source_id),
+            'title': entry.title,
+            'snippet': build_snippet(entry.content or entry.title, terms),
+            'created_at': entry.source_created_at.isoformat() if entry.source_created_at else None,
+        })
+
+    return Response({
+        'query': request.query_params.get('q', ''),
+        'terms': terms,
+        'total_hits': len(entries),
+        'truncated': truncated,
+        'results': list(groups.values()),
+    })
@@ -0,0 +1,163 @@
+"""
+Reference-data cache for WalkEasy Nexus
+Small, rarely changing lookup tables (clinics, clinicians, appointment types,
+funding sources, custom funding sources, email templates) served as one
+bundle from an in-process LRU, with section versions kept as namespace
+versions in the shared cache (ncc_api.caching) so every worker sees an
+invalidation.
+
+Invalidation is driven by the post_save/post_delete handlers in
+settings/signals.py, which call invalidate() for the affected sections.
+"""
+import hashlib
+from collections import OrderedDict
+
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+from ncc_api.caching import LRUCache, bump_namespace, get_namespace_versions
+
+NAMESPACE_PREFIX = 'reference_data.'
+PAYLOAD_KEY_PREFIX = 'reference_data:payload:'
+PAYLOAD_TIMEOUT = 60 * 60 * 24  # Versioned keys never go stale - timeout only frees space
+
+
+_local_cache = LRUCache()
+
+
+# ---------------------------------------------------------------------------
+# Section builders - each returns JSON-ready data for one lookup table.
+# `staff` is True for staff users (who also see inactive clinicians).
+# ---------------------------------------------------------------------------
+
+def _clinics(staff):
+    from clinicians.models import Clinic
+    from clinicians.serializers import ClinicSerializer
+    return ClinicSerializer(Clinic.objects.all().order_by('name'), many=True).data
+
+
+def _clinicians(staff):
+    from clinicians.models import Clinician
+    from clinicians.serializers import ClinicianReferenceSerializer
+    queryset = Clinician.objects.all().select_related('clinic', 'user').order_by('full_name')
+    if not staff:
+        queryset = queryset.filter(active=True)
+    return ClinicianReferenceSerializer(queryset, many=True).data
+
+
+def _appointment_types(staff):
+    from appointments.models import AppointmentType
+    from appointments.serializers import AppointmentTypeSerializer
+    return AppointmentTypeSerializer(AppointmentType.objects.all().order_by('name'), many=True).data
+
+
+def _funding_sources(staff):
+    from .models import FundingSource
+    from .serializers import FundingSourceSerializer
+    return FundingSourceSerializer(FundingSource.objects.all().order_by('order', 'name'), many=True).data
+
+
+def _custom_funding_sources(staff):
+    from invoices.custom_funding_model import CustomFundingSource
+    from invoices.email_serializers import CustomFundingSourceSerializer
+    return CustomFundingSourceSerializer(CustomFundingSource.objects.all(), many=True).data
+
+
+def _email_templates(staff):
+    from invoices.models import EmailTemplate
+    from invoices.email_serializers import EmailTemplateListSerializer
+    return EmailTemplateListSerializer(EmailTemplate.objects.all(), many=True).data
+
+
+# section name -> (builder, varies by staff flag)
+SECTIONS = OrderedDict([
+    ('clinics', (_clinics, False)),
+    ('clinicians', (_clinicians, True)),
+    ('appointment_types', (_appointment_types, False)),
+    ('funding_sources', (_funding_sources, False)),
+    ('custom_funding_sources', (_custom_funding_sources, False)),
+    ('email_templates', (_email_templates, False)),
+])
+
+# model label -> sections to invalidate when a row changes
+# (clinicians embed clinic_name, so clinic changes invalidate both)
+MODEL_SECTIONS = {
+    'clinicians.clinic': ['clinics', 'clinicians'],
+    'clinicians.clinician': ['clinicians'],
+    'appointments.appointmenttype': ['appointment_types'],
+    'settings.fundingsource': ['funding_sources'],
+    'invoices.customfundingsource': ['custom_funding_sources'],
+    'invoices.emailtemplate': ['email_templates'],
+}
+
+
+def get_versions(sections=None):
+    """Return {section: version} from the shared cache"""
+    sections = list(sections or SECTIONS.keys())
+    versions = get_namespace_versions([NAMESPACE_PREFIX + name for name in sections])
+    return {name: versions[NAMESPACE_PREFIX + name] for name in sections}
+
+
+def invalidate(*sections):
+    """Bump the version of the given sections (default: all)"""
+    bump_namespace(*[NAMESPACE_PREFIX + name for name in sections or SECTIONS.keys()])
+
+
+def invalidate_for_model(model):
+    """Invalidate every section built from `model`"""
+    sections = MODEL_SECTIONS.get(model._meta.label_lower)
+    if sections:
+        invalidate(*sections)
+
+
+def get_section(name, staff=False, version=None):
+    """Return cached data for one section, building it on a miss"""
+    builder, varies_by_staff = SECTIONS[name]
+    if version is None:
+        version = get_versions([name])[name]
+    variant = 'staff' if (staff and varies_by_staff) else 'all'
+    key = f"{PAYLOAD_KEY_PREFIX}{name}:{variant}:{version}"
+
+    data = _local_cache.get(key)
+    if data is not None:
+        return data
+
+    data = cache.get(key)
+    if data is None:
+        data = builder(staff)
+        cache.set(key, data, timeout=PAYLOAD_TIMEOUT)
+    _local_cache.set(key, data)
+    return data
+
+
+class Bundle:
+    """Rendered bootstrap response: JSON body plus its content-hash ETag"""
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def get_bootstrap(staff=False, sections=None):
+    """
+    Return a Bundle with every requested section.
+    The rendered body is memoized per combination of section versions, so a
+    warm request costs one cache.get_many() for the versions.
+    """
+    names = [name for name in SECTIONS if not sections or name in sections]
+    versions = get_versions(names)
+    variant = 'staff' if staff else 'all'
+    version_tag = ':'.join(f"{name}={versions[name]}" for name in names)
+    bundle_key = f"{PAYLOAD_KEY_PREFIX}bundle:{variant}:{version_tag}"
+
+    bundle = _local_cache.get(bundle_key)
+    if bundle is not None:
+        return bundle
+
+    payload = {
+        'versions': versions,
+        'sections': {name: get_section(name, staff=staff, version=versions[name]) for name in names},
+    }
+    bundle = Bundle(JSONRenderer().render(payload))
+    _local_cache.set(bundle_key, bundle)
+    return bundle
@@ -0,0 +1,18 @@
+"""
+Signal handlers that invalidate the reference-data cache
+"""
+from django.apps import apps
+from django.db.models.signals import post_save, post_delete
+
+from . import reference_data
+
+
+def invalidate_reference_data(sender, **kwargs):
+    """Bump the cached version of every section built from `sender`"""
+    reference_data.invalidate_for_model(sender)
+
+
+for label in reference_data.MODEL_SECTIONS:
+    model = apps.get_model(label)
+    post_save.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference_data_save_{label}')
+    post_delete.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference_data_delete_{label}')
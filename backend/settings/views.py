@@ -1,8 +1,13 @@
 """
 API Views for Settings models
 """
-from rest_framework import viewsets, filters
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from ncc_api.caching import cached_response
+from . import reference_data
 from .models import FundingSource
 from .serializers import FundingSourceSerializer
 
@@ -24,3 +29,48 @@ class FundingSourceViewSet(viewsets.ModelViewSet):
         if active_only == 'true':
             queryset = queryset.filter(active=True)
         return queryset
+    
+    @cached_response('funding_sources', invalidated_by=['settings.FundingSource'])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @cached_response('funding_sources', invalidated_by=['settings.FundingSource'])
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bootstrap(request):
+    """
+    All reference data the frontend needs on page load, in one response
+    GET /api/bootstrap/?sections=clinics,clinicians
+
+    Sections: clinics, clinicians, appointment_types, funding_sources,
+    custom_funding_sources, email_templates (default: all).
+
+    The ETag is a hash of the response body; send it back in If-None-Match
+    to get a 304 when nothing has changed.
+    """
+    sections = None
+    requested = request.query_params.get('sections')
+    if requested:
+        sections = [name.strip() for name in requested.split(',') if name.strip()]
+        invalid = [name for name in sections if name not in reference_data.SECTIONS]
+        if invalid:
+            return Response(
+                {'error': f"Invalid sections: {', '.join(invalid)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    bundle = reference_data.get_bootstrap(staff=request.user.is_staff, sections=sections)
+    
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if bundle.etag in [tag.strip() for tag in if_none_match.split(',')]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(bundle.body, content_type='application/json')
+    response['ETag'] = bundle.etag
+    response['Cache-Control'] = 'private, no-cache'
+    response['Vary'] = 'Cookie, Authorization'
+    return response
@@ -0,0 +1,249 @@
+"""
+SMS history queries
+Merges outbound (SMSMessage) and inbound (SMSInbound) messages in SQL with
+UNION ALL ordered by timestamp, and pages through them with a keyset cursor
+(timestamp, id) so every page costs the same regardless of depth.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime, time
+
+from django.db.models import CharField, F, Q, UUIDField, Value
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import SMSMessage, SMSInbound
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+OUTBOUND_STATUSES = [choice for choice, _label in SMSMessage.STATUS_CHOICES]
+INBOUND_STATUS = 'received'
+
+# Column order must be identical in both halves of the UNION
+COLUMNS = [
+    'row_id',
+    'row_direction',
+    'row_timestamp',
+    'row_patient_id',
+    'row_first_name',
+    'row_middle_names',
+    'row_last_name',
+    'row_phone',
+    'row_message',
+    'row_status',
+    'row_clinic',
+    'row_clinician',
+    'row_appointment_id',
+]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(timestamp, row_id):
+    raw = json.dumps({'t': timestamp.isoformat(), 'id': str(row_id)})
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        timestamp = parse_datetime(data['t'])
+        if timestamp is None:
+            raise ValueError
+        return timestamp, uuid.UUID(data['id'])
+    except Exception:
+        raise InvalidCursor('Invalid cursor')
+
+
+def _parse_day(value, end_of_day=False):
+    """Parse YYYY-MM-DD (or a full ISO datetime) into an aware datetime"""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _parse_uuid(value, name):
+    if not value:
+        return None
+    try:
+        return uuid.UUID(value)
+    except ValueError:
+        raise ValueError(f'Invalid {name}: {value}')
+
+
+def parse_filters(params):
+    """
+    Read history filters from query params.
+    Raises ValueError with a user-facing message on bad input.
+    """
+    status = params.get('status') or None
+    if status and status != INBOUND_STATUS and status not in OUTBOUND_STATUSES:
+        raise ValueError(f'Invalid status: {status}')
+    direction = params.get('direction') or None
+    if direction and direction not in ('inbound', 'outbound'):
+        raise ValueError(f'Invalid direction: {direction}')
+    return {
+        'patient_id': _parse_uuid(params.get('patient_id'), 'patient_id'),
+        'clinic_id': _parse_uuid(params.get('clinic_id'), 'clinic_id'),
+        'date_from': _parse_day(params.get('date_from')),
+        'date_to': _parse_day(params.get('date_to'), end_of_day=True),
+        'status': status,
+        'direction': direction,
+    }
+
+
+def _keyset(field, cursor):
+    """Rows strictly after `cursor` in (timestamp DESC, id DESC) order"""
+    timestamp, row_id = cursor
+    return Q(**{f'{field}__lt': timestamp}) | Q(**{field: timestamp, 'id__lt': row_id})
+
+
+def _outbound_queryset(filters, cursor):
+    queryset = SMSMessage.objects.all()
+    if filters['patient_id']:
+        queryset = queryset.filter(patient_id=filters['patient_id'])
+    if filters['clinic_id']:
+        queryset = queryset.filter(
+            Q(appointment__clinic_id=filters['clinic_id']) |
+            Q(appointment__isnull=True, patient__clinic_id=filters['clinic_id'])
+        )
+    if filters['date_from']:
+        queryset = queryset.filter(created_at__gte=filters['date_from'])
+    if filters['date_to']:
+        queryset = queryset.filter(created_at__lte=filters['date_to'])
+    if filters['status']:
+        queryset = queryset.filter(status=filters['status'])
+    if cursor:
+        queryset = queryset.filter(_keyset('created_at', cursor))
+
+    return queryset.annotate(
+        row_id=F('id'),
+        row_direction=Value('outbound', output_field=CharField()),
+        row_timestamp=F('created_at'),
+        row_patient_id=F('patient_id'),
+        row_first_name=F('patient__first_name'),
+        row_middle_names=F('patient__middle_names'),
+        row_last_name=F('patient__last_name'),
+        row_phone=F('phone_number'),
+        row_message=F('message'),
+        row_status=F('status'),
+        row_clinic=F('appointment__clinic__name'),
+        row_clinician=F('appointment__clinician__full_name'),
+        row_appointment_id=F('appointment_id'),
+    ).values(*COLUMNS).order_by()
+
+
+def _inbound_queryset(filters, cursor):
+    queryset = SMSInbound.objects.all()
+    if filters['patient_id']:
+        queryset = queryset.filter(patient_id=filters['patient_id'])
+    if filters['clinic_id']:
+        queryset = queryset.filter(patient__clinic_id=filters['clinic_id'])
+    if filters['date_from']:
+        queryset = queryset.filter(received_at__gte=filters['date_from'])
+    if filters['date_to']:
+        queryset = queryset.filter(received_at__lte=filters['date_to'])
+    if cursor:
+        queryset = queryset.filter(_keyset('received_at', cursor))
+
+    return queryset.annotate(
+        row_id=F('id'),
+        row_direction=Value('inbound', output_field=CharField()),
+        row_timestamp=F('received_at'),
+        row_patient_id=F('patient_id'),
+        row_first_name=F('patient__first_name'),
+        row_middle_names=F('patient__middle_names'),
+        row_last_name=F('patient__last_name'),
+        row_phone=F('from_number'),
+        row_message=F('message'),
+        row_status=Value(INBOUND_STATUS, output_field=CharField()),
+        row_clinic=Value(None, output_field=CharField()),
+        row_clinician=Value(None, output_field=CharField()),
+        row_appointment_id=Value(None, output_field=UUIDField()),
+    ).values(*COLUMNS).order_by()
+
+
+def history_queryset(filters, cursor=None):
+    """
+    Single SQL query returning merged history rows (dicts keyed by COLUMNS),
+    newest first. Only the halves the filters can match are included.
+    """
+    include_outbound = filters['direction'] != 'inbound' and filters['status'] != INBOUND_STATUS
+    include_inbound = (
+        filters['direction'] != 'outbound' and
+        filters['status'] in (None, INBOUND_STATUS)
+    )
+
+    parts = []
+    if include_outbound:
+        parts.append(_outbound_queryset(filters, cursor))
+    if include_inbound:
+        parts.append(_inbound_queryset(filters, cursor))
+    if not parts:
+        return SMSMessage.objects.none().values(*COLUMNS)
+
+    queryset = parts[0]
+    if len(parts) > 1:
+        queryset = queryset.union(parts[1], all=True)
+    return queryset.order_by('-row_timestamp', '-row_id')
+
+
+def row_to_record(row):
+    """Shape a UNION row like the records returned by the history API"""
+    name = ' '.join(
+        part for part in [row['row_first_name'], row['row_middle_names'], row['row_last_name']] if part
+    )
+    message = row['row_message'] or ''
+    timestamp = row['row_timestamp']
+    return {
+        'id': str(row['row_id']),
+        'patient_id': str(row['row_patient_id']) if row['row_patient_id'] else None,
+        'patient_name': name or 'Unknown',
+        'phone_number': row['row_phone'] or '',
+        'message': message,
+        'direction': row['row_direction'],
+        'status': row['row_status'],
+        'sent_at': timestamp.isoformat() if timestamp else None,
+        'clinic_name': row['row_clinic'],
+        'clinician_name': row['row_clinician'],
+        'appointment_id': str(row['row_appointment_id']) if row['row_appointment_id'] else None,
+        'template_name': None,
+        'character_count': len(message),
+        'segment_count': (len(message) // 160) + 1,
+    }
+
+
+def fetch_page(filters, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return (records, next_cursor) for one page of history"""
+    rows = list(history_queryset(filters, cursor)[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last['row_timestamp'], last['row_id'])
+    return [row_to_record(row) for row in rows], next_cursor
+
+
+def iter_records(filters, batch_size=1000):
+    """Yield every matching record, walking the keyset one batch at a time"""
+    cursor = None
+    while True:
+        rows = list(history_queryset(filters, cursor)[:batch_size])
+        for row in rows:
+            yield row_to_record(row)
+        if len(rows) < batch_size:
+            return
+        last = rows[-1]
+        cursor = (last['row_timestamp'], last['row_id'])
@@ -5,11 +5,15 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.db.models import Q
 from patients.models import Patient
+from patients.versions import bump_patient_versions, etag_matches, not_modified_response, patient_etag, set_etag_headers
+from . import history
 from .models import SMSMessage, SMSInbound
 from .serializers import SMSMessageSerializer, SMSInboundSerializer
+import csv
 import re
 
 
@@ -30,7 +34,7 @@ def normalize_phone(phone):
 
 def get_phone_number_label(patient, phone_number):
     """
-    Determine the label for a phone number based on patient's contact_json
+    Determine the label for a phone number based on the patient's contact points
     Returns label like "Default Mobile", "Mobile - Home", "Mother", etc.
     """
     if not patient or not phone_number:
@@ -40,187 +44,28 @@ def get_phone_number_label(patient, phone_number):
     if not normalized_target:
         return None
     
-    contact_json = patient.contact_json or {}
-    emergency_json = patient.emergency_json or {}
-    
-    # Check mobile numbers - handle both formats
-    mobile = contact_json.get('mobile')
-    if mobile:
-        if isinstance(mobile, str):
-            # Legacy format: simple string
-            if normalize_phone(mobile) == normalized_target:
-                return "Default Mobile"
-        elif isinstance(mobile, dict):
-            # New format: nested objects
-            for key, value in mobile.items():
-                if isinstance(value, dict) and 'value' in value:
-                    if normalize_phone(value['value']) == normalized_target:
-                        is_default = value.get('default', False)
-                        if is_default:
-                            return "Default Mobile"
-                        return f"Mobile - {key.title()}"
-                elif isinstance(value, str):
-                    if normalize_phone(value) == normalized_target:
-                        return f"Mobile - {key.title()}"
-    
-    # Check phone numbers - handle both formats
-    phone = contact_json.get('phone')
-    if phone:
-        if isinstance(phone, str):
-            # Legacy format: simple string
-            if normalize_phone(phone) == normalized_target:
-                return "Phone - Home"
-        elif isinstance(phone, dict):
-            # New format: nested objects
-            for key, value in phone.items():
-                if isinstance(value, dict) and 'value' in value:
-                    if normalize_phone(value['value']) == normalized_target:
-                        is_default = value.get('default', False)
-                        if is_default:
-                            return "Default Phone"
-                        return f"Phone - {key.title()}"
-                elif isinstance(value, str):
-                    if normalize_phone(value) == normalized_target:
-                        return f"Phone - {key.title()}"
-    
-    # Check emergency contacts
-    for contact_type in ['mother', 'father', 'emergency', 'guardian']:
-        contact = emergency_json.get(contact_type, {})
-        if isinstance(contact, dict):
-            mobile = contact.get('mobile') or contact.get('phone')
-            if mobile and normalize_phone(mobile) == normalized_target:
-                return contact_type.title()
+    for point in patient.contact_points.all():
+        if point.kind != 'phone' or point.normalized_value != normalized_target:
+            continue
+        if point.is_default and point.type in ('mobile', 'phone'):
+            return f"Default {point.type.title()}"
+        return point.label
     
     return None
 
 
 def get_available_phone_numbers(patient):
     """
-    Extract all available phone numbers from patient's contact_json and emergency_json
-    Returns list of dicts: [{value, label, is_default}, ...]
-    Handles multiple formats: phones array, legacy mobile/phone objects, and strings
+    All phone numbers of a patient (contact and emergency), from the
+    normalized PatientContactPoint rows parsed from every contact_json shape
+    (see patients/contact_points.py).
+    Returns list of dicts: [{value, label, is_default, type}, ...],
+    default first, then mobile > phone > emergency
     """
     if not patient:
         return []
     
-    phones = []
-    contact_json = patient.contact_json or {}
-    emergency_json = patient.emergency_json or {}
-    
-    # NEW FORMAT: Check for phones array first
-    phones_array = contact_json.get('phones', [])
-    if phones_array and isinstance(phones_array, list):
-        for phone_obj in phones_array:
-            if isinstance(phone_obj, dict):
-                phone_type = phone_obj.get('type', 'phone')
-                number = phone_obj.get('number')
-                label = phone_obj.get('label', 'Unknown')
-                
-                if number:
-                    # Check for default flag (both 'default' and 'is_default')
-                    is_default = phone_obj.get('is_default', False) or phone_obj.get('default', False)
-                    
-                    phones.append({
-                        'value': number,
-                        'label': f"{phone_type.title()} - {label}",
-                        'is_default': is_default,
-                        'type': phone_type
-                    })
-    
-    # LEGACY FORMAT: Extract mobile numbers - handle both formats
-    mobile = contact_json.get('mobile')
-    if mobile:
-        if isinstance(mobile, str):
-            # Legacy format: simple string
-            phones.append({
-                'value': mobile,
-                'label': 'Mobile - Home',
-                'is_default': len(phones) == 0,  # First mobile is default if no phones array
-                'type': 'mobile'
-            })
-        elif isinstance(mobile, dict):
-            # New format: nested objects
-            for key, value in mobile.items():
-                if isinstance(value, dict) and 'value' in value:
-                    # Check for 'default' flag in the object
-                    is_default = value.get('default', False)
-                    phones.append({
-                        'value': value['value'],
-                        'label': f"Mobile - {key.title()}",
-                        'is_default': is_default,
-                        'type': 'mobile'
-                    })
-                elif isinstance(value, str):
-                    # Handle case where value is directly a string
-                    phones.append({
-                        'value': value,
-                        'label': f"Mobile - {key.title()}",
-                        'is_default': False,
-                        'type': 'mobile'
-                    })
-    
-    # LEGACY FORMAT: Extract phone numbers - handle both formats
-    phone = contact_json.get('phone')
-    if phone:
-        if isinstance(phone, str):
-            # Legacy format: simple string
-            phones.append({
-                'value': phone,
-                'label': 'Phone - Home',
-                'is_default': False,  # Mobile takes priority
-                'type': 'phone'
-            })
-        elif isinstance(phone, dict):
-            # New format: nested objects
-            for key, value in phone.items():
-                if isinstance(value, dict) and 'value' in value:
-                    # Check for 'default' flag in the object
-                    is_default = value.get('default', False)
-                    phones.append({
-                        'value': value['value'],
-                        'label': f"Phone - {key.title()}",
-                        'is_default': is_default,
-                        'type': 'phone'
-                    })
-                elif isinstance(value, str):
-                    # Handle case where value is directly a string
-                    phones.append({
-                        'value': value,
-                        'label': f"Phone - {key.title()}",
-                        'is_default': False,
-                        'type': 'phone'
-                    })
-    
-    # Extract emergency contact numbers
-    for contact_type in ['mother', 'father', 'emergency', 'guardian']:
-        contact = emergency_json.get(contact_type, {})
-        if isinstance(contact, dict):
-            mobile = contact.get('mobile') or contact.get('phone')
-            if mobile:
-                phones.append({
-                    'value': mobile,
-                    'label': contact_type.title(),
-                    'is_default': False,
-                    'type': 'emergency'
-                })
-    
-    # If no default is set but we have phones, make the first mobile the default
-    has_default = any(p.get('is_default') for p in phones)
-    if not has_default and phones:
-        # Find first mobile, or first phone if no mobile
-        mobile_phones = [p for p in phones if p['type'] == 'mobile']
-        if mobile_phones:
-            mobile_phones[0]['is_default'] = True
-        elif phones:
-            phones[0]['is_default'] = True
-    
-    # Sort: default first, then by type (mobile > phone > emergency)
-    phones.sort(key=lambda x: (
-        not x['is_default'],
-        {'mobile': 0, 'phone': 1, 'emergency': 2}.get(x['type'], 3)
-    ))
-    
-    return phones
+    return [point.as_phone_option() for point in patient.contact_points.all() if point.kind == 'phone']
 
 
 @api_view(['GET'])
@@ -231,8 +76,12 @@ def patient_conversation(request, patient_id):
     Merges outbound (SMSMessage) and inbound (SMSInbound) messages
     Returns chronological list of all messages
     """
+    etag = patient_etag(request, patient_id)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    
     try:
-        patient = Patient.objects.get(id=patient_id)
+        patient = Patient.objects.prefetch_related('contact_points').get(id=patient_id)
     except Patient.DoesNotExist:
         return Response(
             {'error': 'Patient not found'},
@@ -284,7 +133,7 @@ def patient_conversation(request, patient_id):
             default_phone = phone
             break
     
-    return Response({
+    response = Response({
         'patient_id': str(patient.id),
         'patient_name': patient.get_full_name(),
         'default_phone': default_phone,
@@ -292,6 +141,8 @@ def patient_conversation(request, patient_id):
         'messages': all_messages,
         'total_messages': len(all_messages)
     })
+    set_etag_headers(response, etag)
+    return response
 
 
 @api_view(['GET'])
@@ -505,6 +356,10 @@ def patient_unread_count(request, patient_id):
     Get count of unread SMS messages for a specific patient
     Returns count of inbound messages where is_processed=False
     """
+    etag = patient_etag(request, patient_id)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    
     try:
         # Validate patient exists
         patient = Patient.objects.get(id=patient_id)
@@ -515,10 +370,12 @@ def patient_unread_count(request, patient_id):
             is_processed=False
         ).count()
         
-        return Response({
+        response = Response({
             'patient_id': str(patient.id),
             'unread_count': unread_count
         }, status=status.HTTP_200_OK)
+        set_etag_headers(response, etag)
+        return response
         
     except Patient.DoesNotExist:
         return Response(
@@ -550,6 +407,9 @@ def patient_mark_read(request, patient_id):
             is_processed=True,
             processed_at=timezone.now()
         )
+        if updated_count:
+            # update() skips the post_save handlers that bump the version
+            bump_patient_versions([patient.pk])
         
         return Response({
             'patient_id': str(patient.id),
@@ -679,108 +539,97 @@ def sms_history(request):
     """
     Get full SMS history with filtering options
     Returns all SMS messages (sent and received) with patient, clinic, and status info
+    
+    Unpaginated - kept for existing clients. Prefer history/page/ which pages
+    with a cursor, or history/export/ for a CSV download.
+    Filters: patient_id, clinic_id, date_from, date_to, status, direction
     """
-    from appointments.models import Appointment
-    from clinicians.models import Clinic, Clinician
     import logging
     
     logger = logging.getLogger(__name__)
-    history = []
     
     try:
-        # Get all outbound messages
-        outbound_messages = SMSMessage.objects.select_related(
-            'patient', 'appointment', 'appointment__clinic', 'appointment__clinician'
-        ).order_by('-created_at')
-        
-        for msg in outbound_messages:
-            try:
-                patient_name = "Unknown"
-                patient_id = None
-                if msg.patient:
-                    try:
-                        patient_name = msg.patient.get_full_name() if hasattr(msg.patient, 'get_full_name') else f"{msg.patient.first_name or ''} {msg.patient.last_name or ''}".strip()
-                        patient_id = str(msg.patient.id)
-                    except Exception as e:
-                        logger.error(f"Error getting patient name for message {msg.id}: {e}")
-                        patient_name = "Unknown"
-                
-                clinic_name = None
-                clinician_name = None
-                if msg.appointment:
-                    try:
-                        if msg.appointment.clinic:
-                            clinic_name = msg.appointment.clinic.name
-                        if msg.appointment.clinician:
-                            clinician_name = msg.appointment.clinician.full_name
-                    except Exception as e:
-                        logger.error(f"Error getting appointment details for message {msg.id}: {e}")
-                
-                history.append({
-                    'id': str(msg.id),
-                    'patient_id': patient_id,
-                    'patient_name': patient_name or "Unknown",
-                    'phone_number': msg.phone_number or '',
-                    'message': msg.message or '',
-                    'direction': 'outbound',
-                    'status': msg.delivery_status or 'sent',
-                    'sent_at': msg.created_at.isoformat(),
-                    'clinic_name': clinic_name,
-                    'clinician_name': clinician_name,
-                    'appointment_id': str(msg.appointment.id) if msg.appointment else None,
-                    'template_name': None,
-                    'character_count': len(msg.message or ''),
-                    'segment_count': (len(msg.message or '') // 160) + 1,
-                })
-            except Exception as e:
-                logger.error(f"Error processing outbound message {msg.id}: {e}")
-                continue
-        
-        # Get all inbound messages
-        inbound_messages = SMSInbound.objects.select_related('patient').order_by('-received_at')
-        
-        for msg in inbound_messages:
-            try:
-                patient_name = "Unknown"
-                patient_id = None
-                if msg.patient:
-                    try:
-                        patient_name = msg.patient.get_full_name() if hasattr(msg.patient, 'get_full_name') else f"{msg.patient.first_name or ''} {msg.patient.last_name or ''}".strip()
-                        patient_id = str(msg.patient.id)
-                    except Exception as e:
-                        logger.error(f"Error getting patient name for inbound message {msg.id}: {e}")
-                        patient_name = "Unknown"
-                
-                history.append({
-                    'id': str(msg.id),
-                    'patient_id': patient_id,
-                    'patient_name': patient_name or "Unknown",
-                    'phone_number': msg.from_number or '',
-                    'message': msg.message or '',
-                    'direction': 'inbound',
-                    'status': 'received',
-                    'sent_at': msg.received_at.isoformat(),
-                    'clinic_name': None,
-                    'clinician_name': None,
-                    'appointment_id': None,
-                    'template_name': None,
-                    'character_count': len(msg.message or ''),
-                    'segment_count': (len(msg.message or '') // 160) + 1,
-                })
-            except Exception as e:
-                logger.error(f"Error processing inbound message {msg.id}: {e}")
-                continue
-        
-        # Sort all messages by time (most recent first)
-        history.sort(key=lambda x: x['sent_at'], reverse=True)
-        
-        return Response(history, status=status.HTTP_200_OK)
+        filters = history.parse_filters(request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
+    try:
+        return Response(list(history.iter_records(filters)), status=status.HTTP_200_OK)
     except Exception as e:
         logger.error(f"Error in sms_history: {e}")
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sms_history_page(request):
+    """
+    Cursor-paginated SMS history (outbound and inbound merged, newest first)
+    GET /api/sms/history/page/?limit=100&cursor=<next_cursor>
+    
+    Filters: patient_id, clinic_id, date_from, date_to (YYYY-MM-DD),
+    status (pending/sent/delivered/failed/cancelled/received), direction (inbound/outbound)
+    
+    Returns: {results: [...], next_cursor: str|null, has_more: bool}
+    """
+    try:
+        filters = history.parse_filters(request.query_params)
+        cursor = request.query_params.get('cursor')
+        cursor = history.decode_cursor(cursor) if cursor else None
+        limit = int(request.query_params.get('limit', history.DEFAULT_PAGE_SIZE))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    limit = max(1, min(limit, history.MAX_PAGE_SIZE))
+    records, next_cursor = history.fetch_page(filters, cursor=cursor, limit=limit)
+    
+    return Response({
+        'results': records,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+        'limit': limit,
+    }, status=status.HTTP_200_OK)
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output"""
+    
+    def write(self, value):
+        return value
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sms_history_export(request):
+    """
+    Stream SMS history as CSV
+    GET /api/sms/history/export/?date_from=2025-01-01&clinic_id=<uuid>
+    
+    Accepts the same filters as history/page/. Rows are fetched in keyset
+    batches and written as they are read, so memory use stays flat.
+    """
+    try:
+        filters = history.parse_filters(request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    columns = [
+        'sent_at', 'direction', 'status', 'patient_name', 'patient_id', 'phone_number',
+        'clinic_name', 'clinician_name', 'appointment_id', 'segment_count', 'message',
+    ]
+    writer = csv.writer(_Echo())
+    
+    def rows():
+        yield writer.writerow(columns)
+        for record in history.iter_records(filters):
+            yield writer.writerow([record[column] if record[column] is not None else '' for column in columns])
+    
+    filename = f"sms-history-{timezone.localdate().isoformat()}.csv"
+    response = StreamingHttpResponse(rows(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def delete_sms_message(request, message_id):
@@ -848,7 +697,7 @@ def bulk_send_sms(request):
                 return Response({'error': 'Clinic ID is required for clinic sending'}, status=status.HTTP_400_BAD_REQUEST)
             
             # Get all active patients at this clinic
-            patients = Patient.objects.filter(clinic_id=clinic_id, is_active=True)
+            patients = Patient.objects.filter(clinic_id=clinic_id, is_active=True).prefetch_related('contact_points')
             recipients = list(patients)
             
         elif recipient_type == 'appointments':
@@ -861,7 +710,7 @@ def bulk_send_sms(request):
             appointments = Appointment.objects.filter(
                 start_time__date=date_obj.date(),
                 patient__isnull=False
-            ).select_related('patient')
+            ).select_related('patient').prefetch_related('patient__contact_points')
             
             # Get unique patients (avoid duplicate SMS)
             patient_ids = set()
@@ -872,7 +721,7 @@ def bulk_send_sms(request):
                     
         elif recipient_type == 'all':
             # Get all active patients (use with caution!)
-            patients = Patient.objects.filter(is_active=True)
+            patients = Patient.objects.filter(is_active=True).prefetch_related('contact_points')
             recipients = list(patients)
             
         else:
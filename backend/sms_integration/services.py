@@ -8,6 +8,8 @@ import uuid
 from typing import Dict, Optional
 from django.utils import timezone
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from ncc_api import metrics
 from .models import SMSMessage, SMSTemplate
 
 
@@ -158,6 +160,7 @@ class SMSService:
         
         finally:
             sms_message.save()
+            metrics.inc('ncc_sms_total', status=sms_message.status)
         
         return sms_message
     
@@ -208,7 +211,7 @@ class SMSService:
         appointment = Appointment.objects.select_related('patient', 'clinic', 'clinician').get(id=appointment_id)
         
         # Get patient mobile number
-        phone_number = appointment.patient.get_mobile()
+        phone_number = appointment.patient.default_phone(types=('mobile',))
         if not phone_number:
             raise ValueError(f"Patient {appointment.patient.get_full_name()} has no mobile number")
         
@@ -304,6 +307,6 @@ class SMSService:
             }
 
 
-# Singleton instance
-sms_service = SMSService()
+# Singleton instance (created on first use)
+sms_service = SimpleLazyObject(SMSService)
 
@@ -1,3 +1,51 @@
+import base64
+import json
+import uuid
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import history
+
+
+def _cursor(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+
+class DecodeCursorTests(TestCase):
+
+    def test_round_trip(self):
+        now, row_id = timezone.now(), uuid.uuid4()
+        self.assertEqual(history.decode_cursor(history.encode_cursor(now, row_id)), (now, row_id))
+
+    def test_rejects_tampered_cursors(self):
+        now = timezone.now().isoformat()
+        for cursor in ('not base64!', _cursor({'t': now, 'id': 'nope'}), _cursor({'t': now}), _cursor({'t': 'x', 'id': str(uuid.uuid4())})):
+            with self.subTest(cursor=cursor), self.assertRaises(history.InvalidCursor):
+                history.decode_cursor(cursor)
+
+
+class SMSHistoryPageTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('clinician', password='pw'))
+
+    def test_bad_cursor_is_a_bad_request(self):
+        cursor = _cursor({'t': timezone.now().isoformat(), 'id': 'nope'})
+        response = self.client.get('/api/sms/history/page/', {'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_bad_filter_ids_are_a_bad_request(self):
+        for name in ('patient_id', 'clinic_id'):
+            with self.subTest(name=name):
+                response = self.client.get('/api/sms/history/page/', {name: 'nope'})
+                self.assertEqual(response.status_code, 400)
 
-# Create your tests here.
+    def test_empty_page(self):
+        response = self.client.get('/api/sms/history/page/', {'cursor': history.encode_cursor(timezone.now(), uuid.uuid4())})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+        self.assertIsNone(response.data['next_cursor'])
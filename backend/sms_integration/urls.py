@@ -27,6 +27,8 @@ urlpatterns = [
     path('bulk/send/', patient_views.bulk_send_sms, name='bulk-send-sms'),
     # SMS History endpoints
     path('history/', patient_views.sms_history, name='sms-history'),
+    path('history/page/', patient_views.sms_history_page, name='sms-history-page'),
+    path('history/export/', patient_views.sms_history_export, name='sms-history-export'),
     path('history/<uuid:message_id>/', patient_views.delete_sms_message, name='delete-sms-message'),
     # Webhook endpoints (CSRF exempt - called by SMS Broadcast)
     path('webhook/dlr/', views.sms_delivery_receipt, name='sms-delivery-receipt'),
@@ -279,7 +279,6 @@ def sms_inbound(request):
     """
     from django.utils import timezone
     from django.http import HttpResponse, HttpResponseForbidden
-    from patients.models import Patient
     import os
     
     # Optional webhook secret for security (set in .env)
@@ -359,29 +358,12 @@ def sms_inbound(request):
         # Try to match to patient by phone number
         patient = None
         if formatted_from:
-            # Normalize phone number formats for searching
-            search_variants = [
-                formatted_from,  # 61412345678
-                formatted_from.lstrip('+'),  # Remove + if present
-            ]
+            from .webhook_views import find_patient_by_phone
             
-            # Add variants with/without leading 0
-            if formatted_from.startswith('61'):
-                search_variants.append('0' + formatted_from[2:])  # 0412345678
-            elif not formatted_from.startswith('0') and len(formatted_from) >= 9:
-                search_variants.append('0' + formatted_from)  # Add 0 prefix
-            
-            # Try to find patient by mobile number in contact_json
             try:
-                from django.db.models import Q
-                
-                # Search in contact_json.mobile field
-                queries = Q()
-                for variant in search_variants:
-                    queries |= Q(contact_json__mobile=variant)
-                    queries |= Q(contact_json__mobile__icontains=variant)
-                
-                patient = Patient.objects.filter(queries).first()
+                patient = find_patient_by_phone(formatted_from)
+                if not patient and not formatted_from.startswith(('0', '61')) and len(formatted_from) >= 9:
+                    patient = find_patient_by_phone('0' + formatted_from)  # Number without its leading 0
                 
                 if patient:
                     print(f"[SMS Webhook] ✓ Matched to patient: {patient.get_full_name()}")
@@ -8,7 +8,8 @@ from django.utils import timezone
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from patients.models import Patient
+from django.db.models import Case, When
+from patients.models import PatientContactPoint
 from .models import SMSMessage, SMSInbound
 import re
 import logging
@@ -35,7 +36,9 @@ def normalize_phone(phone):
 def find_patient_by_phone(phone_number):
     """
     Find a patient by phone number
-    Searches in contact_json.phones array, contact_json.mobile, contact_json.phone, and emergency_json
+    Looks the normalized number up in PatientContactPoint (contact phones
+    of every contact_json shape, plus emergency contacts), preferring a
+    patient's own numbers over emergency contacts
     """
     if not phone_number:
         return None
@@ -46,67 +49,17 @@ def find_patient_by_phone(phone_number):
     
     logger.info(f"[SMS Webhook] Searching for patient with phone: {normalized_target}")
     
-    # Search all patients
-    patients = Patient.objects.all()
+    point = PatientContactPoint.objects.filter(
+        kind='phone',
+        normalized_value=normalized_target,
+    ).select_related('patient').order_by(
+        Case(When(type='emergency', then=1), default=0),
+        'patient__last_name', 'patient__first_name', 'position',
+    ).first()
     
-    for patient in patients:
-        contact_json = patient.contact_json or {}
-        emergency_json = patient.emergency_json or {}
-        
-        # NEW FORMAT: Check phones array first
-        phones_array = contact_json.get('phones', [])
-        if phones_array and isinstance(phones_array, list):
-            for phone_obj in phones_array:
-                if isinstance(phone_obj, dict):
-                    number = phone_obj.get('number')
-                    if number and normalize_phone(number) == normalized_target:
-                        logger.info(f"[SMS Webhook] ✓ Found patient via phones array: {patient.get_full_name()}")
-                        return patient
-        
-        # LEGACY FORMAT: Check mobile numbers - handle both string and dict formats
-        mobile = contact_json.get('mobile')
-        if mobile:
-            if isinstance(mobile, str):
-                if normalize_phone(mobile) == normalized_target:
-                    logger.info(f"[SMS Webhook] ✓ Found patient via mobile string: {patient.get_full_name()}")
-                    return patient
-            elif isinstance(mobile, dict):
-                for key, value in mobile.items():
-                    if isinstance(value, dict) and 'value' in value:
-                        if normalize_phone(value['value']) == normalized_target:
-                            logger.info(f"[SMS Webhook] ✓ Found patient via mobile dict: {patient.get_full_name()}")
-                            return patient
-                    elif isinstance(value, str):
-                        if normalize_phone(value) == normalized_target:
-                            logger.info(f"[SMS Webhook] ✓ Found patient via mobile dict value: {patient.get_full_name()}")
-                            return patient
-        
-        # LEGACY FORMAT: Check phone numbers - handle both string and dict formats
-        phone = contact_json.get('phone')
-        if phone:
-            if isinstance(phone, str):
-                if normalize_phone(phone) == normalized_target:
-                    logger.info(f"[SMS Webhook] ✓ Found patient via phone string: {patient.get_full_name()}")
-                    return patient
-            elif isinstance(phone, dict):
-                for key, value in phone.items():
-                    if isinstance(value, dict) and 'value' in value:
-                        if normalize_phone(value['value']) == normalized_target:
-                            logger.info(f"[SMS Webhook] ✓ Found patient via phone dict: {patient.get_full_name()}")
-                            return patient
-                    elif isinstance(value, str):
-                        if normalize_phone(value) == normalized_target:
-                            logger.info(f"[SMS Webhook] ✓ Found patient via phone dict value: {patient.get_full_name()}")
-                            return patient
-        
-        # Check emergency contacts
-        for contact_type in ['mother', 'father', 'emergency', 'guardian']:
-            contact = emergency_json.get(contact_type, {})
-            if isinstance(contact, dict):
-                emergency_mobile = contact.get('mobile') or contact.get('phone')
-                if emergency_mobile and normalize_phone(emergency_mobile) == normalized_target:
-                    logger.info(f"[SMS Webhook] ✓ Found patient via emergency contact: {patient.get_full_name()}")
-                    return patient
+    if point:
+        logger.info(f"[SMS Webhook] ✓ Found patient via {point.label}: {point.patient.get_full_name()}")
+        return point.patient
     
     logger.warning(f"[SMS Webhook] ✗ No patient found for phone: {normalized_target}")
     return None
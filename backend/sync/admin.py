@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import ChangeLogEntry
+
+
+@admin.register(ChangeLogEntry)
+class ChangeLogEntryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'object_type', 'object_id', 'action', 'changed_at']
+    list_filter = ['object_type', 'action']
+    search_fields = ['object_id']
+    readonly_fields = ['id', 'object_type', 'object_id', 'action', 'changed_at']
+
+    def has_add_permission(self, request):
+        return False
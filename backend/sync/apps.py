@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'sync'
+    verbose_name = 'Sync Change Feed'
+
+    def ready(self):
+        # Connect post_save/post_delete handlers that record changes
+        from . import signals  # noqa: F401
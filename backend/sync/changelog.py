@@ -0,0 +1,184 @@
+"""
+Change feed for offline-capable clients
+
+Recording
+    Saves and deletes of the feed models are recorded by the signal handlers
+    in sync/signals.py. QuerySet.update() and bulk_create() bypass signals,
+    so bulk operations call record_changes() themselves with every affected
+    id (written with one INSERT).
+
+    Entries are written when the surrounding transaction commits, so rolled
+    back changes never reach the feed.
+
+Reading
+    read_changes(since) returns the entries after cursor `since`, collapsed
+    to the latest change per record, with upserts serialized from the
+    record's current state (one query per type) and deletes as tombstones.
+
+Commit order
+    Ids come from a sequence when a row is inserted, so a transaction that
+    got id 101 can commit after the one that got id 102. A client that saw
+    102 and moved its cursor there would never see 101. The feed therefore
+    stops before the first entry younger than SETTLE_SECONDS: anything
+    older has had time to commit.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from .models import ChangeLogEntry
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 2000
+SETTLE_SECONDS = 2
+
+
+class CursorExpired(Exception):
+    """The client's cursor is older than the retained log; it must reload everything"""
+
+
+# ---------------------------------------------------------------------------
+# Serializers - each returns {pk: JSON-ready data} for the records in `ids`
+# that still exist, using the same shapes as the list endpoints the client
+# caches.
+# ---------------------------------------------------------------------------
+
+def _patients(ids, context):
+    from patients.models import Patient
+    from patients.serializers import PatientListSerializer, active_referrers_prefetch
+    patients = list(
+        Patient.objects.filter(pk__in=ids)
+        .select_related('clinic', 'funding_type')
+        .prefetch_related(active_referrers_prefetch())
+    )
+    data = PatientListSerializer(patients, many=True, context=context).data
+    # The list cache drops archived patients, so clients need the flag
+    return {patient.pk: dict(row, archived=patient.archived) for patient, row in zip(patients, data)}
+
+
+def _appointments(ids, context):
+    from appointments.models import Appointment
+    from appointments.serializers import AppointmentSerializer
+    appointments = Appointment.objects.filter(pk__in=ids).select_related(
+        'patient', 'clinic', 'clinician', 'appointment_type',
+    )
+    return {row.pk: AppointmentSerializer(row, context=context).data for row in appointments}
+
+
+def _notes(ids, context):
+    from notes.models import Note
+    from notes.serializers import NoteSerializer
+    notes = Note.objects.filter(pk__in=ids).select_related('patient')
+    return {row.pk: NoteSerializer(row, context=context).data for row in notes}
+
+
+def _reminders(ids, context):
+    from reminders.models import Reminder
+    from reminders.serializers import ReminderSerializer
+    reminders = Reminder.objects.filter(pk__in=ids).select_related('patient', 'clinic')
+    return {row.pk: ReminderSerializer(row, context=context).data for row in reminders}
+
+
+def _clinics(ids, context):
+    from clinicians.models import Clinic
+    from clinicians.serializers import ClinicSerializer
+    return {row.pk: ClinicSerializer(row, context=context).data for row in Clinic.objects.filter(pk__in=ids)}
+
+
+# object_type -> (app_label, model_name, serializer)
+SOURCES = {
+    'patient': ('patients', 'Patient', _patients),
+    'appointment': ('appointments', 'Appointment', _appointments),
+    'note': ('notes', 'Note', _notes),
+    'reminder': ('reminders', 'Reminder', _reminders),
+    'clinic': ('clinicians', 'Clinic', _clinics),
+}
+
+
+def get_source_models():
+    """Return {model class: object_type} for every model in the feed"""
+    return {
+        apps.get_model(app_label, model_name): object_type
+        for object_type, (app_label, model_name, _serializer) in SOURCES.items()
+    }
+
+
+def record_changes(object_type, object_ids, action='upsert'):
+    """Log a change to each of `object_ids`, once the current transaction commits"""
+    object_ids = [object_id for object_id in dict.fromkeys(object_ids) if object_id]
+    if not object_ids:
+        return
+
+    def write():
+        # Timestamped at insert, which the settle window relies on
+        changed_at = timezone.now()
+        ChangeLogEntry.objects.bulk_create([
+            ChangeLogEntry(object_type=object_type, object_id=object_id, action=action, changed_at=changed_at)
+            for object_id in object_ids
+        ], batch_size=1000)
+
+    transaction.on_commit(write)
+
+
+def latest_cursor():
+    return ChangeLogEntry.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def read_changes(since, limit=DEFAULT_LIMIT, types=None, context=None):
+    """
+    Changes after cursor `since`.
+
+    Returns {'cursor', 'has_more', 'changes'}; pass `cursor` back as `since`
+    for the next page. Raises CursorExpired if entries after `since` may
+    have been pruned.
+    """
+    bounds = ChangeLogEntry.objects.aggregate(oldest=Min('id'), latest=Max('id'))
+    if bounds['oldest'] is not None and since < bounds['oldest'] - 1:
+        raise CursorExpired(f"Cursor {since} is older than the retained change log")
+    if since > (bounds['latest'] or 0):
+        raise CursorExpired(f"Cursor {since} is ahead of the change log")
+
+    entries = ChangeLogEntry.objects.filter(id__gt=since).order_by('id')
+    unsettled = entries.filter(
+        changed_at__gt=timezone.now() - timedelta(seconds=SETTLE_SECONDS)
+    ).values_list('id', flat=True).first()
+    if unsettled is not None:
+        entries = entries.filter(id__lt=unsettled)
+    if types:
+        entries = entries.filter(object_type__in=types)
+
+    entries = list(entries[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return {'cursor': since, 'has_more': False, 'changes': []}
+
+    # Latest entry per record, in feed order
+    latest = {}
+    for entry in entries:
+        latest.pop((entry.object_type, entry.object_id), None)
+        latest[(entry.object_type, entry.object_id)] = entry
+
+    upserts = {}
+    for object_type in {entry.object_type for entry in latest.values() if entry.action == 'upsert'}:
+        ids = [entry.object_id for entry in latest.values() if entry.object_type == object_type and entry.action == 'upsert']
+        upserts[object_type] = SOURCES[object_type][2](ids, context)
+
+    changes = []
+    for entry in latest.values():
+        data = upserts.get(entry.object_type, {}).get(entry.object_id)
+        change = {
+            'seq': entry.id,
+            'type': entry.object_type,
+            'id': str(entry.object_id),
+            # Upserted then deleted before this read: send the tombstone
+            'action': 'upsert' if data is not None else 'delete',
+        }
+        if data is not None:
+            change['data'] = data
+        changes.append(change)
+
+    return {'cursor': entries[-1].id, 'has_more': has_more, 'changes': changes}
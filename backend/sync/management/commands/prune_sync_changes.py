@@ -0,0 +1,49 @@
+"""
+Delete old change feed entries.
+
+Clients whose cursor is older than the oldest remaining entry get 410 Gone
+from /api/sync/changes/ and reload everything, so keep at least as many
+days as a client may stay offline. The newest entry is always kept so the
+feed can tell an up-to-date cursor from a pruned one.
+
+Usage:
+    python manage.py prune_sync_changes
+    python manage.py prune_sync_changes --days 90 --dry-run
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from sync.changelog import latest_cursor
+from sync.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    help = 'Delete change feed entries older than --days (default: 30)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Keep entries from the last N days (default: 30)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+
+        self.stdout.write("=" * 70)
+        self.stdout.write("🧹 Prune Sync Change Log")
+        self.stdout.write("=" * 70)
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        old_entries = ChangeLogEntry.objects.filter(changed_at__lt=cutoff, id__lt=latest_cursor())
+        if options['dry_run']:
+            deleted = old_entries.count()
+        else:
+            deleted, _ = old_entries.delete()
+
+        self.stdout.write("\n" + "=" * 70)
+        self.stdout.write("📊 SUMMARY")
+        self.stdout.write("=" * 70)
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(f"{verb}: {deleted} entries older than {cutoff:%Y-%m-%d %H:%M}")
+        self.stdout.write(f"Remaining: {ChangeLogEntry.objects.count()}")
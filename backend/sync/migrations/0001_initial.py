@@ -0,0 +1,32 @@
+# Generated by Django 4.2.25 on 2026-10-19 08:30
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('object_type', models.CharField(help_text="Feed type, e.g. 'patient' (see sync/changelog.py)", max_length=30)),
+                ('object_id', models.UUIDField(help_text='Primary key of the changed record')),
+                ('action', models.CharField(choices=[('upsert', 'Created or updated'), ('delete', 'Deleted')], max_length=10)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Change log entry',
+                'verbose_name_plural': 'Change log entries',
+                'db_table': 'sync_changes',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['changed_at'], name='sync_change_changed_b3bad7_idx'), models.Index(fields=['object_type', 'id'], name='sync_change_object__053613_idx')],
+            },
+        ),
+    ]
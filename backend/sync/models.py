@@ -0,0 +1,42 @@
+"""
+Change feed models for WalkEasy Nexus
+Append-only log of patient, appointment, note, reminder and clinic changes,
+read by offline-capable clients through /api/sync/changes/
+"""
+from django.db import models
+from django.utils import timezone
+
+
+class ChangeLogEntry(models.Model):
+    """
+    One change to one record. The auto-increment id is the feed cursor.
+
+    Entries only say *what* changed; the feed serializes the record's
+    current state when it is read, so several changes to one record
+    collapse into a single upsert.
+    """
+
+    ACTION_CHOICES = [
+        ('upsert', 'Created or updated'),
+        ('delete', 'Deleted'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+
+    object_type = models.CharField(max_length=30, help_text="Feed type, e.g. 'patient' (see sync/changelog.py)")
+    object_id = models.UUIDField(help_text="Primary key of the changed record")
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'sync_changes'
+        ordering = ['id']
+        verbose_name = 'Change log entry'
+        verbose_name_plural = 'Change log entries'
+        indexes = [
+            models.Index(fields=['changed_at']),
+            models.Index(fields=['object_type', 'id']),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.action} {self.object_type} {self.object_id}"
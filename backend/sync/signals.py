@@ -0,0 +1,27 @@
+"""
+Signal handlers that record feed model changes in the change log
+"""
+from django.db.models.signals import post_save, post_delete
+
+from . import changelog
+
+# model class -> feed object_type
+SOURCE_MODELS = changelog.get_source_models()
+
+
+def record_save(sender, instance, raw=False, **kwargs):
+    """Log an upsert whenever a record is saved (skipped for fixture loading)"""
+    if raw:
+        return
+    changelog.record_changes(SOURCE_MODELS[sender], [instance.pk], 'upsert')
+
+
+def record_delete(sender, instance, **kwargs):
+    """Log a tombstone when a record is deleted"""
+    changelog.record_changes(SOURCE_MODELS[sender], [instance.pk], 'delete')
+
+
+for model in SOURCE_MODELS:
+    label = model._meta.label_lower
+    post_save.connect(record_save, sender=model, dispatch_uid=f'sync_change_save_{label}')
+    post_delete.connect(record_delete, sender=model, dispatch_uid=f'sync_change_delete_{label}')
@@ -0,0 +1,9 @@
+"""
+URL Configuration for the sync change feed
+"""
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('changes/', views.changes, name='sync-changes'),
+]
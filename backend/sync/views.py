@@ -0,0 +1,60 @@
+"""
+Delta sync feed for offline-capable clients
+
+GET /api/sync/changes/?since=<cursor>[&limit=500][&types=patient,appointment]
+
+    {
+        "cursor": 1234,
+        "has_more": false,
+        "changes": [
+            {"seq": 1230, "type": "patient", "id": "...", "action": "upsert", "data": {...}},
+            {"seq": 1234, "type": "note", "id": "...", "action": "delete"}
+        ]
+    }
+
+Apply the changes in order, store `cursor`, and call again with it as
+`since` (straight away while has_more is true). Without `since` only the
+current cursor is returned: fetch it *before* a full reload, then sync
+from it. 410 Gone means the cursor is no longer usable and the client must
+reload everything.
+"""
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from . import changelog
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def changes(request):
+    """Changes to patients, appointments, notes, reminders and clinics after a cursor"""
+    since = request.query_params.get('since')
+    if since in (None, ''):
+        return Response({'cursor': changelog.latest_cursor(), 'has_more': False, 'changes': []})
+
+    try:
+        since = int(since)
+        limit = int(request.query_params.get('limit', changelog.DEFAULT_LIMIT))
+    except ValueError:
+        return Response({'error': 'since and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    if since < 0:
+        return Response({'error': 'since must not be negative'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = max(1, min(limit, changelog.MAX_LIMIT))
+
+    types = None
+    if request.query_params.get('types'):
+        types = [name.strip() for name in request.query_params['types'].split(',') if name.strip()]
+        unknown = [name for name in types if name not in changelog.SOURCES]
+        if unknown:
+            return Response(
+                {'error': f"Unknown types: {', '.join(unknown)}. Available: {', '.join(changelog.SOURCES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    try:
+        data = changelog.read_changes(since, limit=limit, types=types, context={'request': request})
+    except changelog.CursorExpired as e:
+        return Response({'error': str(e), 'reset': True}, status=status.HTTP_410_GONE)
+    return Response(data)
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.25 on 2026-10-19 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xero_integration', '0006_add_clinician_to_invoice'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='xeroinvoicelink',
+            name='line_items',
+            field=models.JSONField(blank=True, default=list, help_text='Line items as last synced from Xero: description, quantity, unit_amount, discount, tax_type, account_code'),
+        ),
+        migrations.AddField(
+            model_name='xeroinvoicelink',
+            name='reference',
+            field=models.CharField(blank=True, help_text='Reference as last synced from Xero', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='xeroquotelink',
+            name='line_items',
+            field=models.JSONField(blank=True, default=list, help_text='Line items as last synced from Xero: description, quantity, unit_amount, discount, tax_type, account_code'),
+        ),
+        migrations.AddField(
+            model_name='xeroquotelink',
+            name='reference',
+            field=models.CharField(blank=True, help_text='Reference as last synced from Xero', max_length=255),
+        ),
+    ]
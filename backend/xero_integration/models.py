@@ -213,6 +213,14 @@ class XeroInvoiceLink(models.Model):
     amount_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     currency = models.CharField(max_length=3, default='AUD')
     
+    # Document content snapshot (so PDFs/emails render without calling Xero)
+    line_items = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Line items as last synced from Xero: description, quantity, unit_amount, discount, tax_type, account_code"
+    )
+    reference = models.CharField(max_length=255, blank=True, help_text="Reference as last synced from Xero")
+    
     # Dates
     invoice_date = models.DateField(null=True, blank=True)
     due_date = models.DateField(null=True, blank=True)
@@ -301,6 +309,14 @@ class XeroQuoteLink(models.Model):
     total_tax = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Total tax amount")
     currency = models.CharField(max_length=3, default='AUD')
     
+    # Document content snapshot (so PDFs/emails render without calling Xero)
+    line_items = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Line items as last synced from Xero: description, quantity, unit_amount, discount, tax_type, account_code"
+    )
+    reference = models.CharField(max_length=255, blank=True, help_text="Reference as last synced from Xero")
+    
     # Dates
     quote_date = models.DateField(null=True, blank=True, help_text="Date quote was created")
     expiry_date = models.DateField(null=True, blank=True, help_text="Quote expiry date")
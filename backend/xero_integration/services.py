@@ -18,6 +18,7 @@ from urllib.parse import urlencode
 
 from django.conf import settings
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from xero_python.api_client import ApiClient
 from xero_python.api_client.configuration import Configuration
 from xero_python.api_client.oauth2 import OAuth2Token
@@ -207,6 +208,27 @@ def generate_smart_reference(patient, custom_reference=None):
     return patient.get_full_name_with_title()
 
 
+def line_items_snapshot(xero_line_items) -> List[Dict[str, Any]]:
+    """
+    Convert Xero LineItem objects to the JSON stored on XeroInvoiceLink /
+    XeroQuoteLink.line_items, so invoice/quote PDFs and emails can be built
+    from the local database.
+    """
+    snapshot = []
+    for item in xero_line_items or []:
+        snapshot.append({
+            'description': item.description or '',
+            'quantity': float(item.quantity) if item.quantity else 1,
+            'unit_amount': float(item.unit_amount) if item.unit_amount else 0,
+            'discount': float(item.discount_rate) if item.discount_rate else 0,
+            'tax_type': item.tax_type or '',
+            'tax_amount': float(item.tax_amount) if getattr(item, 'tax_amount', None) else 0,
+            'line_amount': float(item.line_amount) if getattr(item, 'line_amount', None) else 0,
+            'account_code': item.account_code or '',
+        })
+    return snapshot
+
+
 class XeroService:
     """
     Main service class for Xero API interactions
@@ -696,12 +718,12 @@ class XeroService:
                 name=f"{patient.last_name}, {patient.first_name}",
                 first_name=patient.first_name,
                 last_name=patient.last_name,
-                email_address=patient.get_email() or None,
+                email_address=patient.default_email(),
                 contact_number=str(patient.id)[:12],  # Use patient ID as reference
             )
             
             # Add phone if available
-            mobile = patient.get_mobile()
+            mobile = patient.default_phone(types=('mobile',))
             if mobile:
                 from xero_python.accounting import Phone
                 contact.phones = [
@@ -1079,6 +1101,8 @@ class XeroService:
                 amount_paid=float(xero_invoice.amount_paid) if xero_invoice.amount_paid else 0,
                 invoice_date=xero_invoice.date,
                 due_date=xero_invoice.due_date,
+                line_items=line_items_snapshot(xero_invoice.line_items),
+                reference=xero_invoice.reference or '',
                 last_synced_at=timezone.now()
             )
             
@@ -1227,6 +1251,8 @@ class XeroService:
             if xero_invoice.fully_paid_on_date:
                 invoice_link.fully_paid_on_date = xero_invoice.fully_paid_on_date
             
+            invoice_link.line_items = line_items_snapshot(xero_invoice.line_items)
+            invoice_link.reference = xero_invoice.reference or ''
             invoice_link.last_synced_at = timezone.now()
             invoice_link.save()
             
@@ -1351,6 +1377,8 @@ class XeroService:
             if updated_xero_invoice.due_date:
                 invoice_link.due_date = updated_xero_invoice.due_date
             
+            invoice_link.line_items = line_items_snapshot(updated_xero_invoice.line_items)
+            invoice_link.reference = updated_xero_invoice.reference or ''
             invoice_link.last_synced_at = timezone.now()
             invoice_link.save()
             
@@ -1765,6 +1793,8 @@ class XeroService:
                 total_tax=float(created_quote.total_tax) if created_quote.total_tax else 0,
                 quote_date=created_quote.date,
                 expiry_date=created_quote.expiry_date,
+                line_items=line_items_snapshot(created_quote.line_items),
+                reference=created_quote.reference or '',
                 last_synced_at=timezone.now()
             )
             
@@ -1875,6 +1905,8 @@ class XeroService:
                 amount_paid=float(created_invoice.amount_paid) if created_invoice.amount_paid else 0,
                 invoice_date=created_invoice.date,
                 due_date=created_invoice.due_date,
+                line_items=line_items_snapshot(created_invoice.line_items),
+                reference=created_invoice.reference or '',
                 last_synced_at=timezone.now()
             )
             logger.info(f"✅ [convert_quote_to_invoice] Invoice link created with patient: {quote_link.patient}, company: {quote_link.company}")
@@ -1950,6 +1982,8 @@ class XeroService:
             quote_link.total = float(xero_quote.total) if xero_quote.total else 0
             quote_link.subtotal = float(xero_quote.sub_total) if xero_quote.sub_total else 0
             quote_link.total_tax = float(xero_quote.total_tax) if xero_quote.total_tax else 0
+            quote_link.line_items = line_items_snapshot(xero_quote.line_items)
+            quote_link.reference = xero_quote.reference or ''
             quote_link.last_synced_at = timezone.now()
             quote_link.save()
             
@@ -2550,6 +2584,6 @@ class XeroService:
             raise
 
 
-# Global service instance
-xero_service = XeroService()
+# Global service instance (created on first use)
+xero_service = SimpleLazyObject(XeroService)
 
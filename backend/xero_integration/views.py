@@ -11,6 +11,8 @@ Provides API endpoints for:
 import logging
 from django.shortcuts import redirect
 from django.http import JsonResponse
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
@@ -45,7 +47,10 @@ from .serializers import (
     XeroPaymentSerializer,
     XeroBatchPaymentSerializer
 )
-from .services import xero_service
+
+# xero_integration.services imports the Xero SDK (~200ms), so it is loaded on
+# the first Xero request rather than when the URLconf is imported
+xero_service = SimpleLazyObject(lambda: import_string('xero_integration.services.xero_service'))
 
 
 @api_view(['GET'])